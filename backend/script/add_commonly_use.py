@@ -2,10 +2,10 @@
 import json
 import os
 
-# プロジェクトのルートディレクトリからのパス
+from pokedata import PokeData, POKEMON_DATA_FILE
+
 # backend/script/add_commonly_use.py から見て frontend/data/pokemon_data_all.json を指す
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATA_FILE = os.path.join(BASE_DIR, 'frontend', 'data', 'pokemon_data_all.json')
+DATA_FILE = POKEMON_DATA_FILE
 
 def main():
     if not os.path.exists(DATA_FILE):
@@ -13,17 +13,17 @@ def main():
         return
 
     print(f"Reading data from: {DATA_FILE}")
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON: {e}")
-            return
+    data = PokeData(pokemon_file=DATA_FILE)
+    try:
+        forms = data.forms
+    except json.JSONDecodeError as e:
+        print(f"Error decoding JSON: {e}")
+        return
 
     updated_count = 0
-    total_count = len(data)
+    total_count = len(forms)
     
-    for pokemon in data:
+    for pokemon in forms:
         # commonly_use フィールドがなければ追加
         if 'commonly_use' not in pokemon:
             pokemon['commonly_use'] = []
@@ -31,8 +31,7 @@ def main():
     
     if updated_count > 0:
         print(f"Updating {updated_count} entries out of {total_count}...")
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        data.save_forms()
         print("Done.")
     else:
         print("All entries already have 'commonly_use' field. No changes made.")
@@ -0,0 +1,316 @@
+"""
+対戦ログから使用率データ（pokemon_sv_season_trend.json と同じ形式）を集計するスクリプト
+
+対戦ログの形式（1行1対戦のJSON。.gz / .bz2 / .xz で圧縮されていてもよい）:
+    {"battle_id": "...", "teams": [[{"species": "ディンルー", "item": "たべのこし", "nature": "わんぱく",
+                                    "tera": "みず", "moves": ["じしん", ...]}, ...], [...]]}
+
+機能:
+- ログファイルを1行ずつ読む（展開しながら読むので、ファイルの大きさに関わらずメモリ使用量は一定）
+- ファイル単位でプロセスプールに分配し、各ワーカーの集計（ポケモンごとの登場数と
+  技・持ち物・性格・テラスタイプの回数）を親プロセスで足し合わせる
+- 登場数の順に順位を付け、採用率（そのポケモンの登場数に対する割合）を "85.9%" の形式で出力する
+- 集計結果と取り込んだファイル（サイズ・更新日時）を状態ファイルに保存し、次回は新しいファイルだけを読む
+  （取り込み済みのファイルが変更・削除された場合は --full で集計し直す）
+
+出力は season_store.py --ingest でシーズンとして取り込める。
+
+使用方法:
+    python battle_log_ingest.py logs/                         # logs/ 以下の *.jsonl[.gz|.bz2|.xz] を集計
+    python battle_log_ingest.py logs/ --workers 8 --top 150 --output trend.json
+    python battle_log_ingest.py logs/ --full                  # 状態を使わずに集計し直す
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import lzma
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from incremental_build import save_json_atomic
+from pokedata import NATURE_EFFECTS, PokeData
+from season_store import resolve_form
+
+# プロジェクトルート（backend/script の2階層上）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+OUTPUT_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'battle_log_trend.json')
+STATE_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'battle_log_state.json')
+
+STATE_VERSION = 1
+LOG_SUFFIXES = ('.jsonl', '.jsonl.gz', '.jsonl.bz2', '.jsonl.xz')
+OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+# ファイル単位で読めなかったときの例外（途中で切れた・壊れた圧縮ファイル、文字コードの誤りなど）
+READ_ERRORS = (EOFError, OSError, UnicodeDecodeError, lzma.LZMAError, zlib.error)
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_TOP_SPECIES = 100
+# 分類 → (ログのキー, 出力する件数)。件数は pokemon_sv_season_trend.json に合わせる
+CATEGORIES = {
+    'moves': ('moves', 10),
+    'items': ('item', 10),
+    'natures': ('nature', 5),
+    'teras': ('tera', 8),
+}
+
+
+def nature_label(name: str) -> str:
+    """
+    わんぱく → わんぱく ( B↑ C↓ )（pokemon_sv_season_trend.json と同じ表示名。無補正の性格・表示名付きはそのまま）
+    """
+    effect = NATURE_EFFECTS.get(name)
+    return f"{name} ( {effect[0]}↑ {effect[1]}↓ )" if effect else name
+
+
+def open_log(path: str):
+    """圧縮形式を拡張子で判断してテキストとして開く"""
+    opener = OPENERS.get(os.path.splitext(path)[1], open)
+    return opener(path, 'rt', encoding='utf-8')
+
+
+def find_log_files(paths: List[str]) -> List[str]:
+    """ファイル・ディレクトリの一覧から対戦ログを探す（ディレクトリは再帰的に）"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                files += [os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(LOG_SUFFIXES)]
+        elif os.path.exists(path):
+            files.append(path)
+    return [os.path.abspath(f) for f in files]
+
+
+def file_signature(path: str) -> Dict[str, int]:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+# =============================================================================
+# 集計
+# =============================================================================
+
+def empty_counters() -> Dict:
+    return {'battles': 0, 'lines': 0, 'errors': 0, 'species': {}}
+
+
+def count_team(counters: Dict, team: List[Dict]) -> None:
+    """
+    1チーム分を集計に加える（同じ技が重複していても1回だけ数える）
+
+    値の形が崩れていれば（AttributeError / TypeError）、集計を変える前に例外になる。
+    """
+    rows = []
+    for pokemon in team:
+        name = pokemon.get('species')
+        if not name:
+            continue
+        values = {}
+        for category, (key, _) in CATEGORIES.items():
+            value = pokemon.get(key)
+            if value:
+                values[category] = set(value) if isinstance(value, list) else {value}
+        hash(name)  # 辞書のキーにできない名前（配列など）はここで TypeError にする
+        rows.append((name, values))
+
+    for name, values in rows:
+        entry = counters['species'].get(name)
+        if entry is None:
+            entry = counters['species'][name] = {'count': 0, **{category: {} for category in CATEGORIES}}
+        entry['count'] += 1
+        for category, items in values.items():
+            for value in items:
+                entry[category][value] = entry[category].get(value, 0) + 1
+
+
+def count_lines(lines: Iterator[str], counters: Dict) -> Dict:
+    for line in lines:
+        counters['lines'] += 1
+        if not line.strip():
+            continue
+        try:
+            battle = json.loads(line)
+            teams = battle['teams']
+        except (ValueError, KeyError, TypeError):
+            counters['errors'] += 1
+            continue
+        # 形の崩れた対戦（チームやポケモンが配列・オブジェクトでない）は数えない
+        if not (isinstance(teams, list) and all(isinstance(team, list) and all(isinstance(pokemon, dict)
+                                                                                 for pokemon in team)
+                                                for team in teams)):
+            counters['errors'] += 1
+            continue
+        try:
+            for team in teams:
+                count_team(counters, team)
+        except (AttributeError, TypeError):
+            # 技・持ち物などの値が文字列でない
+            counters['errors'] += 1
+            continue
+        counters['battles'] += 1
+    return counters
+
+
+def count_file(path: str) -> Tuple[str, Dict]:
+    """ワーカー: 1ファイルを集計する"""
+    with open_log(path) as f:
+        return path, count_lines(f, empty_counters())
+
+
+def merge_counters(total: Dict, part: Dict) -> Dict:
+    for key in ('battles', 'lines', 'errors'):
+        total[key] += part[key]
+    for name, entry in part['species'].items():
+        target = total['species'].get(name)
+        if target is None:
+            total['species'][name] = entry
+            continue
+        target['count'] += entry['count']
+        for category in CATEGORIES:
+            values = target[category]
+            for value, count in entry[category].items():
+                values[value] = values.get(value, 0) + count
+    return total
+
+
+def format_rate(count: int, total: int) -> str:
+    return f"{count * 100 / total:.1f}%"
+
+
+def build_trend(counters: Dict, data: Optional[PokeData] = None,
+                top_species: int = DEFAULT_TOP_SPECIES) -> List[Dict]:
+    """
+    集計を pokemon_sv_season_trend.json の形式にする（登場数の多い順に順位を付ける）
+
+    同じ登場数は名前順。図鑑番号は全ポケモンデータから引く（見つからなければ空文字）。
+    """
+    ranked = sorted(counters['species'].items(), key=lambda item: (-item[1]['count'], item[0]))[:top_species]
+    trend = []
+    for rank, (name, entry) in enumerate(ranked, 1):
+        number = ''
+        if data is not None:
+            form_name = resolve_form(data, name)
+            if form_name is not None:
+                number = f"{data.form(form_name).get('pokedex_number', 0):04d}"
+        row = {'rank': rank, 'name': name, 'pokedex_number': number}
+        for category, (_, limit) in CATEGORIES.items():
+            values = sorted(entry[category].items(), key=lambda item: (-item[1], item[0]))[:limit]
+            row[category] = [{'name': nature_label(value) if category == 'natures' else value,
+                              'rate': format_rate(count, entry['count'])} for value, count in values]
+        trend.append(row)
+    return trend
+
+
+# =============================================================================
+# 状態
+# =============================================================================
+
+def load_state(path: str) -> Dict:
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == STATE_VERSION:
+                return state
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {'version': STATE_VERSION, 'files': {}, 'counters': empty_counters()}
+
+
+def ingest(paths: List[str], workers: int = DEFAULT_WORKERS, state_file: Optional[str] = STATE_FILE,
+           full: bool = False, progress: bool = False) -> Dict:
+    """
+    対戦ログを集計する（状態ファイルがあれば新しいファイルだけを読んで足し合わせる）
+
+    読めなかったファイル（途中で切れた圧縮ファイルなど）は取り込まずに failed に入れ、次回また読む。
+    状態ファイルはファイルを1つ取り込むごとに保存する（途中で止まっても取り込んだ分は残る）。
+
+    Returns:
+        {"counters": 集計, "files": 今回読んだファイル数, "skipped": 取り込み済みで読まなかったファイル数,
+         "stale": 取り込み後に変更・削除されたファイル, "failed": [(読めなかったファイル, エラー)],
+         "bytes": 今回読んだファイルの合計サイズ, "elapsed": 秒}
+    """
+    start_time = time.time()
+    state = load_state(None if full else state_file)
+    files = find_log_files(paths)
+    signatures = {path: file_signature(path) for path in files}
+    new_files = [path for path in files if path not in state['files']]
+    # 取り込み済みのファイルのうち、その後に変更・削除されたもの（集計から差し引けないので警告だけ）
+    stale = [path for path, signature in state['files'].items()
+             if (path in signatures and signatures[path] != signature) or not os.path.exists(path)]
+
+    counters = state['counters']
+    failed = []
+    if new_files:
+        # 大きいファイルから割り当てて、最後に1つのワーカーだけが残る時間を短くする
+        new_files.sort(key=lambda path: -signatures[path]['size'])
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(new_files)))) as executor:
+            futures = [executor.submit(count_file, path) for path in new_files]
+            paths_of = dict(zip(futures, new_files))
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    path, part = future.result()
+                except READ_ERRORS as e:
+                    failed.append((paths_of[future], f"{type(e).__name__}: {e}"))
+                    if progress:
+                        print(f"  [{done}/{len(new_files)}] {os.path.basename(paths_of[future])}: "
+                              f"読み込みに失敗しました（{type(e).__name__}: {e}）")
+                    continue
+                merge_counters(counters, part)
+                state['files'][path] = signatures[path]
+                if state_file:
+                    save_json_atomic(state_file, state)
+                if progress:
+                    print(f"  [{done}/{len(new_files)}] {os.path.basename(path)}: "
+                          f"{part['battles']:,} 対戦（不正な行 {part['errors']}）")
+
+    if state_file and not new_files:
+        save_json_atomic(state_file, state)
+    failed_paths = {path for path, _ in failed}
+    return {
+        'counters': counters,
+        'files': len(new_files) - len(failed),
+        'skipped': len(files) - len(new_files),
+        'stale': stale,
+        'failed': failed,
+        'bytes': sum(signatures[path]['size'] for path in new_files if path not in failed_paths),
+        'elapsed': time.time() - start_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='対戦ログから使用率データを集計します')
+    parser.add_argument('paths', nargs='+', help='対戦ログのファイルまたはディレクトリ')
+    parser.add_argument('--output', type=str, default=OUTPUT_FILE, help=f'出力ファイル（デフォルト: {OUTPUT_FILE}）')
+    parser.add_argument('--state', type=str, default=STATE_FILE, help=f'状態ファイル（デフォルト: {STATE_FILE}）')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'ワーカープロセス数（デフォルト: {DEFAULT_WORKERS}）')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_SPECIES, help=f'出力するポケモン数（デフォルト: {DEFAULT_TOP_SPECIES}）')
+    parser.add_argument('--full', action='store_true', help='取り込み済みの集計を使わずに全ファイルを集計し直す')
+    args = parser.parse_args()
+
+    result = ingest(args.paths, args.workers, args.state, full=args.full, progress=True)
+    counters = result['counters']
+    for path, error in result['failed']:
+        print(f"警告: {path} を読み込めませんでした（{error}）。取り込まずに次回また読みます")
+    if result['stale']:
+        print(f"警告: 取り込み済みのファイル {len(result['stale'])}件 が変更・削除されています。"
+              f"集計に反映するには --full で集計し直してください")
+    if not counters['battles']:
+        print("エラー: 集計できる対戦がありません")
+        return 1
+
+    trend = build_trend(counters, PokeData(), args.top)
+    save_json_atomic(args.output, trend, indent=2)
+    elapsed = result['elapsed']
+    print(f"{args.output} に保存しました（{len(trend)}件）")
+    print(f"  今回読んだファイル: {result['files']}件（{result['bytes'] / 1e6:,.1f} MB, "
+          f"{result['bytes'] / 1e6 / elapsed if elapsed > 0 else 0:,.1f} MB/秒）, 取り込み済み: {result['skipped']}件")
+    print(f"  累計: {counters['battles']:,} 対戦, {len(counters['species'])} 種類, 不正な行 {counters['errors']:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
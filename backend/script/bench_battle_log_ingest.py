@@ -0,0 +1,147 @@
+"""
+battle_log_ingest.py の集計速度を合成した対戦ログで計測するベンチマーク
+
+機能:
+- pokemon_sv_season_trend.json の採用率に従って、ランダムなチーム（6匹）の対戦ログを生成する
+  （乱数はシードで再現可能。gzip 圧縮した .jsonl.gz を --files 個）
+- ワーカー数を変えて全件を集計し、総処理時間・MB/秒（圧縮後・展開後）・対戦/秒を表示する
+- 全設定の集計結果が同一であること、ファイルを1つ追加した差分取り込みの結果が
+  全件の集計し直しと一致することを確認する
+
+使用方法:
+    python bench_battle_log_ingest.py
+    python bench_battle_log_ingest.py --files 16 --battles 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+import battle_log_ingest as ingester
+from pokedata import TREND_DATA_FILE
+
+TEAM_SIZE = 6
+MOVES_PER_POKEMON = 4
+
+
+def parse_percent(rate: str) -> float:
+    return float(rate.rstrip('%'))
+
+
+def plain_nature(label: str) -> str:
+    """わんぱく ( B↑ C↓ ) → わんぱく"""
+    return label.split(' (')[0]
+
+
+class BattleGenerator:
+    """使用率データの分布から対戦ログの行を作る"""
+
+    def __init__(self, trend: List[Dict], seed: int = 0):
+        self.random = random.Random(seed)
+        self.trend = trend
+        # 順位が低いほど選ばれにくくする
+        self.weights = [1.0 / entry['rank'] for entry in trend]
+
+    def _choice(self, values: List[Dict], default: str) -> str:
+        if not values:
+            return default
+        weights = [parse_percent(value['rate']) for value in values]
+        return self.random.choices(values, weights=weights)[0]['name']
+
+    def pokemon(self, entry: Dict) -> Dict:
+        moves = entry['moves']
+        chosen = set()
+        while moves and len(chosen) < min(MOVES_PER_POKEMON, len(moves)):
+            chosen.add(self._choice(moves, ''))
+        return {
+            'species': entry['name'],
+            'item': self._choice(entry['items'], ''),
+            'nature': plain_nature(self._choice(entry['natures'], 'まじめ')),
+            'tera': self._choice(entry['teras'], 'ノーマル'),
+            'moves': sorted(chosen),
+        }
+
+    def battle(self, battle_id: str) -> str:
+        teams = []
+        for _ in range(2):
+            entries = set()
+            while len(entries) < TEAM_SIZE:
+                entries.add(self.random.choices(range(len(self.trend)), weights=self.weights)[0])
+            teams.append([self.pokemon(self.trend[i]) for i in sorted(entries)])
+        return json.dumps({'battle_id': battle_id, 'teams': teams}, ensure_ascii=False)
+
+
+def write_logs(directory: str, generator: BattleGenerator, files: int, battles: int,
+               start: int = 0) -> int:
+    """合成ログを書き出す。展開後の合計バイト数を返す"""
+    raw_bytes = 0
+    for file_index in range(start, start + files):
+        path = os.path.join(directory, f'battles-{file_index:04d}.jsonl.gz')
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            for battle_index in range(battles):
+                line = generator.battle(f'{file_index}-{battle_index}') + '\n'
+                raw_bytes += len(line.encode('utf-8'))
+                f.write(line)
+    return raw_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='battle_log_ingest.py の集計速度を合成ログで計測します')
+    parser.add_argument('--files', type=int, default=8, help='生成するログファイル数（デフォルト: 8）')
+    parser.add_argument('--battles', type=int, default=5000, help='1ファイルあたりの対戦数（デフォルト: 5000）')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='計測するワーカー数（複数指定可）')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    args = parser.parse_args()
+
+    with open(TREND_DATA_FILE, 'r', encoding='utf-8') as f:
+        trend = json.load(f)
+    generator = BattleGenerator(trend, args.seed)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        log_dir = os.path.join(work_dir, 'logs')
+        os.makedirs(log_dir)
+        start_time = time.time()
+        raw_bytes = write_logs(log_dir, generator, args.files, args.battles)
+        compressed_bytes = sum(os.path.getsize(os.path.join(log_dir, name)) for name in os.listdir(log_dir))
+        total_battles = args.files * args.battles
+        print(f"合成ログ: {args.files}ファイル, {total_battles:,} 対戦, 展開後 {raw_bytes / 1e6:,.1f} MB, "
+              f"圧縮後 {compressed_bytes / 1e6:,.1f} MB（生成 {time.time() - start_time:.1f}秒, CPU {os.cpu_count()}）")
+
+        print(f"\n{'ワーカー':>8} {'秒':>8} {'MB/秒(展開後)':>14} {'MB/秒(圧縮後)':>14} {'対戦/秒':>10} {'比':>6}")
+        reference = None
+        baseline = None
+        for workers in args.workers:
+            result = ingester.ingest([log_dir], workers, state_file=None, full=True)
+            elapsed = result['elapsed']
+            trend_out = ingester.build_trend(result['counters'])
+            if reference is None:
+                reference, baseline = trend_out, elapsed
+            elif trend_out != reference:
+                print(f"エラー: ワーカー数 {workers} の集計結果が一致しません")
+                return 1
+            print(f"{workers:>8} {elapsed:>8.2f} {raw_bytes / 1e6 / elapsed:>14.1f} "
+                  f"{compressed_bytes / 1e6 / elapsed:>14.1f} {total_battles / elapsed:>10,.0f} "
+                  f"{baseline / elapsed:>5.2f}x")
+
+        # 差分取り込み: 全件を取り込んだ後に1ファイル追加し、追加分だけ読んだ結果を全件の集計し直しと比べる
+        state_file = os.path.join(work_dir, 'state.json')
+        ingester.ingest([log_dir], max(args.workers), state_file=state_file)
+        write_logs(log_dir, generator, 1, args.battles, start=args.files)
+        incremental = ingester.ingest([log_dir], max(args.workers), state_file=state_file)
+        full = ingester.ingest([log_dir], max(args.workers), state_file=None, full=True)
+        same = ingester.build_trend(incremental['counters']) == ingester.build_trend(full['counters'])
+        print(f"\n差分取り込み: {incremental['files']}ファイル読み込み（取り込み済み {incremental['skipped']}件）"
+              f" {incremental['elapsed']:.2f}秒 / 全件 {full['elapsed']:.2f}秒, 結果一致: {'OK' if same else 'NG'}")
+        if not same:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,86 @@
+"""
+damage_engine.py のダメージ計算の速度を測るベンチマーク
+
+機能:
+- 使用率上位のポケモン（pokemon_sv_season_trend.json）を攻撃側・防御側にし、
+  攻撃側 × 防御側 × 技（採用率上位の技）の全組み合わせを DamageEngine.calculate() でまとめて計算する
+- 1回あたりの時間と、計算数/秒（1計算 = 攻撃側・防御側・技1組の乱数16段階）を表示する
+- 比較として、同じ計算を1組ずつ damage_rolls() に渡した場合（damage.js と同じ1組ずつの呼び出し）も測る
+
+使用方法:
+    python bench_damage_engine.py
+    python bench_damage_engine.py --top 100 --moves 10 --repeat 5
+"""
+
+import argparse
+import time
+
+from damage_engine import DamageEngine, damage_rolls, form_stats, form_type_ids
+from pokedata import PokeData
+from season_store import resolve_entry
+from type_table import EFFECTIVENESS_LOOKUP, defender_combo
+
+SINGLE_CALL_SAMPLE = 2000
+
+
+def build_sides(data: PokeData, top: int, move_count: int):
+    """使用率上位のポケモンの攻撃側・防御側（能力Pなし・補正なし）と、上位の技"""
+    attackers, defenders, moves = [], [], []
+    # trends は順位順（同じ名前が2回あれば後の方）
+    for entry in list(data.trends.values())[:top]:
+        form_name = resolve_entry(data, entry)
+        if form_name is None:
+            continue
+        form = data.form(form_name)
+        stats = form_stats(form)
+        type_ids = form_type_ids(form)
+        attackers.append({'type_ids': type_ids, 'stats': stats})
+        defenders.append({'type_ids': type_ids, 'stats': stats})
+        for move in entry.get('moves', []):
+            if move['name'] not in moves and (data.move(move['name']) or {}).get('power'):
+                moves.append(move['name'])
+    return attackers, defenders, moves[:move_count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='damage_engine.py の計算速度を測ります')
+    parser.add_argument('--top', type=int, default=100, help='使用率上位何匹を使うか（デフォルト: 100）')
+    parser.add_argument('--moves', type=int, default=10, help='技の数（デフォルト: 10）')
+    parser.add_argument('--repeat', type=int, default=5, help='繰り返し回数（最良の結果を表示）')
+    args = parser.parse_args()
+
+    data = PokeData()
+    engine = DamageEngine(data)
+    attackers, defenders, moves = build_sides(data, args.top, args.moves)
+    count = len(attackers) * len(defenders) * len(moves)
+    print(f"攻撃側 {len(attackers)} × 防御側 {len(defenders)} × 技 {len(moves)} = {count:,} 計算")
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start_time = time.perf_counter()
+        rolls = engine.calculate(attackers, defenders, moves)
+        best = min(best, time.perf_counter() - start_time)
+    print(f"まとめて計算: {best * 1000:.1f} ms, {count / best:,.0f} 計算/秒（結果 {rolls.nbytes / 1e6:.1f} MB）")
+
+    # 1組ずつの呼び出し（配列化・ブロードキャストの効果を比べる）
+    move_arrays = engine.move_arrays(moves)
+    sample = [(a, d, m) for a in range(len(attackers)) for d in range(len(defenders))
+              for m in range(len(moves))][:SINGLE_CALL_SAMPLE]
+    start_time = time.perf_counter()
+    for a, d, m in sample:
+        physical = move_arrays['category'][m] == 0
+        move_type = move_arrays['type_id'][m]
+        single = damage_rolls(50, move_arrays['power'][m],
+                              attackers[a]['stats']['attack' if physical else 'spAtk'],
+                              defenders[d]['stats']['defense' if physical else 'spDef'],
+                              stab=move_type in attackers[a]['type_ids'],
+                              type_mod=EFFECTIVENESS_LOOKUP[move_type, defender_combo(defenders[d]['type_ids'])])
+        assert (single == rolls[a, d, m]).all()
+    single_rate = len(sample) / (time.perf_counter() - start_time)
+    print(f"1組ずつ計算: {single_rate:,.0f} 計算/秒（{len(sample):,} 組で計測）, "
+          f"まとめて計算は {count / best / single_rate:.0f} 倍")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,201 @@
+"""
+fetch_all_pokemon.py の取得時間をローカルのスタブサーバー（または記録したフィクスチャの再生）で計測するベンチマーク
+
+機能:
+- pokeapi_stub_server をプロセス内で起動し、並列度を変えて全件取得を実行
+- --fixture 指定時は http_fixture で記録した実APIの応答をプロセス内で再生して計測（通信なし）
+- 遅延・429/503 の注入（乱数はシードで再現可能）
+- 各設定の総処理時間（--repeat 回の中央値）・種族/秒と、最初の設定との比較を表示
+- 全設定で最終出力が同一であることを確認
+- get_form_display_name の単体計測
+- --json-out で結果をJSONに保存（入力のハッシュ・コミットを含め、コミット間で比較できるようにする）
+
+使用方法:
+    python bench_fetch_all_pokemon.py                       # 100種族・遅延50ms
+    python bench_fetch_all_pokemon.py --species 50 --latency-ms 20 --configs 1:1 4:8 8:16
+    python bench_fetch_all_pokemon.py --fixture pokeapi_fixture.jsonl.gz --latency-ms 30 --repeat 3 --json-out bench.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import fetch_all_pokemon as fetcher
+from http_fixture import start_replay_server, fixture_sha256
+from pokeapi_stub_server import (
+    start_stub_server, build_species, DEFAULT_SPECIES_COUNT, DEFAULT_LATENCY_MS
+)
+
+BENCH_RATE = 1e6
+FORM_NAME_ITERATIONS = 200  # get_form_display_name の計測で名前一覧を繰り返す回数
+
+
+def run_once(base_url: str, work_dir: str, workers: int, max_concurrency: int) -> Tuple[float, bytes]:
+    """
+    空のキャッシュ・進捗で1回取得を実行する
+
+    Returns:
+        (経過秒数, 最終出力ファイルの内容) のタプル
+    """
+    fetcher.BASE_URL = base_url
+    fetcher.OUTPUT_FILE = os.path.join(work_dir, 'out', 'pokemon_data_all.json')
+    fetcher.LEARNSET_FILE = os.path.join(work_dir, 'out', 'pokemon_learnsets.json')
+    fetcher.JOURNAL_FILE = os.path.join(work_dir, 'journal.sqlite3')
+    fetcher.PROGRESS_FILE = os.path.join(work_dir, 'progress.json')
+    fetcher.CACHE_FILE = os.path.join(work_dir, 'name_cache.json')
+    fetcher.METRICS_JSON_FILE = os.path.join(work_dir, 'metrics.json')
+    fetcher.METRICS_PROM_FILE = os.path.join(work_dir, 'metrics.prom')
+    fetcher.configure_http_cache(None)
+    fetcher.close_journal()
+    for path in (fetcher.OUTPUT_FILE, fetcher.JOURNAL_FILE, fetcher.CACHE_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    for category in fetcher.name_cache:
+        fetcher.name_cache[category] = {}
+
+    start = time.perf_counter()
+    # レート制限は計測対象外にするため十分大きな値にする
+    fetcher.fetch_all_pokemon(resume=False, save_interval=10**9,
+                              workers=workers, max_concurrency=max_concurrency,
+                              rate=BENCH_RATE, max_rate=BENCH_RATE)
+    elapsed = time.perf_counter() - start
+
+    with open(fetcher.OUTPUT_FILE, 'rb') as f:
+        return elapsed, f.read()
+
+
+def collect_form_names(server) -> List[Tuple[str, str]]:
+    """get_form_display_name の計測に使う (内部名, 種族の日本語名) の一覧"""
+    names = []
+    entries = getattr(server, 'entries', None)
+    if entries is not None:
+        for key, entry in entries.items():
+            if key.startswith('/pokemon-species/') and entry.status == 200:
+                species = json.loads(entry.body)
+                ja_name = fetcher.get_japanese_name(species['names']) or species['name']
+                names.extend((v['pokemon']['name'], ja_name) for v in species['varieties'])
+    else:
+        for species_id in range(1, server.species_count + 1):
+            species = build_species(server.base_url, species_id)
+            ja_name = fetcher.get_japanese_name(species['names'])
+            names.extend((v['pokemon']['name'], ja_name) for v in species['varieties'])
+    return names
+
+
+def bench_form_names(names: List[Tuple[str, str]], iterations: int = FORM_NAME_ITERATIONS) -> float:
+    """get_form_display_name 1回あたりの平均マイクロ秒"""
+    if not names:
+        return 0.0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for internal_name, ja_name in names:
+            fetcher.get_form_display_name(internal_name, ja_name)
+    return (time.perf_counter() - start) / (iterations * len(names)) * 1e6
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='fetch_all_pokemon.py の取得時間をスタブサーバーで計測します')
+    parser.add_argument('--species', type=int, default=DEFAULT_SPECIES_COUNT,
+                        help=f'スタブの種族数（デフォルト: {DEFAULT_SPECIES_COUNT}、--fixture 指定時は無視）')
+    parser.add_argument('--fixture', type=str, default=None,
+                        help='スタブの代わりに再生するフィクスチャ（http_fixture の .jsonl.gz）')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help=f'応答遅延ミリ秒（デフォルト: {DEFAULT_LATENCY_MS}）')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='429/503 を返す割合 0〜1（デフォルト: 0）')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='エラー注入の乱数シード（デフォルト: 0）')
+    parser.add_argument('--configs', nargs='+', default=['1:1', '4:8', '8:16', '16:32'],
+                        help='計測する「workers:max-concurrency」の組（デフォルト: 1:1 4:8 8:16 16:32）')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='各設定の実行回数（中央値を採用、デフォルト: 1）')
+    parser.add_argument('--json-out', type=str, default=None,
+                        help='結果を保存するJSONファイル')
+    args = parser.parse_args()
+
+    configs = [tuple(int(v) for v in c.split(':')) for c in args.configs]
+    if args.fixture:
+        server = start_replay_server(args.fixture, latency_ms=args.latency_ms,
+                                     error_rate=args.error_rate, seed=args.seed)
+        source = f"フィクスチャ {args.fixture}（{len(server.entries)}件）"
+    else:
+        server = start_stub_server(species_count=args.species, latency_ms=args.latency_ms,
+                                   error_rate=args.error_rate, seed=args.seed)
+        source = f"スタブ {args.species}種族"
+    results: List[Dict] = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for workers, max_concurrency in configs:
+                runs = []
+                for _ in range(max(1, args.repeat)):
+                    elapsed, output = run_once(server.base_url, work_dir, workers, max_concurrency)
+                    summary = fetcher.telemetry.summary()
+                    runs.append((elapsed, output, summary))
+                elapsed = statistics.median(r[0] for r in runs)
+                output, summary = runs[-1][1], runs[-1][2]
+                results.append({
+                    'workers': workers, 'max_concurrency': max_concurrency,
+                    'elapsed': elapsed, 'runs': [r[0] for r in runs],
+                    'species': summary['run']['species'],
+                    'species_per_second': summary['run']['species'] / elapsed if elapsed > 0 else 0.0,
+                    'requests': summary['totals']['requests'],
+                    'retries': summary['totals']['retries'],
+                    'output_sha256': hashlib.sha256(output).hexdigest(),
+                    'output': output,
+                })
+        form_name_us = bench_form_names(collect_form_names(server))
+    finally:
+        server.shutdown()
+
+    baseline = results[0]
+    print("\n" + "=" * 60)
+    print(f"ベンチマーク結果（{source}, 遅延 {args.latency_ms}ms, エラー率 {args.error_rate:g}）")
+    print("=" * 60)
+    for r in results:
+        speedup = baseline['elapsed'] / r['elapsed'] if r['elapsed'] > 0 else float('inf')
+        same = "一致" if r['output'] == baseline['output'] else "不一致"
+        print(f"  workers={r['workers']:>3}  max-concurrency={r['max_concurrency']:>3}  "
+              f"{r['elapsed']:8.2f}秒  {r['species_per_second']:7.2f}種族/秒  x{speedup:5.1f}  "
+              f"リクエスト {r['requests']}件（再試行 {r['retries']}件）  出力: {same}")
+    print(f"  get_form_display_name: {form_name_us:.2f}µs/回")
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump({
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'source': {
+                    'fixture': args.fixture,
+                    'fixture_sha256': fixture_sha256(args.fixture) if args.fixture else None,
+                    'stub_species': None if args.fixture else args.species,
+                    'latency_ms': args.latency_ms,
+                    'error_rate': args.error_rate,
+                    'seed': args.seed,
+                },
+                'repeat': args.repeat,
+                'results': [{k: v for k, v in r.items() if k != 'output'} for r in results],
+                'get_form_display_name_us': form_name_us,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"結果を保存しました: {args.json_out}")
+
+    return 0 if all(r['output'] == baseline['output'] for r in results) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
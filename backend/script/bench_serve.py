@@ -0,0 +1,272 @@
+"""
+serve.py と python3 -m http.server の配信性能を比べる負荷試験
+
+機能:
+- 2つのサーバーを別プロセスで起動する（http.server はプロジェクトルート、serve.py は dist/）
+- index.html から静的に参照されるファイル（JS・CSS・JSON・画像）をページ1回分の読み込みとし、
+  ブラウザと同じく1訪問者あたり最大 CONNECTIONS_PER_VISITOR 本の接続で取得する
+  （接続が閉じられなければ keep-alive で使い回す）
+- 初回訪問: キャッシュなし（Accept-Encoding: br, gzip）
+- 再訪問: キャッシュあり。ずっとキャッシュしてよいファイル（immutable）はリクエストせず、
+  それ以外は ETag（If-None-Match）または Last-Modified（If-Modified-Since）で再検証する
+- 同時訪問者数を変えて、訪問あたりの時間（中央値・95パーセンタイル）・リクエスト/秒・受信バイト数を表示
+
+使用方法:
+    python bench_serve.py
+    python bench_serve.py --visitors 1 10 50 --rounds 3 --json-out bench_serve.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from build_assets import BASE_DIR, DIST_DIR, PAGE_DIR, build_assets, collect_sources, plan_build
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONNECTIONS_PER_VISITOR = 6
+ACCEPT_ENCODING = 'br, gzip'
+STARTUP_TIMEOUT = 10.0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(command: List[str], cwd: str, port: int) -> subprocess.Popen:
+    """サーバーを起動し、接続を受け付けるまで待つ"""
+    process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"サーバーが起動しませんでした: {' '.join(command)}")
+
+
+def page_assets() -> Tuple[List[str], Dict[str, str]]:
+    """
+    ページ1回分の読み込みで取得するファイル
+
+    Returns:
+        (元のパスの一覧（index.html が先頭）, 元のパス → ビルド後のパス)
+    """
+    sources = collect_sources()
+    _, outputs, references = plan_build(sources)
+    entry = f'{PAGE_DIR}/index.html'
+    order, pending = [], [entry]
+    while pending:
+        path = pending.pop(0)
+        if path in order:
+            continue
+        order.append(path)
+        pending.extend(references.get(path, []))
+    return order, outputs
+
+
+# =============================================================================
+# クライアント
+# =============================================================================
+
+class Connection:
+    """keep-alive できれば使い回す1本の接続"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.opened = 0
+
+    async def request(self, path: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], int]:
+        """
+        GET を1回送る
+
+        Returns:
+            (ステータス, 応答ヘッダー, 受信バイト数)
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+            self.opened += 1
+        lines = [f'GET /{path} HTTP/1.1', f'Host: 127.0.0.1:{self.port}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        version, status = status_line.split()[:2]
+        response_headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(':')
+            if sep:
+                response_headers[name.strip().lower()] = value.strip()
+
+        length = response_headers.get('content-length')
+        if int(status) == 304:
+            body_size = 0
+        elif length is not None:
+            body_size = len(await self.reader.readexactly(int(length)))
+        else:
+            body_size = len(await self.reader.read())
+
+        if version == 'HTTP/1.0' or response_headers.get('connection', '').lower() == 'close' or length is None:
+            await self.close()
+        return int(status), response_headers, len(head) + body_size
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = self.reader = None
+
+
+async def visit(port: int, paths: List[str], cache: Optional[Dict[str, Dict[str, str]]] = None) -> Dict:
+    """
+    ページを1回読み込む（index.html の後に残りを並列に取得する）
+
+    Args:
+        cache: 前回の応答ヘッダー {パス: ヘッダー}（None ならキャッシュなし。取得した応答で更新する）
+
+    Returns:
+        {"elapsed", "requests", "bytes", "not_modified", "connections", "errors"}
+    """
+    start_time = time.perf_counter()
+    connections = [Connection(port) for _ in range(CONNECTIONS_PER_VISITOR)]
+    stats = {'requests': 0, 'bytes': 0, 'not_modified': 0, 'errors': 0}
+
+    async def fetch(connection: Connection, path: str) -> None:
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        cached = cache.get(path) if cache is not None else None
+        if cached is not None:
+            if 'immutable' in cached.get('cache-control', ''):
+                return
+            if 'etag' in cached:
+                headers['If-None-Match'] = cached['etag']
+            elif 'last-modified' in cached:
+                headers['If-Modified-Since'] = cached['last-modified']
+        try:
+            status, response_headers, size = await connection.request(path, headers)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            stats['errors'] += 1
+            await connection.close()
+            return
+        stats['requests'] += 1
+        stats['bytes'] += size
+        if status == 304:
+            stats['not_modified'] += 1
+        elif status == 200:
+            if cache is not None:
+                cache[path] = response_headers
+        else:
+            stats['errors'] += 1
+
+    async def worker(connection: Connection, queue: List[str]) -> None:
+        while queue:
+            await fetch(connection, queue.pop(0))
+
+    await fetch(connections[0], paths[0])
+    queue = list(paths[1:])
+    await asyncio.gather(*(worker(connection, queue) for connection in connections))
+    for connection in connections:
+        await connection.close()
+    stats['connections'] = sum(connection.opened for connection in connections)
+    stats['elapsed'] = time.perf_counter() - start_time
+    return stats
+
+
+async def run_load(port: int, paths: List[str], visitors: int, repeat_visit: bool) -> Dict:
+    """visitors 人が同時にページを読み込む（再訪問なら事前に1回読み込んでキャッシュを作る）"""
+    caches = [{} if repeat_visit else None for _ in range(visitors)]
+    if repeat_visit:
+        for cache in caches:
+            await visit(port, paths, cache)
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*(visit(port, paths, cache) for cache in caches))
+    wall = time.perf_counter() - start_time
+    times = sorted(r['elapsed'] for r in results)
+    requests = sum(r['requests'] for r in results)
+    return {
+        'visitors': visitors,
+        'median_ms': statistics.median(times) * 1000,
+        'p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+        'requests_per_sec': requests / wall if wall > 0 else 0.0,
+        'requests_per_visit': requests / visitors,
+        'bytes_per_visit': sum(r['bytes'] for r in results) / visitors,
+        'connections_per_visit': sum(r['connections'] for r in results) / visitors,
+        'errors': sum(r['errors'] for r in results),
+    }
+
+
+def best_of(port: int, paths: List[str], visitors: int, repeat_visit: bool, rounds: int) -> Dict:
+    """rounds 回のうち訪問時間の中央値が最小の結果"""
+    results = [asyncio.run(run_load(port, paths, visitors, repeat_visit)) for _ in range(rounds)]
+    return min(results, key=lambda r: r['median_ms'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='serve.py と python3 -m http.server の配信性能を比較します')
+    parser.add_argument('--visitors', type=int, nargs='+', default=[1, 10, 50],
+                        help='同時訪問者数（複数指定可）')
+    parser.add_argument('--rounds', type=int, default=3, help='各設定の試行回数（最良の結果を表示）')
+    parser.add_argument('--no-build', action='store_true', help='build_assets.py を実行せずに既存の dist/ を使う')
+    parser.add_argument('--json-out', type=str, default=None, help='結果をJSONで保存するファイル')
+    args = parser.parse_args()
+
+    if not args.no_build:
+        build_assets()
+    order, outputs = page_assets()
+    # サーバー名 → (ポート → 起動コマンド, 作業ディレクトリ, 取得するパス)
+    servers = {
+        'http.server': (lambda port: [sys.executable, '-m', 'http.server', '--bind', '127.0.0.1', str(port)],
+                        BASE_DIR, order),
+        'serve.py': (lambda port: [sys.executable, os.path.join(SCRIPT_DIR, 'serve.py'),
+                                   '--root', DIST_DIR, '--port', str(port)],
+                     SCRIPT_DIR, [outputs[path] for path in order]),
+    }
+    print(f"ページ1回分: {len(order)}ファイル（{', '.join(os.path.basename(p) for p in order[:6])} ...）")
+
+    results = []
+    for name, (command, cwd, paths) in servers.items():
+        port = free_port()
+        process = start_server(command(port), cwd, port)
+        try:
+            for repeat_visit in (False, True):
+                for visitors in args.visitors:
+                    result = best_of(port, paths, visitors, repeat_visit, args.rounds)
+                    result.update({'server': name, 'visit': 'repeat' if repeat_visit else 'first'})
+                    results.append(result)
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f"\n{'サーバー':<12} {'訪問':<6} {'同時':>4} {'中央値ms':>9} {'p95 ms':>9} {'req/秒':>9} "
+          f"{'req/訪問':>8} {'接続/訪問':>9} {'受信KB/訪問':>12} {'エラー':>6}")
+    for r in results:
+        print(f"{r['server']:<12} {'初回' if r['visit'] == 'first' else '再訪問':<6} {r['visitors']:>4} "
+              f"{r['median_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['requests_per_sec']:>9.0f} "
+              f"{r['requests_per_visit']:>8.1f} {r['connections_per_visit']:>9.1f} "
+              f"{r['bytes_per_visit'] / 1024:>12.1f} {r['errors']:>6}")
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump({'files': order, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n{args.json_out} に保存しました")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
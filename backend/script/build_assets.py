@@ -0,0 +1,342 @@
+"""
+フロントエンドの配信用ビルド（JSONの最小化・内容ハッシュ付きファイル名・圧縮済みファイル・アセットマニフェスト）
+
+frontend/ と backend/data/image/ を dist/ に同じ配置で書き出す。
+
+- JSON はインデントなしに最小化する
+- 他のファイルから参照されるファイル（JS・CSS・JSON・画像）は名前に内容のハッシュを付ける
+  （main-<hash>.js）。参照元の import・src/href・url()・fetch のパスを書き換え、?v= は取り除く
+  参照元のハッシュは書き換え後の内容から計算するため、依存先が変われば参照元の名前も変わる
+- 名前にすでにハッシュを含むファイル（データシャード・ミラーした画像・アトラスのシート）はそのまま
+- 入口のファイル（index.html、どこからも静的に参照されないファイル）は名前を変えない
+- テキストのファイルは gzip（.gz）と brotli（.br、brotli パッケージがある場合）の圧縮版も書き出す
+- dist/asset-manifest.json に、元のパス → 出力パスと、各出力ファイルのSHA-256・サイズ・
+  圧縮版・ずっとキャッシュしてよいか（immutable）を書き出す（serve.py が使う）
+
+内容が変わらないファイルは書き直さず、前回の出力に残っていて今回の出力に無いファイルは削除する。
+
+使用方法:
+    python build_assets.py
+    python build_assets.py --output /tmp/dist --no-compress
+"""
+
+import argparse
+import graphlib
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# プロジェクトルート（backend/script の2階層上）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DIST_DIR = os.path.join(BASE_DIR, 'dist')
+MANIFEST_NAME = 'asset-manifest.json'
+
+# 配信するディレクトリ（プロジェクトルートからの相対パス）
+SOURCE_DIRS = ('frontend', 'backend/data/image')
+# ページ（index.html）のあるディレクトリ。fetch のパスはここからの相対パスとして解決する
+PAGE_DIR = 'frontend'
+# 名前にすでに内容のハッシュを含むファイルのディレクトリ（名前を変えずにずっとキャッシュさせる）
+PREHASHED_DIRS = ('frontend/data/shards', 'backend/data/image/sprites', 'backend/data/image/atlas')
+# 配信しないファイル（ビルド用の状態ファイル）
+EXCLUDE_FILES = ('backend/data/image/sprites/manifest.json', 'backend/data/image/atlas/atlas_state.json')
+EXCLUDE_SUFFIXES = ('.tmp',)
+
+MANIFEST_VERSION = 1
+HASH_LENGTH = 10
+TEXT_EXTENSIONS = ('.html', '.js', '.css', '.json', '.svg', '.txt')
+MIN_COMPRESS_SIZE = 256  # これより小さいファイルは圧縮しない
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# 参照の抽出（url は ./ ../ で始まる相対パス、または HTML の src/href の値）
+HTML_REF = re.compile(r'(?P<prefix>\b(?:src|href)=)(?P<q>["\'])(?P<url>[^"\']+)(?P=q)')
+CSS_REF = re.compile(r'(?P<prefix>url\(\s*)(?P<q>["\']?)(?P<url>[^"\')]+)(?P=q)')
+# import 文のパスはそのモジュールから、それ以外の文字列はページからの相対パス
+JS_REF = re.compile(r'(?P<prefix>\bfrom\s*|\bimport\s*\(?\s*)?(?P<q>["\'])(?P<url>\.\.?/[^"\'\n]*)(?P=q)')
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hashed_name(path: str, data: bytes) -> str:
+    """main.js → main-<hash>.js"""
+    stem, ext = posixpath.splitext(path)
+    return f"{stem}-{sha256_hex(data)[:HASH_LENGTH]}{ext}"
+
+
+def in_dirs(path: str, directories) -> bool:
+    return any(path == d or path.startswith(d + '/') for d in directories)
+
+
+def collect_sources(base_dir: str = BASE_DIR) -> Dict[str, str]:
+    """配信するファイル（プロジェクトルートからの相対パス → 絶対パス）"""
+    sources = {}
+    for source_dir in SOURCE_DIRS:
+        root = os.path.join(base_dir, *source_dir.split('/'))
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                full_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(full_path, base_dir).replace(os.sep, '/')
+                if rel_path in EXCLUDE_FILES or filename.endswith(EXCLUDE_SUFFIXES) or filename.startswith('.'):
+                    continue
+                sources[rel_path] = full_path
+    return sources
+
+
+def minify_json(data: bytes) -> bytes:
+    return json.dumps(json.loads(data.decode('utf-8')), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# =============================================================================
+# 参照の抽出と書き換え
+# =============================================================================
+
+def split_url(url: str) -> Tuple[str, str]:
+    """パスとクエリ・フラグメントに分ける（?v=118 などはパスに含めない）"""
+    match = re.search(r'[?#]', url)
+    return (url[:match.start()], url[match.start():]) if match else (url, '')
+
+
+def resolve(base_dir: str, url: str, sources) -> Optional[str]:
+    """参照元のディレクトリから見た相対URLを、配信するファイルのパスに解決する"""
+    if re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*:|^//|^#|^/', url):
+        return None
+    path, _ = split_url(url)
+    if not path:
+        return None
+    target = posixpath.normpath(posixpath.join(base_dir, path))
+    return target if target in sources else None
+
+
+def reference_pattern(path: str):
+    """ファイルの種類ごとの (正規表現, 参照の解決に使うディレクトリを決める関数)"""
+    directory = posixpath.dirname(path)
+    if path.endswith('.html'):
+        return HTML_REF, lambda m: directory
+    if path.endswith('.css'):
+        return CSS_REF, lambda m: directory
+    if path.endswith('.js'):
+        return JS_REF, lambda m: directory if m.group('prefix') else PAGE_DIR
+    return None, None
+
+
+def find_references(path: str, text: str, sources) -> List[str]:
+    pattern, base_of = reference_pattern(path)
+    if pattern is None:
+        return []
+    targets = []
+    for match in pattern.finditer(text):
+        target = resolve(base_of(match), match.group('url'), sources)
+        if target and target != path and target not in targets:
+            targets.append(target)
+    return targets
+
+
+def rewrite_references(path: str, text: str, sources, outputs: Dict[str, str]) -> str:
+    """参照先を出力パス（ハッシュ付きの名前）に書き換える。?v= などのクエリは取り除く"""
+    pattern, base_of = reference_pattern(path)
+    if pattern is None:
+        return text
+
+    def replace(match):
+        url = match.group('url')
+        base = base_of(match)
+        target = resolve(base, url, sources)
+        if not target or target == path:
+            return match.group(0)
+        _, suffix = split_url(url)
+        # キャッシュ破棄用のクエリは不要になる（フラグメントだけ残す）
+        fragment = suffix[suffix.index('#'):] if '#' in suffix else ''
+        new_url = posixpath.relpath(outputs[target], base)
+        if url.startswith('./') and not new_url.startswith('../'):
+            new_url = './' + new_url
+        return f"{match.group('prefix') or ''}{match.group('q')}{new_url}{fragment}{match.group('q')}"
+
+    return pattern.sub(replace, text)
+
+
+# =============================================================================
+# ビルド
+# =============================================================================
+
+def compress_variants(data: bytes, compress: bool = True) -> Dict[str, bytes]:
+    """圧縮版（元より小さくなるものだけ）"""
+    if not compress or len(data) < MIN_COMPRESS_SIZE:
+        return {}
+    variants = {'gzip': gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+    if BROTLI_AVAILABLE:
+        variants['br'] = brotli.compress(data, quality=BROTLI_QUALITY)
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(data)}
+
+
+ENCODING_SUFFIX = {'gzip': '.gz', 'br': '.br'}
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    """内容が同じなら書き直さない（更新日時を保つ）。書き込んだら True"""
+    if os.path.exists(path) and os.path.getsize(path) == len(data):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+    return True
+
+
+def plan_build(sources: Dict[str, str]) -> Tuple[Dict[str, bytes], Dict[str, str], Dict[str, List[str]]]:
+    """
+    各ファイルの出力内容と出力パスを決める
+
+    Returns:
+        (出力内容 {元のパス: バイト列}, 出力パス {元のパス: 出力パス}, 参照 {元のパス: [参照先]})
+
+    Raises:
+        ValueError: ファイル間の参照が循環している（ハッシュを決められない）
+    """
+    contents: Dict[str, bytes] = {}
+    references: Dict[str, List[str]] = {}
+    for path, full_path in sources.items():
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        if path.endswith('.json'):
+            data = minify_json(data)
+        contents[path] = data
+        if path.endswith(('.html', '.css', '.js')):
+            references[path] = find_references(path, data.decode('utf-8'), sources)
+        else:
+            references[path] = []
+
+    referenced = {target for targets in references.values() for target in targets}
+    sorter = graphlib.TopologicalSorter({path: references[path] for path in sources})
+    try:
+        order = list(sorter.static_order())
+    except graphlib.CycleError as e:
+        raise ValueError(f"ファイル間の参照が循環しています: {' → '.join(e.args[1])}")
+
+    # 参照先から順に内容を確定させ、ハッシュ付きの名前を決める
+    outputs: Dict[str, str] = {}
+    for path in order:
+        if references[path]:
+            text = rewrite_references(path, contents[path].decode('utf-8'), sources, outputs)
+            contents[path] = text.encode('utf-8')
+        if path in referenced and not in_dirs(path, PREHASHED_DIRS):
+            outputs[path] = hashed_name(path, contents[path])
+        else:
+            outputs[path] = path
+    return contents, outputs, references
+
+
+def build_assets(output_dir: str = DIST_DIR, base_dir: str = BASE_DIR, compress: bool = True) -> Dict:
+    """
+    dist/ を作る
+
+    Returns:
+        {"files": 出力ファイル数, "written": 書き込んだファイル数, "removed": 削除したファイル数,
+         "source_bytes": 元の合計サイズ, "output_bytes": 出力の合計サイズ,
+         "gzip_bytes": 圧縮版がある場合は圧縮後で数えた合計サイズ, "manifest": マニフェスト}
+    """
+    start_time = time.time()
+    sources = collect_sources(base_dir)
+    contents, outputs, _ = plan_build(sources)
+
+    files: Dict[str, Dict] = {}
+    written = 0
+    live = {MANIFEST_NAME}
+    stats = {'source_bytes': 0, 'output_bytes': 0, 'gzip_bytes': 0, 'br_bytes': 0}
+    for path in sorted(sources):
+        data = contents[path]
+        output = outputs[path]
+        entry = {
+            'sha256': sha256_hex(data),
+            'size': len(data),
+            'immutable': output != path or in_dirs(path, PREHASHED_DIRS),
+        }
+        if write_if_changed(os.path.join(output_dir, *output.split('/')), data):
+            written += 1
+        live.add(output)
+
+        variants = compress_variants(data, compress) if path.endswith(TEXT_EXTENSIONS) else {}
+        if variants:
+            entry['encodings'] = {}
+            for encoding, body in variants.items():
+                variant_path = output + ENCODING_SUFFIX[encoding]
+                if write_if_changed(os.path.join(output_dir, *variant_path.split('/')), body):
+                    written += 1
+                live.add(variant_path)
+                entry['encodings'][encoding] = {'file': variant_path, 'size': len(body)}
+        files[output] = entry
+
+        stats['source_bytes'] += os.path.getsize(sources[path])
+        stats['output_bytes'] += len(data)
+        stats['gzip_bytes'] += len(variants.get('gzip', data))
+        stats['br_bytes'] += len(variants.get('br', variants.get('gzip', data)))
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'assets': {path: outputs[path] for path in sorted(sources)},
+        'files': files,
+    }
+    manifest_data = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    if write_if_changed(os.path.join(output_dir, MANIFEST_NAME), manifest_data):
+        written += 1
+
+    # 前回のビルドの残り（名前の変わった古いファイル）を消す
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(output_dir, topdown=False):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            if os.path.relpath(full_path, output_dir).replace(os.sep, '/') not in live:
+                os.remove(full_path)
+                removed += 1
+        if dirpath != output_dir and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+    return {'files': len(files), 'written': written, 'removed': removed,
+            'elapsed': time.time() - start_time, 'manifest': manifest, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='フロントエンドの配信用ファイル（ハッシュ付きの名前・圧縮版）を作成します')
+    parser.add_argument('--output', type=str, default=DIST_DIR, help=f'出力先ディレクトリ（デフォルト: {DIST_DIR}）')
+    parser.add_argument('--no-compress', action='store_true', help='gzip・brotli の圧縮版を作らない')
+    args = parser.parse_args()
+
+    if not args.no_compress and not BROTLI_AVAILABLE:
+        print("brotli がインストールされていないため、gzip の圧縮版だけを作ります（pip install brotli）")
+
+    try:
+        result = build_assets(args.output, compress=not args.no_compress)
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"エラー: {str(e)}")
+        return 1
+
+    hashed = sum(1 for path, output in result['manifest']['assets'].items() if output != path)
+    print(f"{args.output} に {result['files']}件 を出力しました"
+          f"（名前にハッシュを付けたファイル {hashed}件, 書き込み {result['written']}件, "
+          f"削除 {result['removed']}件, {result['elapsed']:.2f}秒）")
+    print(f"  元のサイズ:   {result['source_bytes']:>12,} バイト")
+    print(f"  最小化後:     {result['output_bytes']:>12,} バイト")
+    print(f"  gzip 転送時:  {result['gzip_bytes']:>12,} バイト")
+    if BROTLI_AVAILABLE and not args.no_compress:
+        print(f"  brotli 転送時:{result['br_bytes']:>12,} バイト")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
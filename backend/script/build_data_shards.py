@@ -0,0 +1,270 @@
+"""
+フロントエンド用に全ポケモンデータを「軽量な索引」と「遅延読み込みする詳細シャード」に分割する
+
+ページ表示時に 2MB 超の pokemon_data_all.json と使用率データを全て読み込む代わりに、
+オートコンプリートとチームスロットに必要な項目（名前・タイプ・種族値・画像など）だけの索引を読み込み、
+特性・覚える技・使用率の詳細は、ポケモンを選んだ時にそのポケモンを含むシャードだけを読み込む。
+
+出力（frontend/data 以下）:
+    pokemon_manifest.json              索引・シャードのファイル名とSHA-256（毎回取得する小さなファイル）
+    shards/pokemon-index-<hash>.json   索引（フィールド名の配列 + 行の配列、使用率順位）
+    shards/pokemon-<NN>-<hash>.json    図鑑番号 SHARD_SPAN 件ごとの詳細（特性・覚える技・よく使う技・使用率）
+
+ファイル名に内容のハッシュを含むため、内容が変わらない限り同じURLになり、ブラウザのキャッシュが効く。
+作成後、索引とシャードから元のデータ（pokemon_data_all.json・使用率データ）を組み立て直して
+完全に一致することを確認する（一致しなければマニフェストを更新しない）。
+
+使用方法:
+    python build_data_shards.py
+    python build_data_shards.py --shard-span 32
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from typing import Dict, List, Tuple
+
+from incremental_build import record_keys
+
+# プロジェクトルート（backend/script の2階層上）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(BASE_DIR, 'frontend', 'data')
+POKEMON_DATA_FILE = os.path.join(DATA_DIR, 'pokemon_data_all.json')
+TREND_DATA_FILE = os.path.join(DATA_DIR, 'pokemon_sv_season_trend.json')
+MANIFEST_FILE = os.path.join(DATA_DIR, 'pokemon_manifest.json')
+SHARD_DIR_NAME = 'shards'
+
+MANIFEST_VERSION = 1
+SHARD_SPAN = 16  # 1シャードあたりの図鑑番号の数
+HASH_LENGTH = 12
+
+# 索引の行のフィールド（元データのキー順。types は [名前, slot(, タイプID)]、base_stats は STAT_KEYS 順の配列）
+INDEX_FIELDS = ('pokedex_name', 'sprite_url', 'pokedex_number', 'weight_kg', 'height_m', 'is_default',
+                'form_name', 'base_species', 'types', 'base_stats', 'shard')
+# シャードに入れるフィールド（元データのキー順）
+DETAIL_FIELDS = ('abilities', 'moves', 'commonly_use')
+STAT_KEYS = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+FIELD_ORDER = INDEX_FIELDS[:-1] + DETAIL_FIELDS
+
+
+def compact_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def shard_of(pokedex_number, shard_span: int = SHARD_SPAN) -> int:
+    try:
+        return int(pokedex_number) // shard_span
+    except (TypeError, ValueError):
+        return 0
+
+
+def common_prefix(values: List[str]) -> str:
+    """画像URLの共通部分（索引では URL からこの部分を除いて持つ）"""
+    if not values:
+        return ''
+    prefix = os.path.commonprefix(values)
+    return prefix[:prefix.rfind('/') + 1]
+
+
+# =============================================================================
+# 分割
+# =============================================================================
+
+def split_dataset(forms: List[Dict], trend: List[Dict],
+                  shard_span: int = SHARD_SPAN) -> Tuple[Dict, Dict[int, Dict]]:
+    """
+    全ポケモンデータと使用率データを索引とシャードに分ける
+
+    Returns:
+        (索引, {シャード番号: シャード}) のタプル
+    """
+    if any(tuple(form) != FIELD_ORDER for form in forms):
+        raise ValueError("pokemon_data_all.json のキー構成が想定と異なります")
+
+    keys = record_keys(forms)
+    sprite_prefix = common_prefix([form['sprite_url'] for form in forms if form['sprite_url']])
+    rows = []
+    shards: Dict[int, Dict] = {}
+    shard_by_name: Dict[str, int] = {}
+    for key, form in zip(keys, forms):
+        shard = shard_of(form['pokedex_number'], shard_span)
+        shard_by_name.setdefault(form['pokedex_name'], shard)
+        sprite = form['sprite_url']
+        if sprite is not None and sprite.startswith(sprite_prefix):
+            sprite = sprite[len(sprite_prefix):]
+        rows.append([
+            form['pokedex_name'], sprite, form['pokedex_number'], form['weight_kg'], form['height_m'],
+            form['is_default'], form['form_name'], form['base_species'],
+            [[t['name'], t['slot']] + ([t['id']] if 'id' in t else []) for t in form['types']],
+            [form['base_stats'][stat] for stat in STAT_KEYS],
+            shard,
+        ])
+        detail = shards.setdefault(shard, {'forms': {}, 'usage': []})
+        detail['forms'][key] = [
+            [[a['name'], a['is_hidden']] for a in form['abilities']],
+            form['moves'],
+            form['commonly_use'],
+        ]
+
+    # 使用率はそのポケモンのフォルムを含むシャードへ（同名のフォルムが無ければ図鑑番号で決める）
+    ranking = []
+    for position, entry in enumerate(trend):
+        shard = shard_by_name.get(entry['name'], shard_of(entry.get('pokedex_number'), shard_span))
+        shards.setdefault(shard, {'forms': {}, 'usage': []})['usage'].append([position, entry])
+        ranking.append([entry['rank'], entry['name'], shard])
+
+    index = {
+        'fields': list(INDEX_FIELDS),
+        'stat_keys': list(STAT_KEYS),
+        'sprite_prefix': sprite_prefix,
+        'rows': rows,
+        'usage_ranking': ranking,
+    }
+    return index, shards
+
+
+def reassemble(index: Dict, shards: Dict[int, Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """索引とシャードから元の全ポケモンデータ・使用率データを組み立て直す"""
+    forms = []
+    names = [row[0] for row in index['rows']]
+    keys = record_keys([{'pokedex_name': name} for name in names])
+    for key, row in zip(keys, index['rows']):
+        values = dict(zip(index['fields'], row))
+        sprite = values['sprite_url']
+        abilities, moves, commonly_use = shards[values['shard']]['forms'][key]
+        forms.append({
+            'pokedex_name': values['pokedex_name'],
+            'sprite_url': None if sprite is None else index['sprite_prefix'] + sprite,
+            'pokedex_number': values['pokedex_number'],
+            'weight_kg': values['weight_kg'],
+            'height_m': values['height_m'],
+            'is_default': values['is_default'],
+            'form_name': values['form_name'],
+            'base_species': values['base_species'],
+            'types': [dict(zip(('name', 'slot', 'id'), t)) for t in values['types']],
+            'base_stats': dict(zip(index['stat_keys'], values['base_stats'])),
+            'abilities': [{'name': name, 'is_hidden': hidden} for name, hidden in abilities],
+            'moves': moves,
+            'commonly_use': commonly_use,
+        })
+    usage = sorted((item for shard in shards.values() for item in shard['usage']), key=lambda item: item[0])
+    return forms, [entry for _, entry in usage]
+
+
+def same_json(a, b) -> bool:
+    """値・型・キー順まで同じか（JSONとして同じ文字列になるか）"""
+    return compact_json(a) == compact_json(b)
+
+
+# =============================================================================
+# 書き出し
+# =============================================================================
+
+def write_hashed(directory: str, stem: str, data) -> Tuple[str, str, int]:
+    """内容ハッシュ付きのファイル名で書き出す（同じ内容のファイルがあれば書き直さない）"""
+    body = compact_json(data)
+    digest = hashlib.sha256(body).hexdigest()
+    file_name = f"{stem}-{digest[:HASH_LENGTH]}.json"
+    path = os.path.join(directory, file_name)
+    if not os.path.exists(path):
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_file, path)
+    return file_name, digest, len(body)
+
+
+def build_shards(pokemon_file: str = POKEMON_DATA_FILE, trend_file: str = TREND_DATA_FILE,
+                 manifest_file: str = MANIFEST_FILE, shard_span: int = SHARD_SPAN) -> Dict:
+    """
+    索引・シャード・マニフェストを作る
+
+    Returns:
+        統計情報（シャード数・索引サイズ・合計サイズ・元データのサイズ）
+    """
+    with open(pokemon_file, 'r', encoding='utf-8') as f:
+        forms = json.load(f)
+    trend = []
+    if trend_file and os.path.exists(trend_file):
+        with open(trend_file, 'r', encoding='utf-8') as f:
+            trend = json.load(f)
+
+    index, shards = split_dataset(forms, trend, shard_span)
+    rebuilt_forms, rebuilt_trend = reassemble(index, shards)
+    if not same_json(rebuilt_forms, forms) or not same_json(rebuilt_trend, trend):
+        raise ValueError("索引とシャードから元のデータを組み立て直せませんでした")
+
+    data_dir = os.path.dirname(manifest_file)
+    shard_dir = os.path.join(data_dir, SHARD_DIR_NAME)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    index_file, index_sha, index_size = write_hashed(shard_dir, 'pokemon-index', index)
+    shard_entries = []
+    total_size = index_size
+    for number in sorted(shards):
+        file_name, digest, size = write_hashed(shard_dir, f"pokemon-{number:02d}", shards[number])
+        shard_entries.append({'id': number, 'file': f"{SHARD_DIR_NAME}/{file_name}", 'sha256': digest,
+                              'size': size, 'forms': len(shards[number]['forms'])})
+        total_size += size
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'shard_span': shard_span,
+        'source_sha256': hashlib.sha256(compact_json(forms)).hexdigest(),
+        'index': {'file': f"{SHARD_DIR_NAME}/{index_file}", 'sha256': index_sha, 'size': index_size},
+        'shards': shard_entries,
+    }
+    tmp_file = manifest_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+    # マニフェストから参照されなくなった古いファイルを削除する
+    referenced = {os.path.basename(entry['file']) for entry in shard_entries} | {index_file}
+    removed = 0
+    for file_name in os.listdir(shard_dir):
+        if file_name.startswith('pokemon-') and file_name.endswith('.json') and file_name not in referenced:
+            os.remove(os.path.join(shard_dir, file_name))
+            removed += 1
+
+    return {
+        'shards': len(shard_entries),
+        'index_size': index_size,
+        'total_size': total_size,
+        'largest_shard': max((entry['size'] for entry in shard_entries), default=0),
+        'source_size': os.path.getsize(pokemon_file) + (os.path.getsize(trend_file) if trend else 0),
+        'removed': removed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='pokemon_data_all.json をフロントエンド用の索引と詳細シャードに分割します'
+    )
+    parser.add_argument('--input', type=str, default=POKEMON_DATA_FILE,
+                        help=f'全ポケモンデータ（デフォルト: {POKEMON_DATA_FILE}）')
+    parser.add_argument('--trend', type=str, default=TREND_DATA_FILE,
+                        help=f'使用率データ（デフォルト: {TREND_DATA_FILE}）')
+    parser.add_argument('--manifest', type=str, default=MANIFEST_FILE,
+                        help=f'マニフェストの出力先（デフォルト: {MANIFEST_FILE}）')
+    parser.add_argument('--shard-span', type=int, default=SHARD_SPAN,
+                        help=f'1シャードあたりの図鑑番号の数（デフォルト: {SHARD_SPAN}）')
+    args = parser.parse_args()
+
+    try:
+        stats = build_shards(args.input, args.trend, args.manifest, max(1, args.shard_span))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"エラー: {str(e)}")
+        return 1
+
+    print(f"{args.manifest} を作成しました（元データと一致することを確認済み）")
+    print(f"  索引: {stats['index_size'] / 1024:.0f}KB"
+          f"（元データ {stats['source_size'] / 1024:.0f}KB の {stats['index_size'] / stats['source_size']:.1%}）")
+    print(f"  シャード: {stats['shards']}個, 最大 {stats['largest_shard'] / 1024:.0f}KB, "
+          f"合計 {stats['total_size'] / 1024:.0f}KB, 古いファイルの削除 {stats['removed']}個")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,386 @@
+"""
+ポケモンのアイコンと backend/data/image の画像をスプライトシート（アトラス）にまとめるスクリプト
+
+機能:
+- mirror_sprites.py でローカルに保存したポケモン画像と backend/data/image/*.png を
+  スカイライン法（Bottom-Left）で数枚のシートに詰める
+- ポケモン画像は正方形のセルの中央に置く（表示側は正方形の枠に % 指定でそのまま合わせられる）
+- 同じ画像を使うフォルムは1つの領域を共有する
+- 座標の索引 frontend/data/sprite_atlas.json（pokedex_name → [シート番号, x, y, 幅, 高さ]）を出力
+- 差分更新: 前回の配置と各シートの空き状況（スカイライン）を atlas/atlas_state.json に保存し、
+  変更のない画像は同じ位置に残す。追加・変更された画像を含むシートだけを書き直す
+  （削除された画像の領域は空きのまま残るので、詰め直す場合は --full）
+
+注意:
+- アニメーションGIFは1フレーム目だけを使う
+- Pillow が必要（pip install Pillow）
+
+使用方法:
+    python build_sprite_atlas.py                  # 差分更新
+    python build_sprite_atlas.py --full           # 全て詰め直す
+    python build_sprite_atlas.py --icon-size 64   # ポケモン画像を64px以内に縮小して詰める
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from mirror_sprites import DATA_FILE, SPRITE_DIR, DEFAULT_URL_PREFIX as SPRITE_URL_PREFIX, save_json_atomic
+
+# プロジェクトのルートディレクトリからのパス
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+IMAGE_DIR = os.path.join(BASE_DIR, 'backend', 'data', 'image')
+ATLAS_DIR = os.path.join(IMAGE_DIR, 'atlas')
+INDEX_FILE = os.path.join(BASE_DIR, 'frontend', 'data', 'sprite_atlas.json')
+# frontend/index.html から見たシート画像のパス
+ATLAS_URL_PREFIX = '../backend/data/image/atlas/'
+
+DEFAULT_SHEET_SIZE = 2048
+GUTTER = 1  # 隣の画像の滲みを防ぐ余白（px）
+INDEX_VERSION = 1
+STATE_NAME = 'atlas_state.json'  # 差分更新用の配置・スカイライン（atlas_dir に保存）
+
+
+# =============================================================================
+# スカイライン法による詰め込み
+# =============================================================================
+
+class SkylinePacker:
+    """
+    スカイライン法（Bottom-Left）の矩形詰め込み
+
+    skyline は (x, y, 幅) の線分のリストで、x の昇順に隙間なく並ぶ。
+    状態ファイルに保存して次回の差分更新で続きから詰められるようにする。
+    """
+
+    def __init__(self, width: int, height: int, skyline: Optional[List[List[int]]] = None):
+        self.width = width
+        self.height = height
+        self.skyline: List[List[int]] = [list(s) for s in skyline] if skyline else [[0, 0, width]]
+
+    def _fit(self, index: int, w: int, h: int) -> Optional[int]:
+        """skyline[index] の左端から幅 w を置いたときの y（置けなければ None）"""
+        x = self.skyline[index][0]
+        if x + w > self.width:
+            return None
+        y = 0
+        remaining = w
+        i = index
+        while remaining > 0:
+            if i >= len(self.skyline):
+                return None
+            y = max(y, self.skyline[i][1])
+            if y + h > self.height:
+                return None
+            remaining -= self.skyline[i][2]
+            i += 1
+        return y
+
+    def insert(self, w: int, h: int) -> Optional[Tuple[int, int]]:
+        """w×h の矩形を置ける位置 (x, y) を返してスカイラインを更新する（置けなければ None）"""
+        best = None
+        for i in range(len(self.skyline)):
+            y = self._fit(i, w, h)
+            if y is None:
+                continue
+            key = (y + h, self.skyline[i][2], i)
+            if best is None or key < best[0]:
+                best = (key, i, y)
+        if best is None:
+            return None
+        _, index, y = best
+        x = self.skyline[index][0]
+        self._add_segment(index, x, y + h, w)
+        return x, y
+
+    def _add_segment(self, index: int, x: int, y: int, w: int) -> None:
+        self.skyline.insert(index, [x, y, w])
+        # 新しい線分に覆われた部分を削る
+        i = index + 1
+        while i < len(self.skyline):
+            seg = self.skyline[i]
+            prev_end = self.skyline[i - 1][0] + self.skyline[i - 1][2]
+            if seg[0] >= prev_end:
+                break
+            shrink = prev_end - seg[0]
+            seg[0] += shrink
+            seg[2] -= shrink
+            if seg[2] <= 0:
+                del self.skyline[i]
+            else:
+                break
+        # 同じ高さの線分を結合する
+        i = 0
+        while i < len(self.skyline) - 1:
+            if self.skyline[i][1] == self.skyline[i + 1][1]:
+                self.skyline[i][2] += self.skyline[i + 1][2]
+                del self.skyline[i + 1]
+            else:
+                i += 1
+
+    @property
+    def used_height(self) -> int:
+        return max(s[1] for s in self.skyline)
+
+
+# =============================================================================
+# 画像の収集
+# =============================================================================
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_sources(data_file: str, sprite_dir: str, image_dir: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    アトラスに入れる画像を集める
+
+    Returns:
+        ({pokedex_name: 画像パス}, {画像名（拡張子なし）: 画像パス}) のタプル
+    """
+    with open(data_file, 'r', encoding='utf-8') as f:
+        pokemon_data = json.load(f)
+
+    pokemon: Dict[str, str] = {}
+    not_mirrored = 0
+    for p in pokemon_data:
+        sprite_url = p.get('sprite_url')
+        if not sprite_url:
+            continue
+        if not sprite_url.startswith(SPRITE_URL_PREFIX):
+            not_mirrored += 1
+            continue
+        path = os.path.join(sprite_dir, sprite_url[len(SPRITE_URL_PREFIX):])
+        if os.path.exists(path):
+            pokemon.setdefault(p['pokedex_name'], path)
+    if not_mirrored:
+        print(f"警告: ローカルに保存されていない画像が {not_mirrored}件あります（先に mirror_sprites.py を実行してください）")
+
+    images: Dict[str, str] = {}
+    for file_name in sorted(os.listdir(image_dir)):
+        path = os.path.join(image_dir, file_name)
+        if os.path.isfile(path) and file_name.lower().endswith(('.png', '.gif')):
+            images[os.path.splitext(file_name)[0]] = path
+    return pokemon, images
+
+
+def load_image(path: str, icon_size: Optional[int], square: bool) -> 'Image.Image':
+    """画像を読み込み（GIFは1フレーム目）、必要なら縮小・正方形化する"""
+    with Image.open(path) as img:
+        img.seek(0)
+        image = img.convert('RGBA')
+    if icon_size and max(image.size) > icon_size:
+        image.thumbnail((icon_size, icon_size), Image.LANCZOS)
+    if square and image.width != image.height:
+        side = max(image.size)
+        canvas = Image.new('RGBA', (side, side), (0, 0, 0, 0))
+        canvas.paste(image, ((side - image.width) // 2, (side - image.height) // 2))
+        image = canvas
+    return image
+
+
+# =============================================================================
+# アトラスの構築
+# =============================================================================
+
+def load_state(atlas_dir: str, sheet_size: int, icon_size: Optional[int]) -> Optional[Dict]:
+    """前回の配置を読む（設定が異なる場合は None → 全て詰め直す）"""
+    path = os.path.join(atlas_dir, STATE_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    settings = state.get('settings', {})
+    if (state.get('version') != INDEX_VERSION or settings.get('sheet_size') != sheet_size
+            or settings.get('icon_size') != icon_size):
+        print("前回の配置と設定が異なるため、全て詰め直します。")
+        return None
+    return state
+
+
+def build_atlas(data_file: str = DATA_FILE, sprite_dir: str = SPRITE_DIR,
+                image_dir: str = IMAGE_DIR, atlas_dir: str = ATLAS_DIR,
+                index_file: str = INDEX_FILE, sheet_size: int = DEFAULT_SHEET_SIZE,
+                icon_size: Optional[int] = None, full: bool = False) -> Dict[str, int]:
+    """
+    アトラスを構築（差分更新）する
+
+    Returns:
+        統計情報
+    """
+    pokemon_sources, image_sources = collect_sources(data_file, sprite_dir, image_dir)
+    previous = None if full else load_state(atlas_dir, sheet_size, icon_size)
+
+    # 画像（内容のハッシュ）単位のエントリ。同じ画像を使うフォルムは1つを共有する
+    # slot key: ('p', sha256) はポケモン画像（正方形化）、('i', sha256) はその他の画像
+    wanted: Dict[Tuple[str, str], str] = {}
+    pokemon_slot: Dict[str, Tuple[str, str]] = {}
+    image_slot: Dict[str, Tuple[str, str]] = {}
+    for name, path in pokemon_sources.items():
+        key = ('p', file_sha256(path))
+        wanted.setdefault(key, path)
+        pokemon_slot[name] = key
+    for name, path in image_sources.items():
+        key = ('i', file_sha256(path))
+        wanted.setdefault(key, path)
+        image_slot[name] = key
+
+    sheets: List[Dict] = []
+    packers: List[SkylinePacker] = []
+    placements: Dict[Tuple[str, str], Dict] = {}
+    if previous:
+        for sheet in previous['sheets']:
+            sheets.append({'file': sheet['file'], 'width': sheet['width'], 'height': sheet['height']})
+            packers.append(SkylinePacker(sheet_size, sheet_size, sheet['skyline']))
+        for slot in previous['slots']:
+            key = (slot['kind'], slot['sha256'])
+            if key in wanted:
+                placements[key] = {k: slot[k] for k in ('sheet', 'x', 'y', 'w', 'h')}
+
+    # シート画像が消えている場合は描き直す
+    dirty = {i for i, sheet in enumerate(sheets)
+             if not sheet['file'] or not os.path.exists(os.path.join(atlas_dir, sheet['file']))}
+
+    # 追加された画像を読み込み、大きい順に詰める
+    new_keys = [key for key in wanted if key not in placements]
+    loaded = {key: load_image(wanted[key], icon_size if key[0] == 'p' else None, key[0] == 'p')
+              for key in new_keys}
+    new_keys.sort(key=lambda k: (-loaded[k].height, -loaded[k].width, k))
+    skipped = 0
+    for key in new_keys:
+        image = loaded[key]
+        w, h = image.width + GUTTER, image.height + GUTTER
+        if w > sheet_size or h > sheet_size:
+            print(f"警告: シートより大きい画像はアトラスに入れません: {wanted[key]}")
+            skipped += 1
+            continue
+        position = None
+        for sheet_index, packer in enumerate(packers):
+            position = packer.insert(w, h)
+            if position:
+                break
+        if position is None:
+            packers.append(SkylinePacker(sheet_size, sheet_size))
+            sheets.append({'file': None, 'width': sheet_size, 'height': 0})
+            sheet_index = len(packers) - 1
+            position = packers[sheet_index].insert(w, h)
+        placements[key] = {'sheet': sheet_index, 'x': position[0], 'y': position[1],
+                           'w': image.width, 'h': image.height}
+        dirty.add(sheet_index)
+
+    # 変更のあったシートを、そのシートに置かれた全画像から描き直す
+    os.makedirs(atlas_dir, exist_ok=True)
+    for sheet_index in sorted(dirty):
+        packer = packers[sheet_index]
+        height = min(sheet_size, packer.used_height)
+        canvas = Image.new('RGBA', (sheet_size, height), (0, 0, 0, 0))
+        for key, placement in placements.items():
+            if placement['sheet'] != sheet_index:
+                continue
+            image = loaded.get(key) or load_image(wanted[key], icon_size if key[0] == 'p' else None,
+                                                  key[0] == 'p')
+            canvas.paste(image, (placement['x'], placement['y']))
+        tmp_path = os.path.join(atlas_dir, f'sheet-{sheet_index}.png.tmp')
+        canvas.save(tmp_path, format='PNG', optimize=True)
+        file_name = f'sheet-{sheet_index}-{file_sha256(tmp_path)[:8]}.png'
+        os.replace(tmp_path, os.path.join(atlas_dir, file_name))
+        old_file = sheets[sheet_index]['file']
+        if old_file and old_file != file_name and os.path.exists(os.path.join(atlas_dir, old_file)):
+            os.remove(os.path.join(atlas_dir, old_file))
+        sheets[sheet_index].update({'file': file_name, 'width': sheet_size, 'height': height})
+
+    def rect(key: Tuple[str, str]) -> List[int]:
+        p = placements[key]
+        return [p['sheet'], p['x'], p['y'], p['w'], p['h']]
+
+    save_json_atomic(index_file, {
+        'version': INDEX_VERSION,
+        'url_prefix': ATLAS_URL_PREFIX,
+        'sheets': [{'file': s['file'], 'width': s['width'], 'height': s['height']} for s in sheets],
+        'pokemon': {name: rect(key) for name, key in sorted(pokemon_slot.items()) if key in placements},
+        'images': {name: rect(key) for name, key in sorted(image_slot.items()) if key in placements},
+    }, indent=None)
+    save_json_atomic(os.path.join(atlas_dir, STATE_NAME), {
+        'version': INDEX_VERSION,
+        'settings': {'sheet_size': sheet_size, 'icon_size': icon_size},
+        'sheets': [{**s, 'skyline': packers[i].skyline} for i, s in enumerate(sheets)],
+        'slots': [
+            {'kind': key[0], 'sha256': key[1], **placement}
+            for key, placement in sorted(placements.items(),
+                                         key=lambda kv: (kv[1]['sheet'], kv[1]['y'], kv[1]['x']))
+        ],
+    })
+
+    # 索引から参照されなくなったシート画像を削除する
+    live_files = {s['file'] for s in sheets}
+    for file_name in os.listdir(atlas_dir):
+        if file_name.endswith('.png') and file_name not in live_files:
+            os.remove(os.path.join(atlas_dir, file_name))
+
+    used_area = sum((p['w'] + GUTTER) * (p['h'] + GUTTER) for p in placements.values())
+    total_area = sum(s['width'] * s['height'] for s in sheets) or 1
+    return {
+        'pokemon': sum(1 for key in pokemon_slot.values() if key in placements),
+        'images': sum(1 for key in image_slot.values() if key in placements),
+        'slots': len(placements),
+        'added': len(new_keys) - skipped,
+        'skipped': skipped,
+        'sheets': len(sheets),
+        'rewritten_sheets': len(dirty),
+        'fill_rate_percent': round(used_area / total_area * 100, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ポケモンのアイコンと画像をスプライトシートにまとめます')
+    parser.add_argument('--data', type=str, default=DATA_FILE,
+                        help=f'全ポケモンデータ（デフォルト: {DATA_FILE}）')
+    parser.add_argument('--sprite-dir', type=str, default=SPRITE_DIR,
+                        help=f'mirror_sprites.py の画像ストア（デフォルト: {SPRITE_DIR}）')
+    parser.add_argument('--image-dir', type=str, default=IMAGE_DIR,
+                        help=f'一緒に詰める画像のディレクトリ（デフォルト: {IMAGE_DIR}）')
+    parser.add_argument('--atlas-dir', type=str, default=ATLAS_DIR,
+                        help=f'シート画像の出力先（デフォルト: {ATLAS_DIR}）')
+    parser.add_argument('--index', type=str, default=INDEX_FILE,
+                        help=f'座標の索引の出力先（デフォルト: {INDEX_FILE}）')
+    parser.add_argument('--sheet-size', type=int, default=DEFAULT_SHEET_SIZE,
+                        help=f'シートの一辺（px、デフォルト: {DEFAULT_SHEET_SIZE}）')
+    parser.add_argument('--icon-size', type=int, default=None,
+                        help='ポケモン画像をこの大きさ（px）以内に縮小する（デフォルト: 縮小しない）')
+    parser.add_argument('--full', action='store_true',
+                        help='前回の配置を使わず全て詰め直す')
+    args = parser.parse_args()
+
+    if not PIL_AVAILABLE:
+        print("エラー: Pillowライブラリがインストールされていません。")
+        print("インストールするには: pip install Pillow")
+        return
+
+    start_time = time.time()
+    stats = build_atlas(args.data, args.sprite_dir, args.image_dir, args.atlas_dir, args.index,
+                        args.sheet_size, args.icon_size, args.full)
+    print("\n=== アトラス構築完了 ===")
+    print(f"ポケモン: {stats['pokemon']}件, その他の画像: {stats['images']}件（配置 {stats['slots']}枚, "
+          f"今回追加 {stats['added']}枚）")
+    print(f"シート: {stats['sheets']}枚（書き直し {stats['rewritten_sheets']}枚, 充填率 {stats['fill_rate_percent']}%）")
+    if stats['skipped']:
+        print(f"大きすぎて入れなかった画像: {stats['skipped']}件")
+    print(f"索引: {args.index}")
+    print(f"処理時間: {time.time() - start_time:.1f}秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,112 +4,168 @@
 機能:
 - pokemon_data_all.json の全ポケモンの技をチェック
 - moves_data.json に存在しない技を検出
+- 存在しない技ごとに、近い技名の候補を表示（move_suggest.py の n-gram 索引）
 - 詳細なレポートを出力
+- 候補を修正ファイルに書き出し、data_pipeline.py の movefix ステージで自動適用できるようにする
+- --workers 2 以上では、フォルムを範囲ごとのシャードに分けてプロセスプールで並列に走査する
 
 使用方法:
     python check_moves_existence.py                    # 基本実行
     python check_moves_existence.py --output report.txt  # レポートをファイルに出力
     python check_moves_existence.py --missing-only       # 存在しない技のみ表示
+    python check_moves_existence.py --fix-file           # 修正ファイル（backend/data/move_fixes.json）を書き出す
+    python check_moves_existence.py --workers 4          # 4プロセスで並列に走査
 """
 
-import json
 import os
 import argparse
-from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
-# スクリプトのディレクトリを取得
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-# プロジェクトルート（backend/script の2階層上）
-PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+from move_suggest import MOVE_FIX_FILE, DEFAULT_SUGGESTIONS, MoveNameIndex, fix_entry, save_fix_file
+from pokedata import PokeData, POKEMON_DATA_FILE, MOVES_DATA_FILE
 
-# ファイルパス設定（プロジェクトルート基準）
-POKEMON_DATA_FILE = os.path.join(PROJECT_ROOT, 'backend', 'data', 'pokemon_data_all.json')
-MOVES_DATA_FILE = os.path.join(PROJECT_ROOT, 'backend', 'data', 'moves_data.json')
+SHARDS_PER_WORKER = 4
 
+# 並列走査でワーカーに fork で引き継ぐデータ（プロセス間で全フォルムを送らないため）
+_SCAN_FORMS: Optional[List[Dict]] = None
+_SCAN_KNOWN_MOVES: Optional[set] = None
 
-def load_moves_data() -> Set[str]:
+
+def load_data() -> PokeData:
     """
-    moves_data.json を読み込んで、全ての技名のセットを返す
-    
+    pokemon_data_all.json の索引と moves_data.json を読み込む
+
     Returns:
-        技名のセット
+        PokeData（索引はキャッシュがあれば再利用される）
     """
-    if not os.path.exists(MOVES_DATA_FILE):
-        raise FileNotFoundError(f"{MOVES_DATA_FILE} が見つかりません。")
-    
-    with open(MOVES_DATA_FILE, 'r', encoding='utf-8') as f:
-        moves_data = json.load(f)
-    
-    # 辞書のキー（技名）をセットとして返す
-    moves_set = set(moves_data.keys())
-    print(f"moves_data.json を読み込みました: {len(moves_set)} 種類の技")
-    return moves_set
+    for path in (MOVES_DATA_FILE, POKEMON_DATA_FILE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} が見つかりません。")
+
+    data = PokeData()
+    print(f"moves_data.json を読み込みました: {len(data.moves)} 種類の技")
+    print(f"pokemon_data_all.json の索引を読み込みました: {len(data)} 件のポケモン/フォルム")
+    return data
 
 
-def load_pokemon_data() -> List[Dict]:
+def _scan_shard(bounds: Tuple[int, int]) -> Tuple[int, Dict[str, List[int]]]:
+    """ワーカー: フォルムの範囲 [start, end) を走査し、(確認した技の数, {存在しない技名: [位置]}) を返す"""
+    start, end = bounds
+    checked = 0
+    missing: Dict[str, List[int]] = {}
+    for position in range(start, end):
+        # 索引と同じく、同じフォルムに重複した技は1回だけ数える
+        moves = dict.fromkeys(_SCAN_FORMS[position].get('moves', []))
+        checked += len(moves)
+        for move_name in moves:
+            if move_name not in _SCAN_KNOWN_MOVES:
+                missing.setdefault(move_name, []).append(position)
+    return checked, missing
+
+
+def scan_missing_parallel(data: PokeData, workers: int) -> Tuple[int, Dict[str, List[int]]]:
     """
-    pokemon_data_all.json を読み込む
-    
+    フォルムを範囲ごとのシャードに分けて並列に走査する
+
+    fork できない環境では同じ処理を1プロセスで行う。
+
     Returns:
-        ポケモンデータのリスト
+        (確認した技の数, {存在しない技名: [フォルムの位置（昇順）]})
     """
-    if not os.path.exists(POKEMON_DATA_FILE):
-        raise FileNotFoundError(f"{POKEMON_DATA_FILE} が見つかりません。")
-    
-    with open(POKEMON_DATA_FILE, 'r', encoding='utf-8') as f:
-        pokemon_data = json.load(f)
-    
-    print(f"pokemon_data_all.json を読み込みました: {len(pokemon_data)} 件のポケモン/フォルム")
-    return pokemon_data
+    global _SCAN_FORMS, _SCAN_KNOWN_MOVES
+    _SCAN_FORMS = data.forms
+    _SCAN_KNOWN_MOVES = set(data.moves)
+    shard_count = max(1, workers * SHARDS_PER_WORKER)
+    size = (len(_SCAN_FORMS) + shard_count - 1) // shard_count or 1
+    shards = [(start, min(start + size, len(_SCAN_FORMS))) for start in range(0, len(_SCAN_FORMS), size)]
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        context = None
+
+    try:
+        if context is None or workers <= 1:
+            parts = [_scan_shard(bounds) for bounds in shards]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                parts = list(executor.map(_scan_shard, shards))
+    finally:
+        _SCAN_FORMS = _SCAN_KNOWN_MOVES = None
+
+    checked = 0
+    missing: Dict[str, List[int]] = {}
+    # シャードの順に足し合わせるので、位置は昇順のまま
+    for part_checked, part_missing in parts:
+        checked += part_checked
+        for move_name, positions in part_missing.items():
+            missing.setdefault(move_name, []).extend(positions)
+    return checked, missing
 
 
-def check_moves_existence(pokemon_data: List[Dict], moves_set: Set[str]) -> Dict:
+def check_moves_existence(data: PokeData, workers: int = 1,
+                          suggestions: int = DEFAULT_SUGGESTIONS) -> Dict:
     """
     全ポケモンの技が moves_data.json に存在するかをチェック
-    
+
+    workers が 1 なら、覚える技 → フォルムの索引を使い、技の種類ごとに1回だけ存在を確認する
+    （フォルムの詳細は存在しない技を覚えるフォルムについてだけ読み込む）。
+    2 以上なら全フォルムを読み込み、範囲ごとのシャードに分けて並列に走査する。
+    存在しない技には、近い技名の候補を suggestions 件まで付ける。
+
     Args:
-        pokemon_data: ポケモンデータのリスト
-        moves_set: moves_data.json に存在する技名のセット
-    
+        data: ポケモン・技データ
+        workers: 走査するプロセス数
+
     Returns:
         チェック結果の辞書
     """
     # 存在しない技を記録: {技名: [ポケモン情報のリスト]}
-    missing_moves: Dict[str, List[Dict]] = defaultdict(list)
+    missing_moves: Dict[str, List[Dict]] = {}
     
     # 統計情報
-    total_pokemon_checked = 0
     total_moves_checked = 0
     pokemon_with_missing_moves = set()
     
     print("\nチェックを開始します...\n")
     
-    for pokemon in pokemon_data:
-        pokedex_number = pokemon.get('pokedex_number', 0)
-        pokedex_name = pokemon.get('pokedex_name', 'Unknown')
-        form_name = pokemon.get('form_name', '通常')
-        moves = pokemon.get('moves', [])
-        
-        total_pokemon_checked += 1
-        total_moves_checked += len(moves)
-        
-        # 各技をチェック
-        for move_name in moves:
-            if move_name not in moves_set:
-                # 存在しない技を記録
-                pokemon_info = {
-                    'pokedex_number': pokedex_number,
-                    'pokedex_name': pokedex_name,
-                    'form_name': form_name,
-                    'base_species': pokemon.get('base_species', pokedex_name)
-                }
-                missing_moves[move_name].append(pokemon_info)
-                pokemon_with_missing_moves.add((pokedex_number, pokedex_name, form_name))
+    if workers > 1:
+        total_moves_checked, missing_positions = scan_missing_parallel(data, workers)
+    else:
+        missing_positions = {}
+        for move_name in sorted(data.learned_moves()):
+            learner_count = len(data.learner_names(move_name))
+            total_moves_checked += learner_count
+            if not data.has_move(move_name):
+                missing_positions[move_name] = data.indexes['by_move'][move_name]
+
+    for move_name in sorted(missing_positions):
+        # 存在しない技を覚えるフォルムを記録
+        for position in missing_positions[move_name]:
+            pokemon = data.form_at(position)
+            pokedex_number = pokemon.get('pokedex_number', 0)
+            pokedex_name = pokemon.get('pokedex_name', 'Unknown')
+            form_name = pokemon.get('form_name', '通常')
+            pokemon_info = {
+                'pokedex_number': pokedex_number,
+                'pokedex_name': pokedex_name,
+                'form_name': form_name,
+                'base_species': pokemon.get('base_species', pokedex_name)
+            }
+            missing_moves.setdefault(move_name, []).append(pokemon_info)
+            pokemon_with_missing_moves.add((pokedex_number, pokedex_name, form_name))
+
+    # 近い技名の候補（n-gram 索引で候補を絞ってから編集距離で並べる）
+    suggestions_by_move: Dict[str, List[Tuple[str, float]]] = {}
+    if missing_moves:
+        index = MoveNameIndex(data.moves)
+        suggestions_by_move = {move_name: index.suggest(move_name, suggestions) for move_name in missing_moves}
     
     return {
-        'missing_moves': dict(missing_moves),
-        'total_pokemon_checked': total_pokemon_checked,
+        'missing_moves': missing_moves,
+        'suggestions': suggestions_by_move,
+        'total_pokemon_checked': len(data),
         'total_moves_checked': total_moves_checked,
         'pokemon_with_missing_moves_count': len(pokemon_with_missing_moves),
         'missing_moves_count': len(missing_moves)
@@ -167,6 +223,9 @@ def generate_report(result: Dict, missing_only: bool = False) -> str:
     for move_name, pokemon_list in sorted_missing:
         lines.append(f"技名: {move_name}")
         lines.append(f"  影響を受けるポケモン数: {len(pokemon_list)} 件")
+        candidates = result.get('suggestions', {}).get(move_name)
+        if candidates:
+            lines.append("  候補: " + ", ".join(f"{name}（{score:.2f}）" for name, score in candidates))
         lines.append("  覚えるポケモン一覧:")
         
         # 図鑑番号でソート
@@ -202,16 +261,21 @@ def main():
                         help='レポートをファイルに出力（指定しない場合はコンソールに出力）')
     parser.add_argument('--missing-only', action='store_true',
                         help='存在しない技のみ表示（統計情報を省略）')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='走査するプロセス数（2以上でフォルムのシャードを並列に走査）')
+    parser.add_argument('--suggestions', type=int, default=DEFAULT_SUGGESTIONS,
+                        help=f'存在しない技ごとに表示する候補数（デフォルト: {DEFAULT_SUGGESTIONS}）')
+    parser.add_argument('--fix-file', type=str, nargs='?', const=MOVE_FIX_FILE, default=None,
+                        help=f'修正ファイルを書き出す（パス省略時は {MOVE_FIX_FILE}）')
     
     args = parser.parse_args()
     
     try:
         # データ読み込み
-        moves_set = load_moves_data()
-        pokemon_data = load_pokemon_data()
+        data = load_data()
         
         # チェック実行
-        result = check_moves_existence(pokemon_data, moves_set)
+        result = check_moves_existence(data, workers=args.workers, suggestions=args.suggestions)
         
         # レポート生成
         report = generate_report(result, missing_only=args.missing_only)
@@ -224,6 +288,14 @@ def main():
         else:
             print("\n" + report)
         
+        if args.fix_file:
+            fixes = {move_name: fix_entry(result['suggestions'].get(move_name, []),
+                                          [p['pokedex_name'] for p in pokemon_list])
+                     for move_name, pokemon_list in result['missing_moves'].items()}
+            save_fix_file(args.fix_file, fixes, data.moves_file)
+            auto_count = sum(1 for fix in fixes.values() if fix['auto'])
+            print(f"修正ファイルを {args.fix_file} に保存しました（{len(fixes)} 件, 自動適用 {auto_count} 件）")
+
         # 終了コード
         exit_code = 0 if result['missing_moves_count'] == 0 else 1
         return exit_code
@@ -16,16 +16,16 @@ import json
 import os
 import argparse
 import shutil
-from typing import Dict, List, Set
+from typing import Dict
 from collections import defaultdict
 
+from pokedata import PokeData, POKEMON_DATA_FILE
+
 # スクリプトのディレクトリを取得
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # プロジェクトルート（backend/script の2階層上）
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
-# ファイルパス設定（プロジェクトルート基準）
-POKEMON_DATA_FILE = os.path.join(PROJECT_ROOT, 'backend', 'data', 'pokemon_data_all.json')
 # pokemon_name_cache.json はプロジェクトルートまたはbackend/dataに存在する可能性がある
 CACHE_FILE_CANDIDATES = [
     os.path.join(PROJECT_ROOT, 'pokemon_name_cache.json'),
@@ -68,89 +68,77 @@ def load_type_mapping() -> Dict[str, str]:
     return type_ja_to_en
 
 
-def load_pokemon_data() -> List[Dict]:
+def load_pokemon_data() -> PokeData:
     """
-    pokemon_data_all.json を読み込む
+    pokemon_data_all.json の索引を読み込む（フォルムの本体は変換が必要な時だけ読み込む）
     
     Returns:
-        ポケモンデータのリスト
+        PokeData
     """
     if not os.path.exists(POKEMON_DATA_FILE):
         raise FileNotFoundError(f"{POKEMON_DATA_FILE} が見つかりません。")
     
-    with open(POKEMON_DATA_FILE, 'r', encoding='utf-8') as f:
-        pokemon_data = json.load(f)
-    
-    print(f"pokemon_data_all.json を読み込みました: {len(pokemon_data)} 件のポケモン/フォルム")
-    return pokemon_data
+    data = PokeData()
+    print(f"pokemon_data_all.json の索引を読み込みました: {len(data)} 件のポケモン/フォルム")
+    return data
 
 
-def convert_types_to_english(pokemon_data: List[Dict], type_mapping: Dict[str, str]) -> Dict:
+def convert_types_to_english(data: PokeData, type_mapping: Dict[str, str]) -> Dict:
     """
     全ポケモンの types.name を日本語から英語に変換
     
+    タイプ → フォルムの索引を使い、日本語表記のタイプを持つフォルムだけを書き換える。
+    
     Args:
-        pokemon_data: ポケモンデータのリスト
+        data: ポケモンデータ
         type_mapping: 日本語→英語のタイプマッピング
     
     Returns:
         変換結果の統計情報
     """
-    converted_count = 0
+    converted_positions = set()
     failed_conversions = defaultdict(list)
+    english_names = set(type_mapping.values())
     
     print("\n変換を開始します...\n")
     
-    for pokemon in pokemon_data:
-        pokedex_number = pokemon.get('pokedex_number', 0)
-        pokedex_name = pokemon.get('pokedex_name', 'Unknown')
-        form_name = pokemon.get('form_name', '通常')
-        types = pokemon.get('types', [])
-        
-        pokemon_converted = False
+    for type_name in sorted(data.type_names()):
+        # 既に英語表記の場合はスキップ
+        if type_name in english_names:
+            continue
         
-        for type_info in types:
-            type_name = type_info.get('name', '')
-            
-            # 既に英語表記の場合はスキップ
-            if type_name in type_mapping.values():
-                continue
-            
-            # 日本語→英語に変換
+        for position in data.type_positions(type_name):
+            pokemon = data.forms[position]
             if type_name in type_mapping:
-                type_info['name'] = type_mapping[type_name]
-                pokemon_converted = True
+                # 日本語→英語に変換
+                for type_info in pokemon.get('types', []):
+                    if type_info.get('name', '') == type_name:
+                        type_info['name'] = type_mapping[type_name]
+                converted_positions.add(position)
             else:
                 # 変換できないタイプ名を記録
-                pokemon_key = f"#{pokedex_number} {pokedex_name}"
+                pokemon_key = f"#{pokemon.get('pokedex_number', 0)} {pokemon.get('pokedex_name', 'Unknown')}"
+                form_name = pokemon.get('form_name', '通常')
                 if form_name != '通常':
                     pokemon_key += f"（{form_name}）"
                 failed_conversions[type_name].append(pokemon_key)
-        
-        if pokemon_converted:
-            converted_count += 1
     
     return {
-        'converted_pokemon_count': converted_count,
+        'converted_pokemon_count': len(converted_positions),
         'failed_conversions': dict(failed_conversions),
-        'total_pokemon': len(pokemon_data)
+        'total_pokemon': len(data)
     }
 
 
-def save_pokemon_data(pokemon_data: List[Dict], output_file: str) -> None:
+def save_pokemon_data(data: PokeData, output_file: str) -> None:
     """
-    変換済みポケモンデータを保存
+    変換済みポケモンデータを保存（一時ファイル経由で置き換え、索引キャッシュも更新）
     
     Args:
-        pokemon_data: ポケモンデータのリスト
+        data: ポケモンデータ
         output_file: 出力ファイルパス
     """
-    # ディレクトリが存在しない場合は作成
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(pokemon_data, f, indent=2, ensure_ascii=False)
-    
+    data.save_forms(output_file)
     print(f"\n変換済みデータを {output_file} に保存しました。")
 
 
@@ -230,20 +218,23 @@ def main():
         type_mapping = load_type_mapping()
         
         # ポケモンデータを読み込み
-        pokemon_data = load_pokemon_data()
+        data = load_pokemon_data()
         
         # バックアップ作成
         if args.backup and args.output is None:
             create_backup(POKEMON_DATA_FILE)
         
         # 変換実行
-        result = convert_types_to_english(pokemon_data, type_mapping)
+        result = convert_types_to_english(data, type_mapping)
         
         # 出力ファイルの決定
         output_file = args.output if args.output else POKEMON_DATA_FILE
         
-        # 保存
-        save_pokemon_data(pokemon_data, output_file)
+        # 保存（変換がなく元ファイルへの上書きなら書き込まない）
+        if result['converted_pokemon_count'] > 0 or args.output:
+            save_pokemon_data(data, output_file)
+        else:
+            print("\n変換が必要なタイプ名はありませんでした。ファイルは更新しません。")
         
         # レポート生成・表示
         report = generate_report(result)
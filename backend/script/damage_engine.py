@@ -0,0 +1,346 @@
+"""
+frontend/js/calc/damage.js（calculateDamage）と stats.js（calculateHp / calculateStat）の NumPy 版
+
+damage.js は攻撃側・防御側・技を1組ずつ計算するので、使用率上位どうしの総当たりなどの一括の分析には遅い。
+このモジュールは同じ計算を、攻撃側 × 防御側 × 技 の配列に対して1回で行う。
+
+damage.js と結果が完全に一致するよう、切り捨ての順序と浮動小数点の演算（float64）をそのまま再現する:
+    1. ランク補正: A = floor(実数値 × 倍率)、D も同様（倍率は +n: 1 + n × 0.5、-n: 1 / (1 + n × 0.5)）
+    2. 持ち物（stat_modifier）: 技の分類に合う能力なら A = floor(A × 倍率)
+    3. 基礎ダメージ: floor(floor(floor(Lv × 2 / 5 + 2) × 威力 × A / D) / 50) + 2
+    4. 急所: floor(基礎 × 1.5)
+    5. 乱数16段階（85〜100）ごとに floor(× i / 100) → タイプ一致 floor(× 1.5) → タイプ相性 floor(× 倍率)
+       → 持ち物（damage_boost）floor(× 倍率)
+    6. 最低1ダメージ。ただしタイプ相性が0倍なら0。威力0（変化技など）は全て0
+一致は damage_parity.py の golden vector（Node で damage.js を実行した結果）で確認する。
+
+使用方法:
+    engine = DamageEngine()
+    rolls = engine.calculate(attackers, defenders, ['じしん', 'ムーンフォース'])   # (攻撃側, 防御側, 技, 16)
+    rolls[..., 0], rolls[..., -1]                                                  # 最小・最大ダメージ
+
+    攻撃側 {"level": 50, "types": ["じめん", "ドラゴン"], "stats": {"attack": 182, "spAtk": 100},
+            "ranks": {"attack": 1}, "item": "こだわりハチマキ", "crit": False}
+    防御側 {"types": ["フェアリー"], "stats": {"defense": 115, "spDef": 135}, "ranks": {}}
+    （types の代わりに type_table.py のタイプID "type_ids": [4, 15] でもよい）
+
+タイプ一致・タイプ相性はタイプID（type_table.py）で判定する。技は moves_data.json の type_id を使い、
+相性は EFFECTIVENESS_LOOKUP[技のタイプID, 防御側の組み合わせID] を配列ごと1回引くだけで求める。
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from pokedata import NATURE_EFFECTS, PokeData
+from type_table import UNKNOWN_TYPE, defender_combo, type_id
+
+if NUMPY_AVAILABLE:
+    from type_table import EFFECTIVENESS_LOOKUP
+
+ROLL_PERCENTS = tuple(range(85, 101))
+ROLL_COUNT = len(ROLL_PERCENTS)
+CRIT_MULTIPLIER = 1.5
+STAB_MULTIPLIER = 1.5
+DEFAULT_LEVEL = 50
+DEFAULT_IV = 31
+
+# 技の分類 → (攻撃側の能力, 防御側の能力)。物理・特殊以外（変化技）は damage.js と同じく物理扱い
+CATEGORY_STATS = {
+    'Physical': ('attack', 'defense'),
+    'Special': ('spAtk', 'spDef'),
+}
+PHYSICAL, SPECIAL = 0, 1
+ATTACKER_TYPE_PAD = UNKNOWN_TYPE - 1
+# 性格の表記（NATURE_EFFECTS の A〜S）→ 能力
+NATURE_STAT_LETTERS = {'A': 'attack', 'B': 'defense', 'C': 'spAtk', 'D': 'spDef', 'S': 'speed'}
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy がインストールされていません（pip install numpy）")
+
+
+# =============================================================================
+# 実数値（stats.js）
+# =============================================================================
+
+def calculate_hp(base, iv, stat_points, level):
+    """HP: floor((種族値×2 + 個体値) × Lv/100) + Lv + 10 + 能力P（配列可）"""
+    _require_numpy()
+    base, iv, stat_points, level = (np.asarray(x, dtype=np.float64) for x in (base, iv, stat_points, level))
+    return (np.floor((base * 2 + iv) * level / 100) + level + 10 + stat_points).astype(np.int64)
+
+
+def calculate_stat(base, iv, stat_points, level, nature_multiplier=1.0):
+    """
+    HP以外: floor((floor((種族値×2 + 個体値) × Lv/100) + 5 + 能力P) × 性格補正)（配列可）
+
+    nature_multiplier は stats.js と同じ 1.1（up）/ 0.9（down）/ 1.0。nature_multiplier() で文字列から変換できる。
+    """
+    _require_numpy()
+    base, iv, stat_points, level = (np.asarray(x, dtype=np.float64) for x in (base, iv, stat_points, level))
+    raw = np.floor((base * 2 + iv) * level / 100) + 5
+    return np.floor((raw + stat_points) * np.asarray(nature_multiplier, dtype=np.float64)).astype(np.int64)
+
+
+def nature_multiplier(nature_bonus: str) -> float:
+    """stats.js の natureBonus（'up' / 'down' / それ以外）→ 倍率"""
+    return {'up': 1.1, 'down': 0.9}.get(nature_bonus, 1.0)
+
+
+def nature_bonuses(nature: str) -> Dict[str, str]:
+    """性格名（"いじっぱり" または表示名 "いじっぱり ( A↑ C↓ )"）→ {"attack": "up", "spAtk": "down"}"""
+    effect = NATURE_EFFECTS.get(nature.split(' (')[0].strip()) if nature else None
+    if not effect:
+        return {}
+    return {NATURE_STAT_LETTERS[effect[0]]: 'up', NATURE_STAT_LETTERS[effect[1]]: 'down'}
+
+
+# =============================================================================
+# ダメージ（damage.js）
+# =============================================================================
+
+def rank_multiplier(rank):
+    """ランク補正の倍率（getRankMultiplier と同じ式。配列可）"""
+    _require_numpy()
+    rank = np.asarray(rank, dtype=np.float64)
+    return np.where(rank > 0, 1 + rank * 0.5, np.where(rank < 0, 1 / (1 + np.abs(rank) * 0.5), 1.0))
+
+
+def type_effectiveness(move_type: str, defender_types: Sequence[str]) -> float:
+    """タイプ名（日本語・英語）での相性（getTypeEffectiveness と同じ）"""
+    _require_numpy()
+    combo = defender_combo([type_id(name) for name in defender_types or []])
+    return float(EFFECTIVENESS_LOOKUP[type_id(move_type), combo])
+
+
+def side_type_ids(side: Dict) -> List[int]:
+    """攻撃側・防御側のタイプID（type_ids があればそのまま、無ければ types の名前から）"""
+    if side.get('type_ids') is not None:
+        return list(side['type_ids'])
+    return [type_id(name) for name in side.get('types') or []]
+
+
+def damage_rolls(level, power, attack, defense, attack_rank=0, defense_rank=0, stat_multiplier=1.0,
+                 damage_multiplier=1.0, crit=False, stab=False, type_mod=1.0):
+    """
+    乱数16段階のダメージ（引数はブロードキャストできる配列。戻り値は 形状 + (16,) の int32）
+
+    Args:
+        level: 攻撃側のレベル
+        power: 技の威力（0 なら全て0）
+        attack, defense: 技の分類に対応する攻撃側・防御側の実数値（ランク補正前）
+        attack_rank, defense_rank: ランク（-6〜+6）
+        stat_multiplier: 持ち物（stat_modifier）の倍率。技の分類の能力に合わなければ 1.0
+        damage_multiplier: 持ち物（damage_boost）の倍率。無ければ 1.0
+        crit: 急所
+        stab: タイプ一致
+        type_mod: タイプ相性の倍率
+    """
+    _require_numpy()
+    level, power, attack, defense, stat_multiplier, damage_multiplier, type_mod = (
+        np.asarray(x, dtype=np.float64)
+        for x in (level, power, attack, defense, stat_multiplier, damage_multiplier, type_mod))
+    crit_multiplier = np.where(np.asarray(crit, dtype=bool), CRIT_MULTIPLIER, 1.0)
+    stab_multiplier = np.where(np.asarray(stab, dtype=bool), STAB_MULTIPLIER, 1.0)
+
+    # 倍率 1.0 の掛け算と切り捨ては値を変えないので、damage.js の条件分岐は倍率 1.0 で置き換えられる
+    a = np.floor(np.floor(attack * rank_multiplier(attack_rank)) * stat_multiplier)
+    d = np.floor(defense * rank_multiplier(defense_rank))
+    base = np.floor(np.floor(np.floor(level * 2 / 5 + 2) * power * a / d) / 50) + 2
+    base = np.floor(base * crit_multiplier)
+
+    shape = np.broadcast_shapes(base.shape, stab_multiplier.shape, type_mod.shape, damage_multiplier.shape)
+    damage = np.multiply(np.broadcast_to(base, shape)[..., None], np.array(ROLL_PERCENTS, dtype=np.float64))
+    # 以降は一時配列を作らずにその場で計算する（16倍の大きさの配列が主なコスト）
+    np.divide(damage, 100, out=damage)
+    np.floor(damage, out=damage)
+    for multiplier in (stab_multiplier, type_mod, damage_multiplier):
+        np.multiply(damage, multiplier[..., None], out=damage)
+        np.floor(damage, out=damage)
+    np.maximum(damage, 1, out=damage)
+    damage[np.broadcast_to((type_mod == 0) | (power == 0), shape)] = 0
+    return damage.astype(np.int32)
+
+
+class DamageEngine:
+    """
+    技・持ち物データを配列にしておき、攻撃側 × 防御側 × 技 のダメージをまとめて計算する
+
+    Args:
+        data: ポケモン・技・持ち物データ（省略時は PokeData()）
+    """
+
+    def __init__(self, data: Optional[PokeData] = None):
+        _require_numpy()
+        self.data = data or PokeData()
+        self.items = self.data.items
+
+    def move_arrays(self, moves: Sequence) -> Dict[str, 'np.ndarray']:
+        """技（技名 or moves_data.json の値）→ {"power", "category", "type_id"}（category は PHYSICAL / SPECIAL）"""
+        entries = [self.data.move(move) or {} if isinstance(move, str) else move for move in moves]
+        return {
+            'power': np.array([entry.get('power') or 0 for entry in entries], dtype=np.float64),
+            'category': np.array([SPECIAL if entry.get('category') == 'Special' else PHYSICAL
+                                  for entry in entries], dtype=np.int64),
+            # type_id が無い（type_table.py を実行する前の）データは名前から引く
+            'type_id': np.array([entry['type_id'] if entry.get('type_id') is not None
+                                 else type_id(entry.get('type')) for entry in entries], dtype=np.int64),
+        }
+
+    def attacker_arrays(self, attackers: Sequence[Dict]) -> Dict[str, 'np.ndarray']:
+        """攻撃側 → 物理・特殊それぞれの実数値・ランク・持ち物の倍率など（[攻撃側, 分類]）"""
+        stat_names = [CATEGORY_STATS['Physical'][0], CATEGORY_STATS['Special'][0]]
+        stat_multiplier = np.ones((len(attackers), 2))
+        damage_multiplier = np.ones(len(attackers))
+        for i, attacker in enumerate(attackers):
+            item = self.items.get(attacker.get('item') or '') or {}
+            if item.get('type') == 'stat_modifier' and item.get('stat') in stat_names:
+                stat_multiplier[i, stat_names.index(item['stat'])] = item['multiplier']
+            elif item.get('type') == 'damage_boost':
+                damage_multiplier[i] = item['multiplier']
+        return {
+            'level': np.array([attacker.get('level', DEFAULT_LEVEL) for attacker in attackers], dtype=np.float64),
+            'stats': np.array([[attacker['stats'][name] for name in stat_names] for attacker in attackers],
+                              dtype=np.float64).reshape(-1, 2),
+            'ranks': np.array([[(attacker.get('ranks') or {}).get(name, 0) for name in stat_names]
+                               for attacker in attackers], dtype=np.float64).reshape(-1, 2),
+            'stat_multiplier': stat_multiplier,
+            'damage_multiplier': damage_multiplier,
+            'crit': np.array([bool(attacker.get('crit')) for attacker in attackers]),
+            # 2つに満たない分は、どの技のタイプID（UNKNOWN_TYPE を含む）とも一致しない値で埋める
+            'type_ids': np.array([(side_type_ids(attacker) + [ATTACKER_TYPE_PAD] * 2)[:2] for attacker in attackers],
+                                 dtype=np.int64).reshape(-1, 2),
+        }
+
+    def defender_arrays(self, defenders: Sequence[Dict]) -> Dict[str, 'np.ndarray']:
+        stat_names = [CATEGORY_STATS['Physical'][1], CATEGORY_STATS['Special'][1]]
+        return {
+            'stats': np.array([[defender['stats'][name] for name in stat_names] for defender in defenders],
+                              dtype=np.float64).reshape(-1, 2),
+            'ranks': np.array([[(defender.get('ranks') or {}).get(name, 0) for name in stat_names]
+                               for defender in defenders], dtype=np.float64).reshape(-1, 2),
+            'combo': np.array([defender_combo(side_type_ids(defender)) for defender in defenders], dtype=np.int64),
+        }
+
+    def calculate(self, attackers: Sequence[Dict], defenders: Sequence[Dict], moves: Sequence) -> 'np.ndarray':
+        """
+        全ての組み合わせのダメージ
+
+        Returns:
+            int32 の配列 [攻撃側, 防御側, 技, 乱数16段階]
+        """
+        move = self.move_arrays(moves)
+        atk = self.attacker_arrays(attackers)
+        dfn = self.defender_arrays(defenders)
+        category = move['category']
+        # [攻撃側, 技] / [防御側, 技] の値を [攻撃側, 防御側, 技] にブロードキャストする
+        stab = (atk['type_ids'][:, :, None] == move['type_id'][None, None, :]).any(axis=1)
+        type_mod = EFFECTIVENESS_LOOKUP[move['type_id'][None, :], dfn['combo'][:, None]]
+        return damage_rolls(
+            level=atk['level'][:, None, None],
+            power=move['power'][None, None, :],
+            attack=atk['stats'][:, category][:, None, :],
+            defense=dfn['stats'][:, category][None, :, :],
+            attack_rank=atk['ranks'][:, category][:, None, :],
+            defense_rank=dfn['ranks'][:, category][None, :, :],
+            stat_multiplier=atk['stat_multiplier'][:, category][:, None, :],
+            damage_multiplier=atk['damage_multiplier'][:, None, None],
+            crit=atk['crit'][:, None, None],
+            stab=stab[:, None, :],
+            type_mod=type_mod[None, :, :],
+        )
+
+    def calculate_pairs(self, attackers: Sequence[Dict], defenders: Sequence[Dict], moves: Sequence) -> 'np.ndarray':
+        """
+        i 番目の攻撃側・防御側・技どうしのダメージ（3つは同じ長さ）
+
+        Returns:
+            int32 の配列 [組, 乱数16段階]
+        """
+        move = self.move_arrays(moves)
+        atk = self.attacker_arrays(attackers)
+        dfn = self.defender_arrays(defenders)
+        pair = np.arange(len(move['power']))
+        category = move['category']
+        return damage_rolls(
+            level=atk['level'],
+            power=move['power'],
+            attack=atk['stats'][pair, category],
+            defense=dfn['stats'][pair, category],
+            attack_rank=atk['ranks'][pair, category],
+            defense_rank=dfn['ranks'][pair, category],
+            stat_multiplier=atk['stat_multiplier'][pair, category],
+            damage_multiplier=atk['damage_multiplier'],
+            crit=atk['crit'],
+            stab=(atk['type_ids'] == move['type_id'][:, None]).any(axis=1),
+            type_mod=EFFECTIVENESS_LOOKUP[move['type_id'], dfn['combo']],
+        )
+
+    def calculate_movesets(self, attackers: Sequence[Dict], defenders: Sequence[Dict],
+                           movesets: Sequence[Sequence]) -> 'np.ndarray':
+        """
+        攻撃側ごとに技が違う場合のダメージ（movesets[i] が i 番目の攻撃側の技。足りない分は威力0）
+
+        Returns:
+            int32 の配列 [攻撃側, 防御側, 技, 乱数16段階]
+        """
+        width = max((len(moves) for moves in movesets), default=0)
+        move = self.move_arrays([moves[k] if k < len(moves) else {} for moves in movesets for k in range(width)])
+        power, category, move_type = (move[key].reshape(len(attackers), width)
+                                      for key in ('power', 'category', 'type_id'))
+        atk = self.attacker_arrays(attackers)
+        dfn = self.defender_arrays(defenders)
+        rows = np.arange(len(attackers))[:, None]
+        # 防御側の値は [防御側, 攻撃側, 技] で引いてから [攻撃側, 防御側, 技] に並べ替える
+        return damage_rolls(
+            level=atk['level'][:, None, None],
+            power=power[:, None, :],
+            attack=atk['stats'][rows, category][:, None, :],
+            defense=np.moveaxis(dfn['stats'][:, category], 0, 1),
+            attack_rank=atk['ranks'][rows, category][:, None, :],
+            defense_rank=np.moveaxis(dfn['ranks'][:, category], 0, 1),
+            stat_multiplier=atk['stat_multiplier'][rows, category][:, None, :],
+            damage_multiplier=atk['damage_multiplier'][:, None, None],
+            crit=atk['crit'][:, None, None],
+            stab=(atk['type_ids'][:, :, None] == move_type[:, None, :]).any(axis=1)[:, None, :],
+            type_mod=EFFECTIVENESS_LOOKUP[move_type[:, None, :], dfn['combo'][None, :, None]],
+        )
+
+
+def form_types(form: Dict) -> List[str]:
+    """フォルムのタイプ名（loader.js と同じく slot 順）"""
+    return [t['name'] for t in sorted(form.get('types', []), key=lambda t: t.get('slot', 0))]
+
+
+def form_type_ids(form: Dict) -> List[int]:
+    """フォルムのタイプID（slot 順。typeids ステージで付けた id が無ければ名前から）"""
+    return [t['id'] if t.get('id') is not None else type_id(t['name'])
+            for t in sorted(form.get('types', []), key=lambda t: t.get('slot', 0))]
+
+
+def form_stats(form: Dict, level: int = DEFAULT_LEVEL, stat_points: Optional[Dict[str, int]] = None,
+               natures: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """
+    フォルムの実数値（PokemonModel.computeStats と同じく個体値31）
+
+    Args:
+        stat_points: 能力P {"hp": 0〜32, "attack": ...}
+        natures: 性格補正 {"attack": "up", "spAtk": "down"}
+    """
+    stat_points = stat_points or {}
+    natures = natures or {}
+    base = form['base_stats']
+    keys = {'hp': 'hp', 'attack': 'attack', 'defense': 'defense', 'spAtk': 'special-attack',
+            'spDef': 'special-defense', 'speed': 'speed'}
+    stats = {'hp': int(calculate_hp(base['hp'], DEFAULT_IV, stat_points.get('hp', 0), level))}
+    for name, key in keys.items():
+        if name != 'hp':
+            stats[name] = int(calculate_stat(base[key], DEFAULT_IV, stat_points.get(name, 0), level,
+                                             nature_multiplier(natures.get(name, 'neutral'))))
+    return stats
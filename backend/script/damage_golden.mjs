@@ -0,0 +1,64 @@
+// damage_parity.py から呼ばれる Node スクリプト
+// frontend/js/calc/damage.js・stats.js をそのまま読み込み、ケースごとの結果（golden vector）を標準出力にJSONで書く
+//
+// 使用方法: node damage_golden.mjs <ケースのJSONファイル>
+//   ケース: {"damage": [{"attacker": {...}, "defender": {...}, "move": "技名"}], "stats": [{...}]}
+
+import { readFileSync } from 'node:fs';
+import { dirname, join } from 'node:path';
+import { fileURLToPath, pathToFileURL } from 'node:url';
+
+const FRONTEND_DIR = join(dirname(fileURLToPath(import.meta.url)), '..', '..', 'frontend');
+const CALC_DIR = join(FRONTEND_DIR, 'js', 'calc');
+
+// loader.js はページからの相対パス（./data/...）で fetch するので、frontend/ のファイルを返す
+globalThis.fetch = async (url) => {
+    const path = join(FRONTEND_DIR, String(url).split('?')[0]);
+    let text;
+    try {
+        text = readFileSync(path, 'utf-8');
+    } catch (e) {
+        return { ok: false, status: 404, json: async () => null };
+    }
+    return { ok: true, status: 200, json: async () => JSON.parse(text) };
+};
+// damage.js・loader.js のデバッグ出力は結果のJSONに混ぜない
+console.log = () => {};
+console.warn = () => {};
+
+// damage.js と同じ指定（?v=...）で読み込まないと、ITEMS_DEX が別のモジュールのものになる
+const damageSource = readFileSync(join(CALC_DIR, 'damage.js'), 'utf-8');
+const loaderSpecifier = damageSource.match(/from '(\.\.\/data\/loader\.js[^']*)'/)[1];
+const loader = await import(new URL(loaderSpecifier, pathToFileURL(join(CALC_DIR, 'damage.js'))).href);
+const { calculateDamage } = await import(pathToFileURL(join(CALC_DIR, 'damage.js')).href);
+const { calculateHp, calculateStat } = await import(pathToFileURL(join(CALC_DIR, 'stats.js')).href);
+await loader.loadAllData();
+
+function combatant(side) {
+    const ranks = side.ranks || {};
+    const stats = {};
+    for (const name of ['attack', 'defense', 'spAtk', 'spDef']) stats[name] = { rank: ranks[name] || 0 };
+    return {
+        level: side.level,
+        realStats: side.stats,
+        stats,
+        item: side.item || '',
+        speciesData: loader.SPECIES_DEX[side.species] || null,
+        conditions: { isCrit: Boolean(side.crit) },
+    };
+}
+
+const cases = JSON.parse(readFileSync(process.argv[2], 'utf-8'));
+const result = { damage: [], stats: [] };
+for (const c of cases.damage || []) {
+    const move = loader.MOVES_DEX[c.move];
+    const damage = calculateDamage(combatant(c.attacker), combatant(c.defender), move, {});
+    result.damage.push({ rolls: damage.rolls, typeMod: damage.typeMod ?? null });
+}
+for (const c of cases.stats || []) {
+    result.stats.push({
+        hp: calculateHp(c.base, c.iv, c.stat_points, c.level),
+        stat: calculateStat(c.base, c.iv, c.stat_points, c.level, c.nature),
+    });
+}
+process.stdout.write(JSON.stringify(result));
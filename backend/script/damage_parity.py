@@ -0,0 +1,205 @@
+"""
+damage_engine.py と frontend/js/calc/damage.js・stats.js の結果が完全に一致するかを golden vector で確認する
+
+機能:
+- --generate: ランダムなケース（実在のポケモン・技・持ち物。レベル・実数値・ランク・急所もランダム）と
+  境界のケース（タイプ無効・威力0・最低1ダメージ・4倍など）を作り、Node で damage_golden.mjs を実行して
+  damage.js の結果を golden vector（backend/data/damage_golden.json）に保存する
+- 引数なし: golden vector の全ケースを damage_engine.py でまとめて計算し、1つでも違えば終了コード1
+  （JS側のファイルが golden vector の作成時から変わっていれば、作り直すよう表示する）
+- --live: golden vector を使わず、その場で作ったケースを Node と直接比べる
+
+使用方法:
+    python damage_parity.py --generate --cases 5000
+    python damage_parity.py
+    python damage_parity.py --live --cases 20000 --seed 3
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from damage_engine import DamageEngine, ROLL_COUNT, calculate_hp, calculate_stat, form_types, nature_multiplier
+from incremental_build import save_json_atomic
+from pokedata import BASE_DIR, PokeData
+from pokemon_pack import file_sha256
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HARNESS_FILE = os.path.join(SCRIPT_DIR, 'damage_golden.mjs')
+GOLDEN_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'damage_golden.json')
+GOLDEN_VERSION = 1
+# 結果に影響するJS・データのファイル（golden vector の作成時から変わっていないかを確認する）
+SOURCE_FILES = ('frontend/js/calc/damage.js', 'frontend/js/calc/stats.js', 'frontend/js/data/types.js',
+                'frontend/js/data/type_table.js', 'frontend/js/data/loader.js',
+                'frontend/data/moves_data.json', 'frontend/data/items_data.json')
+
+DEFAULT_CASES = 2000
+LEVELS = (1, 5, 50, 50, 50, 50, 100)
+STAT_RANGE = (4, 700)   # 防御がランク-6でも0にならない範囲
+NATURES = ('up', 'down', 'neutral')
+
+
+def source_hashes() -> Dict[str, str]:
+    return {path: file_sha256(os.path.join(BASE_DIR, path)).hex() for path in SOURCE_FILES}
+
+
+def random_side(rng: random.Random, species: str, level: int, stat_names: Tuple[str, str],
+                item: str = '', crit: bool = False) -> Dict:
+    side = {
+        'species': species,
+        'level': level,
+        'stats': {name: rng.randint(*STAT_RANGE) for name in stat_names},
+        'ranks': {name: rng.choice((0, 0, 0, rng.randint(-6, 6))) for name in stat_names},
+    }
+    if item:
+        side['item'] = item
+    if crit:
+        side['crit'] = True
+    return side
+
+
+def edge_cases(data: PokeData) -> List[Dict]:
+    """境界のケース: タイプ無効・威力0・最低1ダメージ・4倍・急所と持ち物の組み合わせ"""
+    def case(attacker, defender, move, level=50, attack=100, defense=100, ranks=None, item='', crit=False):
+        return {
+            'attacker': {'species': attacker, 'level': level, 'stats': {'attack': attack, 'spAtk': attack},
+                         'ranks': ranks or {}, 'item': item, 'crit': crit},
+            'defender': {'species': defender, 'level': 50, 'stats': {'defense': defense, 'spDef': defense},
+                         'ranks': {}},
+            'move': move,
+        }
+    return [
+        case('ピカチュウ', 'ガブリアス', '10まんボルト'),                  # 無効（でんき → じめん）
+        case('ゲンガー', 'カビゴン', 'シャドーボール'),                    # 無効（ゴースト → ノーマル）
+        case('ピカチュウ', 'ガブリアス', 'でんじは'),                      # 変化技（威力0）
+        case('コイキング', 'ハッサム', 'はねる'),                          # 変化技（威力0）
+        case('コイキング', 'ハッサム', 'たいあたり', level=1, attack=4, defense=700,
+             ranks={'attack': -6}),                                           # 最低1ダメージ
+        case('ガブリアス', 'ユキノオー', 'ドラゴンクロー', attack=400),    # 等倍
+        case('カイリュー', 'セグレイブ', 'げきりん', attack=500, item='こだわりハチマキ', crit=True),
+        case('フシギバナ', 'ヌオー', 'ソーラービーム', attack=600, item='いのちのたま',
+             ranks={'spAtk': 6}),                                             # 4倍 + 持ち物
+        case('リザードン', 'ハッサム', 'かえんほうしゃ', attack=700, item='こだわりメガネ', crit=True,
+             ranks={'spAtk': 6}),
+    ]
+
+
+def generate_cases(data: PokeData, count: int, seed: int) -> Dict[str, List[Dict]]:
+    rng = random.Random(seed)
+    species = data.names()
+    moves = sorted(data.moves)
+    # 変化技（威力0）ばかりにならないよう、ほとんどは威力のある技から選ぶ
+    attacking_moves = [name for name in moves if data.move(name).get('power')]
+    items = [''] * 4 + sorted(data.items)
+    damage_cases = [case for case in edge_cases(data) if data.form(case['attacker']['species'])
+                    and data.form(case['defender']['species']) and data.has_move(case['move'])]
+    while len(damage_cases) < count:
+        damage_cases.append({
+            'attacker': random_side(rng, rng.choice(species), rng.choice(LEVELS), ('attack', 'spAtk'),
+                                    rng.choice(items), rng.random() < 0.1),
+            'defender': random_side(rng, rng.choice(species), 50, ('defense', 'spDef')),
+            'move': rng.choice(attacking_moves if rng.random() < 0.9 else moves),
+        })
+    stat_cases = [{'base': rng.randint(1, 255), 'iv': rng.randint(0, 31), 'stat_points': rng.randint(0, 32),
+                   'level': rng.choice(LEVELS + (rng.randint(1, 100),)), 'nature': rng.choice(NATURES)}
+                  for _ in range(max(1, count // 4))]
+    return {'damage': damage_cases, 'stats': stat_cases}
+
+
+def run_harness(cases: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Node で damage.js・stats.js を実行した結果"""
+    node = shutil.which('node')
+    if node is None:
+        raise RuntimeError("node が見つかりません（golden vector の作成と --live には Node.js が必要です）")
+    with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8', delete=False) as f:
+        json.dump(cases, f, ensure_ascii=False)
+        case_file = f.name
+    try:
+        completed = subprocess.run([node, HARNESS_FILE, case_file], capture_output=True, text=True, check=True)
+    finally:
+        os.remove(case_file)
+    return json.loads(completed.stdout)
+
+
+def expected_rolls(result: Dict) -> List[int]:
+    """damage.js は威力0の技で rolls を空にするので、エンジンと同じく全て0として比べる"""
+    return result['rolls'] or [0] * ROLL_COUNT
+
+
+def compare(data: PokeData, cases: Dict[str, List[Dict]], expected: Dict[str, List[Dict]]) -> List[str]:
+    """一致しなかったケースの説明（全て一致すれば空）"""
+    engine = DamageEngine(data)
+    sides = {}
+    for role in ('attacker', 'defender'):
+        sides[role] = [dict(case[role], types=form_types(data.form(case[role]['species'])))
+                       for case in cases['damage']]
+    rolls = engine.calculate_pairs(sides['attacker'], sides['defender'], [case['move'] for case in cases['damage']])
+
+    mismatches = []
+    for i, (case, result) in enumerate(zip(cases['damage'], expected['damage'])):
+        if rolls[i].tolist() != expected_rolls(result):
+            mismatches.append(f"damage #{i} {case['attacker']['species']} → {case['defender']['species']} "
+                              f"{case['move']}: JS {expected_rolls(result)} / Python {rolls[i].tolist()}")
+
+    stats = cases['stats']
+    columns = {key: np.array([case[key] for case in stats]) for key in ('base', 'iv', 'stat_points', 'level')}
+    hp = calculate_hp(columns['base'], columns['iv'], columns['stat_points'], columns['level'])
+    other = calculate_stat(columns['base'], columns['iv'], columns['stat_points'], columns['level'],
+                           np.array([nature_multiplier(case['nature']) for case in stats]))
+    for i, (case, result) in enumerate(zip(stats, expected['stats'])):
+        if (int(hp[i]), int(other[i])) != (result['hp'], result['stat']):
+            mismatches.append(f"stats #{i} {case}: JS {result} / Python hp={hp[i]} stat={other[i]}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='damage_engine.py と damage.js の結果の一致を確認します')
+    parser.add_argument('--generate', action='store_true', help='Node で golden vector を作り直す')
+    parser.add_argument('--live', action='store_true', help='golden vector を使わず、その場で Node と比べる')
+    parser.add_argument('--cases', type=int, default=DEFAULT_CASES,
+                        help=f'ダメージ計算のケース数（デフォルト: {DEFAULT_CASES}）')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--golden', type=str, default=GOLDEN_FILE, help='golden vector のファイル')
+    args = parser.parse_args()
+
+    data = PokeData()
+    if args.generate or args.live:
+        cases = generate_cases(data, args.cases, args.seed)
+        print(f"Node で damage.js を実行しています（{len(cases['damage']):,} + {len(cases['stats']):,} ケース）...")
+        expected = run_harness(cases)
+        if args.generate:
+            save_json_atomic(args.golden, {'version': GOLDEN_VERSION, 'seed': args.seed, 'sources': source_hashes(),
+                                           'cases': cases, 'expected': expected}, indent=None)
+            print(f"golden vector を {args.golden} に保存しました")
+    else:
+        if not os.path.exists(args.golden):
+            print(f"エラー: {args.golden} がありません（--generate で作成してください）")
+            return 1
+        with open(args.golden, 'r', encoding='utf-8') as f:
+            golden = json.load(f)
+        if golden.get('version') != GOLDEN_VERSION:
+            print(f"エラー: 未対応の golden vector の形式です: {golden.get('version')}")
+            return 1
+        changed = [path for path, digest in source_hashes().items() if golden['sources'].get(path) != digest]
+        if changed:
+            print(f"注意: golden vector の作成後に変更されたファイルがあります（--generate で作り直してください）: "
+                  f"{', '.join(changed)}")
+        cases, expected = golden['cases'], golden['expected']
+
+    mismatches = compare(data, cases, expected)
+    print(f"ダメージ計算 {len(cases['damage']):,} ケース, 実数値 {len(cases['stats']):,} ケース: "
+          f"不一致 {len(mismatches)} 件")
+    for line in mismatches[:20]:
+        print(f"  - {line}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,543 @@
+"""
+pokemon_data_all.json の保守処理を1回の読み込み・1回の書き込みで行うパイプライン
+
+add_commonly_use.py / convert_types_to_english.py / check_moves_existence.py はそれぞれ
+全データを読み込み（2つは書き戻し）するため、続けて実行するとパースと書き出しが3回ずつ発生する。
+このスクリプトは各処理を「ステージ」として、全フォルムを1回だけ順に流す。
+
+ステージ（--stages で任意の組み合わせ・順序を指定できる）:
+    defaults  不足しているフィールドに既定値を補う（commonly_use など）
+    types     types.name を日本語から英語表記に変換する（type_table.py の対応表を使う。既定では実行しない）
+    typeids   types の各要素にタイプID（type_table.py）を付ける
+    movefix   check_moves_existence.py --fix-file で作った修正ファイルのうち、自動適用の置き換えを行う
+    moves     覚える技が moves_data.json に存在するか確認する（存在しない技には近い技名の候補を付ける）
+    schema    各フィールドの有無と型を確認する
+
+どのステージもデータを変更しなかった場合は書き込まない。書き込みは一時ファイル経由で置き換える。
+
+差分ビルド（incremental_build.py）:
+    前回の出力と内容ハッシュが同じフォルムはステージに通さず、前回の結果（エラー・注意）を再利用する。
+    ステージの設定が変わった場合はそのステージだけ全件、技データが変わった場合はその技を覚えるフォルムだけを
+    技の確認に通す。出力が前回から変わった場合は差分パッチ（backend/data/patches/）を書き出す。
+
+使用方法:
+    python data_pipeline.py                              # 既定のステージ（defaults,typeids,movefix,moves,schema）
+    python data_pipeline.py --stages types,typeids       # タイプ名を英語表記にする
+    python data_pipeline.py --stages moves,schema        # 確認だけ（書き込みなし）
+    python data_pipeline.py --stages defaults --dry-run  # 変更内容だけ表示
+    python data_pipeline.py --output out.json --report report.txt
+    python data_pipeline.py --full                       # 前回のビルド状態を使わず全件処理
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, List, Optional
+
+from incremental_build import (BuildState, PATCH_DIR, STATE_FILE, make_patch, patch_file_name,
+                               patch_is_empty, record_hash, record_keys, save_json_atomic)
+from move_suggest import MOVE_FIX_FILE, MoveNameIndex, load_auto_fixes
+from type_table import TYPE_IDS, TYPES, UNKNOWN_TYPE, type_id
+from pokedata import PokeData, POKEMON_DATA_FILE
+
+# 不足していたら補うフィールドと既定値（リストなどはフォルムごとにコピーする）
+DEFAULT_FIELDS = {
+    'commonly_use': [],
+}
+
+# フィールド名 → 許される型
+SCHEMA = {
+    'pokedex_name': (str,),
+    'sprite_url': (str, type(None)),
+    'pokedex_number': (int,),
+    'weight_kg': (int, float),
+    'height_m': (int, float),
+    'is_default': (bool,),
+    'form_name': (str,),
+    'base_species': (str,),
+    'types': (list,),
+    'base_stats': (dict,),
+    'abilities': (list,),
+    'moves': (list,),
+    'commonly_use': (list,),
+}
+STAT_KEYS = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+MAX_DETAIL_LINES = 20  # レポートに載せる詳細の上限（ステージごと）
+
+
+def form_label(form: Dict) -> str:
+    """レポート用のフォルム表記（#6 リザードン（メガX））"""
+    label = f"#{form.get('pokedex_number', 0)} {form.get('pokedex_name', 'Unknown')}"
+    form_name = form.get('form_name', '通常')
+    if form_name != '通常':
+        label += f"（{form_name}）"
+    return label
+
+
+# =============================================================================
+# ステージ
+# =============================================================================
+
+class Stage:
+    """
+    パイプラインのステージの基底クラス
+
+    prepare() で必要なデータを用意し、process() を全フォルムについて1回ずつ呼び、最後に finish() を呼ぶ。
+    process() はフォルムを変更したら True を返す。問題は errors に、終了コードに影響しない注意は warnings に記録する。
+
+    差分ビルドでは、前回から変わっていないフォルムは process() の代わりに restore() で前回の結果を戻す。
+    observe() は変更の有無にかかわらず全フォルムについて呼ばれる（フォルム間にまたがる確認用）。
+    """
+
+    name = ''
+    title = ''
+    uses_moves = False  # moves_data.json の内容に結果が依存するか
+
+    def __init__(self):
+        self.changed = 0
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+
+    def prepare(self, data: PokeData) -> None:
+        pass
+
+    def fingerprint(self) -> str:
+        """ステージの設定のハッシュ（変わったら全件を処理し直す）"""
+        return record_hash([self.name])
+
+    def observe(self, form: Dict) -> None:
+        pass
+
+    def process(self, form: Dict) -> bool:
+        raise NotImplementedError
+
+    def record_result(self, form: Dict, errors: List[str], warnings: List[str]):
+        """process() 1回分の結果（ビルド状態に保存する。空なら None）"""
+        if not errors and not warnings:
+            return None
+        return {'errors': errors, 'warnings': warnings}
+
+    def restore(self, form: Dict, result) -> None:
+        """record_result() で保存した前回の結果を戻す"""
+        if result:
+            self.errors += result['errors']
+            self.warnings += result['warnings']
+
+    def finish(self) -> None:
+        pass
+
+    def summary_lines(self) -> List[str]:
+        return []
+
+    def report_lines(self) -> List[str]:
+        lines = [f"【{self.title}】"]
+        lines += [f"  {line}" for line in self.summary_lines()]
+        for prefix, messages in (('-', self.errors), ('注意:', self.warnings)):
+            for message in messages[:MAX_DETAIL_LINES]:
+                lines.append(f"  {prefix} {message}")
+            if len(messages) > MAX_DETAIL_LINES:
+                lines.append(f"  ... 他 {len(messages) - MAX_DETAIL_LINES} 件")
+        return lines
+
+
+class DefaultsStage(Stage):
+    name = 'defaults'
+    title = '既定値の補完'
+
+    def __init__(self):
+        super().__init__()
+        self.filled: Dict[str, int] = {}
+
+    def fingerprint(self) -> str:
+        return record_hash([self.name, DEFAULT_FIELDS])
+
+    def process(self, form: Dict) -> bool:
+        changed = False
+        for field, default in DEFAULT_FIELDS.items():
+            if field not in form:
+                form[field] = list(default) if isinstance(default, list) else default
+                self.filled[field] = self.filled.get(field, 0) + 1
+                changed = True
+        return changed
+
+    def summary_lines(self) -> List[str]:
+        if not self.filled:
+            return ["補完が必要なフィールドはありません"]
+        return [f"{field}: {count} 件を補完" for field, count in self.filled.items()]
+
+
+class TypeNormalizeStage(Stage):
+    name = 'types'
+    title = 'タイプ名の英語表記への変換'
+
+    def __init__(self):
+        super().__init__()
+        self.type_mapping: Dict[str, str] = {}
+        self.english_names = set()
+
+    def prepare(self, data: PokeData) -> None:
+        # 日本語名 → 英語名（pokemon_name_cache.json や PokeAPI は使わない）
+        self.type_mapping = {jp: en for en, jp in TYPES}
+        self.english_names = set(self.type_mapping.values())
+
+    def fingerprint(self) -> str:
+        return record_hash([self.name, self.type_mapping])
+
+    def process(self, form: Dict) -> bool:
+        changed = False
+        for type_info in form.get('types', []):
+            type_name = type_info.get('name', '')
+            if type_name in self.english_names:
+                continue
+            if type_name in self.type_mapping:
+                type_info['name'] = self.type_mapping[type_name]
+                changed = True
+            else:
+                self.errors.append(f"{form_label(form)}: 変換できないタイプ名 {type_name}")
+        return changed
+
+    def summary_lines(self) -> List[str]:
+        return [f"変換したポケモン/フォルム数: {self.changed:,} 件",
+                f"変換できなかったタイプ名: {len(self.errors)} 件"]
+
+
+class TypeIdStage(Stage):
+    name = 'typeids'
+    title = 'タイプIDの付与'
+
+    def fingerprint(self) -> str:
+        return record_hash([self.name, TYPE_IDS])
+
+    def process(self, form: Dict) -> bool:
+        changed = False
+        for type_info in form.get('types', []):
+            tid = type_id(type_info.get('name'))
+            if tid == UNKNOWN_TYPE:
+                self.errors.append(f"{form_label(form)}: タイプIDの無いタイプ名 {type_info.get('name')}")
+            elif type_info.get('id') != tid:
+                type_info['id'] = tid
+                changed = True
+        return changed
+
+    def summary_lines(self) -> List[str]:
+        return [f"タイプIDを付けたポケモン/フォルム数: {self.changed:,} 件"]
+
+
+class MoveFixStage(Stage):
+    name = 'movefix'
+    title = '技名の自動修正'
+
+    def __init__(self, fix_file: str = MOVE_FIX_FILE):
+        super().__init__()
+        self.fix_file = fix_file
+        self.fixes: Dict[str, str] = {}
+        self.applied: Dict[str, int] = {}
+
+    def prepare(self, data: PokeData) -> None:
+        # 置き換え先が moves_data.json に無いものは使わない
+        self.fixes = load_auto_fixes(self.fix_file, data.moves)
+
+    def fingerprint(self) -> str:
+        return record_hash([self.name, self.fixes])
+
+    def process(self, form: Dict) -> bool:
+        moves = form.get('moves', [])
+        if not self.fixes or not any(move_name in self.fixes for move_name in moves):
+            return False
+        fixed = []
+        for move_name in moves:
+            replacement = self.fixes.get(move_name, move_name)
+            if replacement != move_name:
+                self.applied[move_name] = self.applied.get(move_name, 0) + 1
+            # 置き換えた結果、既に覚えている技と重なったら1つにする
+            if replacement not in fixed:
+                fixed.append(replacement)
+        form['moves'] = fixed
+        return True
+
+    def summary_lines(self) -> List[str]:
+        if not self.fixes:
+            return [f"自動適用する置き換えはありません（{self.fix_file}）"]
+        lines = [f"置き換えたポケモン/フォルム数: {self.changed:,} 件"]
+        lines += [f"{move_name} → {self.fixes[move_name]}: {count} 件"
+                  for move_name, count in sorted(self.applied.items())]
+        return lines
+
+
+class MoveValidationStage(Stage):
+    name = 'moves'
+    title = '技データの存在確認'
+    uses_moves = True
+
+    def __init__(self):
+        super().__init__()
+        self.known_moves = set()
+        self.checked = 0
+        self.missing: Dict[str, List[str]] = {}
+
+    def prepare(self, data: PokeData) -> None:
+        self.known_moves = set(data.moves)
+
+    def observe(self, form: Dict) -> None:
+        self.checked += len(form.get('moves', []))
+
+    def process(self, form: Dict) -> bool:
+        for move_name in form.get('moves', []):
+            if move_name not in self.known_moves:
+                self.missing.setdefault(move_name, []).append(form_label(form))
+        return False
+
+    def record_result(self, form: Dict, errors: List[str], warnings: List[str]):
+        missing = [move_name for move_name in form.get('moves', []) if move_name not in self.known_moves]
+        return missing or None
+
+    def restore(self, form: Dict, result) -> None:
+        for move_name in result or []:
+            self.missing.setdefault(move_name, []).append(form_label(form))
+
+    def summary_lines(self) -> List[str]:
+        affected = {label for labels in self.missing.values() for label in labels}
+        lines = [f"チェックした技の総数: {self.checked:,} 回",
+                 f"存在しない技の種類数: {len(self.missing)} 種類",
+                 f"影響を受けるポケモン/フォルム数: {len(affected)} 件"]
+        return lines
+
+    def finish(self) -> None:
+        # 影響を受けるフォルム数の多い順に、技ごとの詳細（と最も近い技名）をエラーとして並べる
+        index = MoveNameIndex(self.known_moves) if self.missing else None
+        self.errors = []
+        for move_name, labels in sorted(self.missing.items(), key=lambda x: len(x[1]), reverse=True):
+            message = f"{move_name}: {len(labels)} 件（{', '.join(labels[:5])}{' ほか' if len(labels) > 5 else ''}）"
+            suggestions = index.suggest(move_name, 1)
+            if suggestions:
+                message += f" → 候補: {suggestions[0][0]}"
+            self.errors.append(message)
+
+
+class SchemaCheckStage(Stage):
+    name = 'schema'
+    title = 'スキーマ確認'
+
+    def __init__(self):
+        super().__init__()
+        self.seen_names = set()
+
+    def fingerprint(self) -> str:
+        return record_hash([self.name, {field: [t.__name__ for t in types] for field, types in SCHEMA.items()},
+                            STAT_KEYS])
+
+    def observe(self, form: Dict) -> None:
+        # 同名フォルムは名前で引くと後のものが見つからない（他のフォルムに依存するので毎回確認する）
+        name = form.get('pokedex_name')
+        if name in self.seen_names:
+            self.warnings.append(f"{form_label(form)}: pokedex_name が重複しています")
+        self.seen_names.add(name)
+
+    def process(self, form: Dict) -> bool:
+        label = form_label(form)
+        for field, types in SCHEMA.items():
+            if field not in form:
+                self.errors.append(f"{label}: {field} がありません")
+            elif not isinstance(form[field], types) or (isinstance(form[field], bool) and bool not in types):
+                self.errors.append(f"{label}: {field} の型が不正です（{type(form[field]).__name__}）")
+        for field in form:
+            if field not in SCHEMA:
+                self.errors.append(f"{label}: 未知のフィールド {field}")
+
+        stats = form.get('base_stats')
+        if isinstance(stats, dict) and tuple(stats) != STAT_KEYS:
+            self.errors.append(f"{label}: base_stats のキーが不正です（{', '.join(stats)}）")
+        for key in ('types', 'abilities'):
+            for entry in form.get(key) or []:
+                if not isinstance(entry, dict) or not entry.get('name'):
+                    self.errors.append(f"{label}: {key} に名前のない要素があります")
+        if not form.get('types'):
+            self.errors.append(f"{label}: types が空です")
+        return False
+
+    def summary_lines(self) -> List[str]:
+        return [f"スキーマ違反: {len(self.errors)} 件", f"注意: {len(self.warnings)} 件"]
+
+
+STAGES = {stage.name: stage for stage in (DefaultsStage, TypeNormalizeStage, TypeIdStage, MoveFixStage,
+                                           MoveValidationStage, SchemaCheckStage)}
+# types（日本語のタイプ名を英語に書き換える）は --stages で指定したときだけ
+DEFAULT_STAGE_ORDER = ('defaults', 'typeids', 'movefix', 'moves', 'schema')
+
+
+# =============================================================================
+# 実行
+# =============================================================================
+
+def run_pipeline(stage_names: List[str], input_file: str = POKEMON_DATA_FILE,
+                 output_file: Optional[str] = None, dry_run: bool = False,
+                 state_file: Optional[str] = STATE_FILE, patch_dir: Optional[str] = PATCH_DIR,
+                 full: bool = False) -> Dict:
+    """
+    指定したステージに全フォルムを1回だけ通し、変更があれば1回だけ書き込む
+
+    state_file があれば差分ビルドを行う（前回の出力と同じ内容のフォルムはステージに通さない）。
+    full なら前回の結果を再利用せずに全件を処理する（パッチとビルド状態は書き出す）。
+    state_file が None なら全件を処理し、ビルド状態もパッチも書き出さない。
+
+    Returns:
+        実行結果（ステージ・件数・書き込み先・所要時間・パッチ）
+    """
+    stages = [STAGES[name]() for name in stage_names]
+    start = time.perf_counter()
+    data = PokeData(pokemon_file=input_file)
+    for stage in stages:
+        stage.prepare(data)
+
+    state = BuildState.load(state_file) if state_file else BuildState()
+    fingerprints = {stage.name: stage.fingerprint() for stage in stages}
+    move_hashes = {name: record_hash(move) for name, move in data.moves.items()}
+    changed_moves = state.changed_moves(move_hashes)
+    # 設定が前回と同じステージだけ前回の結果を再利用できる
+    reusable = {stage.name: not full and state.fingerprints.get(stage.name) == fingerprints[stage.name]
+                for stage in stages}
+    results: Dict[str, Dict[str, object]] = {stage.name: {} for stage in stages}
+
+    forms = data.forms
+    keys = record_keys(forms)
+    output_hashes = []
+    changed_forms = 0
+    processed_forms = 0
+    for key, form in zip(keys, forms):
+        input_hash = record_hash(form)
+        unchanged = state.forms.get(key) == input_hash
+        form_changed = False
+        form_processed = False
+        for stage in stages:
+            stage.observe(form)
+            if (unchanged and reusable[stage.name]
+                    and not (stage.uses_moves and changed_moves.intersection(form.get('moves', [])))):
+                result = state.results.get(stage.name, {}).get(key)
+                stage.restore(form, result)
+            else:
+                form_processed = True
+                errors_before, warnings_before = len(stage.errors), len(stage.warnings)
+                if stage.process(form):
+                    stage.changed += 1
+                    form_changed = True
+                result = stage.record_result(form, stage.errors[errors_before:],
+                                             stage.warnings[warnings_before:])
+            if result is not None:
+                results[stage.name][key] = result
+        if form_changed:
+            changed_forms += 1
+        if form_processed:
+            processed_forms += 1
+        output_hashes.append(record_hash(form) if form_changed else input_hash)
+    for stage in stages:
+        stage.finish()
+
+    written = None
+    if not dry_run and (changed_forms > 0 or (output_file and output_file != input_file)):
+        written = data.save_forms(output_file or input_file)
+
+    # 前回の出力からの差分パッチとビルド状態
+    patch = None
+    patch_written = None
+    if state_file:
+        patch = make_patch(state.forms, keys, output_hashes, forms, state.moves, move_hashes, data.moves)
+        if patch_is_empty(patch):
+            patch = None
+        elif not dry_run and patch_dir and not state.empty:
+            patch_written = os.path.join(patch_dir, patch_file_name(patch))
+            save_json_atomic(patch_written, patch)
+        if not dry_run:
+            BuildState(dict(zip(keys, output_hashes)), move_hashes, fingerprints, results).save(state_file)
+
+    return {
+        'stages': stages,
+        'forms': len(forms),
+        'changed_forms': changed_forms,
+        'processed_forms': processed_forms,
+        'incremental': bool(state_file) and not state.empty and not full,
+        'patch': patch,
+        'patch_written': patch_written,
+        'written': written,
+        'dry_run': dry_run,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def generate_report(result: Dict) -> str:
+    lines = ["=" * 80, "データパイプライン実行レポート", "=" * 80, ""]
+    lines.append("【サマリー】")
+    lines.append(f"  ステージ: {', '.join(stage.name for stage in result['stages'])}")
+    lines.append(f"  ポケモン/フォルム数: {result['forms']:,} 件")
+    lines.append(f"  変更したポケモン/フォルム数: {result['changed_forms']:,} 件")
+    if result['incremental']:
+        lines.append(f"  処理したポケモン/フォルム数: {result['processed_forms']:,} 件"
+                     f"（残りは前回の結果を再利用）")
+    if result['patch']:
+        forms_patch = result['patch']['forms']
+        lines.append(f"  前回からの差分: 変更・追加 {len(forms_patch['upsert'])} 件, 削除 {len(forms_patch['remove'])} 件, "
+                     f"技 {len(result['patch']['moves']['upsert']) + len(result['patch']['moves']['remove'])} 件")
+    if result['patch_written']:
+        lines.append(f"  差分パッチ: {result['patch_written']}")
+    if result['written']:
+        lines.append(f"  保存先: {result['written']}")
+    elif result['dry_run'] and result['changed_forms']:
+        lines.append("  保存先: なし（--dry-run）")
+    else:
+        lines.append("  保存先: なし（変更なし）")
+    lines.append(f"  所要時間: {result['elapsed']:.2f} 秒")
+    lines.append("")
+    for stage in result['stages']:
+        lines += stage.report_lines()
+        lines.append("")
+    problems = sum(len(stage.errors) for stage in result['stages'])
+    lines.append("✅ 問題は見つかりませんでした" if problems == 0 else f"⚠️ 問題: {problems} 件")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='pokemon_data_all.json の補完・変換・確認を1回の読み込みでまとめて行います'
+    )
+    parser.add_argument('--stages', type=str, default=','.join(DEFAULT_STAGE_ORDER),
+                        help=f"実行するステージ（カンマ区切り、指定順に実行。デフォルト: {','.join(DEFAULT_STAGE_ORDER)}）")
+    parser.add_argument('--input', type=str, default=POKEMON_DATA_FILE,
+                        help=f'入力ファイル（デフォルト: {POKEMON_DATA_FILE}）')
+    parser.add_argument('--output', type=str, default=None,
+                        help='出力ファイル（指定しない場合は入力ファイルを上書き）')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='変更内容をレポートするだけで書き込まない')
+    parser.add_argument('--full', action='store_true',
+                        help='前回のビルド状態を使わずに全件を処理する（ビルド状態は更新する）')
+    parser.add_argument('--state', type=str, default=STATE_FILE,
+                        help=f'ビルド状態ファイル（デフォルト: {STATE_FILE}、空文字で差分ビルドを無効化）')
+    parser.add_argument('--patch-dir', type=str, default=PATCH_DIR,
+                        help=f'差分パッチの出力先（デフォルト: {PATCH_DIR}、空文字で出力しない）')
+    parser.add_argument('--report', type=str, default=None,
+                        help='レポートをファイルに出力（指定しない場合はコンソールに出力）')
+    args = parser.parse_args()
+
+    stage_names = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = [name for name in stage_names if name not in STAGES]
+    if unknown or not stage_names:
+        print(f"エラー: 不明なステージ {', '.join(unknown) or '(なし)'}（利用可能: {', '.join(STAGES)}）")
+        return 1
+
+    try:
+        result = run_pipeline(stage_names, args.input, args.output, args.dry_run,
+                              args.state or None, args.patch_dir or None, args.full)
+    except FileNotFoundError as e:
+        print(f"エラー: {str(e)}")
+        return 1
+
+    report = generate_report(result)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f"レポートを {args.report} に保存しました。")
+    else:
+        print(report)
+    return 0 if all(not stage.errors for stage in result['stages']) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -4,22 +4,49 @@ PokeAPIを使用して全ポケモン（フォルム違い含む）の基礎デ
 機能:
 - 通常フォルムとフォルム違いを含む全ポケモンを取得
 - 技データも各フォルムごとに取得
-- 途中保存と再開機能
+- 全バージョングループの習得技を1回の取得でまとめて抽出（技IDテーブル上のビットセットで別ファイルに保存）
+- 途中保存と再開機能（1種族1レコードの追記型ジャーナル、SQLite WALモード）
 - 技名・タイプ名・特性名のキャッシュによるAPI呼出し削減
+- 技名・タイプ名・特性名の一括事前取得（同じ名前の同時取得は1リクエストにまとめる）
+- 種族・フォルム・名前解決の並列取得（全体の同時接続数に上限あり）
+- 共有トークンバケットによるレート制御（Retry-After・指数バックオフ・自動レート調整）
+- 取得に失敗した図鑑番号の記録と再試行
+- 応答のディスクキャッシュ（ETag/Last-Modified で再検証、オフライン再構築にも対応）
+- 計測（エンドポイント別の応答時間パーセンタイル・再試行・転送量・名前キャッシュ・スループット）を
+  中間保存ごとと終了時に JSON / Prometheus テキスト形式で書き出し
+- 応答の記録（フィクスチャ）と、記録した応答のローカル再生による決定的なオフライン実行
 
 使用方法:
     python fetch_all_pokemon.py                    # 全ポケモンを取得（再開可能）
     python fetch_all_pokemon.py --start-id 1 --max-id 151  # 図鑑番号1〜151のみ
     python fetch_all_pokemon.py --no-resume        # 新規開始（中間ファイル無視）
     python fetch_all_pokemon.py --test 6           # リザードン（図鑑番号6）のみテスト
+    python fetch_all_pokemon.py --workers 8 --max-concurrency 16  # 並列度を指定
+    python fetch_all_pokemon.py --rate 10 --max-rate 50  # 初期レート・上限レート（リクエスト/秒）
+    python fetch_all_pokemon.py --no-resume --offline   # キャッシュのみで再構築（通信なし）
+    python fetch_all_pokemon.py --no-prefetch      # 名前の一括事前取得を行わない
+    python fetch_all_pokemon.py --no-resume --no-http-cache --record-fixture pokeapi_fixture.jsonl.gz  # 応答を記録
+    python fetch_all_pokemon.py --no-resume --replay-fixture pokeapi_fixture.jsonl.gz  # 記録した応答で実行
+    python fetch_all_pokemon.py --metrics-prom /var/lib/node_exporter/pokeapi_fetch.prom  # 計測の出力先
 """
 
 import requests
 import json
 import time
-import os
 import argparse
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
+
+from fetch_journal import FetchJournal
+from fetch_telemetry import Telemetry
+from http_fixture import FixtureRecorder, start_replay_server
+from learnset_bitset import resource_id_from_url, build_learnset_file
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from rate_limiter import (
+    AdaptiveRateLimiter, parse_retry_after, backoff_delay,
+    DEFAULT_RATE, DEFAULT_MAX_RATE
+)
 
 try:
     from tqdm import tqdm
@@ -31,12 +58,26 @@ except ImportError:
 
 # ファイルパス設定
 OUTPUT_FILE = 'backend/data/pokemon_data_all.json'
-PROGRESS_FILE = 'pokemon_fetch_progress.json'
-CACHE_FILE = 'pokemon_name_cache.json'
+LEARNSET_FILE = 'backend/data/pokemon_learnsets.json'  # 全バージョングループの習得技（ビットセット）
+JOURNAL_FILE = 'pokemon_fetch_journal.sqlite3'  # 取得結果・進捗・名前キャッシュ
+PROGRESS_FILE = 'pokemon_fetch_progress.json'  # 旧形式の進捗ファイル（ジャーナルへの取り込み用）
+CACHE_FILE = 'pokemon_name_cache.json'  # 名前キャッシュのJSON書き出し先
+METRICS_JSON_FILE: Optional[str] = 'pokemon_fetch_metrics.json'  # 計測サマリー（None で出力しない）
+METRICS_PROM_FILE: Optional[str] = 'pokemon_fetch_metrics.prom'  # Prometheus テキスト形式（None で出力しない）
 
 # API設定
 BASE_URL = "https://pokeapi.co/api/v2"
-API_DELAY = 0.05  # API呼び出し間の待機時間（秒）
+REQUEST_TIMEOUT = 30  # 1リクエストあたりのタイムアウト（秒）
+MAX_RETRIES = 5  # 429/5xx・通信エラー時の最大再試行回数
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# 名前の事前取得設定（name_cache のカテゴリ → 一覧エンドポイント）
+PREFETCH_ENDPOINTS = {'moves': 'move', 'types': 'type', 'abilities': 'ability'}
+PREFETCH_PAGE_SIZE = 200
+
+# 並列取得設定
+DEFAULT_WORKERS = 4  # 同時に処理する種族数
+DEFAULT_MAX_CONCURRENCY = 8  # 全体で同時に発行するHTTPリクエスト数の上限
 
 # グローバルキャッシュ
 name_cache: Dict[str, Dict[str, str]] = {
@@ -44,6 +85,21 @@ name_cache: Dict[str, Dict[str, str]] = {
     "types": {},
     "abilities": {}
 }
+_name_cache_lock = threading.Lock()
+_name_inflight: Dict[Tuple[str, str], Future] = {}  # 取得中の名前（single-flight用）
+journal: Optional[FetchJournal] = None  # open_journal で初期化
+
+# 並列取得用の共有状態（configure_concurrency で初期化）
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+_http_semaphore = threading.BoundedSemaphore(DEFAULT_MAX_CONCURRENCY)
+rate_limiter = AdaptiveRateLimiter()
+response_cache: Optional[ResponseCache] = None  # configure_http_cache で有効化
+offline_mode = False
+telemetry = Telemetry()  # fetch_all_pokemon の開始時に作り直す
+fixture_recorder: Optional[FixtureRecorder] = None  # --record-fixture で有効化
+_thread_local = threading.local()
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
 
 
 # =============================================================================
@@ -250,31 +306,207 @@ def get_form_display_name(internal_name: str, species_ja_name: str) -> Tuple[str
     return display_name, form_label
 
 
+# =============================================================================
+# HTTP・並列実行基盤
+# =============================================================================
+
+def configure_concurrency(max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> None:
+    """
+    全体の同時HTTPリクエスト数の上限を設定する
+    
+    既存のスレッドプールは破棄され、次回 get_executor() 呼び出し時に作り直される。
+    """
+    global _http_semaphore, _max_concurrency
+    _max_concurrency = max(1, max_concurrency)
+    _http_semaphore = threading.BoundedSemaphore(_max_concurrency)
+    shutdown_executors()
+
+
+def get_executor(kind: str) -> ThreadPoolExecutor:
+    """
+    用途別（'varieties', 'names'）の共有スレッドプールを取得する
+    
+    親タスクが子タスクの完了を待つため、用途ごとにプールを分けてデッドロックを防ぐ。
+    実際の同時通信数は _http_semaphore で制限されるので、スレッド数は多めに確保する。
+    """
+    with _executor_lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=_max_concurrency * 2,
+                thread_name_prefix=f"fetch-{kind}"
+            )
+            _executors[kind] = executor
+        return executor
+
+
+def shutdown_executors() -> None:
+    """共有スレッドプールを全て終了する"""
+    with _executor_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
+
+
+def _get_session() -> requests.Session:
+    """スレッドごとのSession（keep-aliveで接続を再利用）を取得する"""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+def configure_rate_limit(rate: float = DEFAULT_RATE, max_rate: float = DEFAULT_MAX_RATE) -> None:
+    """全リクエスト箇所で共有するレートリミッターを作り直す"""
+    global rate_limiter
+    rate_limiter = AdaptiveRateLimiter(rate=rate, max_rate=max_rate)
+
+
+def configure_http_cache(cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                         max_bytes: int = DEFAULT_MAX_BYTES, offline: bool = False) -> None:
+    """
+    応答のディスクキャッシュを設定する
+    
+    Args:
+        cache_dir: キャッシュディレクトリ（None ならキャッシュを使わない）
+        max_bytes: キャッシュの合計サイズ上限（バイト）
+        offline: True なら通信せずキャッシュのみから応答する
+    """
+    global response_cache, offline_mode
+    if response_cache is not None:
+        response_cache.close()
+    response_cache = ResponseCache(cache_dir, max_bytes) if cache_dir else None
+    offline_mode = offline and response_cache is not None
+
+
+def _not_cached_error(url: str) -> requests.exceptions.HTTPError:
+    """オフライン時のキャッシュミスを404として表すエラーを作る（図鑑番号の終端判定と同じ扱いにする）"""
+    res = requests.Response()
+    res.status_code = 404
+    res.reason = 'Not Cached'
+    res.url = url
+    return requests.exceptions.HTTPError(f"オフライン: キャッシュにありません: {url}", response=res)
+
+
+def _record_cached(url: str, data: Dict, entry) -> Dict:
+    """応答キャッシュから返した本文もフィクスチャに記録する"""
+    if fixture_recorder is not None:
+        fixture_recorder.record(url, 200, json.dumps(data, ensure_ascii=False).encode('utf-8'),
+                                entry.etag, entry.last_modified)
+    return data
+
+
+def http_get(url: str) -> Dict:
+    """
+    レート制限と同時接続数の上限内でGETリクエストを発行し、JSONを返す
+    
+    キャッシュ済みのURLは検証子付きで再検証し、304なら保存済みの本文を返す。
+    オフライン時は通信せず、キャッシュにないURLは404として扱う。
+    429/5xx・通信エラーは Retry-After またはジッター付き指数バックオフで待って再試行する。
+    
+    Raises:
+        requests.exceptions.HTTPError: 404などの再試行しないエラー、または再試行回数の上限到達
+        requests.exceptions.RequestException: 通信エラーが再試行回数の上限まで続いた場合
+    """
+    cache = response_cache
+    entry = cache.lookup(url) if cache else None
+    if offline_mode:
+        data = cache.load(entry) if entry is not None else None
+        if data is None:
+            raise _not_cached_error(url)
+        telemetry.record_cache_served(url)
+        return _record_cached(url, data, entry)
+    headers = ResponseCache.conditional_headers(entry)
+    
+    for attempt in range(MAX_RETRIES + 1):
+        rate_limiter.acquire()
+        try:
+            with _http_semaphore:
+                request_start = time.perf_counter()
+                res = _get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            telemetry.record_request(url, time.perf_counter() - request_start, 'error')
+            if attempt >= MAX_RETRIES:
+                raise
+            telemetry.record_retry(url)
+            rate_limiter.on_throttle(reduce_rate=False)
+            time.sleep(backoff_delay(attempt))
+            continue
+        telemetry.record_request(url, time.perf_counter() - request_start, res.status_code, len(res.content))
+        
+        if res.status_code in RETRYABLE_STATUS and attempt < MAX_RETRIES:
+            telemetry.record_retry(url)
+            # レートを下げるのは429のみ。5xxはサーバー側の一時的な障害として待って再試行する
+            retry_after = parse_retry_after(res.headers.get('Retry-After'))
+            rate_limiter.on_throttle(retry_after, reduce_rate=res.status_code == 429)
+            time.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+            continue
+        
+        if res.status_code == 304 and entry is not None:
+            rate_limiter.on_success()
+            data = cache.load(entry)
+            if data is None:
+                # リクエスト中にキャッシュから消えていた（エントリは削除済みなので、次は検証子なしで取り直す）
+                return http_get(url)
+            telemetry.record_cache_served(url)
+            return _record_cached(url, data, entry)
+        
+        if fixture_recorder is not None:
+            fixture_recorder.record(url, res.status_code, res.content,
+                                    res.headers.get('ETag'), res.headers.get('Last-Modified'))
+        res.raise_for_status()
+        rate_limiter.on_success()
+        data = res.json()
+        if cache:
+            cache.store(url, res.content, res.headers.get('ETag'), res.headers.get('Last-Modified'), data)
+        return data
+    raise AssertionError("unreachable")
+
+
 # =============================================================================
 # キャッシュ管理
 # =============================================================================
 
+def open_journal() -> FetchJournal:
+    """ジャーナルを開く（初回は旧形式の進捗ファイル・名前キャッシュJSONを取り込む）"""
+    global journal
+    if journal is None:
+        journal = FetchJournal(JOURNAL_FILE)
+        journal.import_legacy(PROGRESS_FILE, CACHE_FILE)
+    return journal
+
+
+def close_journal() -> None:
+    global journal
+    if journal is not None:
+        journal.close()
+        journal = None
+
+
 def load_cache() -> None:
-    """キャッシュファイルを読み込む"""
-    global name_cache
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                loaded = json.load(f)
-                name_cache["moves"] = loaded.get("moves", {})
-                name_cache["types"] = loaded.get("types", {})
-                name_cache["abilities"] = loaded.get("abilities", {})
-            print(f"キャッシュを読み込みました: 技名 {len(name_cache['moves'])}件, "
-                  f"タイプ {len(name_cache['types'])}件, 特性 {len(name_cache['abilities'])}件")
-        except Exception as e:
-            print(f"キャッシュ読み込みエラー: {str(e)}")
+    """ジャーナルから名前キャッシュを読み込む"""
+    try:
+        loaded = open_journal().load_names()
+        with _name_cache_lock:
+            name_cache["moves"] = loaded.get("moves", {})
+            name_cache["types"] = loaded.get("types", {})
+            name_cache["abilities"] = loaded.get("abilities", {})
+        print(f"キャッシュを読み込みました: 技名 {len(name_cache['moves'])}件, "
+              f"タイプ {len(name_cache['types'])}件, 特性 {len(name_cache['abilities'])}件")
+    except Exception as e:
+        print(f"キャッシュ読み込みエラー: {str(e)}")
 
 
 def save_cache() -> None:
-    """キャッシュをファイルに保存する"""
+    """
+    名前キャッシュをJSONファイルに書き出す
+    
+    取得中の追加分はジャーナルに1件ずつ追記済みなので、ここでは実行終了時に
+    他のスクリプト向けのJSONを1回だけ書き出す。
+    """
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(name_cache, f, indent=2, ensure_ascii=False)
+        open_journal().export_names(CACHE_FILE)
     except Exception as e:
         print(f"キャッシュ保存エラー: {str(e)}")
 
@@ -283,6 +515,9 @@ def get_cached_name(category: str, english_name: str, api_url: str) -> Optional[
     """
     キャッシュから日本語名を取得、なければAPIから取得してキャッシュに追加
     
+    同じ名前を複数スレッドが同時に要求した場合、APIへのリクエストは1回だけ発行し、
+    後から来た呼び出しはその結果を待って共有する（single-flight）。
+    
     Args:
         category: 'moves', 'types', 'abilities' のいずれか
         english_name: 英語名（キャッシュキー）
@@ -291,78 +526,172 @@ def get_cached_name(category: str, english_name: str, api_url: str) -> Optional[
     Returns:
         日本語名
     """
-    # キャッシュにあれば返す
-    if english_name in name_cache[category]:
-        return name_cache[category][english_name]
+    key = (category, english_name)
+    with _name_cache_lock:
+        # キャッシュにあれば返す
+        cached = name_cache[category].get(english_name)
+        if cached is not None:
+            return cached
+        # 取得中なら結果を待つ
+        flight = _name_inflight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = Future()
+            _name_inflight[key] = flight
+    
+    if not is_leader:
+        return flight.result()
     
     # APIから取得
+    ja_name = None
     try:
-        res = requests.get(api_url)
-        res.raise_for_status()
-        ja_name = get_japanese_name(res.json()['names'])
+        ja_name = get_japanese_name(http_get(api_url)['names'])
         
-        # キャッシュに追加
+        # キャッシュに追加（ジャーナルにも差分のみ追記）
         if ja_name:
-            name_cache[category][english_name] = ja_name
-        
-        time.sleep(API_DELAY)
-        return ja_name
+            with _name_cache_lock:
+                name_cache[category][english_name] = ja_name
+            if journal is not None:
+                journal.upsert_name(category, english_name, ja_name)
     except Exception as e:
         print(f"    警告: {category} '{english_name}' の日本語名取得に失敗: {str(e)}")
-        return None
+    finally:
+        with _name_cache_lock:
+            del _name_inflight[key]
+        flight.set_result(ja_name)
+    return ja_name
+
+
+def resolve_names(category: str, entries: Iterable[Tuple[str, str]]) -> List[Optional[str]]:
+    """
+    (英語名, URL) の列をまとめて日本語名に解決する（入力と同じ順序で返す）
+    
+    キャッシュ済みのものはその場で返し、未解決分のみ名前解決用スレッドプールで並列取得する。
+    """
+    entries = list(entries)
+    with _name_cache_lock:
+        results = [name_cache[category].get(en) for en, _ in entries]
+    missing = [i for i, r in enumerate(results) if r is None]
+    telemetry.record_name_cache(category, len(results) - len(missing), len(missing))
+    if missing:
+        executor = get_executor('names')
+        fetched = executor.map(lambda i: get_cached_name(category, *entries[i]), missing)
+        for i, ja_name in zip(missing, fetched):
+            results[i] = ja_name
+    return results
+
+
+def list_resource_urls(endpoint: str) -> List[Tuple[str, str]]:
+    """
+    一覧エンドポイント（/move, /type, /ability）から全件の (英語名, URL) を取得する
+    
+    1ページ目で総件数を確認し、残りのページは並列に取得する。
+    """
+    first = http_get(f"{BASE_URL}/{endpoint}?limit={PREFETCH_PAGE_SIZE}&offset=0")
+    pages = [first]
+    offsets = range(PREFETCH_PAGE_SIZE, first.get('count', 0), PREFETCH_PAGE_SIZE)
+    if offsets:
+        executor = get_executor('names')
+        pages.extend(executor.map(
+            lambda offset: http_get(f"{BASE_URL}/{endpoint}?limit={PREFETCH_PAGE_SIZE}&offset={offset}"),
+            offsets
+        ))
+    return [(r['name'], r['url']) for page in pages for r in page.get('results', [])]
+
+
+def prefetch_names() -> None:
+    """
+    技名・タイプ名・特性名を一覧エンドポイントから一括で解決し、name_cache を温める
+    
+    種族の処理前に呼ぶことで、名前解決のリクエストを種族ごとの直列待ちから切り離し、
+    全件を上限いっぱいの並列度でまとめて発行する。
+    """
+    start_time = time.time()
+    print("技名・タイプ名・特性名を事前取得しています...")
+    for category, endpoint in PREFETCH_ENDPOINTS.items():
+        try:
+            entries = list_resource_urls(endpoint)
+        except Exception as e:
+            print(f"  警告: {endpoint} の一覧取得に失敗しました（種族処理中に個別取得します）: {str(e)}")
+            continue
+        with _name_cache_lock:
+            missing = [e for e in entries if e[0] not in name_cache[category]]
+        resolved = resolve_names(category, missing)
+        failed = sum(1 for r in resolved if r is None)
+        print(f"  {category}: 全{len(entries)}件（新規取得 {len(missing) - failed}件"
+              + (f", 失敗 {failed}件" if failed else "") + "）")
+    print(f"事前取得完了（{format_time(time.time() - start_time)}）\n")
 
 
 # =============================================================================
 # 進捗管理
 # =============================================================================
 
-def load_progress() -> Tuple[List[Dict], int]:
+def load_progress() -> Tuple[int, int, List[int]]:
     """
-    進捗ファイルを読み込む
+    ジャーナルから再開に必要な進捗だけを読み込む（取得済みデータ本体は読まない）
     
     Returns:
-        (取得済みデータリスト, 最後の図鑑番号) のタプル
+        (取得済み種族数, 最後の図鑑番号, 取得に失敗した図鑑番号リスト) のタプル
     """
-    if os.path.exists(PROGRESS_FILE):
-        try:
-            with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            pokemon_data = data.get('pokemon_data', [])
-            last_id = data.get('last_pokedex_number', 0)
-            print(f"進捗を読み込みました: {len(pokemon_data)}件（最後の図鑑番号: {last_id}）")
-            return pokemon_data, last_id
-        except Exception as e:
-            print(f"進捗読み込みエラー: {str(e)}")
-    return [], 0
+    try:
+        species_count, last_id, failed_ids = open_journal().load_progress()
+        if last_id > 0:
+            print(f"進捗を読み込みました: {species_count}種族（最後の図鑑番号: {last_id}）")
+        if failed_ids:
+            print(f"  前回取得に失敗した図鑑番号: {failed_ids}")
+        return species_count, last_id, failed_ids
+    except Exception as e:
+        print(f"進捗読み込みエラー: {str(e)}")
+    return 0, 0, []
 
 
-def save_progress(pokemon_data: List[Dict], last_id: int) -> None:
-    """進捗をファイルに保存する"""
+def save_progress(last_id: int, failed_ids: Optional[Iterable[int]] = None) -> None:
+    """追記済みの種族レコードと進捗をまとめて確定し、その時点の計測値を書き出す"""
     try:
-        with open(PROGRESS_FILE, 'w', encoding='utf-8') as f:
-            json.dump({
-                'pokemon_data': pokemon_data,
-                'last_pokedex_number': last_id
-            }, f, indent=2, ensure_ascii=False)
+        open_journal().commit(last_id, sorted(failed_ids or []))
     except Exception as e:
         print(f"進捗保存エラー: {str(e)}")
+    telemetry.checkpoints += 1
+    export_telemetry(last_id)
 
 
-def save_final_output(pokemon_data: List[Dict]) -> None:
-    """最終出力ファイルに保存する"""
-    # ディレクトリが存在しない場合は作成
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    
-    # 図鑑番号とデフォルトフラグでソート
-    sorted_data = sorted(pokemon_data, key=lambda x: (
-        x.get('pokedex_number', 0),
-        0 if x.get('is_default', True) else 1
-    ))
-    
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(sorted_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"\n最終出力: {OUTPUT_FILE} に保存しました（{len(sorted_data)}件）")
+def export_telemetry(last_id: Optional[int] = None) -> None:
+    """計測値を METRICS_JSON_FILE / METRICS_PROM_FILE に書き出す"""
+    extra = {
+        'last_pokedex_number': last_id,
+        'rate_limit_per_second': round(rate_limiter.rate, 3),
+        'max_concurrency': _max_concurrency,
+    }
+    if response_cache:
+        extra['http_cache_hit_rate'] = round(response_cache.hit_rate, 4)
+        extra['http_cache_bytes_saved'] = response_cache.bytes_saved
+    try:
+        telemetry.export(METRICS_JSON_FILE, METRICS_PROM_FILE,
+                         {k: v for k, v in extra.items() if v is not None})
+    except OSError as e:
+        print(f"計測値の書き出しエラー: {str(e)}")
+
+
+def save_final_output() -> int:
+    """
+    ジャーナルを図鑑番号順に圧縮して最終出力ファイルに保存する
+
+    全バージョングループの習得技（learnsets）は本体から外し、ビットセット形式で LEARNSET_FILE に保存する。
+    """
+    journal_ = open_journal()
+    count = journal_.compact(OUTPUT_FILE, strip_keys=('learnsets',))
+    print(f"\n最終出力: {OUTPUT_FILE} に保存しました（{count}件）")
+
+    learnsets = {
+        form['pokedex_name']: form['learnsets']
+        for form in journal_.iter_forms() if form.get('learnsets')
+    }
+    if learnsets:
+        stats = build_learnset_file(LEARNSET_FILE, learnsets, journal_.load_move_ids(), name_cache['moves'])
+        print(f"習得技: {LEARNSET_FILE} に保存しました（{stats['forms']}フォルム × "
+              f"{stats['version_groups']}バージョングループ、技テーブル {stats['moves']}件）")
+    return count
 
 
 # =============================================================================
@@ -385,19 +714,17 @@ def fetch_pokemon_variety(pokemon_url: str, species_ja_name: str,
     Returns:
         フォルムデータの辞書
     """
-    res = requests.get(pokemon_url)
-    res.raise_for_status()
-    p_data = res.json()
-    time.sleep(API_DELAY)
+    p_data = http_get(pokemon_url)
     
     internal_name = p_data['name']
     display_name, form_label = get_form_display_name(internal_name, species_ja_name)
     
     # タイプ取得（キャッシュ利用）
     types_ja = []
-    for type_info in p_data['types']:
-        type_name = type_info['type']['name']
-        type_ja = get_cached_name('types', type_name, type_info['type']['url'])
+    type_names = resolve_names(
+        'types', [(t['type']['name'], t['type']['url']) for t in p_data['types']]
+    )
+    for type_info, type_ja in zip(p_data['types'], type_names):
         if type_ja:
             types_ja.append({
                 "name": type_ja,
@@ -406,9 +733,10 @@ def fetch_pokemon_variety(pokemon_url: str, species_ja_name: str,
     
     # 特性取得（キャッシュ利用）
     abilities_ja = []
-    for ab in p_data['abilities']:
-        ab_name = ab['ability']['name']
-        ab_ja = get_cached_name('abilities', ab_name, ab['ability']['url'])
+    ability_names = resolve_names(
+        'abilities', [(ab['ability']['name'], ab['ability']['url']) for ab in p_data['abilities']]
+    )
+    for ab, ab_ja in zip(p_data['abilities'], ability_names):
         if ab_ja:
             abilities_ja.append({
                 "name": ab_ja,
@@ -422,24 +750,37 @@ def fetch_pokemon_variety(pokemon_url: str, species_ja_name: str,
     weight_kg = p_data.get('weight', 0) / 10
     height_m = p_data.get('height', 0) / 10
     
-    # 技取得（バージョングループ指定、キャッシュ利用）
-    moves_ja = []
+    # 技取得（全バージョングループを1回で抽出、キャッシュ利用）
+    # version_group_details から全バージョングループの習得技IDを集め、
+    # moves には指定されたバージョングループの技だけを日本語名で入れる
+    learnsets: Dict[str, List[int]] = {}
+    move_ids: Dict[int, str] = {}
+    all_moves = []
+    is_available_in_version = []
     for m in p_data['moves']:
-        # version_group_details をチェックして、指定されたバージョングループに存在する技のみを取得
-        version_group_details = m.get('version_group_details', [])
-        is_available_in_version = False
-        
-        for vg_detail in version_group_details:
-            vg_name = vg_detail.get('version_group', {}).get('name', '')
-            if vg_name == version_group:
-                is_available_in_version = True
-                break
-        
-        if is_available_in_version:
-            move_name = m['move']['name']
-            move_ja = get_cached_name('moves', move_name, m['move']['url'])
-            if move_ja:
-                moves_ja.append(move_ja)
+        move_id = resource_id_from_url(m['move']['url'])
+        vg_names = {
+            vg_detail.get('version_group', {}).get('name', '')
+            for vg_detail in m.get('version_group_details', [])
+        }
+        vg_names.discard('')
+        if not vg_names:
+            continue
+        if move_id is not None:
+            move_ids[move_id] = m['move']['name']
+            for vg_name in vg_names:
+                learnsets.setdefault(vg_name, []).append(move_id)
+        all_moves.append((m['move']['name'], m['move']['url']))
+        is_available_in_version.append(version_group in vg_names)
+    
+    # 全バージョングループの技名を解決しておく（習得技ファイルの技テーブルで使う）
+    all_moves_ja = resolve_names('moves', all_moves)
+    moves_ja = [
+        move_ja for move_ja, available in zip(all_moves_ja, is_available_in_version)
+        if move_ja and available
+    ]
+    if move_ids and journal is not None:
+        journal.upsert_move_ids(move_ids)
     
     # 画像URL取得（アニメーションGIF優先）
     sprites = p_data.get('sprites', {})
@@ -462,7 +803,8 @@ def fetch_pokemon_variety(pokemon_url: str, species_ja_name: str,
         "base_stats": base_stats,
         "abilities": abilities_ja,
         "moves": moves_ja,
-        "commonly_use": []
+        "commonly_use": [],
+        "learnsets": {vg: sorted(ids) for vg, ids in sorted(learnsets.items())}
     }
 
 
@@ -479,27 +821,35 @@ def fetch_species_all_forms(species_id: int, version_group: str = 'scarlet-viole
     """
     # Species情報を取得
     species_url = f"{BASE_URL}/pokemon-species/{species_id}"
-    species_res = requests.get(species_url)
-    species_res.raise_for_status()
-    species_data = species_res.json()
-    time.sleep(API_DELAY)
+    species_data = http_get(species_url)
     
     # 種族の日本語名を取得
     species_ja_name = get_japanese_name(species_data['names'])
     
-    all_forms = []
+    # 全てのVariety（フォルム）を並列取得（結果はvarietiesの順序を維持）
+    executor = get_executor('varieties')
+    variety_futures = [
+        executor.submit(
+            fetch_pokemon_variety,
+            variety['pokemon']['url'], species_ja_name, variety['is_default'],
+            species_data['id'], version_group
+        )
+        for variety in species_data['varieties']
+    ]
     
-    # 全てのVariety（フォルム）をループ
-    for variety in species_data['varieties']:
-        pokemon_url = variety['pokemon']['url']
-        is_default = variety['is_default']
-        
+    all_forms = []
+    for variety, future in zip(species_data['varieties'], variety_futures):
         try:
-            form_data = fetch_pokemon_variety(
-                pokemon_url, species_ja_name, is_default, species_data['id'], version_group
-            )
+            form_data = future.result()
             if form_data:
                 all_forms.append(form_data)
+        except requests.exceptions.HTTPError as e:
+            # 再試行しても回復しなかったエラーは種族ごと失敗扱いにして、後で取り直す
+            if e.response is None or e.response.status_code != 404:
+                raise
+            print(f"    警告: フォルム {variety['pokemon']['name']} が見つかりません: {str(e)}")
+        except requests.exceptions.RequestException:
+            raise
         except Exception as e:
             print(f"    警告: フォルム {variety['pokemon']['name']} の取得に失敗: {str(e)}")
             continue
@@ -513,35 +863,68 @@ def fetch_species_all_forms(species_id: int, version_group: str = 'scarlet-viole
 
 def fetch_all_pokemon(start_id: int = 1, max_id: Optional[int] = None,
                       resume: bool = True, save_interval: int = 10,
-                      version_group: str = 'scarlet-violet') -> int:
+                      version_group: str = 'scarlet-violet',
+                      workers: int = DEFAULT_WORKERS,
+                      max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                      rate: float = DEFAULT_RATE,
+                      max_rate: float = DEFAULT_MAX_RATE,
+                      prefetch: bool = True) -> int:
     """
     全ポケモンのデータを取得してJSONファイルに保存
     
+    種族単位の取得を workers 件まで同時に進め、HTTPリクエストは全体で
+    max_concurrency 件までに制限する。完了順は前後するが、取得結果は
+    図鑑番号順に確定させるので、中間保存・再開・最終出力の内容は逐次取得時と同じになる。
+    
+    再試行しても取得できなかった図鑑番号は失敗リストとして進捗ファイルに記録し、
+    全体の取得後（および次回の再開時）にもう一度取得を試みる。
+    
+    取得結果は1種族ずつジャーナルに追記し、save_interval 種族ごとに1トランザクションで確定する。
+    
     Args:
         start_id: 開始図鑑番号（resume=Trueの場合は無視）
         max_id: 最大図鑑番号（Noneの場合は404まで）
         resume: 中断から再開するか
-        save_interval: 何体ごとに中間保存するか
+        save_interval: 何種族ごとに中間保存（ジャーナルの確定）するか
         version_group: バージョングループ（例: 'scarlet-violet', 'sword-shield'）
+        workers: 同時に処理する種族数
+        max_concurrency: 全体で同時に発行するHTTPリクエスト数の上限
+        rate: 初期リクエストレート（リクエスト/秒）
+        max_rate: 自動引き上げ時の上限レート（リクエスト/秒）
+        prefetch: 種族の処理前に技名・タイプ名・特性名を一括取得するか
     
     Returns:
-        取得したポケモン数
+        取得したポケモン数（フォルム数）
     """
+    global telemetry
+    telemetry = Telemetry()
+    
+    # 取得結果はジャーナルに記録するので、開けなければ取得を始めない
+    try:
+        journal_ = open_journal()
+    except Exception as e:
+        raise RuntimeError(f"ジャーナル {JOURNAL_FILE} を開けません: {str(e)}") from e
+    
     # キャッシュを読み込む
     load_cache()
+    configure_concurrency(max_concurrency)
+    configure_rate_limit(rate, max_rate)
+    workers = max(1, workers)
+    failed_ids: Set[int] = set()
     
     # 進捗を読み込む
     if resume:
-        all_pokemon_data, last_id = load_progress()
+        species_count, last_id, previous_failed = load_progress()
+        failed_ids.update(previous_failed)
         if last_id > 0:
             pokemon_id = last_id + 1
             print(f"図鑑番号 {pokemon_id} から再開します。")
         else:
             pokemon_id = start_id
-            all_pokemon_data = []
     else:
-        all_pokemon_data = []
+        journal_.reset_progress()
         pokemon_id = start_id
+    fetched_forms = 0
     
     # 開始メッセージ
     if max_id:
@@ -549,100 +932,163 @@ def fetch_all_pokemon(start_id: int = 1, max_id: Optional[int] = None,
     else:
         print(f"\nポケモンデータの取得を開始します（図鑑番号 {pokemon_id} から）...")
     print(f"バージョングループ: {version_group}")
+    print(f"並列度: 種族 {workers}件同時, HTTP {max_concurrency}件同時"
+          f"（レート {rate:g}〜{max_rate:g}件/秒）")
     print(f"{save_interval}体ごとに中間保存します。\n")
     
     start_time = time.time()
     count_since_last_save = 0
     
+    if prefetch:
+        prefetch_names()
+    
     # プログレスバー
     pbar = None
     if TQDM_AVAILABLE and max_id:
         total = max_id - pokemon_id + 1
         pbar = tqdm(total=total, desc="取得中", unit="種")
     
+    # committed_id: 図鑑番号順に確定済みの最後の番号（中間保存の last_pokedex_number）
+    committed_id = pokemon_id - 1
+    next_id = pokemon_id
+    end_id = max_id  # 取得対象の最後の図鑑番号（404検出時に確定）
+    in_flight: Dict[int, Future] = {}
+    completed: Dict[int, List[Dict]] = {}
+    reached_end_by_404 = False
+    species_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch-species")
+    
     try:
         while True:
-            # 最大ID チェック
-            if max_id and pokemon_id > max_id:
-                print(f"\n最大図鑑番号 {max_id} に到達しました。")
+            # 取得ウィンドウを埋める（確定待ちの結果が溜まりすぎないよう先行数を制限）
+            while (len(in_flight) < workers
+                   and next_id - committed_id <= workers * 4
+                   and (end_id is None or next_id <= end_id)):
+                in_flight[next_id] = species_pool.submit(
+                    fetch_species_all_forms, next_id, version_group
+                )
+                next_id += 1
+            
+            if not in_flight:
                 break
             
-            try:
-                if pbar:
-                    pbar.set_postfix_str(f"図鑑番号 {pokemon_id}")
-                else:
-                    print(f"図鑑番号 {pokemon_id} を取得中...", end=" ", flush=True)
-                
-                # 全フォルムを取得
-                forms = fetch_species_all_forms(pokemon_id, version_group)
-                
-                if forms:
-                    all_pokemon_data.extend(forms)
-                    count_since_last_save += 1
-                    
-                    species_name = forms[0].get('base_species', 'Unknown')
-                    if pbar:
-                        pbar.set_postfix_str(f"{species_name} ({len(forms)}フォルム)")
-                        pbar.update(1)
+            done, _ = wait(list(in_flight.values()), return_when=FIRST_COMPLETED)
+            for species_id in sorted(sid for sid, f in in_flight.items() if f in done):
+                # 404検出で打ち切った図鑑番号は in_flight から除かれている
+                future = in_flight.pop(species_id, None)
+                if future is None or (end_id is not None and species_id > end_id):
+                    continue
+                try:
+                    completed[species_id] = future.result()
+                except requests.exceptions.HTTPError as e:
+                    if e.response is not None and e.response.status_code == 404:
+                        # 以降の図鑑番号は取得不要
+                        end_id = species_id - 1 if end_id is None else min(end_id, species_id - 1)
+                        reached_end_by_404 = True
+                        for sid in [sid for sid in in_flight if sid > end_id]:
+                            in_flight.pop(sid).cancel()
+                        for sid in [sid for sid in completed if sid > end_id]:
+                            del completed[sid]
                     else:
-                        print(f"✓ {species_name} ({len(forms)}フォルム)")
-                
-                # 中間保存
-                if count_since_last_save >= save_interval:
-                    save_progress(all_pokemon_data, pokemon_id)
-                    save_cache()
-                    if not pbar:
-                        print(f"  → 中間保存完了（合計 {len(all_pokemon_data)}件）")
-                    count_since_last_save = 0
-                
-                pokemon_id += 1
+                        print(f"\nHTTPエラー（図鑑番号 {species_id}）: {str(e)} → 後で再試行します")
+                        failed_ids.add(species_id)
+                        completed[species_id] = []
+                except Exception as e:
+                    print(f"\nエラー（図鑑番号 {species_id}）: {str(e)} → 後で再試行します")
+                    failed_ids.add(species_id)
+                    completed[species_id] = []
+            
+            # 図鑑番号順に連続している分だけ確定する
+            while committed_id + 1 in completed:
+                committed_id += 1
+                forms = completed.pop(committed_id)
+                if not forms:
+                    continue
+                journal_.record_species(committed_id, forms)
+                telemetry.record_species(len(forms))
+                fetched_forms += len(forms)
+                count_since_last_save += 1
                 
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 404:
-                    if pbar:
-                        pbar.close()
-                    print(f"\n図鑑番号 {pokemon_id} が見つかりませんでした。取得完了。")
-                    break
+                species_name = forms[0].get('base_species', 'Unknown')
+                if pbar:
+                    pbar.set_postfix_str(f"{species_name} ({len(forms)}フォルム)")
+                    pbar.update(1)
                 else:
-                    print(f"\nHTTPエラー: {str(e)}")
-                    pokemon_id += 1
-                    continue
-                    
-            except Exception as e:
-                print(f"\nエラー（図鑑番号 {pokemon_id}）: {str(e)}")
-                # エラー時も中間保存
-                save_progress(all_pokemon_data, pokemon_id - 1)
-                save_cache()
-                pokemon_id += 1
-                continue
+                    print(f"図鑑番号 {committed_id}: ✓ {species_name} ({len(forms)}フォルム)")
+            
+            # 中間保存
+            if count_since_last_save >= save_interval:
+                save_progress(committed_id, failed_ids)
+                if not pbar:
+                    print(f"  → 中間保存完了（今回 {fetched_forms}件）")
+                count_since_last_save = 0
     
     except KeyboardInterrupt:
         if pbar:
             pbar.close()
         print(f"\n\n処理が中断されました。進捗を保存します...")
-        save_progress(all_pokemon_data, pokemon_id - 1)
+        species_pool.shutdown(wait=False, cancel_futures=True)
+        shutdown_executors()
+        save_progress(committed_id, failed_ids)
         save_cache()
-        print(f"保存完了（{len(all_pokemon_data)}件）")
-        return len(all_pokemon_data)
+        print(f"保存完了（今回 {fetched_forms}件）")
+        return fetched_forms
+    
+    # 失敗した図鑑番号を取り直す
+    if failed_ids:
+        print(f"\n取得に失敗した図鑑番号を再試行します: {sorted(failed_ids)}")
+        retry_futures = {
+            species_id: species_pool.submit(fetch_species_all_forms, species_id, version_group)
+            for species_id in sorted(failed_ids)
+        }
+        for species_id, future in retry_futures.items():
+            try:
+                forms = future.result()
+            except Exception as e:
+                print(f"  図鑑番号 {species_id}: 再試行も失敗しました: {str(e)}")
+                continue
+            failed_ids.discard(species_id)
+            if forms:
+                journal_.record_species(species_id, forms)
+                telemetry.record_species(len(forms))
+                fetched_forms += len(forms)
+                print(f"  図鑑番号 {species_id}: ✓ {forms[0].get('base_species', 'Unknown')} "
+                      f"({len(forms)}フォルム)")
+    
+    species_pool.shutdown(wait=True)
+    shutdown_executors()
     
     # 最終保存
     if pbar:
         pbar.close()
     
+    if reached_end_by_404:
+        print(f"\n図鑑番号 {end_id + 1} が見つかりませんでした。取得完了。")
+    elif max_id:
+        print(f"\n最大図鑑番号 {max_id} に到達しました。")
+    
     elapsed_time = time.time() - start_time
     print(f"\n=== 取得完了 ===")
     print(f"総処理時間: {format_time(elapsed_time)}")
-    print(f"取得ポケモン数: {len(all_pokemon_data)}件")
+    print(f"今回取得したポケモン数: {fetched_forms}件")
+    if failed_ids:
+        print(f"⚠ 取得できなかった図鑑番号: {sorted(failed_ids)}（次回の再開時に再試行します）")
+    print(f"最終レート: {rate_limiter.rate:.1f}件/秒")
+    if response_cache:
+        print(response_cache.format_stats())
     print(f"キャッシュ: 技名 {len(name_cache['moves'])}件, "
           f"タイプ {len(name_cache['types'])}件, 特性 {len(name_cache['abilities'])}件")
+    print(telemetry.format_summary())
     
-    # 最終出力ファイルに保存
-    save_final_output(all_pokemon_data)
+    # 進捗を確定（失敗が残っている場合は再開時に取り直せるよう記録される）
+    save_progress(committed_id, failed_ids)
+    
+    # ジャーナルを圧縮して最終出力ファイルに保存
+    total_forms = save_final_output()
     
     # キャッシュも保存
     save_cache()
     
-    return len(all_pokemon_data)
+    return total_forms
 
 
 def test_single_pokemon(pokemon_id: int, version_group: str = 'scarlet-violet') -> None:
@@ -668,6 +1114,10 @@ def test_single_pokemon(pokemon_id: int, version_group: str = 'scarlet-violet')
                 print(f"    技数: {len(form['moves'])}件")
                 if form['moves']:
                     print(f"    技（一部）: {', '.join(form['moves'][:5])}...")
+                learnsets = form.get('learnsets', {})
+                if learnsets:
+                    print(f"    習得技（全バージョングループ）: "
+                          f"{', '.join(f'{vg} {len(ids)}件' for vg, ids in learnsets.items())}")
         else:
             print("データが取得できませんでした。")
             
@@ -679,6 +1129,9 @@ def test_single_pokemon(pokemon_id: int, version_group: str = 'scarlet-violet')
     except Exception as e:
         print(f"エラー: {str(e)}")
     
+    if response_cache:
+        print(f"\n{response_cache.format_stats()}")
+    
     # テスト後もキャッシュを保存
     save_cache()
 
@@ -703,16 +1156,86 @@ if __name__ == "__main__":
                         help='バージョングループ（デフォルト: scarlet-violet）例: sword-shield, sun-moon')
     parser.add_argument('--test', type=int, default=None,
                         help='単一ポケモンのテスト（図鑑番号を指定）')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'同時に処理する種族数（デフォルト: {DEFAULT_WORKERS}）')
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help=f'全体の同時HTTPリクエスト数の上限（デフォルト: {DEFAULT_MAX_CONCURRENCY}）')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'初期リクエストレート（件/秒、デフォルト: {DEFAULT_RATE:g}）')
+    parser.add_argument('--max-rate', type=float, default=DEFAULT_MAX_RATE,
+                        help=f'自動引き上げ時の上限レート（件/秒、デフォルト: {DEFAULT_MAX_RATE:g}）')
+    parser.add_argument('--no-prefetch', action='store_true',
+                        help='技名・タイプ名・特性名の一括事前取得を行わない')
+    parser.add_argument('--http-cache-dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help=f'応答キャッシュのディレクトリ（デフォルト: {DEFAULT_CACHE_DIR}）')
+    parser.add_argument('--http-cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2,
+                        help=f'応答キャッシュのサイズ上限MB（デフォルト: {DEFAULT_MAX_BYTES // 1024 ** 2}）')
+    parser.add_argument('--no-http-cache', action='store_true',
+                        help='応答キャッシュを使わない')
+    parser.add_argument('--offline', action='store_true',
+                        help='通信せず応答キャッシュのみで取得する（キャッシュにない図鑑番号で終了）')
+    parser.add_argument('--metrics-json', type=str, default=METRICS_JSON_FILE,
+                        help=f'計測サマリーの出力先（デフォルト: {METRICS_JSON_FILE}、空文字で出力しない）')
+    parser.add_argument('--metrics-prom', type=str, default=METRICS_PROM_FILE,
+                        help=f'Prometheus テキスト形式の出力先（デフォルト: {METRICS_PROM_FILE}、空文字で出力しない）')
+    parser.add_argument('--record-fixture', type=str, default=None,
+                        help='受け取った応答をフィクスチャ（.jsonl.gz）に記録する')
+    parser.add_argument('--replay-fixture', type=str, default=None,
+                        help='記録したフィクスチャをローカルで再生して取得する（通信なし、応答キャッシュは使わない）')
+    parser.add_argument('--replay-latency-ms', type=float, default=0.0,
+                        help='再生時に応答ごとに入れる遅延ミリ秒（デフォルト: 0）')
+    parser.add_argument('--replay-error-rate', type=float, default=0.0,
+                        help='再生時に 429/503 を返す割合 0〜1（デフォルト: 0）')
+    parser.add_argument('--replay-seed', type=int, default=0,
+                        help='再生時のエラー注入の乱数シード（デフォルト: 0）')
+    parser.add_argument('--base-url', type=str, default=BASE_URL,
+                        help=f'APIのベースURL（デフォルト: {BASE_URL}）ローカルのスタブサーバー利用時に指定')
     
     args = parser.parse_args()
+    BASE_URL = args.base_url.rstrip('/')
+    METRICS_JSON_FILE = args.metrics_json or None
+    METRICS_PROM_FILE = args.metrics_prom or None
+    configure_concurrency(args.max_concurrency)
+    configure_rate_limit(args.rate, args.max_rate)
+    if args.offline and args.no_http_cache:
+        parser.error('--offline と --no-http-cache は同時に指定できません')
+    if args.replay_fixture and (args.offline or args.record_fixture):
+        parser.error('--replay-fixture は --offline / --record-fixture と同時に指定できません')
     
-    if args.test:
-        test_single_pokemon(args.test, args.version_group)
-    else:
-        fetch_all_pokemon(
-            start_id=args.start_id,
-            max_id=args.max_id,
-            resume=not args.no_resume,
-            save_interval=args.save_interval,
-            version_group=args.version_group
-        )
+    replay_server = None
+    if args.replay_fixture:
+        replay_server = start_replay_server(args.replay_fixture, latency_ms=args.replay_latency_ms,
+                                            error_rate=args.replay_error_rate, seed=args.replay_seed)
+        BASE_URL = replay_server.base_url
+        print(f"フィクスチャを再生します: {args.replay_fixture}（{len(replay_server.entries)}件）")
+    configure_http_cache(
+        None if args.no_http_cache or replay_server else args.http_cache_dir,
+        args.http_cache_max_mb * 1024 ** 2,
+        offline=args.offline
+    )
+    if args.record_fixture:
+        fixture_recorder = FixtureRecorder(args.record_fixture, BASE_URL)
+    
+    try:
+        if args.test:
+            test_single_pokemon(args.test, args.version_group)
+        else:
+            fetch_all_pokemon(
+                start_id=args.start_id,
+                max_id=args.max_id,
+                resume=not args.no_resume,
+                save_interval=args.save_interval,
+                version_group=args.version_group,
+                workers=args.workers,
+                max_concurrency=args.max_concurrency,
+                rate=args.rate,
+                max_rate=args.max_rate,
+                prefetch=not args.no_prefetch
+            )
+    finally:
+        if fixture_recorder is not None:
+            fixture_recorder.close()
+            print(f"フィクスチャを保存しました: {args.record_fixture}（{len(fixture_recorder)}件）")
+        if replay_server:
+            print(f"再生サーバー: {replay_server.request_count}件応答, 未記録のURL {replay_server.misses}件")
+            replay_server.shutdown()
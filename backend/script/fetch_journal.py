@@ -0,0 +1,254 @@
+"""
+fetch_all_pokemon.py の取得結果を1種族1レコードで追記するジャーナル（SQLite WALモード）
+
+機能:
+- 種族ごとのフォルムデータを追記（中間保存はトランザクション単位でアトミック）
+- 再開時は最後に確定した図鑑番号と失敗リストだけを読む（取得済みデータは読み込まない）
+- 技名・タイプ名・特性名キャッシュの差分追記（UPSERT）
+- 技ID（PokeAPI）と英語名の対応表（習得リストのビットセット化に使う）
+- 最終出力ファイルへの圧縮出力（図鑑番号順に並べ、一時ファイル経由で置き換え）
+- 旧形式の進捗ファイル・名前キャッシュJSONの取り込み
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_JOURNAL_FILE = 'pokemon_fetch_journal.sqlite3'
+NAME_CATEGORIES = ('moves', 'types', 'abilities')
+
+
+class FetchJournal:
+    """
+    取得結果と名前キャッシュを保持するジャーナル
+
+    record_species() で追記したレコードは commit() までまとめて1トランザクションになる。
+    名前キャッシュは upsert_name() で1件ずつ追記する（全体の書き直しはしない）。
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS species (
+                pokedex_number INTEGER PRIMARY KEY,
+                forms TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS failed (
+                pokedex_number INTEGER PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS names (
+                category TEXT NOT NULL,
+                english TEXT NOT NULL,
+                japanese TEXT NOT NULL,
+                PRIMARY KEY (category, english)
+            );
+            CREATE TABLE IF NOT EXISTS move_ids (
+                id INTEGER PRIMARY KEY,
+                english TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+        self._in_transaction = False
+
+    # -------------------------------------------------------------------------
+    # 種族レコード
+    # -------------------------------------------------------------------------
+
+    def _begin(self) -> None:
+        if not self._in_transaction:
+            self._conn.execute('BEGIN')
+            self._in_transaction = True
+
+    def record_species(self, pokedex_number: int, forms: List[Dict]) -> None:
+        """種族1件分のフォルムデータを追記する（commit() で確定）"""
+        payload = json.dumps(forms, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._begin()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO species (pokedex_number, forms) VALUES (?, ?)',
+                (pokedex_number, payload)
+            )
+            self._conn.execute('DELETE FROM failed WHERE pokedex_number = ?', (pokedex_number,))
+
+    def commit(self, last_id: Optional[int] = None,
+               failed_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        追記中のレコードと進捗（最後に確定した図鑑番号・失敗リスト）をまとめて確定する
+        """
+        with self._lock:
+            self._begin()
+            if last_id is not None:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                    ('last_pokedex_number', str(last_id))
+                )
+            if failed_ids is not None:
+                self._conn.execute('DELETE FROM failed')
+                self._conn.executemany('INSERT OR IGNORE INTO failed (pokedex_number) VALUES (?)',
+                                       [(i,) for i in failed_ids])
+            self._conn.execute('COMMIT')
+            self._in_transaction = False
+
+    def load_progress(self) -> Tuple[int, int, List[int]]:
+        """
+        再開に必要な情報だけを読む
+
+        Returns:
+            (取得済み種族数, 最後の図鑑番号, 失敗した図鑑番号リスト) のタプル
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'last_pokedex_number'"
+            ).fetchone()
+            count = self._conn.execute('SELECT COUNT(*) FROM species').fetchone()[0]
+            failed = [r[0] for r in self._conn.execute(
+                'SELECT pokedex_number FROM failed ORDER BY pokedex_number')]
+        return count, int(row[0]) if row else 0, failed
+
+    def reset_progress(self) -> None:
+        """取得済みレコードと進捗を消去する（名前キャッシュは残す）"""
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.execute('DELETE FROM species')
+            self._conn.execute('DELETE FROM failed')
+            self._conn.execute("DELETE FROM meta WHERE key = 'last_pokedex_number'")
+            self._conn.execute('COMMIT')
+            self._in_transaction = False
+
+    def iter_forms(self) -> Iterator[Dict]:
+        """全フォルムを図鑑番号順に1件ずつ返す"""
+        with self._lock:
+            rows = self._conn.execute('SELECT forms FROM species ORDER BY pokedex_number').fetchall()
+        for (forms,) in rows:
+            yield from json.loads(forms)
+
+    def compact(self, output_file: str, strip_keys: Iterable[str] = ()) -> int:
+        """
+        ジャーナルから最終出力ファイルを作る
+
+        図鑑番号・デフォルトフラグ順に並べ、一時ファイルに書いてから置き換えるので、
+        書き込み途中で中断しても既存の出力ファイルは壊れない。
+
+        Args:
+            output_file: 出力ファイルパス
+            strip_keys: 出力から除くキー（別ファイルに書き出す項目）
+
+        Returns:
+            出力したフォルム数
+        """
+        strip_keys = tuple(strip_keys)
+        sorted_data = sorted(self.iter_forms(), key=lambda x: (
+            x.get('pokedex_number', 0),
+            0 if x.get('is_default', True) else 1
+        ))
+        for form in sorted_data:
+            for key in strip_keys:
+                form.pop(key, None)
+        directory = os.path.dirname(output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = output_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(sorted_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, output_file)
+        return len(sorted_data)
+
+    # -------------------------------------------------------------------------
+    # 名前キャッシュ
+    # -------------------------------------------------------------------------
+
+    def load_names(self) -> Dict[str, Dict[str, str]]:
+        names: Dict[str, Dict[str, str]] = {c: {} for c in NAME_CATEGORIES}
+        with self._lock:
+            for category, english, japanese in self._conn.execute(
+                    'SELECT category, english, japanese FROM names'):
+                names.setdefault(category, {})[english] = japanese
+        return names
+
+    def upsert_name(self, category: str, english: str, japanese: str) -> None:
+        """名前キャッシュに1件追記する（種族の追記中ならその commit() で、そうでなければ即時に確定）"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO names (category, english, japanese) VALUES (?, ?, ?) '
+                'ON CONFLICT (category, english) DO UPDATE SET japanese = excluded.japanese',
+                (category, english, japanese)
+            )
+
+    def upsert_names(self, names: Dict[str, Dict[str, str]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO names (category, english, japanese) VALUES (?, ?, ?)',
+                [(c, en, ja) for c, entries in names.items() for en, ja in entries.items()]
+            )
+
+    def export_names(self, cache_file: str) -> None:
+        """名前キャッシュをJSONに書き出す（convert_types_to_english.py などが参照する）"""
+        tmp_file = cache_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.load_names(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+
+    # -------------------------------------------------------------------------
+    # 技IDテーブル
+    # -------------------------------------------------------------------------
+
+    def upsert_move_ids(self, move_ids: Dict[int, str]) -> None:
+        """技ID（PokeAPI）と英語名の対応を追記する"""
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO move_ids (id, english) VALUES (?, ?)',
+                list(move_ids.items())
+            )
+
+    def load_move_ids(self) -> Dict[int, str]:
+        with self._lock:
+            return dict(self._conn.execute('SELECT id, english FROM move_ids'))
+
+    # -------------------------------------------------------------------------
+    # 旧形式の取り込み
+    # -------------------------------------------------------------------------
+
+    def import_legacy(self, progress_file: str, cache_file: str) -> None:
+        """
+        旧形式の進捗ファイル・名前キャッシュJSONを取り込む
+
+        ジャーナルが空の場合のみ取り込み、取り込んだ進捗ファイルは .imported に改名する。
+        """
+        with self._lock:
+            has_names = self._conn.execute('SELECT 1 FROM names LIMIT 1').fetchone()
+            has_species = self._conn.execute('SELECT 1 FROM species LIMIT 1').fetchone()
+
+        if not has_names and os.path.exists(cache_file):
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                self.upsert_names(json.load(f))
+
+        if not has_species and os.path.exists(progress_file):
+            with open(progress_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            by_species: Dict[int, List[Dict]] = {}
+            for form in data.get('pokemon_data', []):
+                by_species.setdefault(form.get('pokedex_number', 0), []).append(form)
+            for pokedex_number, forms in by_species.items():
+                self.record_species(pokedex_number, forms)
+            self.commit(data.get('last_pokedex_number', 0), data.get('failed_pokedex_numbers', []))
+            os.replace(progress_file, progress_file + '.imported')
+            print(f"旧形式の進捗ファイルを取り込みました: {len(by_species)}種族")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._in_transaction:
+                self._conn.execute('COMMIT')
+                self._in_transaction = False
+            self._conn.close()
@@ -0,0 +1,246 @@
+"""
+fetch_all_pokemon.py の計測（テレメトリ）
+
+機能:
+- エンドポイント種別（species, pokemon, move, type, ability）ごとのリクエスト数・ステータス別件数
+- 応答時間のパーセンタイル（p50/p95/p99）
+- 再試行回数・転送バイト数・キャッシュから返した件数
+- 名前キャッシュのヒット/ミス件数
+- 種族・フォルムの処理件数とスループット（種族/秒）
+- JSONサマリーと Prometheus テキスト形式（node_exporter の textfile collector 用）への書き出し
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+# URLのパス要素 → エンドポイント種別
+ENDPOINT_CLASSES = {
+    'pokemon-species': 'species',
+    'pokemon': 'pokemon',
+    'move': 'move',
+    'type': 'type',
+    'ability': 'ability',
+}
+OTHER_ENDPOINT = 'other'
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = 'pokeapi_fetch'
+
+
+def endpoint_class(url: str) -> str:
+    """URLからエンドポイント種別を判定する（/api/v2/pokemon-species/1/ → species）"""
+    for segment in reversed(urlsplit(url).path.strip('/').split('/')):
+        if segment in ENDPOINT_CLASSES:
+            return ENDPOINT_CLASSES[segment]
+    return OTHER_ENDPOINT
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """ソート済みリストのパーセンタイル（最近傍順位法）"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(q * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def _write_atomic(path: str, text: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class Telemetry:
+    """
+    スレッドセーフな計測値の集計
+
+    http_get から record_request() / record_retry() / record_cache_served() を、
+    名前解決から record_name_cache()、種族の確定時に record_species() を呼ぶ。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self._start = time.monotonic()
+        self.requests: Dict[str, Dict[str, int]] = {}
+        self.latencies: Dict[str, List[float]] = {}
+        self.retries: Dict[str, int] = {}
+        self.bytes_downloaded: Dict[str, int] = {}
+        self.cache_served: Dict[str, int] = {}
+        self.name_cache: Dict[str, Dict[str, int]] = {}
+        self.species = 0
+        self.forms = 0
+        self.checkpoints = 0
+
+    # -------------------------------------------------------------------------
+    # 記録
+    # -------------------------------------------------------------------------
+
+    def record_request(self, url: str, seconds: float, status: Any, size: int = 0) -> None:
+        """HTTPリクエスト1回分（再試行の各回を含む）を記録する。通信エラーは status='error'"""
+        endpoint = endpoint_class(url)
+        with self._lock:
+            by_status = self.requests.setdefault(endpoint, {})
+            by_status[str(status)] = by_status.get(str(status), 0) + 1
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            self.bytes_downloaded[endpoint] = self.bytes_downloaded.get(endpoint, 0) + size
+
+    def record_retry(self, url: str) -> None:
+        endpoint = endpoint_class(url)
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def record_cache_served(self, url: str) -> None:
+        """応答キャッシュの本文を返した回数（304・オフライン）"""
+        endpoint = endpoint_class(url)
+        with self._lock:
+            self.cache_served[endpoint] = self.cache_served.get(endpoint, 0) + 1
+
+    def record_name_cache(self, category: str, hits: int, misses: int) -> None:
+        with self._lock:
+            counts = self.name_cache.setdefault(category, {'hits': 0, 'misses': 0})
+            counts['hits'] += hits
+            counts['misses'] += misses
+
+    def record_species(self, forms: int) -> None:
+        with self._lock:
+            self.species += 1
+            self.forms += forms
+
+    # -------------------------------------------------------------------------
+    # 集計・書き出し
+    # -------------------------------------------------------------------------
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    def summary(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """JSONサマリー用の辞書を作る（extra はそのまま "run" に加える）"""
+        with self._lock:
+            elapsed = self.elapsed
+            endpoints = {}
+            for endpoint in sorted(set(self.requests) | set(self.cache_served) | set(self.retries)):
+                samples = sorted(self.latencies.get(endpoint, []))
+                endpoints[endpoint] = {
+                    'requests': sum(self.requests.get(endpoint, {}).values()),
+                    'status': dict(sorted(self.requests.get(endpoint, {}).items())),
+                    'retries': self.retries.get(endpoint, 0),
+                    'bytes_downloaded': self.bytes_downloaded.get(endpoint, 0),
+                    'cache_served': self.cache_served.get(endpoint, 0),
+                    'latency_seconds': {
+                        **{f'p{int(q * 100)}': round(percentile(samples, q), 6) for q in QUANTILES},
+                        'mean': round(sum(samples) / len(samples), 6) if samples else 0.0,
+                        'max': round(samples[-1], 6) if samples else 0.0,
+                    },
+                }
+            name_cache = {c: dict(v) for c, v in sorted(self.name_cache.items())}
+            run = {
+                'started_at': self.started_at,
+                'elapsed_seconds': round(elapsed, 3),
+                'species': self.species,
+                'forms': self.forms,
+                'species_per_second': round(self.species / elapsed, 3) if elapsed > 0 else 0.0,
+                'checkpoints': self.checkpoints,
+            }
+        run.update(extra or {})
+        return {
+            'run': run,
+            'totals': {
+                'requests': sum(e['requests'] for e in endpoints.values()),
+                'retries': sum(e['retries'] for e in endpoints.values()),
+                'bytes_downloaded': sum(e['bytes_downloaded'] for e in endpoints.values()),
+                'cache_served': sum(e['cache_served'] for e in endpoints.values()),
+            },
+            'endpoints': endpoints,
+            'name_cache': name_cache,
+        }
+
+    def to_prometheus(self, extra: Optional[Dict[str, Any]] = None) -> str:
+        """Prometheus テキスト形式（exposition format）の文字列を作る"""
+        data = self.summary(extra)
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels.items())
+                suffix = f'{{{label_text}}}' if label_text else ''
+                lines.append(f'{METRIC_PREFIX}_{name}{suffix} {value}')
+
+        endpoints = data['endpoints']
+        metric('requests_total', 'counter', 'HTTP requests by endpoint class and status.', [
+            ({'endpoint': ep, 'status': status}, count)
+            for ep, e in endpoints.items() for status, count in e['status'].items()
+        ])
+        name = f'{METRIC_PREFIX}_request_duration_seconds'
+        lines.append(f'# HELP {name} HTTP request latency.')
+        lines.append(f'# TYPE {name} summary')
+        with self._lock:
+            for ep in endpoints:
+                samples = sorted(self.latencies.get(ep, []))
+                for q in QUANTILES:
+                    lines.append(f'{name}{{endpoint="{ep}",quantile="{q}"}} {percentile(samples, q)}')
+                lines.append(f'{name}_sum{{endpoint="{ep}"}} {sum(samples)}')
+                lines.append(f'{name}_count{{endpoint="{ep}"}} {len(samples)}')
+        metric('retries_total', 'counter', 'Retried HTTP requests (429/5xx/connection errors).', [
+            ({'endpoint': ep}, e['retries']) for ep, e in endpoints.items()
+        ])
+        metric('bytes_downloaded_total', 'counter', 'Response body bytes transferred.', [
+            ({'endpoint': ep}, e['bytes_downloaded']) for ep, e in endpoints.items()
+        ])
+        metric('cache_served_total', 'counter', 'Responses served from the HTTP cache (304 or offline).', [
+            ({'endpoint': ep}, e['cache_served']) for ep, e in endpoints.items()
+        ])
+        metric('name_cache_hits_total', 'counter', 'Name lookups answered from the name cache.', [
+            ({'category': c}, v['hits']) for c, v in data['name_cache'].items()
+        ])
+        metric('name_cache_misses_total', 'counter', 'Name lookups that needed an API request.', [
+            ({'category': c}, v['misses']) for c, v in data['name_cache'].items()
+        ])
+        run = data['run']
+        metric('species_total', 'counter', 'Species committed in this run.', [({}, run['species'])])
+        metric('forms_total', 'counter', 'Forms committed in this run.', [({}, run['forms'])])
+        metric('species_per_second', 'gauge', 'Species throughput in this run.', [({}, run['species_per_second'])])
+        metric('elapsed_seconds', 'gauge', 'Elapsed time of this run.', [({}, run['elapsed_seconds'])])
+        for key, value in run.items():
+            if key in ('species', 'forms', 'species_per_second', 'elapsed_seconds', 'started_at'):
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metric(key, 'gauge', f'{key} at export time.', [({}, value)])
+        return '\n'.join(lines) + '\n'
+
+    def export(self, json_file: Optional[str], prom_file: Optional[str],
+               extra: Optional[Dict[str, Any]] = None) -> None:
+        """JSONサマリーと Prometheus テキストを一時ファイル経由で書き出す（None の出力先は省略）"""
+        if json_file:
+            _write_atomic(json_file, json.dumps(self.summary(extra), ensure_ascii=False, indent=2) + '\n')
+        if prom_file:
+            _write_atomic(prom_file, self.to_prometheus(extra))
+
+    def format_summary(self) -> str:
+        """実行終了時に表示するエンドポイント別の要約"""
+        data = self.summary()
+        lines = [f"計測: {data['run']['species']}種族 / {data['run']['elapsed_seconds']:.1f}秒 "
+                 f"（{data['run']['species_per_second']:.2f}種族/秒）, "
+                 f"リクエスト {data['totals']['requests']}件, 再試行 {data['totals']['retries']}件, "
+                 f"転送 {data['totals']['bytes_downloaded'] / 1024 ** 2:.1f}MB"]
+        for endpoint, e in data['endpoints'].items():
+            latency = e['latency_seconds']
+            lines.append(f"  {endpoint:<8} {e['requests']:>6}件  p50 {latency['p50'] * 1000:7.1f}ms  "
+                         f"p95 {latency['p95'] * 1000:7.1f}ms  p99 {latency['p99'] * 1000:7.1f}ms  "
+                         f"再試行 {e['retries']}件")
+        for category, counts in data['name_cache'].items():
+            total = counts['hits'] + counts['misses']
+            rate = counts['hits'] / total if total else 0.0
+            lines.append(f"  名前キャッシュ {category}: ヒット {counts['hits']}件 / ミス {counts['misses']}件"
+                         f"（{rate:.1%}）")
+        return '\n'.join(lines)
@@ -0,0 +1,257 @@
+"""
+PokeAPI応答のディスクキャッシュ（コンテンツアドレス方式・サイズ上限付きLRU）
+
+機能:
+- URLをキーに応答本文を保存（本文はSHA-256で格納し、同一内容は1つにまとめる）
+- ETag / Last-Modified を保持し、If-None-Match / If-Modified-Since で再検証する
+- 合計サイズが上限を超えたら最終アクセスの古い順に削除する
+- ヒット率・節約できた転送量の集計
+- 解析済みのJSONを件数上限付きLRUでメモリに保持し、同じ本文の再検証・オフライン読み込みでは解析し直さない
+
+構成:
+    <cache_dir>/index.sqlite3          URL → 本文ハッシュ・検証子・最終アクセス時刻
+    <cache_dir>/objects/ab/abcdef...   本文（ハッシュ名のファイル）
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+DEFAULT_CACHE_DIR = 'pokeapi_http_cache'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2GB
+DEFAULT_PARSED_ENTRIES = 1024     # メモリに保持する解析済みJSONの件数
+
+
+class CacheEntry(NamedTuple):
+    """キャッシュ済み応答の情報"""
+    url: str
+    sha256: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    size: int
+    body: Optional[bytes] = None   # lookup() 時に読んだ本文（その後に削除されても load() で使える。解析済みなら None）
+
+
+class ResponseCache:
+    """
+    スレッドセーフなHTTP応答キャッシュ
+
+    lookup() で取得したエントリから conditional_headers() を作ってリクエストし、
+    200なら store()、304なら load() で本文を取り出す。
+    本文は lookup() の時点で読んでおくので、リクエスト中に他のスレッドの store() で追い出されても load() できる。
+    解析済みのJSON（URL・本文ハッシュごと、parsed_entries 件まで）は本文を読まずにそのまま返す。
+    返すオブジェクトは呼び出し間で共有されるので、呼び出し側で変更しないこと。
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 parsed_entries: int = DEFAULT_PARSED_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.parsed_entries = parsed_entries
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._parsed: 'OrderedDict[Tuple[str, str], Any]' = OrderedDict()  # (URL, 本文ハッシュ) → JSON
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite3'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT sha256, size FROM entries)'
+        ).fetchone()[0]
+
+        # 統計（1回の実行分）
+        self.hits = 0            # 本文を転送せずに済んだ回数（304またはオフライン）
+        self.misses = 0          # 本文をダウンロードした回数
+        self.bytes_saved = 0     # 転送せずに済んだ本文のバイト数
+        self.bytes_downloaded = 0
+
+    # -------------------------------------------------------------------------
+    # 参照
+    # -------------------------------------------------------------------------
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """
+        URLのキャッシュエントリを本文付きで返す（本文ファイルが欠けていればエントリを削除して None）
+
+        解析済みのJSONがメモリにあれば本文は読まない（body は None）。
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, sha256, etag, last_modified, size FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+            if row is not None and (row[0], row[1]) in self._parsed:
+                return CacheEntry(*row)
+        if row is None:
+            return None
+        entry = CacheEntry(*row)
+        body = self._read_object(entry)
+        return None if body is None else entry._replace(body=body)
+
+    def _read_object(self, entry: CacheEntry) -> Optional[bytes]:
+        """本文ファイルを読む（追い出されて無ければエントリを削除して None）"""
+        try:
+            with open(self._object_path(entry.sha256), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            self._forget(entry)
+            return None
+
+    def _forget(self, entry: CacheEntry) -> None:
+        """本文ファイルが無くなったエントリを削除する（別の本文で保存し直されていればそのまま）"""
+        with self._lock:
+            deleted = self._conn.execute('DELETE FROM entries WHERE url = ? AND sha256 = ?',
+                                         (entry.url, entry.sha256)).rowcount
+            if deleted and not self._conn.execute('SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1',
+                                                  (entry.sha256,)).fetchone():
+                self._total_bytes -= entry.size
+            self._conn.commit()
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """再検証用のリクエストヘッダーを作る"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def load(self, entry: CacheEntry) -> Optional[Any]:
+        """
+        キャッシュ済み本文をJSONとして返し、ヒットとして記録する（304・オフライン時）
+
+        解析済みのJSONがあればそれを、無ければ lookup() で読んだ本文を解析して返す。
+        どちらも無く本文ファイルも無ければ None（キャッシュミス）。
+        """
+        key = (entry.url, entry.sha256)
+        with self._lock:
+            data = self._parsed.get(key)
+            if data is not None:
+                self._parsed.move_to_end(key)
+        if data is None:
+            body = entry.body if entry.body is not None else self._read_object(entry)
+            if body is None:
+                return None
+            data = json.loads(body)
+        with self._lock:
+            self._remember(key, data)
+            self._conn.execute('UPDATE entries SET last_access = ? WHERE url = ?',
+                               (time.time(), entry.url))
+            self._conn.commit()
+            self.hits += 1
+            self.bytes_saved += entry.size
+        return data
+
+    def _remember(self, key: Tuple[str, str], data: Any) -> None:
+        """解析済みのJSONを保持する（ロック保持中に呼ぶ。上限を超えたら最も古く使ったものを捨てる）"""
+        if self.parsed_entries <= 0:
+            return
+        self._parsed[key] = data
+        self._parsed.move_to_end(key)
+        while len(self._parsed) > self.parsed_entries:
+            self._parsed.popitem(last=False)
+
+    # -------------------------------------------------------------------------
+    # 保存・削除
+    # -------------------------------------------------------------------------
+
+    def store(self, url: str, body: bytes, etag: Optional[str] = None,
+              last_modified: Optional[str] = None, data: Any = None) -> None:
+        """ダウンロードした本文を保存し、ミスとして記録する（data は解析済みのJSON。あれば保持する）"""
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            if data is not None:
+                self._remember((url, sha256), data)
+            self.misses += 1
+            self.bytes_downloaded += len(body)
+            previous = self._conn.execute(
+                'SELECT sha256 FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+            is_new_object = self._conn.execute(
+                'SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1', (sha256,)
+            ).fetchone() is None
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (url, sha256, etag, last_modified, size, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, sha256, etag, last_modified, len(body), time.time())
+            )
+            if is_new_object:
+                self._total_bytes += len(body)
+            if previous and previous[0] != sha256:
+                self._release_object(previous[0])
+            self._evict()
+            self._conn.commit()
+
+    def _release_object(self, sha256: str) -> None:
+        """どのURLからも参照されなくなった本文ファイルを削除する（ロック保持中に呼ぶ）"""
+        if self._conn.execute('SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1', (sha256,)).fetchone():
+            return
+        path = self._object_path(sha256)
+        try:
+            self._total_bytes -= os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """合計サイズが上限を超えている間、最終アクセスの古いエントリから削除する"""
+        while self._total_bytes > self.max_bytes:
+            row = self._conn.execute(
+                'SELECT url, sha256 FROM entries ORDER BY last_access LIMIT 1'
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute('DELETE FROM entries WHERE url = ?', (row[0],))
+            self._release_object(row[1])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    # -------------------------------------------------------------------------
+    # 統計
+    # -------------------------------------------------------------------------
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def format_stats(self) -> str:
+        """実行終了時に表示する統計文字列"""
+        return (f"HTTPキャッシュ: ヒット {self.hits}件 / ミス {self.misses}件 "
+                f"（ヒット率 {self.hit_rate:.1%}）, "
+                f"節約 {self.bytes_saved / 1024 ** 2:.1f}MB, "
+                f"ダウンロード {self.bytes_downloaded / 1024 ** 2:.1f}MB, "
+                f"キャッシュサイズ {self._total_bytes / 1024 ** 2:.1f}MB")
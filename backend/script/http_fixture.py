@@ -0,0 +1,232 @@
+"""
+PokeAPI応答の記録・再生（オフラインで決定的に取得処理を計測するためのフィクスチャ）
+
+機能:
+- 記録: fetch_all_pokemon.py が受け取った応答（200/404）を URL ごとに1件、gzip圧縮のJSONLに保存
+- 再生: 記録した応答をプロセス内のローカルHTTPサーバーから返す
+  （本文中のAPIのURLは再生サーバーのURLに書き換える）
+- 再生時の遅延・429/503 の注入（pokeapi_stub_server と同じ方式、乱数はシードで再現可能）
+- ETag による再検証（If-None-Match が一致すれば304）
+
+フィクスチャ形式（.jsonl.gz、1行1JSON）:
+    1行目: {"fixture_version": 1, "base_url": "https://pokeapi.co/api/v2", "recorded_at": ...}
+    2行目以降: {"key": "/pokemon/6", "status": 200, "etag": ..., "last_modified": ..., "body": "..."}
+
+使用方法:
+    python fetch_all_pokemon.py --no-resume --no-http-cache --record-fixture pokeapi_fixture.jsonl.gz
+    python fetch_all_pokemon.py --no-resume --replay-fixture pokeapi_fixture.jsonl.gz --replay-latency-ms 50
+    python http_fixture.py pokeapi_fixture.jsonl.gz --port 8765   # 再生サーバーだけを起動
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from pokeapi_stub_server import StubServer, StubRequestHandler, DEFAULT_PORT
+
+FIXTURE_VERSION = 1
+RECORDED_STATUS = (200, 404)  # 再試行で回復する 429/5xx は記録しない
+
+
+def fixture_key(url: str, base_url: str) -> str:
+    """
+    URLをベースURLからの相対パスに正規化する（末尾スラッシュ・クエリの順序の違いを吸収）
+
+    例: https://pokeapi.co/api/v2/move?offset=0&limit=200 → /move?limit=200&offset=0
+    """
+    base_path = urlsplit(base_url).path.rstrip('/')
+    parts = urlsplit(url)
+    path = parts.path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    path = '/' + path.strip('/')
+    if parts.query:
+        path += '?' + urlencode(sorted(parse_qsl(parts.query)))
+    return path
+
+
+def fixture_sha256(path: str) -> str:
+    """フィクスチャファイルのハッシュ（ベンチマーク結果の比較時に同じ入力かを確認する）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# =============================================================================
+# 記録
+# =============================================================================
+
+class FixtureRecorder:
+    """
+    取得した応答をフィクスチャに追記する（スレッドセーフ、同じURLは最初の1件のみ）
+
+    書き込みは一時ファイルに行い、close() で置き換える。
+    """
+
+    def __init__(self, path: str, base_url: str):
+        self.path = path
+        self.base_url = base_url.rstrip('/')
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._tmp_path = path + '.tmp'
+        self._file = gzip.open(self._tmp_path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._keys = set()
+        self._write({"fixture_version": FIXTURE_VERSION, "base_url": self.base_url,
+                     "recorded_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())})
+
+    def _write(self, record: Dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def record(self, url: str, status: int, body: bytes,
+               etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        if status not in RECORDED_STATUS:
+            return
+        key = fixture_key(url, self.base_url)
+        with self._lock:
+            if key in self._keys or self._file is None:
+                return
+            self._keys.add(key)
+            self._write({"key": key, "status": status, "etag": etag,
+                         "last_modified": last_modified, "body": body.decode('utf-8')})
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.path)
+
+
+# =============================================================================
+# 再生
+# =============================================================================
+
+class FixtureEntry(NamedTuple):
+    status: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: bytes
+
+
+def load_fixture(path: str) -> Tuple[str, Dict[str, Dict]]:
+    """
+    フィクスチャを読み込む
+
+    Returns:
+        (記録時のベースURL, {key: 記録レコード}) のタプル
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('fixture_version') != FIXTURE_VERSION:
+            raise ValueError(f"未対応のフィクスチャ形式です: {header.get('fixture_version')}")
+        records = {}
+        for line in f:
+            record = json.loads(line)
+            records[record['key']] = record
+    return header['base_url'], records
+
+
+class ReplayRequestHandler(StubRequestHandler):
+    """フィクスチャの応答を返すリクエストハンドラ（遅延・エラー注入はスタブと共通）"""
+
+    def do_GET(self):
+        server: 'ReplayServer' = self.server
+        if server.latency_s > 0:
+            time.sleep(server.latency_s)
+
+        error_status = server.pick_error_status()
+        if error_status is not None:
+            self.send_injected_error(error_status)
+            return
+
+        entry = server.entries.get(fixture_key(self.path, server.base_url))
+        if entry is None:
+            with server.stats_lock:
+                server.misses += 1
+            self.send_json(404, {"detail": "Not found."})
+            return
+
+        status, body = entry.status, entry.body
+        headers = {'Content-Type': 'application/json; charset=utf-8'}
+        if status == 200:
+            headers['ETag'] = entry.etag
+            if entry.last_modified:
+                headers['Last-Modified'] = entry.last_modified
+            if self.headers.get('If-None-Match') == entry.etag:
+                status, body = 304, b''
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with server.stats_lock:
+            server.request_count += 1
+
+
+class ReplayServer(StubServer):
+    """フィクスチャ再生サーバー（entries に本文のURLを書き換えた応答を保持する）"""
+
+    def __init__(self, address: Tuple[str, int], fixture_path: str, latency_ms: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        super().__init__(address, species_count=0, latency_ms=latency_ms,
+                         error_rate=error_rate, seed=seed, handler_class=ReplayRequestHandler)
+        self.fixture_path = fixture_path
+        self.recorded_base_url, records = load_fixture(fixture_path)
+        self.misses = 0
+        self.entries: Dict[str, FixtureEntry] = {}
+        for key, record in records.items():
+            body = record['body'].replace(self.recorded_base_url, self.base_url).encode('utf-8')
+            etag = record.get('etag') or f'"{hashlib.sha1(body).hexdigest()}"'
+            self.entries[key] = FixtureEntry(record['status'], etag, record.get('last_modified'), body)
+
+
+def start_replay_server(fixture_path: str, port: int = 0, latency_ms: float = 0.0,
+                        error_rate: float = 0.0, seed: int = 0) -> ReplayServer:
+    """
+    フィクスチャ再生サーバーをバックグラウンドスレッドで起動する
+
+    Returns:
+        起動済みのサーバー（base_url 属性にAPIのベースURL、終了は shutdown()）
+    """
+    server = ReplayServer(('127.0.0.1', port), fixture_path, latency_ms, error_rate, seed)
+    thread = threading.Thread(target=server.serve_forever, name='pokeapi-replay', daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='記録したPokeAPI応答をローカルHTTPサーバーで再生します')
+    parser.add_argument('fixture', type=str, help='フィクスチャファイル（.jsonl.gz）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'待ち受けポート（デフォルト: {DEFAULT_PORT}）')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='応答ごとの遅延ミリ秒（デフォルト: 0）')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='429/503 を返す割合 0〜1（デフォルト: 0）')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='エラー注入の乱数シード（デフォルト: 0）')
+    args = parser.parse_args()
+
+    server = ReplayServer(('127.0.0.1', args.port), args.fixture, args.latency_ms,
+                          args.error_rate, args.seed)
+    print(f"再生サーバーを起動しました: {server.base_url}（{len(server.entries)}件, "
+          f"記録元 {server.recorded_base_url}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n停止しました。")
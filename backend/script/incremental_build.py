@@ -0,0 +1,279 @@
+"""
+データビルドの差分処理（レコードごとの内容ハッシュ・ビルド状態・差分パッチ）
+
+- フォルム・技の各レコードについて、キー順に依存しない内容ハッシュを計算する
+- 前回のビルド結果（出力レコードのハッシュとステージごとの結果）をビルド状態ファイルに保存し、
+  次回は内容が変わったレコードだけをステージに通す（data_pipeline.py が使う）
+- 2つのデータセット間の差分を、変更・追加されたレコードと削除されたキーだけのパッチにする
+
+フォルムのキーは pokedex_name（同名が複数ある場合は2件目以降に "#2", "#3" を付ける）。
+
+パッチ形式（JSON）:
+    {
+      "version": 1,
+      "from": "<旧データセットのハッシュ>", "to": "<新データセットのハッシュ>",
+      "forms": {"upsert": {"<キー>": {...}}, "remove": ["<キー>", ...], "order": [...]},
+      "moves": {"upsert": {"<技名>": {...}}, "remove": ["<技名>", ...]}
+    }
+    order は並び順が「旧データから削除を除き、追加を末尾に足した順」と異なる場合だけ含める。
+
+使用方法:
+    python incremental_build.py --diff old.json new.json --output patch.json
+    python incremental_build.py --apply patch.json --input old.json --output new.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# プロジェクトルート（backend/script の2階層上）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STATE_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'pipeline_state.json')
+PATCH_DIR = os.path.join(BASE_DIR, 'backend', 'data', 'patches')
+
+STATE_VERSION = 1
+PATCH_VERSION = 1
+HASH_LENGTH = 16  # 16進16桁（64ビット）
+
+
+def record_hash(record) -> str:
+    """レコードの内容ハッシュ（キー順・インデントに依存しない）"""
+    canonical = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+
+def record_keys(forms: List[Dict]) -> List[str]:
+    """フォルムのキー（pokedex_name、同名の2件目以降は #2, #3 …）"""
+    counts: Dict[str, int] = {}
+    keys = []
+    for form in forms:
+        name = form.get('pokedex_name', 'Unknown')
+        counts[name] = counts.get(name, 0) + 1
+        keys.append(name if counts[name] == 1 else f"{name}#{counts[name]}")
+    return keys
+
+
+def dataset_hash(entries: Iterable[Tuple[str, str]]) -> str:
+    """(キー, レコードハッシュ) の並びからデータセット全体のハッシュを作る"""
+    digest = hashlib.sha256()
+    for key, value in entries:
+        digest.update(f"{key}\t{value}\n".encode('utf-8'))
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def save_json_atomic(path: str, data, indent: Optional[int] = None) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        if indent is None:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_file, path)
+
+
+# =============================================================================
+# ビルド状態
+# =============================================================================
+
+class BuildState:
+    """
+    前回のビルド結果
+
+    forms: {キー: 出力レコードのハッシュ}（並びはデータセットの順）
+    moves: {技名: 技データのハッシュ}
+    fingerprints: {ステージ名: ステージ設定のハッシュ}
+    results: {ステージ名: {キー: レコードごとの結果}}（結果が空のレコードは省略）
+    """
+
+    def __init__(self, forms: Optional[Dict[str, str]] = None, moves: Optional[Dict[str, str]] = None,
+                 fingerprints: Optional[Dict[str, str]] = None,
+                 results: Optional[Dict[str, Dict[str, object]]] = None):
+        self.forms = forms or {}
+        self.moves = moves or {}
+        self.fingerprints = fingerprints or {}
+        self.results = results or {}
+
+    @classmethod
+    def load(cls, path: str) -> 'BuildState':
+        """状態ファイルを読み込む（無い・壊れている・形式が違う場合は空の状態）"""
+        if not path or not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return cls()
+        if data.get('version') != STATE_VERSION:
+            return cls()
+        return cls(data.get('forms'), data.get('moves'), data.get('fingerprints'), data.get('results'))
+
+    def save(self, path: str) -> None:
+        save_json_atomic(path, {
+            'version': STATE_VERSION,
+            'dataset': self.dataset_hash,
+            'forms': self.forms,
+            'moves': self.moves,
+            'fingerprints': self.fingerprints,
+            'results': self.results,
+        })
+
+    @property
+    def empty(self) -> bool:
+        return not self.forms
+
+    @property
+    def dataset_hash(self) -> str:
+        return dataset_hash(self.forms.items())
+
+    def changed_moves(self, move_hashes: Dict[str, str]) -> set:
+        """前回から内容が変わった・追加・削除された技名"""
+        names = set(self.moves) | set(move_hashes)
+        return {name for name in names if self.moves.get(name) != move_hashes.get(name)}
+
+
+# =============================================================================
+# パッチ
+# =============================================================================
+
+def make_patch(old_forms: Dict[str, str], new_keys: List[str], new_hashes: List[str],
+               new_forms: List[Dict], old_moves: Dict[str, str], new_move_hashes: Dict[str, str],
+               new_moves: Dict[str, Dict]) -> Dict:
+    """
+    旧データセット（キー → ハッシュ）から新データセットへのパッチを作る
+
+    旧データの本体は不要（変更・追加されたレコードは新データから、削除はキーだけを持つ）。
+    """
+    new_key_set = set(new_keys)
+    upsert = {key: form for key, value, form in zip(new_keys, new_hashes, new_forms)
+              if old_forms.get(key) != value}
+    remove = [key for key in old_forms if key not in new_key_set]
+    expected_order = [key for key in old_forms if key in new_key_set]
+    expected_order += [key for key in new_keys if key not in old_forms]
+
+    forms_patch = {'upsert': upsert, 'remove': remove}
+    if expected_order != new_keys:
+        forms_patch['order'] = new_keys
+
+    return {
+        'version': PATCH_VERSION,
+        'from': dataset_hash(old_forms.items()),
+        'to': dataset_hash(zip(new_keys, new_hashes)),
+        'forms': forms_patch,
+        'moves': {
+            'upsert': {name: new_moves[name] for name, value in new_move_hashes.items()
+                       if old_moves.get(name) != value},
+            'remove': [name for name in old_moves if name not in new_move_hashes],
+        },
+    }
+
+
+def patch_is_empty(patch: Dict) -> bool:
+    return not (patch['forms']['upsert'] or patch['forms']['remove'] or 'order' in patch['forms']
+                or patch['moves']['upsert'] or patch['moves']['remove'])
+
+
+def diff_datasets(old_forms: List[Dict], new_forms: List[Dict],
+                  old_moves: Optional[Dict[str, Dict]] = None,
+                  new_moves: Optional[Dict[str, Dict]] = None) -> Dict:
+    """2つのデータセット（本体）の差分パッチを作る"""
+    old_keys = record_keys(old_forms)
+    new_keys = record_keys(new_forms)
+    old_moves = old_moves or {}
+    new_moves = new_moves or {}
+    return make_patch(
+        dict(zip(old_keys, (record_hash(form) for form in old_forms))),
+        new_keys, [record_hash(form) for form in new_forms], new_forms,
+        {name: record_hash(move) for name, move in old_moves.items()},
+        {name: record_hash(move) for name, move in new_moves.items()}, new_moves)
+
+
+def apply_patch(old_forms: List[Dict], patch: Dict,
+                old_moves: Optional[Dict[str, Dict]] = None) -> Tuple[List[Dict], Dict[str, Dict]]:
+    """
+    パッチを適用して新データセットを作る
+
+    Raises:
+        ValueError: パッチの元データセットが一致しない、または適用結果のハッシュが一致しない
+    """
+    if patch.get('version') != PATCH_VERSION:
+        raise ValueError(f"未対応のパッチ形式です: {patch.get('version')}")
+    old_keys = record_keys(old_forms)
+    if dataset_hash(zip(old_keys, (record_hash(form) for form in old_forms))) != patch['from']:
+        raise ValueError("パッチの元データセットと入力データが一致しません")
+
+    forms_patch = patch['forms']
+    by_key = dict(zip(old_keys, old_forms))
+    for key in forms_patch['remove']:
+        by_key.pop(key, None)
+    by_key.update(forms_patch['upsert'])
+    order = forms_patch.get('order')
+    if order is None:
+        old_key_set = set(old_keys)
+        order = [key for key in old_keys if key in by_key]
+        order += [key for key in forms_patch['upsert'] if key not in old_key_set]
+    new_forms = [by_key[key] for key in order]
+
+    if dataset_hash(zip(record_keys(new_forms), (record_hash(form) for form in new_forms))) != patch['to']:
+        raise ValueError("パッチ適用後のデータセットがパッチの想定と一致しません")
+
+    new_moves = dict(old_moves or {})
+    for name in patch['moves']['remove']:
+        new_moves.pop(name, None)
+    new_moves.update(patch['moves']['upsert'])
+    return new_forms, new_moves
+
+
+def patch_file_name(patch: Dict) -> str:
+    return f"pokemon_data_{patch['from']}_{patch['to']}.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='データセット間の差分パッチを作成・適用します')
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'), default=None,
+                        help='2つの pokemon_data_all.json の差分パッチを作る')
+    parser.add_argument('--apply', type=str, default=None, metavar='PATCH',
+                        help='パッチを --input に適用して --output に書き出す')
+    parser.add_argument('--input', type=str, default=None, help='パッチを適用する元データ')
+    parser.add_argument('--output', type=str, required=True, help='出力ファイル')
+    args = parser.parse_args()
+
+    if args.diff:
+        old_file, new_file = args.diff
+        with open(old_file, 'r', encoding='utf-8') as f:
+            old_forms = json.load(f)
+        with open(new_file, 'r', encoding='utf-8') as f:
+            new_forms = json.load(f)
+        patch = diff_datasets(old_forms, new_forms)
+        save_json_atomic(args.output, patch)
+        print(f"{args.output} に保存しました（変更・追加 {len(patch['forms']['upsert'])}件, "
+              f"削除 {len(patch['forms']['remove'])}件, {os.path.getsize(args.output):,} バイト）")
+        return 0
+
+    if args.apply:
+        if not args.input:
+            print("エラー: --apply には --input が必要です")
+            return 1
+        with open(args.apply, 'r', encoding='utf-8') as f:
+            patch = json.load(f)
+        with open(args.input, 'r', encoding='utf-8') as f:
+            old_forms = json.load(f)
+        try:
+            new_forms, _ = apply_patch(old_forms, patch)
+        except ValueError as e:
+            print(f"エラー: {str(e)}")
+            return 1
+        save_json_atomic(args.output, new_forms, indent=2)
+        print(f"{args.output} に保存しました（{len(new_forms)}件）")
+        return 0
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
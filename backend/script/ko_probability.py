@@ -0,0 +1,407 @@
+"""
+何発で倒せるか（確定数）と、その確率を正確に求める
+
+damage.js（calculateDamage）は1発分の乱数16段階のダメージを返すだけで、main.js は選んだ1つの乱数を
+HPから引いてから、きのみ（checkBerryRecovery）の発動を調べている。このモジュールは防御側の「受けたダメージ」
+の確率分布を持ち、1発ごとに乱数16段階の分布を np.convolve で畳み込んで、N ターン後までに倒れている確率を求める。
+16^N 通りを数え上げないので、ターン数・攻撃回数が増えても計算量は HP × ダメージの幅 × 回数 で済む。
+
+扱うもの:
+    連続技      moves_data.json の multi_hit（2〜5回は 35% / 35% / 15% / 15%、それ以外は回数ごとに等確率）。
+                1発ごとに乱数を引き直し、途中で倒れたらそこまで
+    きのみ      items_data.json の type "berry"（オボンののみ・回復実）。ダメージを受けるたびに
+                main.js と同じく 残りHP / 最大HP <= threshold なら floor(最大HP × value) 回復して消費
+    持ち物      type "passive"（たべのこし など）。ターンの終わりに floor(最大HP × value) 回復
+    防御側の技  healing_percent（じこさいせい など。負ならHPが減る）と drain_percent（吸収技で回復・反動技で
+                ダメージ。量は防御側の技のダメージ（乱数16段階）から求める）。攻撃側の残りHPによる上限は考えない
+
+確率は乱数1/16・回数の分布・回復の有無の組み合わせなので、float64 で誤差なく（連続技の 35% などを除いて）求まる。
+同じ条件の問い合わせは結果をキャッシュする。
+
+使用方法:
+    ko = ko_probabilities(rolls, max_hp=207, turns=3, berry=(0.5, 0.25))
+    ko[1]                      # 2ターン目までに倒れている確率（"2発で x%"）
+    ko_label(ko)               # "乱数2発（43.8%）"
+
+    python ko_probability.py ガブリアス ディンルー じしん
+    python ko_probability.py ガブリアス ディンルー げきりん --turns 4 --defender-move じこさいせい
+    python ko_probability.py --bench
+"""
+
+import argparse
+import json
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from damage_engine import DamageEngine
+from matchup_matrix import DEFAULT_MOVES, build_roster, build_set
+from pokedata import PokeData
+from season_store import resolve_entry
+
+DEFAULT_TURNS = 4
+# 2〜5回の連続技の回数の確率（2回・3回・4回・5回）
+MULTI_HIT_RATES = {
+    (2, 5): (0.35, 0.35, 0.15, 0.15),
+}
+# 使用率データの持ち物名 → items_data.json の名前（混乱実は items_data.json では「回復実」にまとめてある）
+ITEM_ALIASES = {
+    'オボンのみ': 'オボンののみ',
+    'フィラのみ': '回復実',
+    'ウイのみ': '回復実',
+    'マゴのみ': '回復実',
+    'バンジのみ': '回復実',
+    'イアのみ': '回復実',
+}
+CACHE_SIZE = 65536
+BENCH_QUERIES = 20000
+
+
+# =============================================================================
+# 分布
+# =============================================================================
+
+def roll_distribution(rolls: Sequence[int]) -> 'np.ndarray':
+    """乱数16段階のダメージ → ダメージごとの確率（添字がダメージ）"""
+    rolls = np.asarray(rolls, dtype=np.int64)
+    return np.bincount(rolls) / len(rolls)
+
+
+def hit_count_distribution(move: Optional[Dict]) -> Dict[int, float]:
+    """技の攻撃回数 → 確率（連続技でなければ {1: 1.0}）"""
+    multi_hit = (move or {}).get('multi_hit') or {}
+    if not multi_hit.get('is_multi'):
+        return {1: 1.0}
+    low, high = multi_hit['min_count'], multi_hit['max_count']
+    rates = MULTI_HIT_RATES.get((low, high))
+    if rates is None:
+        rates = (1 / (high - low + 1),) * (high - low + 1)
+    return dict(zip(range(low, high + 1), rates))
+
+
+def self_effect_distribution(move: Optional[Dict], max_hp: int,
+                             dealt_rolls: Optional[Sequence[int]] = None) -> Tuple[Tuple[int, float], ...]:
+    """
+    防御側の技による、防御側自身のHPの変化（正: ダメージ、負: 回復）→ 確率
+
+    Args:
+        move: 防御側の技（healing_percent・drain_percent）
+        dealt_rolls: その技で攻撃側に与えるダメージ（乱数16段階。吸収・反動の量に使う）
+    """
+    if not move:
+        return ()
+    changes = np.zeros(1, dtype=np.int64)
+    healing = move.get('healing_percent') or 0
+    if healing:
+        changes = changes - (max_hp * healing // 100)
+    drain = move.get('drain_percent') or 0
+    if drain and dealt_rolls is not None:
+        dealt = np.asarray(dealt_rolls, dtype=np.int64)
+        # 与えたダメージの drain_percent %（与えたダメージが1以上なら最低1）
+        amount = np.where(dealt > 0, np.maximum(dealt * abs(drain) // 100, 1), 0)
+        changes = changes + (-amount if drain > 0 else amount)
+    values, counts = np.unique(changes, return_counts=True)
+    if len(values) == 1 and values[0] == 0:
+        return ()
+    return tuple((int(value), count / len(changes)) for value, count in zip(values, counts))
+
+
+# =============================================================================
+# 受けたダメージの分布の更新
+# =============================================================================
+# state は [きのみあり, きのみなし（消費済み・持っていない）] × [受けたダメージ 0〜最大HP-1, 瀕死] の確率。
+# きのみを持っていなければ1行だけ
+
+def _damage(state: 'np.ndarray', pmf: 'np.ndarray', max_hp: int) -> 'np.ndarray':
+    """全ての行にダメージの分布 pmf を畳み込む（最大HP以上は瀕死へ）"""
+    result = np.empty_like(state)
+    for row, out in zip(state, result):
+        spread = np.convolve(row[:max_hp], pmf)
+        out[:max_hp] = spread[:max_hp]
+        out[max_hp] = row[max_hp] + spread[max_hp:].sum()
+    return result
+
+
+def _heal(state: 'np.ndarray', amount: int, max_hp: int) -> 'np.ndarray':
+    """瀕死でなければ amount 回復（受けたダメージは0未満にならない）"""
+    if amount <= 0:
+        return state
+    result = np.zeros_like(state)
+    amount = min(amount, max_hp - 1)
+    result[:, 0] = state[:, :amount + 1].sum(axis=1)
+    result[:, 1:max_hp - amount] = state[:, amount + 1:max_hp]
+    result[:, max_hp] = state[:, max_hp]
+    return result
+
+
+def _change(state: 'np.ndarray', changes: Tuple[Tuple[int, float], ...], max_hp: int) -> 'np.ndarray':
+    """HPの変化の分布を適用する（正: ダメージ、負: 回復）"""
+    result = np.zeros_like(state)
+    for value, probability in changes:
+        if value > 0:
+            pmf = np.zeros(value + 1)
+            pmf[value] = 1.0
+            result += probability * _damage(state, pmf, max_hp)
+        else:
+            result += probability * _heal(state, -value, max_hp)
+    return result
+
+
+def _berry(state: 'np.ndarray', trigger: int, amount: int, max_hp: int) -> 'np.ndarray':
+    """きのみありの行で、受けたダメージが trigger 以上（瀕死を除く）なら回復してきのみなしの行へ"""
+    if len(state) == 1 or trigger >= max_hp:
+        return state
+    triggered = np.zeros_like(state)
+    triggered[1, trigger:max_hp] = state[0, trigger:max_hp]
+    state = state.copy()
+    state[0, trigger:max_hp] = 0.0
+    return state + _heal(triggered, amount, max_hp)
+
+
+def _attack(state: 'np.ndarray', pmf: 'np.ndarray', hit_counts: Tuple[Tuple[int, float], ...],
+            berry: Optional[Tuple[int, int]], max_hp: int) -> 'np.ndarray':
+    """攻撃1回分（連続技なら回数の分布どおりに、1発ごとにダメージときのみを適用する）"""
+    # remaining[j]: j 発目が出る確率
+    remaining = {count: sum(p for c, p in hit_counts if c >= count) for count in range(1, hit_counts[-1][0] + 1)}
+    finished = np.zeros_like(state)
+    for count in range(1, hit_counts[-1][0] + 1):
+        if count > 1 and remaining[count] < remaining[count - 1]:
+            carry = remaining[count] / remaining[count - 1]
+            finished += state * (1 - carry)
+            state = state * carry
+        state = _damage(state, pmf, max_hp)
+        if berry is not None:
+            state = _berry(state, berry[0], berry[1], max_hp)
+    return state + finished
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _ko_probabilities(rolls: Tuple[int, ...], max_hp: int, current_hp: int, turns: int,
+                      hit_counts: Tuple[Tuple[int, float], ...], berry: Optional[Tuple[float, float]],
+                      passive: float, self_effect: Tuple[Tuple[int, float], ...],
+                      defender_first: bool) -> 'np.ndarray':
+    pmf = roll_distribution(rolls)
+    state = np.zeros((1 if berry is None else 2, max_hp + 1))
+    state[0, max_hp - current_hp] = 1.0
+
+    berry_trigger = None
+    if berry is not None:
+        threshold, value = berry
+        # main.js と同じ判定（残りHP / 最大HP <= threshold）になる、受けたダメージの最小値
+        hp = np.arange(max_hp, 0, -1)
+        trigger = int(np.argmax(hp / max_hp <= threshold)) if (hp / max_hp <= threshold).any() else max_hp
+        berry_trigger = (trigger, int(np.floor(max_hp * value)))
+        state = _berry(state, *berry_trigger, max_hp)
+    passive_amount = int(np.floor(max_hp * passive))
+
+    def defender_moves(state):
+        if not self_effect:
+            return state
+        state = _change(state, self_effect, max_hp)
+        return state if berry_trigger is None else _berry(state, *berry_trigger, max_hp)
+
+    ko = np.empty(turns)
+    for turn in range(turns):
+        if defender_first:
+            state = defender_moves(state)
+        state = _attack(state, pmf, hit_counts, berry_trigger, max_hp)
+        if not defender_first:
+            state = defender_moves(state)
+        state = _heal(state, passive_amount, max_hp)
+        ko[turn] = state[:, max_hp].sum()
+    ko = np.minimum(ko, 1.0)
+    ko.flags.writeable = False
+    return ko
+
+
+def ko_probabilities(rolls: Sequence[int], max_hp: int, turns: int = DEFAULT_TURNS,
+                     current_hp: Optional[int] = None, hit_counts: Optional[Dict[int, float]] = None,
+                     berry: Optional[Tuple[float, float]] = None, passive: float = 0.0,
+                     self_effect: Sequence[Tuple[int, float]] = (),
+                     defender_first: bool = False) -> 'np.ndarray':
+    """
+    1ターンに1回攻撃を受けたとき、各ターンの終わりまでに倒れている確率
+
+    Args:
+        rolls: 1発のダメージ（乱数16段階）
+        max_hp: 防御側の最大HP
+        current_hp: 防御側の今のHP（省略時は最大HP）
+        hit_counts: 攻撃回数 → 確率（hit_count_distribution。省略時は1回）
+        berry: きのみの (threshold, value)（items_data.json の type "berry"）
+        passive: ターンの終わりに回復する割合（items_data.json の type "passive" の value）
+        self_effect: 防御側の技によるHPの変化（self_effect_distribution）
+        defender_first: 防御側が先に動く
+
+    Returns:
+        [turns] の配列。ko[n - 1] が n ターン目までに倒れている確率
+    """
+    current_hp = max_hp if current_hp is None else max(0, min(current_hp, max_hp))
+    if current_hp == 0:
+        return np.ones(turns)
+    return _ko_probabilities(tuple(int(r) for r in rolls), int(max_hp), int(current_hp), int(turns),
+                             tuple(sorted((hit_counts or {1: 1.0}).items())), berry, float(passive),
+                             tuple(self_effect), bool(defender_first))
+
+
+def ko_label(ko: Sequence[float]) -> str:
+    """確定数の表記（"確定2発" / "乱数2発（43.8%）" / "4発では倒せない"）"""
+    for turn, probability in enumerate(ko, 1):
+        if probability >= 1.0:
+            return f"確定{turn}発"
+        if probability > 0.0:
+            percent = f"{probability * 100:.1f}%" if probability >= 0.001 else '0.1%未満'
+            return f"乱数{turn}発（{percent}）"
+    return f"{len(ko)}発では倒せない"
+
+
+# =============================================================================
+# ダメージ計算と組み合わせた問い合わせ
+# =============================================================================
+
+class KOEngine:
+    """
+    DamageEngine のダメージと持ち物・技のデータから確定数を求める
+
+    攻撃側・防御側は DamageEngine と同じ形（防御側は stats に "hp"、持ち物は "item"）。
+    """
+
+    def __init__(self, data: Optional[PokeData] = None):
+        self.data = data or PokeData()
+        self.engine = DamageEngine(self.data)
+
+    def item_effects(self, item: str) -> Tuple[Optional[Tuple[float, float]], float]:
+        """持ち物（使用率データの名前でもよい）→ (きのみの (threshold, value), ターンの終わりの回復の割合)"""
+        item = ITEM_ALIASES.get(item, item) if item else ''
+        info = self.data.items.get(item) or {}
+        if info.get('healType') != 'ratio':
+            return None, 0.0
+        if info.get('type') == 'berry':
+            return (info['threshold'], info['value']), 0.0
+        if info.get('type') == 'passive':
+            return None, info['value']
+        return None, 0.0
+
+    def query(self, attacker: Dict, defender: Dict, move: str, turns: int = DEFAULT_TURNS,
+              defender_move: Optional[str] = None, current_hp: Optional[int] = None,
+              defender_first: bool = False) -> Dict:
+        """
+        attacker が毎ターン move で攻撃したときの確定数
+
+        Args:
+            defender_move: 防御側が毎ターン使う技（回復技・吸収技・反動技ならHPの変化を反映する）
+
+        Returns:
+            {"rolls", "max_hp", "hit_counts", "ko": [ターンごとの確率], "label"}
+        """
+        move_info = self.data.move(move) or {}
+        rolls = self.engine.calculate_pairs([attacker], [defender], [move])[0]
+        max_hp = int(defender['stats']['hp'])
+        berry, passive = self.item_effects(defender.get('item', ''))
+        self_effect = ()
+        if defender_move:
+            defender_move_info = self.data.move(defender_move) or {}
+            dealt = None
+            if defender_move_info.get('drain_percent'):
+                dealt = self.engine.calculate_pairs([defender], [attacker], [defender_move])[0]
+            self_effect = self_effect_distribution(defender_move_info, max_hp, dealt)
+        hit_counts = hit_count_distribution(move_info)
+        ko = ko_probabilities(rolls, max_hp, turns, current_hp, hit_counts, berry, passive, self_effect,
+                              defender_first)
+        return {
+            'rolls': rolls.tolist(),
+            'max_hp': max_hp,
+            'hit_counts': hit_counts,
+            'ko': ko.tolist(),
+            'label': ko_label(ko),
+        }
+
+
+def find_set(data: PokeData, name: str) -> Optional[Dict]:
+    """使用率データのポケモン名（またはフォルム名）→ 型（matchup_matrix.build_set）"""
+    with open(data.trend_file, 'r', encoding='utf-8') as f:
+        trend = json.load(f)
+    for entry in trend:
+        if entry['name'] == name:
+            form_name = resolve_entry(data, entry)
+            return build_set(data, entry, form_name) if form_name else None
+    # フォルム名（ブラックキュレム など）で指定されたとき
+    for entry in trend:
+        form_name = resolve_entry(data, entry)
+        if form_name == name:
+            return build_set(data, entry, form_name)
+    return None
+
+
+def bench(data: PokeData, queries: int) -> None:
+    """使用率上位どうしのダメージで、問い合わせ1回あたりの時間を測る"""
+    roster = build_roster(data, 100, DEFAULT_MOVES)
+    engine = KOEngine(data)
+    rolls = engine.engine.calculate_movesets(roster, roster, [p['moves'] for p in roster])
+    rng = np.random.default_rng(0)
+    picks = [(int(a), int(d), int(m)) for a, d, m in zip(rng.integers(0, len(roster), queries),
+                                                         rng.integers(0, len(roster), queries),
+                                                         rng.integers(0, DEFAULT_MOVES, queries))]
+    berry = engine.item_effects('オボンののみ')[0]
+    for label, options in (('単発', {}), ('オボンののみ', {'berry': berry}), ('たべのこし', {'passive': 0.0625})):
+        _ko_probabilities.cache_clear()
+        start_time = time.perf_counter()
+        for a, d, m in picks:
+            ko_probabilities(rolls[a, d, m], roster[d]['stats']['hp'], **options)
+        first = (time.perf_counter() - start_time) / queries
+        start_time = time.perf_counter()
+        for a, d, m in picks:
+            ko_probabilities(rolls[a, d, m], roster[d]['stats']['hp'], **options)
+        cached = (time.perf_counter() - start_time) / queries
+        print(f"{label:<8} {first * 1e6:7.1f} µs/回（キャッシュ済み {cached * 1e6:.1f} µs/回, {queries:,} 回）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='確定数とその確率を求めます（型は使用率データの1位の持ち物・性格）')
+    parser.add_argument('attacker', nargs='?', help='攻撃側（使用率データのポケモン名）')
+    parser.add_argument('defender', nargs='?', help='防御側（使用率データのポケモン名）')
+    parser.add_argument('move', nargs='?', help='攻撃側の技')
+    parser.add_argument('--turns', type=int, default=DEFAULT_TURNS, help=f'何ターン目まで（デフォルト: {DEFAULT_TURNS}）')
+    parser.add_argument('--item', type=str, default=None, help='防御側の持ち物（省略時は使用率1位）')
+    parser.add_argument('--hp', type=int, default=None, help='防御側の今のHP（省略時は最大HP）')
+    parser.add_argument('--defender-move', type=str, default=None, help='防御側が毎ターン使う技')
+    parser.add_argument('--defender-first', action='store_true', help='防御側が先に動く')
+    parser.add_argument('--bench', action='store_true', help='問い合わせ1回あたりの時間を測る')
+    args = parser.parse_args()
+
+    data = PokeData()
+    if args.bench:
+        bench(data, BENCH_QUERIES)
+        return 0
+    if not (args.attacker and args.defender and args.move):
+        parser.error('攻撃側・防御側・技を指定してください（または --bench）')
+
+    sets = {}
+    for name in (args.attacker, args.defender):
+        sets[name] = find_set(data, name)
+        if sets[name] is None:
+            print(f"エラー: 使用率データに {name} がありません")
+            return 1
+    for name in (args.move, args.defender_move):
+        if name and not data.has_move(name):
+            print(f"エラー: 技 {name} がありません")
+            return 1
+    attacker, defender = sets[args.attacker], dict(sets[args.defender])
+    if args.item is not None:
+        defender['item'] = args.item
+
+    result = KOEngine(data).query(attacker, defender, args.move, args.turns, args.defender_move, args.hp,
+                                  args.defender_first)
+    hits = '・'.join(f"{count}回 {rate * 100:.0f}%" for count, rate in result['hit_counts'].items())
+    print(f"{attacker['form']}（{attacker['item'] or '持ち物なし'}）の {args.move} → "
+          f"{defender['form']}（HP {result['max_hp']}, {defender['item'] or '持ち物なし'}）")
+    print(f"  1発のダメージ: {result['rolls'][0]}〜{result['rolls'][-1]}（攻撃回数 {hits}）")
+    for turn, probability in enumerate(result['ko'], 1):
+        print(f"  {turn}ターン目までに倒す確率: {probability * 100:6.2f}%")
+    print(f"  → {result['label']}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
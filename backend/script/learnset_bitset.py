@@ -0,0 +1,195 @@
+"""
+技の習得リスト（learnset）をビットセットで保存・展開するモジュール
+
+全フォルム共通の技IDテーブル（PokeAPIの技IDを昇順に並べた連番）を作り、
+各フォルム・各バージョングループの習得技を「テーブル上の位置のビット列」として保持する。
+技名の文字列を繰り返し持つ代わりに、1バージョングループあたり技テーブル長/8 バイトで済む。
+
+ファイル形式（JSON）:
+    {
+      "move_table": [{"id": 1, "name": "pound", "ja": "はたく"}, ...],
+      "version_groups": ["scarlet-violet", "sword-shield", ...],
+      "learnsets": {"<pokedex_name>": {"<version_group>": "<base64ビット列>", ...}, ...}
+    }
+
+使用方法:
+    store = LearnsetStore('backend/data/pokemon_learnsets.json')
+    store.get_moves('リザードン', 'sword-shield')   # → ['メガトンパンチ', ...]
+
+    # 再取得せずに別バージョングループの moves で全ポケモンデータを作る
+    python learnset_bitset.py --version-group sword-shield --output backend/data/pokemon_data_swsh.json
+"""
+
+import argparse
+import base64
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_LEARNSET_FILE = 'backend/data/pokemon_learnsets.json'
+DEFAULT_POKEMON_FILE = 'backend/data/pokemon_data_all.json'
+
+_ID_PATTERN = re.compile(r'/(\d+)/?$')
+
+
+def resource_id_from_url(url: str) -> Optional[int]:
+    """PokeAPIのリソースURL（.../move/14/）から数値IDを取り出す"""
+    match = _ID_PATTERN.search(url or '')
+    return int(match.group(1)) if match else None
+
+
+def encode_bitset(indices: Iterable[int]) -> str:
+    """技テーブル上の位置の集合をビット列（base64）に変換する"""
+    bits = 0
+    for index in indices:
+        bits |= 1 << index
+    length = (bits.bit_length() + 7) // 8
+    return base64.b64encode(bits.to_bytes(length, 'little')).decode('ascii')
+
+
+def decode_bitset(encoded: str) -> List[int]:
+    """ビット列（base64）を技テーブル上の位置の昇順リストに戻す"""
+    bits = int.from_bytes(base64.b64decode(encoded), 'little')
+    indices = []
+    index = 0
+    while bits:
+        if bits & 1:
+            indices.append(index)
+        bits >>= 1
+        index += 1
+    return indices
+
+
+def build_learnset_file(output_file: str, learnsets: Dict[str, Dict[str, List[int]]],
+                        move_names: Dict[int, str], move_ja_names: Dict[str, str]) -> Dict[str, int]:
+    """
+    フォルムごとの技ID（PokeAPI）リストからビットセット形式の習得リストファイルを作る
+
+    Args:
+        output_file: 出力ファイルパス（一時ファイル経由で置き換える）
+        learnsets: {pokedex_name: {version_group: [PokeAPI技ID, ...]}}
+        move_names: {PokeAPI技ID: 英語名}
+        move_ja_names: {英語名: 日本語名}（name_cache['moves']）
+
+    Returns:
+        統計情報（フォルム数・バージョングループ数・技テーブル長）
+    """
+    all_ids = sorted({i for groups in learnsets.values() for ids in groups.values() for i in ids})
+    position = {move_id: index for index, move_id in enumerate(all_ids)}
+    version_groups = sorted({vg for groups in learnsets.values() for vg in groups})
+
+    move_table = []
+    for move_id in all_ids:
+        name = move_names.get(move_id, str(move_id))
+        move_table.append({"id": move_id, "name": name, "ja": move_ja_names.get(name, name)})
+
+    encoded = {
+        pokedex_name: {vg: encode_bitset(position[i] for i in ids) for vg, ids in sorted(groups.items())}
+        for pokedex_name, groups in learnsets.items()
+    }
+
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            "move_table": move_table,
+            "version_groups": version_groups,
+            "learnsets": encoded
+        }, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, output_file)
+
+    return {
+        'forms': len(encoded),
+        'version_groups': len(version_groups),
+        'moves': len(move_table)
+    }
+
+
+class LearnsetStore:
+    """
+    ビットセット形式の習得リストファイルを読み込み、必要になった分だけ技名に展開する
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.move_table: List[Dict] = data['move_table']
+        self.version_groups: List[str] = data['version_groups']
+        self._learnsets: Dict[str, Dict[str, str]] = data['learnsets']
+        self._expand = lru_cache(maxsize=4096)(self._expand_uncached)
+
+    def forms(self) -> List[str]:
+        return list(self._learnsets)
+
+    def available_groups(self, pokedex_name: str) -> List[str]:
+        """そのフォルムが技を覚えるバージョングループの一覧"""
+        return list(self._learnsets.get(pokedex_name, {}))
+
+    def _expand_uncached(self, pokedex_name: str, version_group: str) -> tuple:
+        encoded = self._learnsets.get(pokedex_name, {}).get(version_group)
+        if encoded is None:
+            return ()
+        return tuple(decode_bitset(encoded))
+
+    def get_move_ids(self, pokedex_name: str, version_group: str) -> List[int]:
+        """PokeAPIの技IDのリストを返す"""
+        return [self.move_table[i]['id'] for i in self._expand(pokedex_name, version_group)]
+
+    def get_moves(self, pokedex_name: str, version_group: str) -> List[str]:
+        """日本語の技名のリストを返す（技テーブル順）"""
+        return [self.move_table[i]['ja'] for i in self._expand(pokedex_name, version_group)]
+
+    def can_learn(self, pokedex_name: str, version_group: str, move_ja: str) -> bool:
+        return move_ja in self.get_moves(pokedex_name, version_group)
+
+
+def apply_version_group(pokemon_data: List[Dict], store: LearnsetStore, version_group: str) -> int:
+    """
+    全ポケモンデータの moves を指定バージョングループの習得技に置き換える
+
+    Returns:
+        習得技が見つからず空にしたフォルム数
+    """
+    missing = 0
+    for form in pokemon_data:
+        moves = store.get_moves(form['pokedex_name'], version_group)
+        if not moves:
+            missing += 1
+        form['moves'] = moves
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='習得技ファイル（ビットセット）から指定バージョングループの全ポケモンデータを作る'
+    )
+    parser.add_argument('--version-group', type=str, required=True,
+                        help='バージョングループ（例: scarlet-violet, sword-shield, sun-moon）')
+    parser.add_argument('--learnsets', type=str, default=DEFAULT_LEARNSET_FILE,
+                        help=f'習得技ファイル（デフォルト: {DEFAULT_LEARNSET_FILE}）')
+    parser.add_argument('--input', type=str, default=DEFAULT_POKEMON_FILE,
+                        help=f'元の全ポケモンデータ（デフォルト: {DEFAULT_POKEMON_FILE}）')
+    parser.add_argument('--output', type=str, required=True, help='出力ファイルパス')
+    args = parser.parse_args()
+
+    store = LearnsetStore(args.learnsets)
+    if args.version_group not in store.version_groups:
+        print(f"エラー: バージョングループ {args.version_group} は習得技ファイルにありません")
+        print(f"  利用可能: {', '.join(store.version_groups)}")
+        return
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        pokemon_data = json.load(f)
+    missing = apply_version_group(pokemon_data, store, args.version_group)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(pokemon_data, f, indent=2, ensure_ascii=False)
+    print(f"{args.output} に保存しました（{len(pokemon_data)}件、習得技なし {missing}件）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+使用率上位のポケモンどうしの総当たりダメージ表（攻撃側 × 防御側 × 技）を作るバッチ
+
+pokemon_sv_season_trend.json の上位 N 匹について、それぞれの採用率上位の技（威力のあるもの）・
+持ち物・性格で型を決め、全ての 攻撃側 × 防御側 × 技 のダメージを damage_engine.py でまとめて計算する。
+
+型の決め方:
+    技      採用率の高い順に、威力のある技を --moves 個
+    持ち物  採用率1位（items_data.json にある攻撃アップ・ダメージアップ系なら計算に反映）
+    性格    採用率1位
+    能力P   HP と、攻撃・特攻の種族値が高い方に 32（--no-points で全て0）
+    テラスタル・特性・ランク・急所は考えない
+
+各マスの値:
+    rolls      乱数16段階のダメージ
+    min_pct / max_pct   最小・最大ダメージの、防御側の最大HPに対する割合（%）
+    ko_hits    最大ダメージで倒すのに必要な回数（ダメージ0なら0）
+    ko_rolls   16段階のうち、ko_hits 回で倒せる乱数の数（毎回同じ乱数の場合）
+
+攻撃側をチャンクに分けてプロセスプールで計算し、結果ファイルに書き出す。
+
+結果ファイル（backend/data/matchup_matrix.bin。リトルエンディアン）:
+    ヘッダ   マジック "PKMNMTRX"・バージョン（u32）・索引の長さ（u32）
+    索引     JSON（ポケモンの一覧と型・最大HP・技、配列の形と dtype・データの位置、作成時の入力ファイルのSHA-256）
+    データ   CELL_DTYPE の配列 [攻撃側, 防御側, 技]（64バイト境界から。np.memmap でそのまま開ける）
+
+使用方法:
+    python matchup_matrix.py                               # 上位100匹の表を作る
+    python matchup_matrix.py --top 50 --moves 6 --workers 4
+    python matchup_matrix.py --show ガブリアス             # 作った表から、ガブリアスの攻撃の結果を表示
+    python matchup_matrix.py --show ガブリアス --against ディンルー
+"""
+
+import argparse
+import json
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from damage_engine import ROLL_COUNT, DamageEngine, form_stats, form_type_ids, nature_bonuses
+from pokedata import BASE_DIR, PokeData
+from pokemon_pack import file_sha256
+from season_store import resolve_entry
+
+MATRIX_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'matchup_matrix.bin')
+MAGIC = b'PKMNMTRX'
+MATRIX_VERSION = 1
+PREFIX = struct.Struct('<8sII')
+DATA_ALIGNMENT = 64
+
+DEFAULT_TOP_N = 100
+DEFAULT_MOVES = 4
+DEFAULT_CHUNK = 8      # 1タスクあたりの攻撃側の数
+MAX_STAT_POINTS = 32
+MAX_DAMAGE = np.iinfo(np.uint16).max
+
+CELL_DTYPE = np.dtype([
+    ('rolls', '<u2', (ROLL_COUNT,)),
+    ('min_pct', '<f4'),
+    ('max_pct', '<f4'),
+    ('ko_hits', 'u1'),
+    ('ko_rolls', 'u1'),
+])
+
+# 並列計算でワーカーに fork で引き継ぐ入力
+_JOB: Optional[Dict] = None
+
+
+# =============================================================================
+# 型の決定
+# =============================================================================
+
+def default_stat_points(form: Dict) -> Dict[str, int]:
+    """HP と、攻撃・特攻の種族値が高い方に 32"""
+    base = form['base_stats']
+    attack_stat = 'attack' if base['attack'] >= base['special-attack'] else 'spAtk'
+    return {'hp': MAX_STAT_POINTS, attack_stat: MAX_STAT_POINTS}
+
+
+def build_set(data: PokeData, entry: Dict, form_name: str, move_count: int = DEFAULT_MOVES,
+              points: bool = True) -> Dict:
+    """
+    使用率データの1件（entry）と、対応するフォルムの型
+
+    Returns:
+        {"rank", "name", "form", "item", "nature", "stat_points", "stats", "type_ids", "moves"}
+    """
+    form = data.form(form_name)
+    moves = [move['name'] for move in entry.get('moves', []) if (data.move(move['name']) or {}).get('power')]
+    item = entry['items'][0]['name'] if entry.get('items') else ''
+    nature = entry['natures'][0]['name'] if entry.get('natures') else ''
+    stat_points = default_stat_points(form) if points else {}
+    return {
+        'rank': entry['rank'],
+        'name': entry['name'],
+        'form': form_name,
+        'item': item,
+        'nature': nature,
+        'stat_points': stat_points,
+        'stats': form_stats(form, stat_points=stat_points, natures=nature_bonuses(nature)),
+        'type_ids': form_type_ids(form),
+        'moves': moves[:move_count],
+    }
+
+
+def build_roster(data: PokeData, top: int, move_count: int, points: bool = True) -> List[Dict]:
+    """使用率上位 top 件の型（同じフォルムが2回出てきたら最初のものだけ）"""
+    with open(data.trend_file, 'r', encoding='utf-8') as f:
+        trend = json.load(f)
+    roster, seen = [], set()
+    for entry in trend[:top]:
+        form_name = resolve_entry(data, entry)
+        if form_name is None or form_name in seen:
+            continue
+        seen.add(form_name)
+        roster.append(build_set(data, entry, form_name, move_count, points))
+    return roster
+
+
+# =============================================================================
+# 計算
+# =============================================================================
+
+def matchup_cells(rolls: 'np.ndarray', defender_hp: 'np.ndarray') -> 'np.ndarray':
+    """
+    ダメージ [攻撃側, 防御側, 技, 16] → CELL_DTYPE の配列 [攻撃側, 防御側, 技]
+
+    Args:
+        defender_hp: 防御側の最大HP [防御側]
+    """
+    hp = defender_hp.astype(np.float64)[None, :, None]
+    low, high = rolls[..., 0], rolls[..., -1]
+    ko_hits = np.where(high > 0, np.ceil(hp / np.maximum(high, 1)), 0)
+    cells = np.zeros(rolls.shape[:-1], dtype=CELL_DTYPE)
+    cells['rolls'] = np.minimum(rolls, MAX_DAMAGE)
+    cells['min_pct'] = low / hp * 100
+    cells['max_pct'] = high / hp * 100
+    cells['ko_hits'] = np.minimum(ko_hits, np.iinfo(np.uint8).max)
+    cells['ko_rolls'] = np.where(high > 0, (rolls * ko_hits[..., None] >= hp[..., None]).sum(axis=-1), 0)
+    return cells
+
+
+def _compute_chunk(bounds) -> 'np.ndarray':
+    """ワーカー: 攻撃側 [start, end) の行"""
+    start, end = bounds
+    engine, attackers, defenders, movesets = (_JOB[key] for key in ('engine', 'attackers', 'defenders', 'movesets'))
+    rolls = engine.calculate_movesets(attackers[start:end], defenders, movesets[start:end])
+    return matchup_cells(rolls, _JOB['hp'])
+
+
+def compute_matrix(data: PokeData, roster: List[Dict], move_count: int, workers: int = 1,
+                   chunk_size: int = DEFAULT_CHUNK) -> 'np.ndarray':
+    """全ての 攻撃側 × 防御側 × 技 のマス（[攻撃側, 防御側, move_count]）"""
+    global _JOB
+    engine = DamageEngine(data)
+    sides = [{'stats': p['stats'], 'type_ids': p['type_ids'], 'item': p['item']} for p in roster]
+    # 技名は親プロセスで技データに置き換えておく（ワーカーで技データを引き直さない）
+    movesets = [[data.move(name) for name in p['moves']] + [{}] * (move_count - len(p['moves'])) for p in roster]
+    _JOB = {
+        'engine': engine, 'attackers': sides, 'defenders': sides, 'movesets': movesets,
+        'hp': np.array([p['stats']['hp'] for p in roster]),
+    }
+    chunks = [(start, min(start + chunk_size, len(roster))) for start in range(0, len(roster), chunk_size)]
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        context = None
+    try:
+        if workers <= 1 or context is None or len(chunks) <= 1:
+            parts = [_compute_chunk(bounds) for bounds in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                parts = list(executor.map(_compute_chunk, chunks))
+    finally:
+        _JOB = None
+    if not parts:
+        return np.zeros((0, 0, move_count), dtype=CELL_DTYPE)
+    return np.concatenate(parts, axis=0)
+
+
+# =============================================================================
+# 結果ファイル
+# =============================================================================
+
+def write_matrix(path: str, cells: 'np.ndarray', index: Dict) -> int:
+    """索引とマスを一時ファイル経由で書き出す（ファイルサイズを返す）"""
+    index = dict(index, shape=list(cells.shape), dtype=CELL_DTYPE.descr)
+    # データの位置は索引の長さで決まるので、桁数が落ち着くまで詰め直す
+    data_offset = 0
+    while True:
+        header = json.dumps(dict(index, data_offset=data_offset), ensure_ascii=False).encode('utf-8')
+        aligned = -(-(PREFIX.size + len(header)) // DATA_ALIGNMENT) * DATA_ALIGNMENT
+        if aligned == data_offset:
+            break
+        data_offset = aligned
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(PREFIX.pack(MAGIC, MATRIX_VERSION, len(header)))
+        f.write(header)
+        f.write(b'\0' * (data_offset - PREFIX.size - len(header)))
+        f.write(np.ascontiguousarray(cells).tobytes())
+    os.replace(tmp_file, path)
+    return data_offset + cells.nbytes
+
+
+class MatchupMatrix:
+    """
+    結果ファイルの読み込み（マスは np.memmap。開いただけでは読み込まない）
+
+    Args:
+        path: 結果ファイル
+    """
+
+    def __init__(self, path: str = MATRIX_FILE):
+        with open(path, 'rb') as f:
+            magic, version, header_length = PREFIX.unpack(f.read(PREFIX.size))
+            if magic != MAGIC or version != MATRIX_VERSION:
+                raise ValueError(f"ダメージ表のファイルではないか、未対応のバージョンです: {path}")
+            self.index = json.loads(f.read(header_length).decode('utf-8'))
+        self.roster: List[Dict] = self.index['roster']
+        self.cells = np.memmap(path, dtype=CELL_DTYPE, mode='r', offset=self.index['data_offset'],
+                               shape=tuple(self.index['shape']))
+        self._positions = {}
+        for position, pokemon in enumerate(self.roster):
+            self._positions.setdefault(pokemon['form'], position)
+            self._positions.setdefault(pokemon['name'], position)
+
+    def position_of(self, name: str) -> Optional[int]:
+        """使用率データの名前またはフォルム名 → 表の位置"""
+        return self._positions.get(name)
+
+    def cell(self, attacker: str, defender: str) -> List[Dict]:
+        """attacker の各技で defender を攻撃した結果"""
+        a, d = self.position_of(attacker), self.position_of(defender)
+        if a is None or d is None:
+            raise KeyError(attacker if a is None else defender)
+        rows = []
+        for move, cell in zip(self.roster[a]['moves'], self.cells[a, d]):
+            rows.append({
+                'move': move,
+                'min': int(cell['rolls'][0]), 'max': int(cell['rolls'][-1]),
+                'min_pct': float(cell['min_pct']), 'max_pct': float(cell['max_pct']),
+                'ko_hits': int(cell['ko_hits']), 'ko_rolls': int(cell['ko_rolls']),
+            })
+        return rows
+
+
+def source_hashes(data: PokeData) -> Dict[str, str]:
+    return {os.path.basename(path): file_sha256(path).hex()
+            for path in (data.trend_file, data.pokemon_file, data.moves_file, data.items_file)}
+
+
+def format_ko(row: Dict) -> str:
+    if row['ko_hits'] == 0:
+        return '無効'
+    if row['ko_rolls'] == ROLL_COUNT:
+        return f"確定{row['ko_hits']}発"
+    return f"乱数{row['ko_hits']}発（{row['ko_rolls']}/{ROLL_COUNT}）"
+
+
+def show(matrix: MatchupMatrix, attacker: str, against: Optional[str]) -> int:
+    position = matrix.position_of(attacker)
+    if position is None:
+        print(f"エラー: {attacker} は表にありません")
+        return 1
+    pokemon = matrix.roster[position]
+    print(f"{pokemon['form']}（{pokemon['rank']}位, {pokemon['item'] or '持ち物なし'}, {pokemon['nature'] or '性格不明'}）")
+    defenders = [against] if against else [p['form'] for p in matrix.roster]
+    for defender in defenders:
+        try:
+            rows = matrix.cell(pokemon['form'], defender)
+        except KeyError:
+            print(f"エラー: {defender} は表にありません")
+            return 1
+        best = max(rows, key=lambda row: row['max_pct'], default=None)
+        if against:
+            for row in rows:
+                print(f"  → {defender}: {row['move']:<12} {row['min']}〜{row['max']}"
+                      f"（{row['min_pct']:.1f}%〜{row['max_pct']:.1f}%） {format_ko(row)}")
+        elif best is not None:
+            print(f"  → {defender:<12} {best['move']:<12} {best['min_pct']:5.1f}%〜{best['max_pct']:5.1f}% "
+                  f"{format_ko(best)}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='使用率上位のポケモンどうしの総当たりダメージ表を作ります')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_N, help=f'使用率上位何件か（デフォルト: {DEFAULT_TOP_N}）')
+    parser.add_argument('--moves', type=int, default=DEFAULT_MOVES, help=f'1匹あたりの技の数（デフォルト: {DEFAULT_MOVES}）')
+    parser.add_argument('--no-points', action='store_true', help='能力Pを振らない')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='プロセス数（デフォルト: CPU数）')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK,
+                        help=f'1タスクあたりの攻撃側の数（デフォルト: {DEFAULT_CHUNK}）')
+    parser.add_argument('--output', type=str, default=MATRIX_FILE, help='結果ファイル')
+    parser.add_argument('--show', type=str, default=None, help='作成済みの表から、このポケモンの攻撃の結果を表示')
+    parser.add_argument('--against', type=str, default=None, help='--show と一緒に、防御側を1匹に絞る')
+    args = parser.parse_args()
+
+    if args.show:
+        if not os.path.exists(args.output):
+            print(f"エラー: {args.output} がありません（先に表を作成してください）")
+            return 1
+        return show(MatchupMatrix(args.output), args.show, args.against)
+
+    start_time = time.time()
+    data = PokeData()
+    roster = build_roster(data, args.top, args.moves, points=not args.no_points)
+    prepared = time.time()
+    cells = compute_matrix(data, roster, args.moves, args.workers, args.chunk)
+    computed = time.time()
+    size = write_matrix(args.output, cells, {
+        'version': MATRIX_VERSION,
+        'top': args.top,
+        'moves_per_pokemon': args.moves,
+        'stat_points': 'none' if args.no_points else 'hp+attack',
+        'sources': source_hashes(data),
+        'roster': roster,
+    })
+    count = cells.size
+    print(f"{len(roster)}匹 × {len(roster)}匹 × 技{args.moves} = {count:,} マス"
+          f"（型の準備 {prepared - start_time:.2f}秒, 計算 {computed - prepared:.2f}秒, "
+          f"書き出し {time.time() - computed:.2f}秒, ワーカー {args.workers}）")
+    print(f"{args.output} に保存しました（{size / 1024:,.0f} KB）")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
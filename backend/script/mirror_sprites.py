@@ -0,0 +1,328 @@
+"""
+ポケモンの画像（sprite_url）をローカルの画像ストアにミラーするスクリプト
+
+機能:
+- 全フォルムの sprite_url を並列にダウンロード
+- 内容のSHA-256で重複を除いて保存（多くのフォルムが同じ画像を共有するため）
+  保存先: backend/data/image/sprites/<ハッシュ先頭16桁>.<拡張子>（内容が同じなら名前も同じ）
+- pokemon_data_all.json の sprite_url をローカルのパスに書き換え（一時ファイル経由で置き換え）
+- マニフェスト（取得元URL → ファイル名・ETag）による差分実行
+  2回目以降は取得済みの画像をダウンロードしない（--refresh で ETag による再検証）
+- 取得元URLの置き換え（--remap）で、ローカルのファイルサーバーを相手に動作確認できる
+
+使用方法:
+    python mirror_sprites.py                      # 未取得の画像だけダウンロードして書き換え
+    python mirror_sprites.py --refresh            # 取得済みの画像も再検証（変更があれば取り直す）
+    python mirror_sprites.py --remap https://raw.githubusercontent.com/PokeAPI/sprites/master/=http://127.0.0.1:8000/
+    python mirror_sprites.py --prune              # どのフォルムからも参照されない画像を削除
+"""
+
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from rate_limiter import backoff_delay
+
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
+# プロジェクトのルートディレクトリからのパス
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_FILE = os.path.join(BASE_DIR, 'frontend', 'data', 'pokemon_data_all.json')
+SPRITE_DIR = os.path.join(BASE_DIR, 'backend', 'data', 'image', 'sprites')
+MANIFEST_NAME = 'manifest.json'
+# frontend/index.html から見た画像ストアのパス（sprite_url に書き込む値の接頭辞）
+DEFAULT_URL_PREFIX = '../backend/data/image/sprites/'
+
+DEFAULT_WORKERS = 16
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 4
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+HASH_NAME_LENGTH = 16
+MANIFEST_VERSION = 1
+
+_thread_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+def remap_url(url: str, remaps: List[Tuple[str, str]]) -> str:
+    """--remap の指定に従って取得元URLの接頭辞を置き換える"""
+    for old, new in remaps:
+        if url.startswith(old):
+            return new + url[len(old):]
+    return url
+
+
+def guess_extension(url: str, content_type: Optional[str]) -> str:
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    if ext:
+        return ext
+    if content_type:
+        return mimetypes.guess_extension(content_type.split(';')[0].strip()) or '.bin'
+    return '.bin'
+
+
+# =============================================================================
+# マニフェスト
+# =============================================================================
+
+def load_manifest(sprite_dir: str) -> Dict:
+    """
+    マニフェストを読み込む
+
+    形式:
+        {"version": 1,
+         "sources": {取得元URL: {"file", "sha256", "size", "etag", "last_modified"}},
+         "forms": {pokedex_name: 取得元URL}}
+    """
+    path = os.path.join(sprite_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+        print(f"警告: マニフェストの形式が異なるため作り直します: {path}")
+    return {"version": MANIFEST_VERSION, "sources": {}, "forms": {}}
+
+
+def save_json_atomic(path: str, data, indent: Optional[int] = 2) -> None:
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# ダウンロード
+# =============================================================================
+
+def download_sprite(source_url: str, fetch_url: str, sprite_dir: str,
+                    previous: Optional[Dict]) -> Tuple[str, Optional[Dict]]:
+    """
+    1つの画像をダウンロードし、内容のハッシュ名で保存する
+
+    previous（マニフェストの既存エントリ）があれば ETag / Last-Modified で再検証する。
+
+    Returns:
+        (結果種別 'downloaded' | 'not_modified' | 'failed', マニフェストのエントリ) のタプル
+    """
+    headers = {}
+    if previous:
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            res = _get_session().get(fetch_url, headers=headers, timeout=REQUEST_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= MAX_RETRIES:
+                print(f"  警告: {fetch_url} の取得に失敗: {str(e)}")
+                return 'failed', previous
+            time.sleep(backoff_delay(attempt))
+            continue
+        if res.status_code in RETRYABLE_STATUS and attempt < MAX_RETRIES:
+            time.sleep(backoff_delay(attempt))
+            continue
+        break
+
+    if res.status_code == 304 and previous:
+        return 'not_modified', previous
+    if res.status_code != 200:
+        print(f"  警告: {fetch_url} の取得に失敗: HTTP {res.status_code}")
+        return 'failed', previous
+
+    body = res.content
+    sha256 = hashlib.sha256(body).hexdigest()
+    file_name = sha256[:HASH_NAME_LENGTH] + guess_extension(source_url, res.headers.get('Content-Type'))
+    path = os.path.join(sprite_dir, file_name)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    return 'downloaded', {
+        "file": file_name,
+        "sha256": sha256,
+        "size": len(body),
+        "etag": res.headers.get('ETag'),
+        "last_modified": res.headers.get('Last-Modified'),
+    }
+
+
+def mirror_sprites(data_file: str = DATA_FILE, sprite_dir: str = SPRITE_DIR,
+                   url_prefix: str = DEFAULT_URL_PREFIX, workers: int = DEFAULT_WORKERS,
+                   refresh: bool = False, remaps: Optional[List[Tuple[str, str]]] = None,
+                   prune: bool = False, output_file: Optional[str] = None) -> Dict[str, int]:
+    """
+    全フォルムの画像をミラーし、sprite_url をローカルのパスに書き換える
+
+    Args:
+        data_file: 全ポケモンデータ（pokemon_data_all.json）
+        sprite_dir: 画像ストアのディレクトリ
+        url_prefix: sprite_url に書き込むパスの接頭辞
+        workers: 同時ダウンロード数
+        refresh: 取得済みの画像も ETag / Last-Modified で再検証する
+        remaps: 取得元URLの接頭辞の置き換え [(元, 先), ...]（マニフェストには元のURLで記録）
+        prune: どのフォルムからも参照されない画像ファイルを削除する
+        output_file: 書き換えたデータの出力先（None なら data_file を置き換える）
+
+    Returns:
+        統計情報
+    """
+    remaps = remaps or []
+    os.makedirs(sprite_dir, exist_ok=True)
+    manifest = load_manifest(sprite_dir)
+    sources: Dict[str, Dict] = manifest['sources']
+    forms: Dict[str, str] = manifest['forms']
+
+    with open(data_file, 'r', encoding='utf-8') as f:
+        pokemon_data = json.load(f)
+
+    # フォルムごとの取得元URL（書き換え済みならマニフェストから元のURLを引く）
+    form_sources: Dict[str, str] = {}
+    for pokemon in pokemon_data:
+        sprite_url = pokemon.get('sprite_url')
+        name = pokemon['pokedex_name']
+        if sprite_url and sprite_url.startswith(url_prefix):
+            if name in forms:
+                form_sources[name] = forms[name]
+        elif sprite_url:
+            form_sources[name] = sprite_url
+
+    # 同じURLは1回だけ取得する
+    unique_urls = sorted(set(form_sources.values()))
+    targets = []
+    for url in unique_urls:
+        entry = sources.get(url)
+        has_file = entry is not None and os.path.exists(os.path.join(sprite_dir, entry['file']))
+        if not has_file:
+            targets.append((url, None))
+        elif refresh:
+            targets.append((url, entry))
+
+    stats = {'forms': len(form_sources), 'urls': len(unique_urls), 'downloaded': 0,
+             'not_modified': 0, 'failed': 0, 'reused': len(unique_urls) - len(targets)}
+    print(f"画像: {stats['forms']}フォルム / {stats['urls']}URL（取得対象 {len(targets)}件, "
+          f"取得済み {stats['reused']}件）")
+
+    if targets:
+        pbar = tqdm(total=len(targets), desc="ダウンロード中", unit="枚") if TQDM_AVAILABLE else None
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='sprite') as executor:
+            futures = {
+                url: executor.submit(download_sprite, url, remap_url(url, remaps), sprite_dir, previous)
+                for url, previous in targets
+            }
+            for url, future in futures.items():
+                result, entry = future.result()
+                stats[result] += 1
+                if entry is not None:
+                    sources[url] = entry
+                if pbar:
+                    pbar.update(1)
+        if pbar:
+            pbar.close()
+
+    # sprite_url の書き換え（取得できなかった画像は元のURLのまま残す）
+    rewritten = 0
+    for pokemon in pokemon_data:
+        if not pokemon.get('sprite_url'):
+            continue
+        name = pokemon['pokedex_name']
+        source = form_sources.get(name)
+        entry = sources.get(source) if source else None
+        if entry and os.path.exists(os.path.join(sprite_dir, entry['file'])):
+            forms[name] = source
+            local_url = url_prefix + entry['file']
+            if pokemon.get('sprite_url') != local_url:
+                pokemon['sprite_url'] = local_url
+                rewritten += 1
+        elif source:
+            pokemon['sprite_url'] = source
+
+    referenced = {sources[url]['file'] for url in form_sources.values() if url in sources}
+    stats['files'] = len(referenced)
+    stats['rewritten'] = rewritten
+    mirrored = [sources[url] for url in unique_urls if url in sources]
+    unique_files = {entry['file']: entry['size'] for entry in mirrored}
+    stats['dedupe_saved_bytes'] = sum(entry['size'] for entry in mirrored) - sum(unique_files.values())
+
+    if prune:
+        stats['pruned'] = 0
+        live_sources = set(form_sources.values())
+        for url in [u for u in sources if u not in live_sources]:
+            del sources[url]
+        for file_name in os.listdir(sprite_dir):
+            if file_name == MANIFEST_NAME or file_name in referenced:
+                continue
+            os.remove(os.path.join(sprite_dir, file_name))
+            stats['pruned'] += 1
+
+    save_json_atomic(os.path.join(sprite_dir, MANIFEST_NAME), manifest)
+    save_json_atomic(output_file or data_file, pokemon_data)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='sprite_url の画像をローカルの画像ストアにミラーします')
+    parser.add_argument('--data', type=str, default=DATA_FILE,
+                        help=f'全ポケモンデータ（デフォルト: {DATA_FILE}）')
+    parser.add_argument('--output', type=str, default=None,
+                        help='書き換えたデータの出力先（デフォルト: --data を置き換える）')
+    parser.add_argument('--sprite-dir', type=str, default=SPRITE_DIR,
+                        help=f'画像ストアのディレクトリ（デフォルト: {SPRITE_DIR}）')
+    parser.add_argument('--url-prefix', type=str, default=DEFAULT_URL_PREFIX,
+                        help=f'sprite_url に書き込むパスの接頭辞（デフォルト: {DEFAULT_URL_PREFIX}）')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'同時ダウンロード数（デフォルト: {DEFAULT_WORKERS}）')
+    parser.add_argument('--refresh', action='store_true',
+                        help='取得済みの画像も ETag / Last-Modified で再検証する')
+    parser.add_argument('--remap', action='append', default=[], metavar='OLD=NEW',
+                        help='取得元URLの接頭辞を置き換える（ローカルのファイルサーバーで試す場合など、複数指定可）')
+    parser.add_argument('--prune', action='store_true',
+                        help='どのフォルムからも参照されない画像を削除する')
+    args = parser.parse_args()
+
+    remaps = []
+    for value in args.remap:
+        old, sep, new = value.partition('=')
+        if not sep:
+            parser.error(f'--remap は OLD=NEW の形式で指定してください: {value}')
+        remaps.append((old, new))
+
+    start_time = time.time()
+    stats = mirror_sprites(args.data, args.sprite_dir, args.url_prefix, args.workers,
+                           args.refresh, remaps, args.prune, args.output)
+
+    print("\n=== ミラー完了 ===")
+    print(f"ダウンロード: {stats['downloaded']}件, 変更なし(304): {stats['not_modified']}件, "
+          f"取得済み: {stats['reused']}件, 失敗: {stats['failed']}件")
+    print(f"画像ファイル: {stats['files']}件（重複除去で {stats['dedupe_saved_bytes'] / 1024:.1f}KB 節約）")
+    print(f"sprite_url を書き換えたフォルム: {stats['rewritten']}件")
+    if 'pruned' in stats:
+        print(f"削除した未参照の画像: {stats['pruned']}件")
+    print(f"処理時間: {time.time() - start_time:.1f}秒")
+
+
+if __name__ == '__main__':
+    main()
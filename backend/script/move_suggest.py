@@ -0,0 +1,164 @@
+"""
+技名の近い候補を探すモジュール（文字 n-gram の索引 + 編集距離での並べ替え）と修正ファイル
+
+moves_data.json に無い技名の多くは、カタカナ・ひらがなの違い、全角・半角の違い、空白や中黒の有無、
+1〜2文字の誤字による。全919技と1件ずつ編集距離を計算する代わりに、
+
+1. 技名を正規化する（NFKC で全角・半角をそろえ、カタカナをひらがなに、空白・中黒を除き、小文字に）
+2. 正規化した名前の文字 bigram（先頭・末尾の印付き）→ 技 の転置索引を作っておく
+3. 存在しない技名と bigram を共有する技だけを候補にし、Dice 係数の上位 MAX_CANDIDATES 件だけ編集距離を計算する
+
+修正ファイル（JSON。手で replacement / auto を書き換えてもよい）:
+    {
+      "version": 1,
+      "moves_sha256": "<作成時の moves_data.json のSHA-256>",
+      "fixes": {
+        "<存在しない技名>": {"replacement": "<置き換える技名 or null>", "score": 0.92, "auto": true,
+                             "suggestions": [["<技名>", 0.92], ...], "forms": ["<覚えるフォルム名>", ...]}
+      }
+    }
+    auto が true の置き換えは data_pipeline.py の movefix ステージが自動で適用する。
+
+使用方法:
+    index = MoveNameIndex(data.moves)
+    index.suggest('ﾊｲﾊﾟｰﾎﾞｲｽ')   # → [('ハイパーボイス', 1.0), ...]
+"""
+
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from incremental_build import save_json_atomic
+from pokemon_pack import file_sha256
+
+# プロジェクトルート（backend/script の2階層上）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MOVE_FIX_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'move_fixes.json')
+
+FIX_FILE_VERSION = 1
+NGRAM_SIZE = 2
+MAX_CANDIDATES = 30     # 編集距離を計算する候補数
+DEFAULT_SUGGESTIONS = 3
+# 自動で置き換えてよい条件: 正規化すると一致する、または類似度がこれ以上で2位との差が AUTO_FIX_MARGIN 以上
+AUTO_FIX_SCORE = 0.8
+AUTO_FIX_MARGIN = 0.15
+
+_IGNORED_CHARS = re.compile(r'[\s・･\-_]')
+
+
+def normalize_move_name(name: str) -> str:
+    """表記ゆれを吸収した技名（全角・半角、カタカナ・ひらがな、空白・中黒、大文字・小文字）"""
+    text = unicodedata.normalize('NFKC', name)
+    text = ''.join(chr(ord(c) - 0x60) if 'ァ' <= c <= 'ヶ' else c for c in text)
+    return _IGNORED_CHARS.sub('', text).lower()
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> set:
+    padded = f"^{text}$"
+    return {padded[i:i + size] for i in range(max(1, len(padded) - size + 1))}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """レーベンシュタイン距離"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class MoveNameIndex:
+    """
+    技名の n-gram 転置索引
+
+    Args:
+        move_names: 存在する技名（moves_data.json のキー）
+    """
+
+    def __init__(self, move_names: Iterable[str]):
+        self.names: List[str] = list(move_names)
+        self.normalized: List[str] = [normalize_move_name(name) for name in self.names]
+        self.gram_counts: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.by_normalized: Dict[str, int] = {}
+        for move_id, text in enumerate(self.normalized):
+            grams = ngrams(text)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(move_id)
+            self.by_normalized.setdefault(text, move_id)
+
+    def suggest(self, name: str, limit: int = DEFAULT_SUGGESTIONS) -> List[Tuple[str, float]]:
+        """
+        近い技名を類似度（1 - 編集距離 / 長い方の長さ。正規化して一致すれば 1.0）の高い順に返す
+        """
+        text = normalize_move_name(name)
+        exact = self.by_normalized.get(text)
+        grams = ngrams(text)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for move_id in self.postings.get(gram, ()):
+                shared[move_id] = shared.get(move_id, 0) + 1
+        # Dice 係数の上位だけ編集距離で並べ替える
+        candidates = sorted(shared, key=lambda i: -2 * shared[i] / (len(grams) + self.gram_counts[i]))
+        scored = []
+        for move_id in candidates[:MAX_CANDIDATES]:
+            other = self.normalized[move_id]
+            if move_id == exact:
+                score = 1.0
+            else:
+                # 正規化後に一致しない限り 1.0 にはしない
+                score = min(0.99, 1 - edit_distance(text, other) / max(len(text), len(other), 1))
+            scored.append((score, move_id))
+        scored.sort(key=lambda item: (-item[0], self.names[item[1]]))
+        return [(self.names[move_id], round(score, 3)) for score, move_id in scored[:limit]]
+
+
+def fix_entry(suggestions: List[Tuple[str, float]], forms: List[str]) -> Dict:
+    """存在しない技1件分の修正ファイルのエントリ"""
+    best = suggestions[0] if suggestions else (None, 0.0)
+    second_score = suggestions[1][1] if len(suggestions) > 1 else 0.0
+    auto = best[0] is not None and (best[1] == 1.0 or
+                                    (best[1] >= AUTO_FIX_SCORE and best[1] - second_score >= AUTO_FIX_MARGIN))
+    return {
+        'replacement': best[0],
+        'score': best[1],
+        'auto': auto,
+        'suggestions': [list(s) for s in suggestions],
+        'forms': forms,
+    }
+
+
+def save_fix_file(path: str, fixes: Dict[str, Dict], moves_file: str) -> str:
+    save_json_atomic(path, {
+        'version': FIX_FILE_VERSION,
+        'moves_sha256': file_sha256(moves_file).hex(),
+        'fixes': fixes,
+    }, indent=2)
+    return path
+
+
+def load_auto_fixes(path: str, known_moves: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    修正ファイルのうち自動で適用してよい置き換え {存在しない技名: 置き換える技名}
+
+    置き換え先が known_moves に無いものは除く。ファイルが無ければ空。
+
+    Raises:
+        ValueError: 形式が違う
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        fix_file = json.load(f)
+    if fix_file.get('version') != FIX_FILE_VERSION:
+        raise ValueError(f"未対応の修正ファイルの形式です: {fix_file.get('version')}")
+    known = set(known_moves) if known_moves is not None else None
+    return {name: fix['replacement'] for name, fix in fix_file.get('fixes', {}).items()
+            if fix.get('auto') and fix.get('replacement') and (known is None or fix['replacement'] in known)}
@@ -0,0 +1,318 @@
+"""
+PokeAPIのエンドポイントを模倣するローカルのスタブHTTPサーバー
+
+機能:
+- /pokemon-species/{id}, /pokemon/{id}, /move/{id}, /type/{id}, /ability/{id} と
+  一覧エンドポイント /move, /type, /ability（limit/offset ページング）を
+  本物と同じ形のJSONで返す（内容は決定的に生成した合成データ）
+- 応答ごとに固定の遅延を入れて、実APIのレイテンシを再現できる
+- 一定割合で 429（Retry-After付き）/ 503 を返し、再試行処理を確認できる
+- ETag / Last-Modified を付け、If-None-Match による再検証には304を返す
+- fetch_all_pokemon.py の --base-url に指定して、オフラインで取得処理を計測する
+
+使用方法:
+    python pokeapi_stub_server.py                         # ポート8765で起動
+    python pokeapi_stub_server.py --species 151 --latency-ms 80
+    python pokeapi_stub_server.py --error-rate 0.1         # 10%の応答を429/503にする
+    python fetch_all_pokemon.py --base-url http://127.0.0.1:8765/api/v2 --no-resume
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import argparse
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+API_PREFIX = '/api/v2'
+DEFAULT_PORT = 8765
+DEFAULT_SPECIES_COUNT = 100
+DEFAULT_LATENCY_MS = 50.0
+DEFAULT_ERROR_RATE = 0.0
+THROTTLE_RETRY_AFTER = '1'  # 429応答に付ける Retry-After（秒）
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'  # 合成データは不変なので固定
+
+# 合成データの規模
+MOVE_COUNT = 400
+TYPE_NAMES = [
+    'normal', 'fire', 'water', 'electric', 'grass', 'ice', 'fighting', 'poison', 'ground',
+    'flying', 'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy'
+]
+ABILITY_COUNT = 120
+MOVES_PER_POKEMON = 60
+ALT_FORM_INTERVAL = 5  # この間隔ごとの種族にメガシンカフォルムを持たせる
+ALT_FORM_ID_OFFSET = 10000
+VERSION_GROUPS = ['scarlet-violet', 'sword-shield', 'sun-moon']
+
+
+# =============================================================================
+# 合成データ生成
+# =============================================================================
+
+def _names(ja_name: str, en_name: str) -> list:
+    return [
+        {"language": {"name": "ja-Hrkt"}, "name": ja_name},
+        {"language": {"name": "ja"}, "name": ja_name},
+        {"language": {"name": "en"}, "name": en_name},
+    ]
+
+
+def build_species(base_url: str, species_id: int) -> Dict:
+    """種族データ（/pokemon-species/{id}）を生成する"""
+    varieties = [{
+        "is_default": True,
+        "pokemon": {"name": f"species{species_id}", "url": f"{base_url}/pokemon/{species_id}/"}
+    }]
+    if species_id % ALT_FORM_INTERVAL == 0:
+        alt_id = ALT_FORM_ID_OFFSET + species_id
+        varieties.append({
+            "is_default": False,
+            "pokemon": {"name": f"species{species_id}-mega", "url": f"{base_url}/pokemon/{alt_id}/"}
+        })
+    return {
+        "id": species_id,
+        "name": f"species{species_id}",
+        "names": _names(f"ポケモン{species_id}", f"Species{species_id}"),
+        "varieties": varieties,
+    }
+
+
+def build_pokemon(base_url: str, pokemon_id: int) -> Dict:
+    """ポケモンデータ（/pokemon/{id}）を生成する"""
+    is_alt = pokemon_id > ALT_FORM_ID_OFFSET
+    species_id = pokemon_id - ALT_FORM_ID_OFFSET if is_alt else pokemon_id
+    name = f"species{species_id}-mega" if is_alt else f"species{species_id}"
+
+    type_ids = [species_id % len(TYPE_NAMES) + 1, (species_id * 7 + 3) % len(TYPE_NAMES) + 1]
+    if type_ids[0] == type_ids[1]:
+        type_ids = type_ids[:1]
+    ability_ids = [species_id % ABILITY_COUNT + 1, (species_id * 3 + 11) % ABILITY_COUNT + 1]
+
+    moves = []
+    for i in range(MOVES_PER_POKEMON):
+        move_id = (species_id * 13 + i * 7) % MOVE_COUNT + 1
+        groups = [vg for j, vg in enumerate(VERSION_GROUPS) if (move_id + j) % 4 != 0]
+        moves.append({
+            "move": {"name": f"move-{move_id}", "url": f"{base_url}/move/{move_id}/"},
+            "version_group_details": [
+                {"level_learned_at": 0, "version_group": {"name": vg, "url": ""}} for vg in groups
+            ]
+        })
+    # 同じ技が重複しないようにする（実APIと同様）
+    seen = set()
+    moves = [m for m in moves if not (m['move']['name'] in seen or seen.add(m['move']['name']))]
+
+    stat_names = ['hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed']
+    return {
+        "id": pokemon_id,
+        "name": name,
+        "weight": 100 + species_id,
+        "height": 10 + species_id % 20,
+        "types": [
+            {"slot": slot, "type": {"name": TYPE_NAMES[t - 1], "url": f"{base_url}/type/{t}/"}}
+            for slot, t in enumerate(type_ids, 1)
+        ],
+        "abilities": [
+            {"is_hidden": i == 1, "slot": i + 1,
+             "ability": {"name": f"ability-{a}", "url": f"{base_url}/ability/{a}/"}}
+            for i, a in enumerate(ability_ids)
+        ],
+        "stats": [
+            {"base_stat": 40 + (species_id * (k + 3)) % 100, "stat": {"name": s}}
+            for k, s in enumerate(stat_names)
+        ],
+        "moves": moves,
+        "sprites": {
+            "front_default": f"https://example.invalid/sprites/{pokemon_id}.png",
+            "versions": {"generation-v": {"black-white": {"animated": {
+                "front_default": f"https://example.invalid/sprites/animated/{pokemon_id}.gif"
+            }}}}
+        },
+    }
+
+
+def build_named_resource(kind: str, resource_id: int) -> Optional[Dict]:
+    """技・タイプ・特性（/move, /type, /ability）を生成する"""
+    if kind == 'move' and 1 <= resource_id <= MOVE_COUNT:
+        en, ja = f"move-{resource_id}", f"わざ{resource_id}"
+    elif kind == 'type' and 1 <= resource_id <= len(TYPE_NAMES):
+        en, ja = TYPE_NAMES[resource_id - 1], f"タイプ{resource_id}"
+    elif kind == 'ability' and 1 <= resource_id <= ABILITY_COUNT:
+        en, ja = f"ability-{resource_id}", f"とくせい{resource_id}"
+    else:
+        return None
+    return {"id": resource_id, "name": en, "names": _names(ja, en)}
+
+
+# =============================================================================
+# HTTPサーバー
+# =============================================================================
+
+_PATH_PATTERN = re.compile(r'^/api/v2/(pokemon-species|pokemon|move|type|ability)/(\d+)/?$')
+_LIST_PATTERN = re.compile(r'^/api/v2/(move|type|ability)/?$')
+_LIST_SIZES = {'move': MOVE_COUNT, 'type': len(TYPE_NAMES), 'ability': ABILITY_COUNT}
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """PokeAPI形式のJSONを返すリクエストハンドラ"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server: 'StubServer' = self.server
+        if server.latency_s > 0:
+            time.sleep(server.latency_s)
+
+        error_status = server.pick_error_status()
+        if error_status is not None:
+            self.send_injected_error(error_status)
+            return
+
+        path, _, query = self.path.partition('?')
+        payload = self.build_payload(path, parse_qs(query))
+        if payload is None:
+            self.send_json(404, {"detail": "Not found."})
+        else:
+            self.send_json(200, payload, conditional=True)
+
+    def send_injected_error(self, status: int) -> None:
+        """注入した 429（Retry-After付き）/ 503 を返す"""
+        if status == 429:
+            self.send_json(429, {"detail": "Too many requests."},
+                           extra_headers={'Retry-After': THROTTLE_RETRY_AFTER})
+        else:
+            self.send_json(503, {"detail": "Service unavailable."})
+
+    def build_payload(self, path: str, query: Dict[str, list]) -> Optional[Dict]:
+        server: 'StubServer' = self.server
+        list_match = _LIST_PATTERN.match(path)
+        if list_match:
+            return self.build_list(list_match.group(1), query)
+        match = _PATH_PATTERN.match(path)
+        if not match:
+            return None
+        kind, resource_id = match.group(1), int(match.group(2))
+        if kind == 'pokemon-species':
+            if not 1 <= resource_id <= server.species_count:
+                return None
+            return build_species(server.base_url, resource_id)
+        if kind == 'pokemon':
+            species_id = resource_id - ALT_FORM_ID_OFFSET if resource_id > ALT_FORM_ID_OFFSET else resource_id
+            if not 1 <= species_id <= server.species_count:
+                return None
+            return build_pokemon(server.base_url, resource_id)
+        return build_named_resource(kind, resource_id)
+
+    def build_list(self, kind: str, query: Dict[str, list]) -> Dict:
+        """一覧エンドポイントの1ページを生成する"""
+        server: 'StubServer' = self.server
+        limit = int(query.get('limit', ['20'])[0])
+        offset = int(query.get('offset', ['0'])[0])
+        count = _LIST_SIZES[kind]
+        results = []
+        for resource_id in range(offset + 1, min(count, offset + limit) + 1):
+            resource = build_named_resource(kind, resource_id)
+            results.append({"name": resource['name'], "url": f"{server.base_url}/{kind}/{resource_id}/"})
+        next_url = (f"{server.base_url}/{kind}?offset={offset + limit}&limit={limit}"
+                    if offset + limit < count else None)
+        return {"count": count, "next": next_url, "previous": None, "results": results}
+
+    def send_json(self, status: int, payload: Dict,
+                  extra_headers: Optional[Dict[str, str]] = None,
+                  conditional: bool = False) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        extra_headers = dict(extra_headers or {})
+        if conditional:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            extra_headers['ETag'] = etag
+            extra_headers['Last-Modified'] = LAST_MODIFIED
+            if self.headers.get('If-None-Match') == etag:
+                status, body = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in extra_headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.stats_lock:
+            self.server.request_count += 1
+
+
+class StubServer(ThreadingHTTPServer):
+    """スタブサーバー本体（設定値とリクエスト数を保持する）"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], species_count: int, latency_ms: float,
+                 error_rate: float = DEFAULT_ERROR_RATE, seed: int = 0,
+                 handler_class: type = StubRequestHandler):
+        super().__init__(address, handler_class)
+        self.species_count = species_count
+        self.latency_s = latency_ms / 1000
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.base_url = f"http://{self.server_address[0]}:{self.server_address[1]}{API_PREFIX}"
+        self.request_count = 0
+        self.stats_lock = threading.Lock()
+
+    def pick_error_status(self) -> Optional[int]:
+        """error_rate の確率で 429 または 503 を選ぶ（乱数は seed で再現可能）"""
+        if self.error_rate <= 0:
+            return None
+        with self.stats_lock:
+            if self._random.random() >= self.error_rate:
+                return None
+            return 429 if self._random.random() < 0.5 else 503
+
+
+def start_stub_server(port: int = 0, species_count: int = DEFAULT_SPECIES_COUNT,
+                      latency_ms: float = DEFAULT_LATENCY_MS,
+                      error_rate: float = DEFAULT_ERROR_RATE, seed: int = 0) -> StubServer:
+    """
+    スタブサーバーをバックグラウンドスレッドで起動する
+
+    Args:
+        port: 待ち受けポート（0なら空きポートを自動選択）
+        species_count: 存在させる種族数（それ以降の図鑑番号は404）
+        latency_ms: 応答ごとの遅延（ミリ秒）
+        error_rate: 429/503 を返す割合（0〜1）
+        seed: エラー注入の乱数シード
+
+    Returns:
+        起動済みのサーバー（base_url 属性にAPIのベースURL、終了は shutdown()）
+    """
+    server = StubServer(('127.0.0.1', port), species_count, latency_ms, error_rate, seed)
+    thread = threading.Thread(target=server.serve_forever, name='pokeapi-stub', daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='PokeAPIを模倣するローカルスタブサーバーを起動します')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'待ち受けポート（デフォルト: {DEFAULT_PORT}）')
+    parser.add_argument('--species', type=int, default=DEFAULT_SPECIES_COUNT,
+                        help=f'存在させる種族数（デフォルト: {DEFAULT_SPECIES_COUNT}）')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help=f'応答ごとの遅延ミリ秒（デフォルト: {DEFAULT_LATENCY_MS}）')
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_ERROR_RATE,
+                        help='429/503 を返す割合 0〜1（デフォルト: 0）')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='エラー注入の乱数シード（デフォルト: 0）')
+    args = parser.parse_args()
+
+    server = StubServer(('127.0.0.1', args.port), args.species, args.latency_ms,
+                        args.error_rate, args.seed)
+    print(f"スタブサーバーを起動しました: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n停止しました。")
@@ -0,0 +1,318 @@
+"""
+ポケモン・技・持ち物・使用率データの共通読み込みと索引
+
+各スクリプトがJSONを個別に読み込んで全件を線形に走査する代わりに、このモジュールで
+1回だけ読み込み、索引（名前・図鑑番号・タイプ・特性・覚える技・基本種 → フォルム）から引く。
+
+- 各ファイルは最初に使われた時に読み込む（使わないデータは読み込まない）
+- フォルムの索引は索引キャッシュファイルに保存し、pokemon_data_all.json のSHA-256が
+  変わるまで再利用する（索引だけで答えられる問い合わせは全ポケモンデータを読み込まない）
+- 個々のフォルムは、最新のパック（pokemon_pack.py）があればそこから必要な分だけ読む
+
+使用方法:
+    data = PokeData()
+    data.form('リザードン')                  # 名前 → フォルム
+    data.forms_by_number(6)                  # 図鑑番号 → フォルム一覧
+    data.forms_by_type('ほのお')             # タイプ → フォルム一覧
+    data.forms_by_ability('もうか')          # 特性 → フォルム一覧
+    data.learner_names('じしん')             # 技 → 覚えるフォルム名一覧
+    data.forms_by_base_species('リザードン') # 基本種 → フォルム一覧
+    data.move('じしん'), data.item('オボンののみ'), data.trend('ディンルー')
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Set
+
+from pokemon_pack import PACK_FILE, PokemonPack, file_sha256
+
+# プロジェクトルート（backend/script の2階層上）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(BASE_DIR, 'frontend', 'data')
+POKEMON_DATA_FILE = os.path.join(DATA_DIR, 'pokemon_data_all.json')
+MOVES_DATA_FILE = os.path.join(DATA_DIR, 'moves_data.json')
+ITEMS_DATA_FILE = os.path.join(DATA_DIR, 'items_data.json')
+TREND_DATA_FILE = os.path.join(DATA_DIR, 'pokemon_sv_season_trend.json')
+INDEX_CACHE_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'pokedata_index_cache.json')
+
+INDEX_VERSION = 1
+# 索引名 → フォルムから索引キーを取り出す関数
+INDEX_KEYS = {
+    'by_number': lambda form: [str(form.get('pokedex_number', 0))],
+    'by_type': lambda form: [t['name'] for t in form.get('types', [])],
+    'by_ability': lambda form: [a['name'] for a in form.get('abilities', [])],
+    'by_move': lambda form: form.get('moves', []),
+    'by_base_species': lambda form: [form.get('base_species', form.get('pokedex_name'))],
+}
+# 性格 → (上がる能力, 下がる能力)。能力は A/B/C/D/S（無補正の性格は含まない）
+NATURE_EFFECTS = {
+    'さみしがり': ('A', 'B'), 'ゆうかん': ('A', 'S'), 'いじっぱり': ('A', 'C'), 'やんちゃ': ('A', 'D'),
+    'ずぶとい': ('B', 'A'), 'のんき': ('B', 'S'), 'わんぱく': ('B', 'C'), 'のうてんき': ('B', 'D'),
+    'おくびょう': ('S', 'A'), 'せっかち': ('S', 'B'), 'ようき': ('S', 'C'), 'むじゃき': ('S', 'D'),
+    'ひかえめ': ('C', 'A'), 'おっとり': ('C', 'B'), 'れいせい': ('C', 'S'), 'うっかりや': ('C', 'D'),
+    'おだやか': ('D', 'A'), 'おとなしい': ('D', 'B'), 'なまいき': ('D', 'S'), 'しんちょう': ('D', 'C'),
+}
+
+
+def load_json(path: str):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} が見つかりません。")
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_indexes(forms: List[Dict]) -> Dict:
+    """
+    フォルムのリストから索引を作る
+
+    Returns:
+        {"names": [フォルム名...], "by_number": {"6": [位置...]}, "by_type": {...}, ...}
+        （位置は pokemon_data_all.json 内のフォルムの順番）
+    """
+    indexes = {'names': [form.get('pokedex_name', 'Unknown') for form in forms]}
+    for index_name, keys_of in INDEX_KEYS.items():
+        index: Dict[str, List[int]] = {}
+        for position, form in enumerate(forms):
+            for key in keys_of(form):
+                positions = index.setdefault(key, [])
+                # 同じフォルムに同じキーが重複していても1回だけ数える
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+        indexes[index_name] = index
+    return indexes
+
+
+class PokeData:
+    """
+    データファイルの遅延読み込みと索引による問い合わせ
+
+    Args:
+        pokemon_file: 全ポケモンデータ（JSON）
+        cache_file: 索引キャッシュ（None なら保存しない）
+        pack_file: パック（元JSONと同じ内容のときだけ使う。None なら使わない）
+    """
+
+    def __init__(self, pokemon_file: str = POKEMON_DATA_FILE, moves_file: str = MOVES_DATA_FILE,
+                 items_file: str = ITEMS_DATA_FILE, trend_file: str = TREND_DATA_FILE,
+                 cache_file: Optional[str] = INDEX_CACHE_FILE, pack_file: Optional[str] = PACK_FILE):
+        self.pokemon_file = pokemon_file
+        self.moves_file = moves_file
+        self.items_file = items_file
+        self.trend_file = trend_file
+        self.cache_file = cache_file
+        self.pack_file = pack_file
+
+        self._forms: Optional[List[Dict]] = None
+        self._pack: Optional[PokemonPack] = None
+        self._pack_checked = False
+        self._source_sha256: Optional[str] = None
+        self._indexes: Optional[Dict] = None
+        self._name_index: Optional[Dict[str, int]] = None
+        self._moves: Optional[Dict[str, Dict]] = None
+        self._items: Optional[Dict[str, Dict]] = None
+        self._trend: Optional[Dict[str, Dict]] = None
+
+    # -------------------------------------------------------------------------
+    # 読み込み
+    # -------------------------------------------------------------------------
+
+    @property
+    def source_sha256(self) -> str:
+        if self._source_sha256 is None:
+            if not os.path.exists(self.pokemon_file):
+                raise FileNotFoundError(f"{self.pokemon_file} が見つかりません。")
+            self._source_sha256 = file_sha256(self.pokemon_file).hex()
+        return self._source_sha256
+
+    @property
+    def forms(self) -> List[Dict]:
+        """全フォルム（初回アクセス時に pokemon_data_all.json を読み込む）"""
+        if self._forms is None:
+            self._forms = load_json(self.pokemon_file)
+        return self._forms
+
+    @property
+    def moves(self) -> Dict[str, Dict]:
+        if self._moves is None:
+            self._moves = load_json(self.moves_file)
+        return self._moves
+
+    @property
+    def items(self) -> Dict[str, Dict]:
+        if self._items is None:
+            self._items = load_json(self.items_file)
+        return self._items
+
+    @property
+    def trends(self) -> Dict[str, Dict]:
+        """使用率データ（ポケモン名 → 順位・技・持ち物などのエントリ）"""
+        if self._trend is None:
+            self._trend = {entry['name']: entry for entry in load_json(self.trend_file)}
+        return self._trend
+
+    def _open_pack(self) -> Optional[PokemonPack]:
+        """元JSONと同じ内容のパックがあれば開く"""
+        if not self._pack_checked:
+            self._pack_checked = True
+            if self.pack_file and os.path.exists(self.pack_file):
+                try:
+                    pack = PokemonPack(self.pack_file)
+                except ValueError:
+                    return None
+                if pack.source_sha256 == self.source_sha256:
+                    self._pack = pack
+                else:
+                    pack.close()
+        return self._pack
+
+    def form_at(self, position: int) -> Dict:
+        """pokemon_data_all.json 内の位置からフォルムを返す"""
+        if self._forms is None and self._open_pack() is not None:
+            return self._pack[position]
+        return self.forms[position]
+
+    def close(self) -> None:
+        if self._pack is not None:
+            self._pack.close()
+            self._pack = None
+
+    # -------------------------------------------------------------------------
+    # 索引
+    # -------------------------------------------------------------------------
+
+    @property
+    def indexes(self) -> Dict:
+        """索引（キャッシュが元JSONと同じ内容なら読み込み、違えば作り直して保存する）"""
+        if self._indexes is None:
+            self._indexes = self._load_cached_indexes()
+            if self._indexes is None:
+                self._indexes = build_indexes(self.forms)
+                self._save_cached_indexes()
+        return self._indexes
+
+    def _load_cached_indexes(self) -> Optional[Dict]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if cache.get('version') != INDEX_VERSION or cache.get('source_sha256') != self.source_sha256:
+            return None
+        return cache['indexes']
+
+    def _save_cached_indexes(self) -> None:
+        if not self.cache_file:
+            return
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = self.cache_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'source_sha256': self.source_sha256,
+                       'indexes': self._indexes}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, self.cache_file)
+
+    def _positions(self, index_name: str, key) -> List[int]:
+        return self.indexes[index_name].get(str(key) if index_name == 'by_number' else key, [])
+
+    def _forms_at(self, positions: List[int]) -> List[Dict]:
+        return [self.form_at(position) for position in positions]
+
+    # -------------------------------------------------------------------------
+    # 問い合わせ
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.indexes['names'])
+
+    def names(self) -> List[str]:
+        return list(self.indexes['names'])
+
+    def position_of(self, pokedex_name: str) -> Optional[int]:
+        """フォルム名から位置を引く（同名が複数あれば最初のもの）"""
+        if self._name_index is None:
+            self._name_index = {}
+            for position, name in enumerate(self.indexes['names']):
+                self._name_index.setdefault(name, position)
+        return self._name_index.get(pokedex_name)
+
+    def form(self, pokedex_name: str) -> Optional[Dict]:
+        position = self.position_of(pokedex_name)
+        return None if position is None else self.form_at(position)
+
+    def forms_by_number(self, pokedex_number: int) -> List[Dict]:
+        return self._forms_at(self._positions('by_number', pokedex_number))
+
+    def forms_by_type(self, type_name: str) -> List[Dict]:
+        return self._forms_at(self._positions('by_type', type_name))
+
+    def forms_by_ability(self, ability_name: str) -> List[Dict]:
+        return self._forms_at(self._positions('by_ability', ability_name))
+
+    def forms_by_base_species(self, base_species: str) -> List[Dict]:
+        return self._forms_at(self._positions('by_base_species', base_species))
+
+    def learners(self, move_name: str) -> List[Dict]:
+        """技を覚えるフォルム一覧"""
+        return self._forms_at(self._positions('by_move', move_name))
+
+    def learner_names(self, move_name: str) -> List[str]:
+        """技を覚えるフォルム名一覧（索引だけで答える）"""
+        names = self.indexes['names']
+        return [names[position] for position in self._positions('by_move', move_name)]
+
+    def learned_moves(self) -> Set[str]:
+        """いずれかのフォルムが覚える技の集合"""
+        return set(self.indexes['by_move'])
+
+    def type_names(self) -> Set[str]:
+        """いずれかのフォルムが持つタイプ名の集合"""
+        return set(self.indexes['by_type'])
+
+    def type_positions(self, type_name: str) -> List[int]:
+        return list(self._positions('by_type', type_name))
+
+    def move(self, move_name: str) -> Optional[Dict]:
+        return self.moves.get(move_name)
+
+    def has_move(self, move_name: str) -> bool:
+        return move_name in self.moves
+
+    def item(self, item_name: str) -> Optional[Dict]:
+        return self.items.get(item_name)
+
+    def trend(self, pokemon_name: str) -> Optional[Dict]:
+        return self.trends.get(pokemon_name)
+
+    # -------------------------------------------------------------------------
+    # 保存
+    # -------------------------------------------------------------------------
+
+    def save_forms(self, output_file: Optional[str] = None) -> str:
+        """
+        フォルム（forms を変更した後の内容）を一時ファイル経由で保存する
+
+        元ファイルを上書きした場合は索引を作り直してキャッシュも更新する。
+
+        Returns:
+            保存先のパス
+        """
+        output_file = output_file or self.pokemon_file
+        directory = os.path.dirname(output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = output_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.forms, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, output_file)
+
+        if os.path.abspath(output_file) == os.path.abspath(self.pokemon_file):
+            self.close()
+            self._pack_checked = False
+            self._source_sha256 = None
+            self._name_index = None
+            self._indexes = build_indexes(self.forms)
+            self._save_cached_indexes()
+        return output_file
@@ -0,0 +1,498 @@
+"""
+pokemon_data_all.json をコンパクトなバイナリ（パック）に変換・読み込むモジュール
+
+JSONでは各フォルムが技名・タイプ名・特性名の文字列を繰り返し持つため、
+スクリプトのたびに 2MB 超のJSONを全件パースして大量の dict/str を作ることになる。
+パックでは文字列を1か所にまとめ（インターン）、レコードは整数IDで表す。
+読み込みは mmap + memoryview で行い、アクセスされたレコードだけをその場でデコードする。
+
+パック形式（リトルエンディアン）:
+    ヘッダ          マジック・バージョン・件数・元JSONのSHA-256・各セクションの位置
+    文字列テーブル  u32 オフセット配列（件数+1） + UTF-8 本体
+    技テーブル      u32 文字列ID（全フォルムの技の並び順と矛盾しない位相順）
+    タイプテーブル  u32 文字列ID
+    特性テーブル    u32 文字列ID
+    レコード        固定長（名前・画像URL・フォルム名・基本種・図鑑番号・フラグ・重さ・高さ・可変部の位置）
+    種族値          u16 × 6 の固定長配列（hp, attack, defense, special-attack, special-defense, speed）
+    可変部          タイプ（テーブルの番号・slot・タイプID）・特性・覚える技（技テーブル上のビットセット）・よく使う技
+
+使用方法:
+    python pokemon_pack.py                          # frontend/data/pokemon_data_all.json → backend/data/pokemon_data_all.pack
+    python pokemon_pack.py --export out.json        # パックからJSON（現在のスキーマ）を書き戻す
+    python pokemon_pack.py --verify                 # 元JSONとパックの内容が一致するか確認
+
+    with PokemonPack('backend/data/pokemon_data_all.pack') as pack:
+        pack.get('リザードン')['base_stats']
+        pack.moves(pack.index_of('リザードン'))
+"""
+
+import argparse
+import graphlib
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# プロジェクトルート（backend/script の2階層上）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_FILE = os.path.join(BASE_DIR, 'frontend', 'data', 'pokemon_data_all.json')
+PACK_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'pokemon_data_all.pack')
+
+MAGIC = b'PKMNPACK'
+PACK_VERSION = 2
+NO_STRING = 0xFFFFFFFF  # sprite_url が None
+NO_TYPE_ID = 0xFF      # types の id（type_table.py のタイプID）が無い
+
+# 現在のスキーマのキー順（エクスポート時もこの順で書き出す）
+FIELD_ORDER = ('pokedex_name', 'sprite_url', 'pokedex_number', 'weight_kg', 'height_m', 'is_default',
+               'form_name', 'base_species', 'types', 'base_stats', 'abilities', 'moves', 'commonly_use')
+STAT_KEYS = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+
+# マジック, バージョン, 予約, レコード数, 文字列数, 技数, タイプ数, 特性数, 元JSONのSHA-256,
+# 文字列オフセット, 文字列本体, 技, タイプ, 特性, レコード, 種族値, 可変部 の各セクション位置
+HEADER = struct.Struct('<8sHHIIIHH32s8I')
+# 名前, 画像URL, フォルム名, 基本種, 図鑑番号, フラグ, 予約, 重さ, 高さ, 可変部の位置, 可変部の長さ
+RECORD = struct.Struct('<IIIIHBBddII')
+STATS = struct.Struct('<6H')
+
+FLAG_DEFAULT = 0x01
+MOVES_BITSET = 0   # 技テーブル順のビットセット
+MOVES_EXPLICIT = 1  # 位相順で表せないときの技インデックス列（u16）
+
+
+def file_sha256(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+# =============================================================================
+# 書き出し
+# =============================================================================
+
+class _StringTable:
+    """文字列のインターン（初出順に連番を振る）"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    def serialize(self) -> Tuple[bytes, bytes]:
+        offsets = [0]
+        blob = bytearray()
+        for value in self.strings:
+            blob += value.encode('utf-8')
+            offsets.append(len(blob))
+        return struct.pack(f'<{len(offsets)}I', *offsets), bytes(blob)
+
+
+def order_move_table(pokemon_data: List[Dict]) -> List[str]:
+    """
+    全フォルムの技の並びと矛盾しない技の順序（位相順）を求める
+
+    各フォルムの技リストの隣り合う技を辺としたグラフを位相ソートする。
+    この順の技テーブル上でビットセットを展開すると、各フォルムの元の技の並び順がそのまま得られる。
+    閉路がある（並びが矛盾する）場合は、矛盾を生んだフォルムの辺を除いて並べ直す。
+    """
+    sorter_edges: Dict[str, List[str]] = {}
+    for form in pokemon_data:
+        moves = form.get('moves', [])
+        for move in moves:
+            sorter_edges.setdefault(move, [])
+        for before, after in zip(moves, moves[1:]):
+            sorter_edges[after].append(before)
+    try:
+        return list(graphlib.TopologicalSorter(sorter_edges).static_order())
+    except graphlib.CycleError:
+        pass
+
+    # 矛盾がある場合: フォルムを1つずつ加え、閉路ができるフォルムは辺を加えない
+    edges: Dict[str, List[str]] = {move: [] for move in sorter_edges}
+    for form in pokemon_data:
+        moves = form.get('moves', [])
+        trial = {move: list(preds) for move, preds in edges.items()}
+        for before, after in zip(moves, moves[1:]):
+            trial[after].append(before)
+        try:
+            graphlib.TopologicalSorter(trial).prepare()
+        except graphlib.CycleError:
+            continue
+        edges = trial
+    return list(graphlib.TopologicalSorter(edges).static_order())
+
+
+def _encode_moves(moves: List[str], move_index: Dict[str, int]) -> bytes:
+    """覚える技を可変部のバイト列にする（技テーブル順に並んでいればビットセット）"""
+    indices = [move_index[move] for move in moves]
+    if all(a < b for a, b in zip(indices, indices[1:])):
+        bits = 0
+        for index in indices:
+            bits |= 1 << index
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+        return struct.pack('<BH', MOVES_BITSET, len(data)) + data
+    return struct.pack(f'<BH{len(indices)}H', MOVES_EXPLICIT, len(indices), *indices)
+
+
+def build_pack(data_file: str = DATA_FILE, pack_file: str = PACK_FILE) -> Dict[str, int]:
+    """
+    全ポケモンデータ（JSON）からパックを作る（一時ファイル経由で置き換える）
+
+    Returns:
+        統計情報（レコード数・文字列数・技数・出力サイズ）
+    """
+    with open(data_file, 'r', encoding='utf-8') as f:
+        pokemon_data = json.load(f)
+    source_sha256 = file_sha256(data_file)
+
+    strings = _StringTable()
+    move_table = order_move_table(pokemon_data)
+    move_index = {move: index for index, move in enumerate(move_table)}
+    type_ids: Dict[str, int] = {}
+    ability_ids: Dict[str, int] = {}
+
+    records = bytearray()
+    stats = bytearray()
+    variable = bytearray()
+    for form in pokemon_data:
+        if tuple(form.keys()) != FIELD_ORDER or tuple(form['base_stats'].keys()) != STAT_KEYS:
+            raise ValueError(f"スキーマが想定と異なります: {form.get('pokedex_name')}")
+
+        part = bytearray(struct.pack('<B', len(form['types'])))
+        for type_info in form['types']:
+            type_id = type_ids.setdefault(type_info['name'], len(type_ids))
+            table_id = type_info.get('id')
+            part += struct.pack('<BBB', type_id, type_info['slot'], NO_TYPE_ID if table_id is None else table_id)
+        part += struct.pack('<B', len(form['abilities']))
+        for ability in form['abilities']:
+            ability_id = ability_ids.setdefault(ability['name'], len(ability_ids))
+            part += struct.pack('<HB', ability_id, ability['is_hidden'])
+        part += _encode_moves(form['moves'], move_index)
+        commonly_use = [strings.intern(move) for move in form['commonly_use']]
+        part += struct.pack(f'<H{len(commonly_use)}I', len(commonly_use), *commonly_use)
+
+        records += RECORD.pack(
+            strings.intern(form['pokedex_name']), strings.intern(form['sprite_url']),
+            strings.intern(form['form_name']), strings.intern(form['base_species']),
+            form['pokedex_number'], FLAG_DEFAULT if form['is_default'] else 0, 0,
+            form['weight_kg'], form['height_m'], len(variable), len(part))
+        stats += STATS.pack(*(form['base_stats'][key] for key in STAT_KEYS))
+        variable += part
+
+    move_sids = [strings.intern(move) for move in move_table]
+    type_sids = [strings.intern(name) for name in type_ids]
+    ability_sids = [strings.intern(name) for name in ability_ids]
+    string_offsets, string_blob = strings.serialize()
+
+    sections = [
+        string_offsets,
+        string_blob,
+        struct.pack(f'<{len(move_sids)}I', *move_sids),
+        struct.pack(f'<{len(type_sids)}I', *type_sids),
+        struct.pack(f'<{len(ability_sids)}I', *ability_sids),
+        bytes(records),
+        bytes(stats),
+        bytes(variable),
+    ]
+    positions = []
+    body = bytearray()
+    for section in sections:
+        body += b'\0' * (-(HEADER.size + len(body)) % 4)  # 各セクションを4バイト境界にそろえる
+        positions.append(HEADER.size + len(body))
+        body += section
+    header = HEADER.pack(MAGIC, PACK_VERSION, 0, len(pokemon_data), len(strings.strings),
+                         len(move_table), len(type_ids), len(ability_ids), source_sha256, *positions)
+
+    directory = os.path.dirname(pack_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = pack_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_file, pack_file)
+
+    return {
+        'records': len(pokemon_data),
+        'strings': len(strings.strings),
+        'moves': len(move_table),
+        'size': len(header) + len(body),
+    }
+
+
+# =============================================================================
+# 読み込み
+# =============================================================================
+
+class PokemonPack:
+    """
+    パックを mmap で開き、レコードを必要になった時にデコードする
+
+    文字列は参照された時に1回だけデコードしてキャッシュする。
+    名前→インデックスの索引は最初に index_of()/get() を呼んだ時に作る。
+    """
+
+    def __init__(self, path: str = PACK_FILE):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (magic, version, _, self.record_count, self.string_count, self.move_count,
+         self.type_count, self.ability_count, source_sha256, *positions) = HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} はポケモンデータのパックではありません")
+        if version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"未対応のパック形式です: {version}")
+        self.source_sha256 = source_sha256.hex()
+        (self._string_offsets, self._string_blob, self._moves_pos, self._types_pos,
+         self._abilities_pos, self._records_pos, self._stats_pos, self._variable_pos) = positions
+
+        # 技・タイプ・特性のテーブルは小さいので文字列IDだけ先に展開しておく
+        self._move_sids = struct.unpack_from(f'<{self.move_count}I', self._view, self._moves_pos)
+        self._type_sids = struct.unpack_from(f'<{self.type_count}I', self._view, self._types_pos)
+        self._ability_sids = struct.unpack_from(f'<{self.ability_count}I', self._view, self._abilities_pos)
+        self._strings: List[Optional[str]] = [None] * self.string_count
+        self._name_index: Optional[Dict[str, int]] = None
+
+    # -------------------------------------------------------------------------
+    # 基本操作
+    # -------------------------------------------------------------------------
+
+    def close(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._mmap.close()
+            self._file.close()
+
+    def __enter__(self) -> 'PokemonPack':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def __getitem__(self, index: int) -> Dict:
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError(index)
+        return self._decode_record(index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(self.record_count):
+            yield self._decode_record(index)
+
+    def string(self, sid: int) -> Optional[str]:
+        if sid == NO_STRING:
+            return None
+        value = self._strings[sid]
+        if value is None:
+            start, end = struct.unpack_from('<2I', self._view, self._string_offsets + sid * 4)
+            value = self._strings[sid] = str(self._view[self._string_blob + start:self._string_blob + end],
+                                             'utf-8')
+        return value
+
+    @property
+    def move_table(self) -> List[str]:
+        """技テーブル（ビットセットのビット位置 → 技名）"""
+        return [self.string(sid) for sid in self._move_sids]
+
+    # -------------------------------------------------------------------------
+    # レコード単位のアクセス（必要な部分だけデコードする）
+    # -------------------------------------------------------------------------
+
+    def _record(self, index: int) -> tuple:
+        return RECORD.unpack_from(self._view, self._records_pos + index * RECORD.size)
+
+    def name(self, index: int) -> str:
+        return self.string(self._record(index)[0])
+
+    def names(self) -> List[str]:
+        return [self.name(i) for i in range(self.record_count)]
+
+    def index_of(self, pokedex_name: str) -> Optional[int]:
+        """名前からレコード位置を引く（同名が複数あれば最初のもの）"""
+        if self._name_index is None:
+            self._name_index = {}
+            for i in range(self.record_count):
+                self._name_index.setdefault(self.name(i), i)
+        return self._name_index.get(pokedex_name)
+
+    def get(self, pokedex_name: str) -> Optional[Dict]:
+        index = self.index_of(pokedex_name)
+        return None if index is None else self._decode_record(index)
+
+    def base_stats(self, index: int) -> Dict[str, int]:
+        values = STATS.unpack_from(self._view, self._stats_pos + index * STATS.size)
+        return dict(zip(STAT_KEYS, values))
+
+    def _variable(self, index: int) -> Tuple[List[Dict], List[Dict], int]:
+        """タイプ・特性をデコードし、技の部分の開始位置を返す"""
+        offset = self._variable_pos + self._record(index)[9]
+        view = self._view
+        types = []
+        (count,) = struct.unpack_from('<B', view, offset)
+        offset += 1
+        for _ in range(count):
+            type_id, slot, table_id = struct.unpack_from('<BBB', view, offset)
+            type_info = {'name': self.string(self._type_sids[type_id]), 'slot': slot}
+            if table_id != NO_TYPE_ID:
+                type_info['id'] = table_id
+            types.append(type_info)
+            offset += 3
+        abilities = []
+        (count,) = struct.unpack_from('<B', view, offset)
+        offset += 1
+        for _ in range(count):
+            ability_id, is_hidden = struct.unpack_from('<HB', view, offset)
+            abilities.append({'name': self.string(self._ability_sids[ability_id]),
+                              'is_hidden': bool(is_hidden)})
+            offset += 3
+        return types, abilities, offset
+
+    def _move_indices(self, offset: int) -> Tuple[List[int], int]:
+        mode, length = struct.unpack_from('<BH', self._view, offset)
+        offset += 3
+        if mode == MOVES_EXPLICIT:
+            return list(struct.unpack_from(f'<{length}H', self._view, offset)), offset + length * 2
+        bits = int.from_bytes(self._view[offset:offset + length], 'little')
+        indices = []
+        while bits:
+            low = bits & -bits
+            indices.append(low.bit_length() - 1)
+            bits ^= low
+        return indices, offset + length
+
+    def moves(self, index: int) -> List[str]:
+        """覚える技（元のJSONと同じ並び順）"""
+        _, _, offset = self._variable(index)
+        indices, _ = self._move_indices(offset)
+        return [self.string(self._move_sids[i]) for i in indices]
+
+    def _decode_record(self, index: int) -> Dict:
+        (name_sid, sprite_sid, form_sid, base_sid, number, flags, _,
+         weight, height, _, _) = self._record(index)
+        types, abilities, offset = self._variable(index)
+        indices, offset = self._move_indices(offset)
+        (count,) = struct.unpack_from('<H', self._view, offset)
+        commonly_use = struct.unpack_from(f'<{count}I', self._view, offset + 2)
+        return {
+            'pokedex_name': self.string(name_sid),
+            'sprite_url': self.string(sprite_sid),
+            'pokedex_number': number,
+            'weight_kg': weight,
+            'height_m': height,
+            'is_default': bool(flags & FLAG_DEFAULT),
+            'form_name': self.string(form_sid),
+            'base_species': self.string(base_sid),
+            'types': types,
+            'base_stats': self.base_stats(index),
+            'abilities': abilities,
+            'moves': [self.string(self._move_sids[i]) for i in indices],
+            'commonly_use': [self.string(sid) for sid in commonly_use],
+        }
+
+    def to_list(self) -> List[Dict]:
+        """全レコードを現在のJSONスキーマのリストに戻す"""
+        return list(self)
+
+
+# =============================================================================
+# 書き戻し・確認
+# =============================================================================
+
+def export_json(pack_file: str, output_file: str) -> int:
+    """パックを現在のスキーマのJSON（indent=2, ensure_ascii=False）に書き戻す"""
+    with PokemonPack(pack_file) as pack:
+        pokemon_data = pack.to_list()
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(pokemon_data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, output_file)
+    return len(pokemon_data)
+
+
+def verify_pack(data_file: str, pack_file: str) -> List[str]:
+    """
+    元JSONとパックの内容を比較する
+
+    Returns:
+        不一致の説明のリスト（空なら一致）
+    """
+    with open(data_file, 'r', encoding='utf-8') as f:
+        pokemon_data = json.load(f)
+    problems = []
+    with PokemonPack(pack_file) as pack:
+        if pack.source_sha256 != file_sha256(data_file).hex():
+            problems.append("パック作成後に元JSONが更新されています（再作成してください）")
+        if len(pack) != len(pokemon_data):
+            problems.append(f"件数が異なります: JSON {len(pokemon_data)}件 / パック {len(pack)}件")
+        for index, (original, decoded) in enumerate(zip(pokemon_data, pack)):
+            if original != decoded or list(original) != list(decoded):
+                problems.append(f"{index}: {original.get('pokedex_name')} の内容が異なります")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='pokemon_data_all.json をバイナリのパックに変換します（書き戻し・確認も可能）'
+    )
+    parser.add_argument('--input', type=str, default=DATA_FILE,
+                        help=f'元の全ポケモンデータ（デフォルト: {DATA_FILE}）')
+    parser.add_argument('--pack', type=str, default=PACK_FILE,
+                        help=f'パックファイル（デフォルト: {PACK_FILE}）')
+    parser.add_argument('--export', type=str, default=None,
+                        help='パックを作らずに、既存のパックからJSONを書き戻す出力先')
+    parser.add_argument('--verify', action='store_true',
+                        help='パックを作らずに、元JSONと既存のパックの内容を比較する')
+    args = parser.parse_args()
+
+    if args.export:
+        count = export_json(args.pack, args.export)
+        print(f"{args.export} に書き戻しました（{count}件）")
+        return 0
+
+    if args.verify:
+        problems = verify_pack(args.input, args.pack)
+        for problem in problems[:20]:
+            print(f"  - {problem}")
+        if problems:
+            print(f"不一致: {len(problems)}件")
+            return 1
+        print("✅ パックの内容は元JSONと一致しています")
+        return 0
+
+    start = time.perf_counter()
+    stats = build_pack(args.input, args.pack)
+    source_size = os.path.getsize(args.input)
+    print(f"{args.pack} を作成しました: {stats['records']}件, 文字列 {stats['strings']}個, "
+          f"技 {stats['moves']}個, {stats['size'] / 1024:.0f}KB"
+          f"（元JSON {source_size / 1024:.0f}KB の {stats['size'] / source_size:.1%}, "
+          f"{time.perf_counter() - start:.2f}秒）")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,123 @@
+"""
+PokeAPI呼び出し用のアダプティブなトークンバケット型レートリミッター
+
+機能:
+- 全リクエスト箇所で共有するトークンバケット（スレッドセーフ）
+- 正常応答ごとに許容レートを一定量ずつ引き上げ、429 で一定の割合だけ引き下げる（AIMD）
+- Retry-After ヘッダーを解釈し、指定時間は全スレッドの送信を止める
+- ジッター付き指数バックオフの待ち時間計算
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+# デフォルト設定
+DEFAULT_RATE = 20.0          # 初期レート（リクエスト/秒）
+DEFAULT_MIN_RATE = 1.0       # 引き下げ時の下限
+DEFAULT_MAX_RATE = 100.0     # 引き上げ時の上限
+DEFAULT_BURST = 10           # バケット容量（瞬間的に許容する連続リクエスト数）
+RAMP_UP_STEP = 0.25          # 正常応答1回ごとの引き上げ幅（リクエスト/秒）
+BACKOFF_FACTOR = 0.75        # 429 時の引き下げ倍率（散発的な429でレートが下限まで落ちないよう緩やかに）
+BACKOFF_COOLDOWN = 1.0       # 引き下げの最短間隔（秒）。同時に返ってきた429で何度も下げないため
+
+BACKOFF_BASE = 0.5           # バックオフの基準秒数
+BACKOFF_CAP = 30.0           # バックオフの上限秒数
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After ヘッダーの値を待ち秒数に変換する
+
+    秒数表記（"120"）とHTTP日付表記（"Wed, 21 Oct 2015 07:28:00 GMT"）の両方に対応。
+    解釈できない場合は None を返す。
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """
+    ジッター付き指数バックオフの待ち秒数を返す（Full Jitter方式）
+
+    Args:
+        attempt: 0始まりの再試行回数
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """
+    全スレッドで共有するトークンバケット
+
+    acquire() でトークンを1つ消費し、不足していれば補充されるまで待つ。
+    応答結果を on_success() / on_throttle() で報告すると、レートが自動調整される。
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, min_rate: float = DEFAULT_MIN_RATE,
+                 max_rate: float = DEFAULT_MAX_RATE, burst: int = DEFAULT_BURST):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.rate = min(max(rate, min_rate), self.max_rate)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_backoff = float('-inf')
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def acquire(self) -> None:
+        """トークンを1つ取得する（必要なら待機する）"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        """正常応答を報告する（レートを RAMP_UP_STEP だけ引き上げる）"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + RAMP_UP_STEP)
+
+    def on_throttle(self, retry_after: Optional[float] = None, reduce_rate: bool = True) -> None:
+        """
+        429/5xx・通信エラーを報告する
+
+        reduce_rate=True（429）ならレートを引き下げる。同時に送信中だったリクエストの
+        失敗で何段も下がらないよう、引き下げは BACKOFF_COOLDOWN 秒に1回までとする。
+        Retry-After が指定されていればその間は全スレッドの送信を止める。
+        """
+        with self._lock:
+            now = time.monotonic()
+            if reduce_rate and now - self._last_backoff >= BACKOFF_COOLDOWN:
+                self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+                self._last_backoff = now
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
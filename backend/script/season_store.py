@@ -0,0 +1,496 @@
+"""
+使用率データ（pokemon_sv_season_trend.json）を数値の列形式で複数シーズン分保存するストア
+
+pokemon_sv_season_trend.json は1シーズン分で、採用率が "85.9%" のような文字列、図鑑番号も文字列、
+ポケモンはフォルム名ではなく種族名（"ランドロス"）で入っている。このモジュールは
+
+- 採用率を数値（%、float32）の配列に変換する
+- 種族名を全ポケモンデータのフォルム（pokedex_name）に対応付ける
+  （完全一致・同じ基本種・同じ図鑑番号のフォルムのうち、エントリの技をいちばん多く覚えるもの）
+- フォルム・技・持ち物・性格・テラスタイプの名前を ID（名前表の位置）に置き換える
+- 取り込んだシーズンを、1つのストアファイル（numpy の .npz）に追記する
+
+ストアの列:
+    seasons / forms / moves / items / natures / teras     名前表（ID = 位置。シーズンは取り込んだ順）
+    entry_season, entry_form, entry_rank                   エントリ（シーズン × ポケモン）ごとの値
+    <分類>_offsets                                         エントリごとの範囲（CSR。entry i は offsets[i]:offsets[i+1]）
+    <分類>_ids, <分類>_rates                               名前ID と採用率（%）
+（分類は moves / items / natures / teras）
+
+(シーズン, フォルム) からエントリへの索引は読み込み時に numpy で作るので、問い合わせでJSONを読み直さない。
+
+使用方法:
+    python season_store.py --ingest ../../frontend/data/pokemon_sv_season_trend.json --season 2024-S15
+    python season_store.py --top moves --pokemon ディンルー --last 3
+    python season_store.py --delta 2024-S14 2024-S15
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from pokedata import PokeData, TREND_DATA_FILE
+
+# プロジェクトルート（backend/script の2階層上）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STORE_FILE = os.path.join(BASE_DIR, 'backend', 'data', 'season_store.npz')
+
+STORE_VERSION = 1
+CATEGORIES = ('moves', 'items', 'natures', 'teras')
+NAME_TABLES = ('seasons', 'forms') + CATEGORIES
+DEFAULT_TOP_N = 10
+
+
+def parse_rate(value) -> float:
+    """採用率 "85.9%"（または数値）→ 85.9。解釈できなければ NaN"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except ValueError:
+        return float('nan')
+
+
+def resolve_form(data: PokeData, name: str, pokedex_number=None,
+                 moves: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    使用率データの種族名をフォルム名（pokedex_name）に対応付ける
+
+    フォルム名と完全一致すればそれを使う。種族名（基本種）なら同じ基本種のフォルム、
+    どちらでもなければ同じ図鑑番号のフォルムを候補にする。
+    技（moves）があれば、覚える技の数がいちばん多い候補を選ぶ（キュレム + クロスサンダー → ブラックキュレム）。
+    同数なら 完全一致 → デフォルトのフォルム → 候補の順 で決める。
+    """
+    candidates = data.forms_by_base_species(name)
+    if not candidates:
+        if data.position_of(name) is not None:
+            return name
+        if pokedex_number not in (None, ''):
+            try:
+                candidates = data.forms_by_number(int(pokedex_number))
+            except ValueError:
+                candidates = []
+    if not candidates:
+        return None
+    wanted = set(moves or ())
+
+    def score(item):
+        position, form = item
+        learned = len(wanted.intersection(form.get('moves', []))) if wanted else 0
+        return (-learned, form['pokedex_name'] != name, not form.get('is_default'), position)
+
+    return min(enumerate(candidates), key=score)[1]['pokedex_name']
+
+
+def resolve_entry(data: PokeData, entry: Dict) -> Optional[str]:
+    """使用率データの1エントリ（name / pokedex_number / moves）→ フォルム名（resolve_form）"""
+    return resolve_form(data, entry.get('name', ''), entry.get('pokedex_number'),
+                        [move.get('name') for move in entry.get('moves', [])])
+
+
+class SeasonStore:
+    """
+    複数シーズンの使用率データ（列形式）
+
+    Args:
+        path: ストアファイル（無ければ空のストアとして作る）
+    """
+
+    def __init__(self, path: str = STORE_FILE):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy が必要です（pip install numpy）")
+        self.path = path
+        self.tables: Dict[str, List[str]] = {table: [] for table in NAME_TABLES}
+        self.entry_season = np.zeros(0, dtype=np.int32)
+        self.entry_form = np.zeros(0, dtype=np.int32)
+        self.entry_rank = np.zeros(0, dtype=np.int32)
+        self.offsets = {category: np.zeros(1, dtype=np.int64) for category in CATEGORIES}
+        self.ids = {category: np.zeros(0, dtype=np.int32) for category in CATEGORIES}
+        self.rates = {category: np.zeros(0, dtype=np.float32) for category in CATEGORIES}
+        self._ids_of: Dict[str, Dict[str, int]] = {}
+        self._index: Optional[Tuple['np.ndarray', 'np.ndarray']] = None
+        if path and os.path.exists(path):
+            self._load(path)
+
+    # -------------------------------------------------------------------------
+    # 読み込み・保存
+    # -------------------------------------------------------------------------
+
+    def _load(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as store:
+            if int(store['version']) != STORE_VERSION:
+                raise ValueError(f"未対応のストア形式です: {int(store['version'])}")
+            for table in NAME_TABLES:
+                self.tables[table] = store[table].tolist()
+            self.entry_season = store['entry_season']
+            self.entry_form = store['entry_form']
+            self.entry_rank = store['entry_rank']
+            for category in CATEGORIES:
+                self.offsets[category] = store[f'{category}_offsets']
+                self.ids[category] = store[f'{category}_ids']
+                self.rates[category] = store[f'{category}_rates']
+
+    def save(self, path: Optional[str] = None) -> str:
+        """一時ファイル経由で保存する"""
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        arrays = {'version': np.array(STORE_VERSION)}
+        for table in NAME_TABLES:
+            arrays[table] = np.array(self.tables[table], dtype=str)
+        arrays.update(entry_season=self.entry_season, entry_form=self.entry_form, entry_rank=self.entry_rank)
+        for category in CATEGORIES:
+            arrays[f'{category}_offsets'] = self.offsets[category]
+            arrays[f'{category}_ids'] = self.ids[category]
+            arrays[f'{category}_rates'] = self.rates[category]
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_file, path)
+        return path
+
+    # -------------------------------------------------------------------------
+    # 名前と ID
+    # -------------------------------------------------------------------------
+
+    def intern(self, table: str, name: str) -> int:
+        """名前の ID（無ければ名前表に追加する）"""
+        ids_of = self._ids_of.get(table)
+        if ids_of is None:
+            ids_of = self._ids_of[table] = {value: i for i, value in enumerate(self.tables[table])}
+        if name not in ids_of:
+            ids_of[name] = len(self.tables[table])
+            self.tables[table].append(name)
+        return ids_of[name]
+
+    def id_of(self, table: str, name: str) -> Optional[int]:
+        """名前の ID（名前表に無ければ None）"""
+        ids_of = self._ids_of.get(table)
+        if ids_of is None:
+            ids_of = self._ids_of[table] = {value: i for i, value in enumerate(self.tables[table])}
+        return ids_of.get(name)
+
+    @property
+    def seasons(self) -> List[str]:
+        return list(self.tables['seasons'])
+
+    def _season_ids(self, seasons: Optional[List[str]] = None, last: Optional[int] = None) -> List[int]:
+        if seasons is None:
+            ids = list(range(len(self.tables['seasons'])))
+            return ids[-last:] if last else ids
+        result = []
+        for season in seasons:
+            season_id = self.id_of('seasons', season)
+            if season_id is None:
+                raise KeyError(f"シーズン {season} はストアにありません")
+            result.append(season_id)
+        return result
+
+    # -------------------------------------------------------------------------
+    # 取り込み
+    # -------------------------------------------------------------------------
+
+    def ingest(self, entries: List[Dict], season: str, data: PokeData, replace: bool = False) -> Dict:
+        """
+        1シーズン分の使用率データ（pokemon_sv_season_trend.json の形式）を追加する
+
+        Args:
+            replace: 同じシーズンが既にあれば置き換える（False ならエラー）
+
+        Returns:
+            {"entries": 件数, "unresolved": [フォルムに対応付けられなかった名前],
+             "duplicates": [同じフォルムが2回目以降に出てきた名前（取り込まない）], "bad_rates": 解釈できない採用率の数}
+
+        Raises:
+            ValueError: シーズンが既にある（replace=False）
+        """
+        season_id = self.id_of('seasons', season)
+        if season_id is not None:
+            if not replace:
+                raise ValueError(f"シーズン {season} は取り込み済みです（置き換えるには --replace）")
+            self._drop_season(season_id)
+        else:
+            season_id = self.intern('seasons', season)
+
+        unresolved, duplicates = [], []
+        bad_rates = 0
+        forms, ranks = [], []
+        seen = set()
+        columns = {category: ([], [], []) for category in CATEGORIES}  # (件数, ID, 採用率)
+        for position, entry in enumerate(entries):
+            name = entry.get('name', '')
+            form_name = resolve_entry(data, entry)
+            if form_name is None:
+                unresolved.append(name)
+                form_name = name
+            form_id = self.intern('forms', form_name)
+            # (シーズン, フォルム) ごとに1エントリ（同じフォルムに対応するエントリが複数あれば上位のものを使う）
+            if form_id in seen:
+                duplicates.append(name)
+                continue
+            seen.add(form_id)
+            forms.append(form_id)
+            ranks.append(int(entry.get('rank', position + 1)))
+            for category in CATEGORIES:
+                counts, ids, rates = columns[category]
+                values = entry.get(category, [])
+                counts.append(len(values))
+                for value in values:
+                    rate = parse_rate(value.get('rate'))
+                    if rate != rate:
+                        bad_rates += 1
+                    ids.append(self.intern(category, value.get('name', '')))
+                    rates.append(rate)
+
+        self.entry_season = np.concatenate([self.entry_season, np.full(len(forms), season_id, dtype=np.int32)])
+        self.entry_form = np.concatenate([self.entry_form, np.array(forms, dtype=np.int32)])
+        self.entry_rank = np.concatenate([self.entry_rank, np.array(ranks, dtype=np.int32)])
+        for category in CATEGORIES:
+            counts, ids, rates = columns[category]
+            offsets = self.offsets[category]
+            self.offsets[category] = np.concatenate(
+                [offsets, offsets[-1] + np.cumsum(np.array(counts, dtype=np.int64))])
+            self.ids[category] = np.concatenate([self.ids[category], np.array(ids, dtype=np.int32)])
+            self.rates[category] = np.concatenate([self.rates[category], np.array(rates, dtype=np.float32)])
+        self._index = None
+        return {'entries': len(forms), 'unresolved': unresolved, 'duplicates': duplicates, 'bad_rates': bad_rates}
+
+    def _drop_season(self, season_id: int) -> None:
+        """シーズンのエントリを取り除く（名前表はそのまま）"""
+        keep = self.entry_season != season_id
+        for category in CATEGORIES:
+            counts = np.diff(self.offsets[category])
+            value_keep = np.repeat(keep, counts)
+            self.ids[category] = self.ids[category][value_keep]
+            self.rates[category] = self.rates[category][value_keep]
+            self.offsets[category] = np.concatenate([[0], np.cumsum(counts[keep])]).astype(np.int64)
+        self.entry_season = self.entry_season[keep]
+        self.entry_form = self.entry_form[keep]
+        self.entry_rank = self.entry_rank[keep]
+        self._index = None
+
+    # -------------------------------------------------------------------------
+    # 問い合わせ
+    # -------------------------------------------------------------------------
+
+    def _entry_index(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        """(シーズン, フォルム) のキー（昇順）とエントリ番号"""
+        if self._index is None:
+            keys = (self.entry_season.astype(np.int64) << 32) | self.entry_form.astype(np.int64)
+            order = np.argsort(keys, kind='stable')
+            self._index = (keys[order], order)
+        return self._index
+
+    def entries_of(self, form_name: str, season_ids: List[int]) -> 'np.ndarray':
+        """フォルムの、指定シーズンのエントリ番号（無いシーズンは含まない）"""
+        form_id = self.id_of('forms', form_name)
+        if form_id is None:
+            return np.zeros(0, dtype=np.int64)
+        keys, order = self._entry_index()
+        wanted = (np.array(season_ids, dtype=np.int64) << 32) | form_id
+        positions = np.searchsorted(keys, wanted)
+        found = positions < len(keys)
+        found[found] = keys[positions[found]] == wanted[found]
+        return order[positions[found]]
+
+    def _values(self, category: str, entries: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        """エントリ群の (名前ID, 採用率) を連結する"""
+        offsets = self.offsets[category]
+        if len(entries) == 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        slices = [np.arange(offsets[e], offsets[e + 1]) for e in entries]
+        positions = np.concatenate(slices)
+        return self.ids[category][positions], self.rates[category][positions]
+
+    def top(self, category: str, form_name: str, n: int = DEFAULT_TOP_N, last: Optional[int] = None,
+            seasons: Optional[List[str]] = None) -> List[Tuple[str, float, int]]:
+        """
+        フォルムの採用率上位（指定シーズンの平均。ランク外のシーズンは平均に含めない、
+        そのシーズンに載っていない名前は 0% として平均する）
+
+        Returns:
+            [(名前, 平均採用率, 載っていたシーズン数), ...]
+        """
+        entries = self.entries_of(form_name, self._season_ids(seasons, last))
+        ids, rates = self._values(category, entries)
+        if len(ids) == 0:
+            return []
+        size = len(self.tables[category])
+        totals = np.bincount(ids, weights=np.nan_to_num(rates), minlength=size)
+        appearances = np.bincount(ids, minlength=size)
+        means = totals / len(entries)
+        candidates = np.flatnonzero(appearances)
+        best = candidates[np.lexsort((candidates, -means[candidates]))][:n]
+        return [(self.tables[category][i], float(means[i]), int(appearances[i])) for i in best]
+
+    def series(self, category: str, form_name: str, name: str,
+               seasons: Optional[List[str]] = None) -> 'np.ndarray':
+        """名前の採用率のシーズンごとの推移（載っていないシーズンは NaN。フォルムが載っていても名前が無ければ 0）"""
+        season_ids = self._season_ids(seasons)
+        result = np.full(len(season_ids), np.nan, dtype=np.float32)
+        value_id = self.id_of(category, name)
+        for i, season_id in enumerate(season_ids):
+            entries = self.entries_of(form_name, [season_id])
+            if len(entries) == 0:
+                continue
+            ids, rates = self._values(category, entries)
+            matched = rates[ids == value_id] if value_id is not None else rates[:0]
+            result[i] = matched[0] if len(matched) else 0.0
+        return result
+
+    def ranking(self, season: str) -> List[Tuple[int, str]]:
+        """シーズンの順位表 [(順位, フォルム名), ...]"""
+        season_id = self._season_ids([season])[0]
+        rows = np.flatnonzero(self.entry_season == season_id)
+        rows = rows[np.argsort(self.entry_rank[rows], kind='stable')]
+        return [(int(self.entry_rank[r]), self.tables['forms'][self.entry_form[r]]) for r in rows]
+
+    def rank_delta(self, season_from: str, season_to: str) -> List[Tuple[str, Optional[int], Optional[int]]]:
+        """
+        2シーズン間の順位の変化（season_to の順位順。新たに載ったフォルム・外れたフォルムも含む）
+
+        Returns:
+            [(フォルム名, season_from の順位 or None, season_to の順位 or None), ...]
+        """
+        ids = self._season_ids([season_from, season_to])
+        ranks = []
+        for season_id in ids:
+            rows = np.flatnonzero(self.entry_season == season_id)
+            ranks.append(dict(zip(self.entry_form[rows].tolist(), self.entry_rank[rows].tolist())))
+        before, after = ranks
+        forms = sorted(set(before) | set(after),
+                       key=lambda f: (after.get(f, float('inf')), before.get(f, float('inf'))))
+        return [(self.tables['forms'][f], before.get(f), after.get(f)) for f in forms]
+
+    def rate_delta(self, category: str, form_name: str, season_from: str,
+                   season_to: str) -> List[Tuple[str, float, float]]:
+        """
+        フォルムの採用率の2シーズン間の変化（変化の大きい順。載っていない名前は 0%）
+
+        Returns:
+            [(名前, season_from の採用率, season_to の採用率), ...]
+        """
+        size = len(self.tables[category])
+        vectors = []
+        for season_id in self._season_ids([season_from, season_to]):
+            ids, rates = self._values(category, self.entries_of(form_name, [season_id]))
+            vector = np.zeros(size, dtype=np.float64)
+            vector[ids] = np.nan_to_num(rates)
+            vectors.append(vector)
+        before, after = vectors
+        changed = np.flatnonzero((before != 0) | (after != 0))
+        changed = changed[np.argsort(-np.abs(after[changed] - before[changed]), kind='stable')]
+        return [(self.tables[category][i], float(before[i]), float(after[i])) for i in changed]
+
+    def summary(self) -> Dict:
+        return {
+            'seasons': self.seasons,
+            'entries': int(len(self.entry_form)),
+            'forms': len(self.tables['forms']),
+            **{category: len(self.tables[category]) for category in CATEGORIES},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='使用率データを数値の列形式で複数シーズン分保存・集計します')
+    parser.add_argument('--store', type=str, default=STORE_FILE, help=f'ストアファイル（デフォルト: {STORE_FILE}）')
+    parser.add_argument('--ingest', type=str, nargs='?', const=TREND_DATA_FILE, default=None, metavar='TREND_FILE',
+                        help='使用率データを取り込む（ファイル省略時は pokemon_sv_season_trend.json）')
+    parser.add_argument('--season', type=str, default=None, help='取り込むシーズン名（例: 2024-S15）')
+    parser.add_argument('--replace', action='store_true', help='同じシーズンを取り込み直す')
+    parser.add_argument('--top', type=str, choices=CATEGORIES, default=None, help='採用率上位を表示する分類')
+    parser.add_argument('--pokemon', type=str, default=None, help='--top / --rate-delta のポケモン（種族名またはフォルム名）')
+    parser.add_argument('--last', type=int, default=None, help='--top で直近何シーズンを集計するか（省略時は全シーズン）')
+    parser.add_argument('-n', type=int, default=DEFAULT_TOP_N, help=f'表示件数（デフォルト: {DEFAULT_TOP_N}）')
+    parser.add_argument('--delta', nargs=2, metavar=('FROM', 'TO'), default=None, help='2シーズン間の順位の変化')
+    parser.add_argument('--rate-delta', type=str, choices=CATEGORIES, default=None,
+                        help='--delta と --pokemon のシーズン間の採用率の変化を表示する分類')
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("エラー: numpy が必要です（pip install numpy）")
+        return 1
+
+    try:
+        store = SeasonStore(args.store)
+    except ValueError as e:
+        print(f"エラー: {str(e)}")
+        return 1
+    data = PokeData()
+
+    if args.ingest:
+        if not args.season:
+            print("エラー: --ingest には --season が必要です")
+            return 1
+        with open(args.ingest, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        start_time = time.time()
+        try:
+            result = store.ingest(entries, args.season, data, replace=args.replace)
+        except ValueError as e:
+            print(f"エラー: {str(e)}")
+            return 1
+        store.save()
+        print(f"シーズン {args.season} を取り込みました（{result['entries']}件, {time.time() - start_time:.2f}秒）")
+        if result['unresolved']:
+            print(f"  フォルムに対応付けられなかった名前: {', '.join(result['unresolved'])}")
+        if result['duplicates']:
+            print(f"  重複のため取り込まなかった名前: {', '.join(result['duplicates'])}")
+        if result['bad_rates']:
+            print(f"  解釈できない採用率: {result['bad_rates']}件")
+
+    # 種族名で指定された場合も取り込み時と同じ規則でフォルム名にする
+    form_name = resolve_form(data, args.pokemon) if args.pokemon else None
+    if args.pokemon and form_name is None:
+        print(f"エラー: ポケモン {args.pokemon} が見つかりません")
+        return 1
+
+    try:
+        if args.top:
+            if not form_name:
+                print("エラー: --top には --pokemon が必要です")
+                return 1
+            start_time = time.perf_counter()
+            rows = store.top(args.top, form_name, args.n, last=args.last)
+            elapsed = (time.perf_counter() - start_time) * 1000
+            print(f"{form_name} の {args.top} 上位（{args.last or len(store.seasons)}シーズン, {elapsed:.2f}ms）")
+            for name, rate, count in rows:
+                print(f"  {name:<24} {rate:6.1f}%  （{count}シーズン）")
+
+        if args.delta and args.rate_delta:
+            if not form_name:
+                print("エラー: --rate-delta には --pokemon が必要です")
+                return 1
+            rows = store.rate_delta(args.rate_delta, form_name, *args.delta)
+            print(f"{form_name} の {args.rate_delta} の変化（{args.delta[0]} → {args.delta[1]}）")
+            for name, before, after in rows[:args.n]:
+                print(f"  {name:<24} {before:6.1f}% → {after:6.1f}%  （{after - before:+.1f}）")
+        elif args.delta:
+            rows = store.rank_delta(*args.delta)
+            print(f"順位の変化（{args.delta[0]} → {args.delta[1]}）")
+            for name, before, after in rows[:args.n]:
+                change = f"{before - after:+d}" if before and after else ('新規' if after else '圏外')
+                print(f"  {name:<24} {before or '-':>4} → {after or '-':>4}  （{change}）")
+    except KeyError as e:
+        print(f"エラー: {e.args[0]}")
+        return 1
+
+    if not (args.ingest or args.top or args.delta):
+        summary = store.summary()
+        print(f"シーズン: {', '.join(summary['seasons']) or 'なし'}")
+        print(f"エントリ {summary['entries']}件, フォルム {summary['forms']}, 技 {summary['moves']}, "
+              f"持ち物 {summary['items']}, 性格 {summary['natures']}, テラスタイプ {summary['teras']}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,551 @@
+"""
+フロントエンドを配信するローカルHTTPサーバー（asyncio）
+
+python3 -m http.server の代わりに使う。
+
+- HTTP/1.1 の keep-alive（1つの接続で続けてリクエストを処理する）、多数の同時接続
+- Accept-Encoding に応じて、build_assets.py が作った圧縮版（.br / .gz）をそのまま返す
+  （ビルドしていないツリーを配信する場合は、テキストのファイルを初回に圧縮してメモリに保持する）
+- 内容のハッシュによる強いETag、If-None-Match による再検証には 304
+- 名前に内容のハッシュを含むファイルは Cache-Control: immutable（1年）、それ以外は no-cache
+- Range（単一範囲）による部分取得（206 / 416）
+- 読んだファイルはメモリに保持する（更新されたら読み直す）
+
+配信するディレクトリ:
+    dist/asset-manifest.json があれば dist/（build_assets.py の出力）
+    なければプロジェクトルートの frontend/ と backend/data/image/（開発用。--source で強制）
+
+使用方法:
+    python build_assets.py && python serve.py     # http://localhost:8000/frontend/index.html
+    python serve.py --source --port 8080           # ビルドせずに配信
+"""
+
+import argparse
+import asyncio
+import email.utils
+import json
+import mimetypes
+import os
+import posixpath
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from build_assets import (
+    BASE_DIR, DIST_DIR, MANIFEST_NAME, SOURCE_DIRS, EXCLUDE_FILES, TEXT_EXTENSIONS, PAGE_DIR,
+    compress_variants, in_dirs, sha256_hex
+)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+KEEPALIVE_TIMEOUT = 15.0  # 次のリクエストを待つ秒数
+MAX_HEADER_BYTES = 16 * 1024
+MAX_HEADERS = 100
+CACHE_BYTES = 128 * 1024 * 1024  # メモリに保持するファイル内容の上限
+ETAG_LENGTH = 32
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+# 圧縮版を選ぶ優先順（Accept-Encoding の q が同じ場合）
+ENCODING_PREFERENCE = ('br', 'gzip')
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.json': 'application/json',
+    '.svg': 'image/svg+xml',
+    '.txt': 'text/plain; charset=utf-8',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+STATUS_REASONS = {
+    200: 'OK', 206: 'Partial Content', 301: 'Moved Permanently', 302: 'Found', 304: 'Not Modified',
+    400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 416: 'Range Not Satisfiable',
+    431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+}
+
+
+def content_type_of(path: str) -> str:
+    ext = posixpath.splitext(path)[1].lower()
+    if ext in CONTENT_TYPES:
+        return CONTENT_TYPES[ext]
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def http_date(timestamp: float) -> str:
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+# =============================================================================
+# 配信するファイル
+# =============================================================================
+
+class Asset:
+    """
+    配信する1ファイル
+
+    variants: {エンコーディング: 圧縮版のファイルパス}（ビルド済みの場合）
+    """
+
+    def __init__(self, path: str, full_path: str, size: int, mtime: float, sha256: str,
+                 immutable: bool, variants: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.full_path = full_path
+        self.size = size
+        self.mtime = mtime
+        self.etag_value = sha256[:ETAG_LENGTH]
+        self.immutable = immutable
+        self.variants = variants or {}
+        self.content_type = content_type_of(path)
+        self.last_modified = http_date(mtime)
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """表現ごとの強いETag（圧縮版は内容が違うので別のETag）"""
+        return f'"{self.etag_value}-{encoding}"' if encoding else f'"{self.etag_value}"'
+
+
+class AssetStore:
+    """
+    URLパス → Asset の解決と、ファイル内容のメモリキャッシュ
+
+    Args:
+        root: 配信するディレクトリ（asset-manifest.json があればビルド済みとして扱う）
+        use_manifest: False ならマニフェストがあっても使わない（開発用）
+    """
+
+    def __init__(self, root: str, use_manifest: bool = True, cache_bytes: int = CACHE_BYTES):
+        self.root = os.path.abspath(root)
+        self.manifest_file = os.path.join(self.root, MANIFEST_NAME) if use_manifest else None
+        self.cache_bytes = cache_bytes
+        self._manifest: Optional[Dict] = None
+        self._manifest_mtime: Optional[float] = None
+        self._assets: Dict[str, Tuple[Tuple[int, int], Asset]] = {}
+        self._bodies: 'OrderedDict[Tuple[str, Optional[str]], object]' = OrderedDict()  # 内容または {エンコーディング: 圧縮版}
+        self._cached_bytes = 0
+
+    @property
+    def built(self) -> bool:
+        return self._load_manifest() is not None
+
+    def _load_manifest(self) -> Optional[Dict]:
+        """マニフェストを読み込む（ビルドし直されたら読み直す）"""
+        if not self.manifest_file:
+            return None
+        try:
+            mtime = os.stat(self.manifest_file).st_mtime_ns
+        except OSError:
+            self._manifest = None
+            return None
+        if mtime != self._manifest_mtime:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+            self._assets.clear()
+            self._bodies.clear()
+            self._cached_bytes = 0
+        return self._manifest
+
+    def lookup(self, path: str) -> Optional[Asset]:
+        """ルートからの相対パス（正規化済み）のファイル。無ければ None"""
+        manifest = self._load_manifest()
+        if manifest is not None:
+            entry = manifest['files'].get(path)
+            if entry is None:
+                return None
+        elif not in_dirs(path, SOURCE_DIRS) or path in EXCLUDE_FILES:
+            return None
+
+        full_path = os.path.join(self.root, *path.split('/'))
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        if not os.path.isfile(full_path):
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._assets.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        if manifest is not None:
+            variants = {encoding: os.path.join(self.root, *variant['file'].split('/'))
+                        for encoding, variant in entry.get('encodings', {}).items()}
+            asset = Asset(path, full_path, stat.st_size, stat.st_mtime, entry['sha256'],
+                          entry['immutable'], variants)
+        else:
+            data = self._read(full_path)
+            self._forget((full_path, 'variants'))
+            asset = Asset(path, full_path, len(data), stat.st_mtime, sha256_hex(data), False)
+            self._remember((full_path, None), data)
+        self._assets[path] = (key, asset)
+        return asset
+
+    def encodings(self, asset: Asset) -> List[str]:
+        """その Asset で返せる圧縮版"""
+        if self._manifest is not None:
+            return list(asset.variants)
+        if asset.path.endswith(TEXT_EXTENSIONS):
+            return list(self._source_variants(asset))
+        return []
+
+    def body(self, asset: Asset, encoding: Optional[str] = None) -> bytes:
+        if encoding is None:
+            return self._cached_read(asset.full_path)
+        if encoding in asset.variants:
+            return self._cached_read(asset.variants[encoding])
+        return self._source_variants(asset)[encoding]
+
+    def _source_variants(self, asset: Asset) -> Dict[str, bytes]:
+        """ビルドしていないファイルの圧縮版（初回に圧縮してキャッシュする）"""
+        key = (asset.full_path, 'variants')
+        if key in self._bodies:
+            self._bodies.move_to_end(key)
+            return self._bodies[key]
+        variants = compress_variants(self._cached_read(asset.full_path))
+        self._remember(key, variants)
+        return variants
+
+    def _cached_read(self, full_path: str) -> bytes:
+        key = (full_path, None)
+        if key in self._bodies:
+            self._bodies.move_to_end(key)
+            return self._bodies[key]
+        data = self._read(full_path)
+        self._remember(key, data)
+        return data
+
+    @staticmethod
+    def _read(full_path: str) -> bytes:
+        with open(full_path, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _size_of(value) -> int:
+        return sum(len(v) for v in value.values()) if isinstance(value, dict) else len(value)
+
+    def _forget(self, key) -> None:
+        old = self._bodies.pop(key, None)
+        if old is not None:
+            self._cached_bytes -= self._size_of(old)
+
+    def _remember(self, key, value) -> None:
+        """内容をキャッシュする（上限を超えたら古いものから捨てる）"""
+        self._forget(key)
+        size = self._size_of(value)
+        if size > self.cache_bytes:
+            return
+        self._bodies[key] = value
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._bodies.popitem(last=False)
+            self._cached_bytes -= self._size_of(evicted)
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+class BadRequest(Exception):
+    def __init__(self, status: int = 400):
+        super().__init__(status)
+        self.status = status
+
+
+def parse_accept_encoding(value: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding → {エンコーディング: q値}"""
+    accepted = {}
+    for part in (value or '').split(','):
+        fields = [f.strip() for f in part.split(';')]
+        if not fields[0]:
+            continue
+        q = 1.0
+        for param in fields[1:]:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[fields[0].lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str], available: List[str]) -> Optional[str]:
+    """返す圧縮版を選ぶ（無ければ None = 無圧縮）"""
+    if not available:
+        return None
+    accepted = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in available:
+            continue
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match の判定（弱い比較: W/ を無視する）"""
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Range: bytes=a-b（単一範囲のみ）→ (開始, 終了) 終了を含む
+
+    Returns:
+        範囲。複数範囲・解釈できない値は None（全体を返す）
+
+    Raises:
+        BadRequest(416): 範囲がファイルの外
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    start_text, dash, end_text = spec.strip().partition('-')
+    if not dash:
+        return None
+    try:
+        if not start_text:
+            length = int(end_text)
+            if length <= 0:
+                raise BadRequest(416)
+            return max(0, size - length), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise BadRequest(416)
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class AssetServer:
+    """
+    AssetStore のファイルを配信する asyncio のHTTP/1.1サーバー
+
+    使用方法:
+        server = AssetServer(AssetStore(DIST_DIR))
+        asyncio.run(server.serve_forever('127.0.0.1', 8000))
+    """
+
+    def __init__(self, store: AssetStore, access_log: bool = False):
+        self.store = store
+        self.access_log = access_log
+        self.requests = 0
+        self.connections = 0
+
+    async def serve_forever(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                            ready: Optional[asyncio.Future] = None) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port,
+                                            limit=MAX_HEADER_BYTES, backlog=1024)
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEPALIVE_TIMEOUT)
+                except BadRequest as e:
+                    writer.write(self._response_head(e.status, {'Content-Length': '0', 'Connection': 'close'}))
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+                keep_alive = self._keep_alive(version, headers)
+                head, body = self.respond(method, target, headers)
+                if not keep_alive:
+                    head = head[:-2] + b'Connection: close\r\n\r\n'
+                writer.write(head)
+                if body:
+                    writer.write(body)
+                await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """リクエスト行とヘッダーを読む。接続が閉じられたら None"""
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise BadRequest(431)
+        while line in (b'\r\n', b'\n'):  # リクエストの間の空行は無視する
+            line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise BadRequest(400)
+        method, target, version = parts
+
+        headers: Dict[str, str] = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise BadRequest(431)
+            if line in (b'\r\n', b'\n'):
+                break
+            if not line:
+                raise asyncio.IncompleteReadError(b'', None)
+            if len(headers) >= MAX_HEADERS:
+                raise BadRequest(431)
+            name, sep, value = line.decode('latin-1').partition(':')
+            if not sep:
+                raise BadRequest(400)
+            headers[name.strip().lower()] = value.strip()
+
+        # GET/HEAD の本文は使わないが、次のリクエストを正しく読むために読み捨てる
+        length = headers.get('content-length')
+        if length:
+            try:
+                await reader.readexactly(int(length))
+            except ValueError:
+                raise BadRequest(400)
+        return method, target, version, headers
+
+    @staticmethod
+    def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            return 'keep-alive' in connection
+        return 'close' not in connection
+
+    @staticmethod
+    def _response_head(status: int, headers: Dict[str, str]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    def respond(self, method: str, target: str, request_headers: Dict[str, str]) -> Tuple[bytes, bytes]:
+        """1リクエストの応答（ヘッダー部分, 本文）"""
+        self.requests += 1
+        start_time = time.perf_counter()
+        try:
+            status, headers, body = self._respond(method, target, request_headers)
+        except BadRequest as e:
+            status, headers, body = e.status, {}, b''
+        except Exception as e:
+            print(f"エラー: {target}: {str(e)}")
+            status, headers, body = 500, {}, b''
+        if status != 304:
+            headers.setdefault('Content-Length', str(len(body)))
+        headers['Date'] = http_date(time.time())
+        headers['Server'] = 'PokeBattoSimulation'
+        if self.access_log:
+            print(f"{method} {target} {status} {headers.get('Content-Length', '-')} "
+                  f"{(time.perf_counter() - start_time) * 1000:.2f}ms")
+        return self._response_head(status, headers), b'' if method == 'HEAD' else body
+
+    def _respond(self, method: str, target: str,
+                 request_headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        if method not in ('GET', 'HEAD'):
+            return 405, {'Allow': 'GET, HEAD'}, b''
+
+        url_path = unquote(urlsplit(target).path)
+        if url_path in ('', '/'):
+            return 302, {'Location': f'/{PAGE_DIR}/index.html'}, b''
+        path = posixpath.normpath(url_path).lstrip('/')
+        if path.startswith('..') or any(part.startswith('.') for part in path.split('/')):
+            return 404, {}, b''
+
+        asset = self.store.lookup(path)
+        if asset is None:
+            index = self.store.lookup(posixpath.join(path, 'index.html'))
+            if index is None:
+                return 404, {}, b''
+            if not url_path.endswith('/'):
+                return 301, {'Location': url_path + '/'}, b''
+            asset = index
+
+        available = self.store.encodings(asset)
+        range_header = request_headers.get('range')
+        # 部分取得は無圧縮の表現に対して行う
+        encoding = None if range_header else choose_encoding(request_headers.get('accept-encoding'), available)
+        etag = asset.etag(encoding)
+        headers = {
+            'Content-Type': asset.content_type,
+            'ETag': etag,
+            'Last-Modified': asset.last_modified,
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if asset.immutable else REVALIDATE_CACHE_CONTROL,
+            'Accept-Ranges': 'bytes',
+        }
+        if available:
+            headers['Vary'] = 'Accept-Encoding'
+
+        if_none_match = request_headers.get('if-none-match')
+        if if_none_match is not None:
+            if etag_matches(if_none_match, etag):
+                del headers['Content-Type']
+                return 304, headers, b''
+        elif request_headers.get('if-modified-since') == asset.last_modified:
+            del headers['Content-Type']
+            return 304, headers, b''
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+            return 200, headers, self.store.body(asset, encoding)
+
+        body = self.store.body(asset)
+        if range_header and request_headers.get('if-range', etag) in (etag, asset.last_modified):
+            try:
+                byte_range = parse_range(range_header, len(body))
+            except BadRequest:
+                headers['Content-Range'] = f'bytes */{len(body)}'
+                return 416, headers, b''
+            if byte_range is not None:
+                start, end = byte_range
+                headers['Content-Range'] = f'bytes {start}-{end}/{len(body)}'
+                return 206, headers, body[start:end + 1]
+        return 200, headers, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description='フロントエンドを配信するローカルHTTPサーバーを起動します')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST, help=f'待ち受けアドレス（デフォルト: {DEFAULT_HOST}）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'待ち受けポート（デフォルト: {DEFAULT_PORT}）')
+    parser.add_argument('--root', type=str, default=None,
+                        help=f'配信するディレクトリ（デフォルト: ビルド済みなら {DIST_DIR}、なければプロジェクトルート）')
+    parser.add_argument('--source', action='store_true', help='ビルドせずにプロジェクトルートのファイルを配信する')
+    parser.add_argument('--access-log', action='store_true', help='リクエストごとにログを表示する')
+    args = parser.parse_args()
+
+    if args.source:
+        store = AssetStore(args.root or BASE_DIR, use_manifest=False)
+    else:
+        store = AssetStore(args.root or DIST_DIR)
+        if args.root is None and not store.built:
+            print(f"{DIST_DIR} にビルド結果がないため、プロジェクトルートのファイルを配信します"
+                  f"（python build_assets.py でビルドできます）")
+            store = AssetStore(BASE_DIR, use_manifest=False)
+
+    mode = 'ビルド済み' if store.built else 'ソース'
+    print(f"{store.root} を配信します（{mode}）: http://{args.host}:{args.port}/{PAGE_DIR}/index.html")
+    try:
+        asyncio.run(AssetServer(store, access_log=args.access_log).serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
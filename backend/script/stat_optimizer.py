@@ -0,0 +1,319 @@
+"""
+条件（耐える・抜く・倒す）を満たす能力Pの振り方と性格を探す
+
+stats.js の能力P（各能力 0〜32、1Pにつき実数値+1）と性格補正（1.1 / 0.9）で、指定した条件を全て満たす
+振り方のうち、どの能力も他の振り方より多く使っていないもの（パレート最適）を全て求める。
+
+条件:
+    survive  攻撃側 X の技 M を、最大乱数で hits 回受けても倒れない（持ち物のきのみ・たべのこしも考える）
+    outspeed Y より素早さが高い（自分・Y のランク補正込み。同速は含めない）
+    ko       Z を技 M で hits 回以内に倒す確率が probability 以上（ko_probability.py で計算）
+
+探し方:
+    条件はそれぞれ一部の能力（survive は HP と防御か特防、outspeed は素早さ、ko は攻撃か特攻）だけで決まり、
+    能力Pを増やして条件を満たさなくなることはない。そこで、条件ごとに関係する能力の 0〜32 を配列でまとめて計算し
+    （survive は HP × 防御 の 33 × 33）、性格補正（↑・無補正・↓）ごとに「その能力に最低何P必要か」を求める。
+    この結果は性格補正ごとにキャッシュするので、21通りの性格でも計算は能力ごとに3回で済む。
+    HP の各値と性格の組み合わせから振り方の候補を作り、他の候補に支配されるもの（全ての能力で同じか多く、
+    どこかで多い）を除く。33^6 × 21 通りを全て数え上げるのと同じ結果になる。
+
+相手の型は使用率データ（matchup_matrix.build_set）。素早さの比較では、相手は使用率1位の性格で
+素早さに --opponent-speed-points（デフォルト32）振っているものとする。
+
+使用方法:
+    python stat_optimizer.py ガブリアス --survive ハバタクカミ:ムーンフォース --outspeed ハバタクカミ:1
+    python stat_optimizer.py ガブリアス --survive ハバタクカミ:ムーンフォース --ko サーフゴー:じしん:0.5 \\
+        --max-total 66
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from damage_engine import (DEFAULT_IV, DEFAULT_LEVEL, DamageEngine, calculate_hp, calculate_stat, damage_rolls,
+                           form_stats, nature_bonuses, nature_multiplier, rank_multiplier)
+from ko_probability import KOEngine, find_set, hit_count_distribution, ko_probabilities
+from matchup_matrix import MAX_STAT_POINTS
+from pokedata import NATURE_EFFECTS, PokeData
+from type_table import EFFECTIVENESS_LOOKUP
+
+STATS = ('hp', 'attack', 'defense', 'spAtk', 'spDef', 'speed')
+STAT_LABELS = {'hp': 'H', 'attack': 'A', 'defense': 'B', 'spAtk': 'C', 'spDef': 'D', 'speed': 'S'}
+BASE_STAT_KEYS = {'hp': 'hp', 'attack': 'attack', 'defense': 'defense', 'spAtk': 'special-attack',
+                  'spDef': 'special-defense', 'speed': 'speed'}
+POINTS = np.arange(MAX_STAT_POINTS + 1)
+UNREACHABLE = MAX_STAT_POINTS + 1
+BONUSES = ('up', 'neutral', 'down')
+# 無補正の性格はどれも同じなので1つで代表する
+NEUTRAL_NATURE = 'まじめ'
+NATURES = tuple(NATURE_EFFECTS) + (NEUTRAL_NATURE,)
+DEFAULT_OPPONENT_SPEED_POINTS = MAX_STAT_POINTS
+
+
+def first_true(mask: 'np.ndarray') -> 'np.ndarray':
+    """最後の軸で最初に True になる位置（無ければ UNREACHABLE）"""
+    return np.where(mask.any(axis=-1), mask.argmax(axis=-1), UNREACHABLE)
+
+
+def pareto_front(points: 'np.ndarray') -> 'np.ndarray':
+    """[候補, 能力] のうち、他の候補に支配されない行の真偽値"""
+    no_more = (points[:, None, :] <= points[None, :, :]).all(axis=-1)    # [j, i]: j は i 以下
+    less = (points[:, None, :] < points[None, :, :]).any(axis=-1)
+    return ~(no_more & less).any(axis=0)
+
+
+class StatOptimizer:
+    """
+    1匹の能力Pと性格を、条件を満たすように最適化する
+
+    Args:
+        data: ポケモン・技・持ち物データ
+        subject: 最適化するポケモンの型（matchup_matrix.build_set の形。stats は能力Pに関係なく使わない）
+        level: レベル
+    """
+
+    def __init__(self, data: PokeData, subject: Dict, level: int = DEFAULT_LEVEL):
+        self.data = data
+        self.subject = subject
+        self.level = level
+        self.engine = DamageEngine(data)
+        self.ko_engine = KOEngine(data)
+        self.constraints: List[Dict] = []
+        self._required: Dict[Tuple, 'np.ndarray'] = {}
+
+        base = data.form(subject['form'])['base_stats']
+        # 能力Pごとの実数値: HP は [能力P]、それ以外は {性格補正: [能力P]}
+        self.table = {'hp': calculate_hp(base['hp'], DEFAULT_IV, POINTS, level)}
+        for stat in STATS[1:]:
+            self.table[stat] = {bonus: calculate_stat(base[BASE_STAT_KEYS[stat]], DEFAULT_IV, POINTS, level,
+                                                      nature_multiplier(bonus)) for bonus in BONUSES}
+        self.side = dict(subject, level=level, stats=form_stats(data.form(subject['form']), level))
+
+    # -------------------------------------------------------------------------
+    # 条件
+    # -------------------------------------------------------------------------
+
+    def _category_stat(self, move: str, role: int) -> str:
+        """技の分類に対応する能力（role 0: 攻撃側、1: 防御側）"""
+        return (('attack', 'defense'), ('spAtk', 'spDef'))[int(self.engine.move_arrays([move])['category'][0])][role]
+
+    def survive(self, attacker: Dict, move: str, hits: int = 1) -> None:
+        """attacker の move を最大乱数で hits 回受けても倒れない"""
+        self.constraints.append({'kind': 'survive', 'stat': self._category_stat(move, 1), 'opponent': attacker,
+                                 'move': move, 'hits': hits})
+
+    def outspeed(self, opponent: Dict, rank: int = 0, opponent_rank: int = 0) -> None:
+        """opponent より素早さが高い（rank・opponent_rank はそれぞれのランク）"""
+        self.constraints.append({'kind': 'outspeed', 'stat': 'speed', 'opponent': opponent, 'rank': rank,
+                                 'opponent_rank': opponent_rank})
+
+    def ko(self, defender: Dict, move: str, probability: float = 1.0, hits: int = 1) -> None:
+        """defender を move で hits 回以内に倒す確率が probability 以上"""
+        self.constraints.append({'kind': 'ko', 'stat': self._category_stat(move, 0), 'opponent': defender,
+                                 'move': move, 'probability': probability, 'hits': hits})
+
+    def _rolls(self, attacker: Dict, defender: Dict, move: str, attack=None, defense=None) -> 'np.ndarray':
+        """attacker → defender のダメージ（attack / defense に実数値の配列を渡すと、その形 + (16,) で返す）"""
+        info = self.engine.move_arrays([move])
+        category, move_type = int(info['category'][0]), int(info['type_id'][0])
+        atk = self.engine.attacker_arrays([attacker])
+        dfn = self.engine.defender_arrays([defender])
+        return damage_rolls(
+            level=atk['level'][0],
+            power=info['power'][0],
+            attack=atk['stats'][0, category] if attack is None else attack,
+            defense=dfn['stats'][0, category] if defense is None else defense,
+            attack_rank=atk['ranks'][0, category],
+            defense_rank=dfn['ranks'][0, category],
+            stat_multiplier=atk['stat_multiplier'][0, category],
+            damage_multiplier=atk['damage_multiplier'][0],
+            crit=atk['crit'][0],
+            stab=move_type in atk['type_ids'][0],
+            type_mod=EFFECTIVENESS_LOOKUP[move_type, dfn['combo'][0]],
+        )
+
+    def _survive_required(self, constraint: Dict, bonus: str) -> 'np.ndarray':
+        """HP の能力Pごとに、耐えるのに必要な防御（特防）の能力P [HP]"""
+        defense = self.table[constraint['stat']][bonus]
+        rolls = self._rolls(constraint['opponent'], self.side, constraint['move'], defense=defense)
+        worst = rolls[:, -1]                                           # [防御の能力P]
+        hp = self.table['hp']
+        berry, passive = self.ko_engine.item_effects(self.subject.get('item', ''))
+        hit_counts = hit_count_distribution(self.data.move(constraint['move']))
+        if constraint['hits'] == 1 and berry is None and hit_counts == {1: 1.0}:
+            survives = worst[None, :] < hp[:, None]                   # [HP, 防御]
+        else:
+            # 毎回最大乱数で、攻撃回数の全ての場合に倒れない
+            survives = np.array([[ko_probabilities((int(damage),), int(h), constraint['hits'], hit_counts=hit_counts,
+                                                   berry=berry, passive=passive)[-1] == 0 for damage in worst]
+                                 for h in hp])
+        return first_true(survives)
+
+    def _outspeed_required(self, constraint: Dict, bonus: str) -> 'np.ndarray':
+        speed = np.floor(self.table['speed'][bonus] * rank_multiplier(constraint['rank']))
+        opponent = np.floor(constraint['opponent']['stats']['speed'] * rank_multiplier(constraint['opponent_rank']))
+        return first_true(speed > opponent)
+
+    def _ko_required(self, constraint: Dict, bonus: str) -> 'np.ndarray':
+        defender = constraint['opponent']
+        attack = self.table[constraint['stat']][bonus]
+        rolls = self._rolls(self.side, defender, constraint['move'], attack=attack)    # [攻撃の能力P, 16]
+        berry, passive = self.ko_engine.item_effects(defender.get('item', ''))
+        hit_counts = hit_count_distribution(self.data.move(constraint['move']))
+        chances = np.array([ko_probabilities(row, defender['stats']['hp'], constraint['hits'], hit_counts=hit_counts,
+                                             berry=berry, passive=passive)[-1] for row in rolls])
+        return first_true(chances >= constraint['probability'])
+
+    def required(self, index: int, bonus: str) -> 'np.ndarray':
+        """index 番目の条件に必要な能力P（survive は [HP]、それ以外はスカラー）。性格補正ごとにキャッシュする"""
+        key = (index, bonus)
+        if key not in self._required:
+            constraint = self.constraints[index]
+            method = {'survive': self._survive_required, 'outspeed': self._outspeed_required,
+                      'ko': self._ko_required}[constraint['kind']]
+            self._required[key] = method(constraint, bonus)
+        return self._required[key]
+
+    def _stat_required(self, stat: str, bonus: str) -> 'np.ndarray':
+        """stat に必要な能力P（全ての条件の最大。[HP] の配列）"""
+        needed = np.zeros(len(POINTS), dtype=np.int64)
+        for index, constraint in enumerate(self.constraints):
+            if constraint['stat'] == stat:
+                needed = np.maximum(needed, self.required(index, bonus))
+        return needed
+
+    # -------------------------------------------------------------------------
+    # 探索
+    # -------------------------------------------------------------------------
+
+    def solve(self, max_total: Optional[int] = None) -> List[Dict]:
+        """
+        パレート最適な振り方（能力Pの合計が少ない順）
+
+        Returns:
+            [{"points": {"hp": .., ...}, "total", "natures": [性格名], "stats": {最初の性格での実数値}}]
+        """
+        has_survive = any(c['kind'] == 'survive' for c in self.constraints)
+        candidates: Dict[Tuple[int, ...], List[str]] = {}
+        for nature in NATURES:
+            bonuses = nature_bonuses(nature)
+            # [HP, 能力]: HP の能力Pごとに、他の能力に必要な能力P
+            needed = np.stack([POINTS] + [self._stat_required(stat, bonuses.get(stat, 'neutral'))
+                                          for stat in STATS[1:]], axis=1)
+            feasible = (needed <= MAX_STAT_POINTS).all(axis=1)
+            if not has_survive:
+                feasible &= POINTS == 0
+            for row in needed[feasible]:
+                candidates.setdefault(tuple(int(x) for x in row), []).append(nature)
+        if not candidates:
+            return []
+
+        points = np.array(list(candidates))
+        keep = pareto_front(points)
+        if max_total is not None:
+            keep &= points.sum(axis=1) <= max_total
+        results = []
+        for row in points[keep]:
+            spread = dict(zip(STATS, (int(x) for x in row)))
+            natures = candidates[tuple(row.tolist())]
+            results.append({
+                'points': spread,
+                'total': int(row.sum()),
+                'natures': natures,
+                'stats': form_stats(self.data.form(self.subject['form']), self.level, spread,
+                                    nature_bonuses(natures[0])),
+            })
+        results.sort(key=lambda r: (r['total'], [r['points'][stat] for stat in STATS]))
+        return results
+
+
+# =============================================================================
+# コマンドライン
+# =============================================================================
+
+def parse_spec(spec: str, count: int) -> List[str]:
+    """"名前:技:..." を count 個まで分ける（足りない分は空文字）"""
+    parts = spec.split(':')
+    return parts + [''] * (count - len(parts))
+
+
+def format_points(points: Dict[str, int]) -> str:
+    return '-'.join(f"{STAT_LABELS[stat]}{points[stat]}" for stat in STATS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='条件を満たす能力Pの振り方と性格（パレート最適）を探します')
+    parser.add_argument('pokemon', help='最適化するポケモン（使用率データの名前）')
+    parser.add_argument('--item', type=str, default=None, help='持ち物（省略時は使用率1位）')
+    parser.add_argument('--survive', action='append', default=[], metavar='相手:技[:回数]',
+                        help='相手の技を最大乱数で（回数分）受けても倒れない')
+    parser.add_argument('--outspeed', action='append', default=[], metavar='相手[:自分のランク[:相手のランク]]',
+                        help='相手より素早さが高い')
+    parser.add_argument('--ko', action='append', default=[], metavar='相手:技[:確率[:回数]]',
+                        help='相手を技で（回数以内に）倒す確率が確率以上（デフォルト: 確定1発）')
+    parser.add_argument('--opponent-speed-points', type=int, default=DEFAULT_OPPONENT_SPEED_POINTS,
+                        help=f'素早さの比較での相手の素早さの能力P（デフォルト: {DEFAULT_OPPONENT_SPEED_POINTS}）')
+    parser.add_argument('--max-total', type=int, default=None, help='能力Pの合計の上限')
+    parser.add_argument('--limit', type=int, default=20, help='表示する件数（デフォルト: 20）')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    data = PokeData()
+    sets = {}
+
+    def opponent(name: str) -> Dict:
+        if name not in sets:
+            sets[name] = find_set(data, name)
+            if sets[name] is None:
+                raise SystemExit(f"エラー: 使用率データに {name} がありません")
+        return sets[name]
+
+    def move(name: str) -> str:
+        if not data.has_move(name):
+            raise SystemExit(f"エラー: 技 {name} がありません")
+        return name
+
+    subject = dict(opponent(args.pokemon))
+    if args.item is not None:
+        subject['item'] = args.item
+    optimizer = StatOptimizer(data, subject)
+    for spec in args.survive:
+        name, move_name, hits = parse_spec(spec, 3)
+        optimizer.survive(opponent(name), move(move_name), int(hits or 1))
+    for spec in args.outspeed:
+        name, rank, opponent_rank = parse_spec(spec, 3)
+        target = dict(opponent(name))
+        target_points = dict(target['stat_points'], speed=args.opponent_speed_points)
+        target['stats'] = form_stats(data.form(target['form']), stat_points=target_points,
+                                     natures=nature_bonuses(target['nature']))
+        optimizer.outspeed(target, int(rank or 0), int(opponent_rank or 0))
+    for spec in args.ko:
+        name, move_name, probability, hits = parse_spec(spec, 4)
+        optimizer.ko(opponent(name), move(move_name), float(probability or 1.0), int(hits or 1))
+    if not optimizer.constraints:
+        parser.error('条件（--survive / --outspeed / --ko）を1つ以上指定してください')
+
+    prepared = time.time()
+    results = optimizer.solve(args.max_total)
+    elapsed = time.time() - prepared
+
+    print(f"{subject['form']}（{subject['item'] or '持ち物なし'}）: 条件 {len(optimizer.constraints)} 個, "
+          f"パレート最適な振り方 {len(results)} 件（探索 {elapsed * 1000:.0f} ms, "
+          f"全体 {time.time() - start_time:.2f}秒）")
+    if not results:
+        print("  条件を全て満たす振り方はありません")
+        return 1
+    for result in results[:args.limit]:
+        natures = result['natures']
+        shown = '・'.join(natures[:3]) + (f" ほか{len(natures) - 3}" if len(natures) > 3 else '')
+        stats = '-'.join(str(result['stats'][stat]) for stat in STATS)
+        print(f"  {format_points(result['points'])}（合計 {result['total']:>3}） {stats}  {shown}")
+    if len(results) > args.limit:
+        print(f"  ...ほか {len(results) - args.limit} 件")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,71 @@
+"""
+rate_limiter.AdaptiveRateLimiter のテスト
+
+時計（time.monotonic）を差し替え、レートどおりに送信したものとして応答を報告する。
+
+使用方法:
+    python -m pytest test_rate_limiter.py
+    python -m unittest test_rate_limiter
+"""
+
+import unittest
+from unittest import mock
+
+from rate_limiter import AdaptiveRateLimiter, DEFAULT_MIN_RATE
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def drive(limiter: AdaptiveRateLimiter, clock: FakeClock, requests: int, throttle_every: int) -> list:
+    """throttle_every 回に1回を429として報告し、各応答後のレートを返す"""
+    rates = []
+    for i in range(requests):
+        clock.now += 1.0 / limiter.rate
+        if throttle_every and i % throttle_every == throttle_every - 1:
+            limiter.on_throttle()
+        else:
+            limiter.on_success()
+        rates.append(limiter.rate)
+    return rates
+
+
+class AdaptiveRateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('rate_limiter.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sporadic_throttle_settles_above_min_rate(self):
+        limiter = AdaptiveRateLimiter()
+        rates = drive(limiter, self.clock, 20000, throttle_every=10)  # 10% が429
+        settled = rates[-2000:]
+        self.assertGreater(min(settled), 5 * DEFAULT_MIN_RATE)
+        self.assertGreater(sum(settled) / len(settled), 10 * DEFAULT_MIN_RATE)
+
+    def test_constant_throttle_reaches_min_rate(self):
+        limiter = AdaptiveRateLimiter()
+        drive(limiter, self.clock, 200, throttle_every=1)
+        self.assertEqual(limiter.rate, DEFAULT_MIN_RATE)
+
+    def test_success_ramps_up_to_max_rate(self):
+        limiter = AdaptiveRateLimiter(rate=5.0, max_rate=50.0)
+        drive(limiter, self.clock, 1000, throttle_every=0)
+        self.assertEqual(limiter.rate, 50.0)
+
+    def test_backoff_once_per_cooldown(self):
+        limiter = AdaptiveRateLimiter(rate=40.0)
+        limiter.on_throttle()
+        limiter.on_throttle()
+        self.assertEqual(limiter.rate, 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
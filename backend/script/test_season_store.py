@@ -0,0 +1,63 @@
+"""
+season_store.resolve_form / SeasonStore.ingest のテスト
+
+全ポケモンデータ（frontend/data/pokemon_data_all.json）を使う。
+
+使用方法:
+    python -m pytest test_season_store.py
+    python -m unittest test_season_store
+"""
+
+import unittest
+
+from pokedata import PokeData
+from season_store import NUMPY_AVAILABLE, SeasonStore, resolve_entry, resolve_form
+
+# 使用率データ（2つのキュレム。どちらも名前は "キュレム"）
+KYUREM_BLACK_ENTRY = {
+    'rank': 56, 'name': 'キュレム', 'pokedex_number': '0646',
+    'moves': [{'name': name, 'rate': '10.0%'} for name in (
+        'つららばり', 'りゅうのまい', 'クロスサンダー', 'スケイルショット', 'みがわり',
+        'テラバースト', 'げきりん', 'リフレクター', 'フリーズボルト', 'フリーズドライ')],
+}
+KYUREM_WHITE_ENTRY = {
+    'rank': 98, 'name': 'キュレム', 'pokedex_number': '0646',
+    'moves': [{'name': name, 'rate': '10.0%'} for name in (
+        'フリーズドライ', 'クロスフレイム', 'りゅうせいぐん', 'れいとうビーム', 'だいちのちから',
+        'シャドーボール', 'ラスターカノン', 'げんしのちから', 'りゅうのはどう', 'ハイパーボイス')],
+}
+
+
+class ResolveFormTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = PokeData()
+
+    def test_moves_pick_form(self):
+        self.assertEqual(resolve_entry(self.data, KYUREM_BLACK_ENTRY), 'ブラックキュレム')
+        self.assertEqual(resolve_entry(self.data, KYUREM_WHITE_ENTRY), 'ホワイトキュレム')
+
+    def test_without_moves(self):
+        self.assertEqual(resolve_form(self.data, 'キュレム', '0646'), 'キュレム')
+        self.assertEqual(resolve_form(self.data, 'ブラックキュレム'), 'ブラックキュレム')
+        self.assertIsNone(resolve_form(self.data, 'ピカチュウZ'))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy が必要です")
+    def test_ingest_keeps_both_forms(self):
+        store = SeasonStore(path='')
+        result = store.ingest([KYUREM_BLACK_ENTRY, KYUREM_WHITE_ENTRY], 'S1', self.data)
+        self.assertEqual(result['entries'], 2)
+        self.assertEqual(result['duplicates'], [])
+        self.assertEqual(store.ranking('S1'), [(56, 'ブラックキュレム'), (98, 'ホワイトキュレム')])
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy が必要です")
+    def test_ingest_drops_same_form(self):
+        store = SeasonStore(path='')
+        result = store.ingest([KYUREM_BLACK_ENTRY, dict(KYUREM_BLACK_ENTRY, rank=99)], 'S1', self.data)
+        self.assertEqual(result['entries'], 1)
+        self.assertEqual(result['duplicates'], ['キュレム'])
+
+
+if __name__ == '__main__':
+    unittest.main()
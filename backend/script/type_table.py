@@ -0,0 +1,229 @@
+"""
+タイプの整数IDと、タイプ相性の表（攻撃タイプ × 防御側のタイプの組み合わせ）
+
+getTypeEffectiveness（types.js）は呼ばれるたびに日本語のタイプ名を英語に変換し、防御側のタイプごとに
+入れ子の辞書を引いていた。ここでは
+
+- 18タイプとステラに 0〜18 の ID を付ける（PokeAPI のタイプ番号順。ステラは攻撃タイプのみ）
+- 防御側のタイプの組み合わせ（単タイプ18 + 2タイプ153 = 171通り）にも ID を付ける
+  （単タイプは タイプID、2タイプは 18 以降。タイプの順序は問わない）
+- 攻撃タイプ × 組み合わせ の倍率を密な表（19 × 171）にしておく
+ので、タイプ相性は EFFECTIVENESS[攻撃タイプID, 組み合わせID] の1回の参照になる。
+
+出力:
+    frontend/js/data/type_table.js   フロントエンド用の表（このスクリプトで生成する。手で編集しない）
+    moves_data.json                  各技に type_id を追加（表に無いタイプ（Shadow など）は null）
+    pokemon_data_all.json の types の各要素の id は data_pipeline.py の typeids ステージで付ける
+
+使用方法:
+    python type_table.py              # type_table.js と moves_data.json の type_id を更新
+    python type_table.py --check      # 更新が必要かだけ確認（必要なら終了コード1）
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from incremental_build import save_json_atomic
+from pokedata import BASE_DIR, MOVES_DATA_FILE
+
+TYPE_TABLE_JS = os.path.join(BASE_DIR, 'frontend', 'js', 'data', 'type_table.js')
+
+# ID 順（PokeAPI のタイプ番号 - 1）。(英語名, 日本語名)
+TYPES = (
+    ('Normal', 'ノーマル'), ('Fighting', 'かくとう'), ('Flying', 'ひこう'), ('Poison', 'どく'),
+    ('Ground', 'じめん'), ('Rock', 'いわ'), ('Bug', 'むし'), ('Ghost', 'ゴースト'), ('Steel', 'はがね'),
+    ('Fire', 'ほのお'), ('Water', 'みず'), ('Grass', 'くさ'), ('Electric', 'でんき'), ('Psychic', 'エスパー'),
+    ('Ice', 'こおり'), ('Dragon', 'ドラゴン'), ('Dark', 'あく'), ('Fairy', 'フェアリー'), ('Stellar', 'ステラ'),
+)
+TYPE_NAMES = tuple(en for en, _ in TYPES)
+TYPE_NAMES_JP = tuple(jp for _, jp in TYPES)
+STELLAR = TYPE_NAMES.index('Stellar')
+TYPE_COUNT = STELLAR            # 防御側になるタイプの数（ステラを除く18）
+ATTACK_TYPE_COUNT = len(TYPES)  # 攻撃タイプの数（ステラを含む19）
+UNKNOWN_TYPE = -1               # 表に無いタイプ（Shadow など）。相性は1倍、タイプ一致にもならない
+
+# タイプ名（英語・日本語・小文字の英語）→ ID
+TYPE_IDS: Dict[str, int] = {}
+for _id, (_en, _jp) in enumerate(TYPES):
+    TYPE_IDS.update({_en: _id, _jp: _id, _en.lower(): _id})
+
+# 攻撃タイプ → {防御タイプ: 倍率}（無いものは1倍）
+TYPE_CHART = {
+    "Normal": {"Rock": 0.5, "Ghost": 0, "Steel": 0.5},
+    "Fire": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 2, "Bug": 2, "Rock": 0.5, "Dragon": 0.5, "Steel": 2},
+    "Water": {"Fire": 2, "Water": 0.5, "Grass": 0.5, "Ground": 2, "Rock": 2, "Dragon": 0.5},
+    "Electric": {"Water": 2, "Electric": 0.5, "Grass": 0.5, "Ground": 0, "Flying": 2, "Dragon": 0.5},
+    "Grass": {"Fire": 0.5, "Water": 2, "Grass": 0.5, "Poison": 0.5, "Ground": 2, "Flying": 0.5, "Bug": 0.5,
+              "Rock": 2, "Dragon": 0.5, "Steel": 0.5},
+    "Ice": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 0.5, "Ground": 2, "Flying": 2, "Dragon": 2, "Steel": 0.5},
+    "Fighting": {"Normal": 2, "Ice": 2, "Poison": 0.5, "Flying": 0.5, "Psychic": 0.5, "Bug": 0.5, "Rock": 2,
+                 "Ghost": 0, "Dark": 2, "Steel": 2, "Fairy": 0.5},
+    "Poison": {"Grass": 2, "Poison": 0.5, "Ground": 0.5, "Rock": 0.5, "Ghost": 0.5, "Steel": 0, "Fairy": 2},
+    "Ground": {"Fire": 2, "Electric": 2, "Grass": 0.5, "Poison": 2, "Flying": 0, "Bug": 0.5, "Rock": 2, "Steel": 2},
+    "Flying": {"Electric": 0.5, "Grass": 2, "Fighting": 2, "Bug": 2, "Rock": 0.5, "Steel": 0.5},
+    "Psychic": {"Fighting": 2, "Poison": 2, "Psychic": 0.5, "Dark": 0, "Steel": 0.5},
+    "Bug": {"Fire": 0.5, "Grass": 2, "Fighting": 0.5, "Poison": 0.5, "Flying": 0.5, "Psychic": 2, "Ghost": 0.5,
+            "Dark": 2, "Steel": 0.5, "Fairy": 0.5},
+    "Rock": {"Fire": 2, "Ice": 2, "Fighting": 0.5, "Ground": 0.5, "Flying": 2, "Bug": 2, "Steel": 0.5},
+    "Ghost": {"Normal": 0, "Psychic": 2, "Ghost": 2, "Dark": 0.5},
+    "Dragon": {"Dragon": 2, "Steel": 0.5, "Fairy": 0},
+    "Dark": {"Fighting": 0.5, "Psychic": 2, "Ghost": 2, "Dark": 0.5, "Fairy": 0.5},
+    "Steel": {"Fire": 0.5, "Water": 0.5, "Electric": 0.5, "Ice": 2, "Rock": 2, "Steel": 0.5, "Fairy": 2},
+    "Fairy": {"Fire": 0.5, "Fighting": 2, "Poison": 0.5, "Dragon": 2, "Dark": 2, "Steel": 0.5},
+}
+
+# 防御側のタイプの組み合わせ（ID 順）: 単タイプ (t,)、続いて 2タイプ (a, b)（a < b）
+COMBOS = tuple([(t,) for t in range(TYPE_COUNT)] +
+               [(a, b) for a in range(TYPE_COUNT) for b in range(a + 1, TYPE_COUNT)])
+COMBO_COUNT = len(COMBOS)
+# [タイプA][タイプB] → 組み合わせID（順序を問わない。A == B は単タイプ）
+DEFENDER_COMBOS = [[0] * TYPE_COUNT for _ in range(TYPE_COUNT)]
+for _combo, _types in enumerate(COMBOS):
+    _a, _b = _types[0], _types[-1]
+    DEFENDER_COMBOS[_a][_b] = DEFENDER_COMBOS[_b][_a] = _combo
+
+
+def type_id(name: Optional[str]) -> int:
+    """タイプ名（英語・日本語）→ ID。表に無ければ UNKNOWN_TYPE"""
+    return TYPE_IDS.get(name, UNKNOWN_TYPE) if name else UNKNOWN_TYPE
+
+
+def defender_combo(type_ids: Sequence[int]) -> int:
+    """防御側のタイプID（1〜2個）→ 組み合わせID。タイプが無い・表に無いタイプなら UNKNOWN_TYPE"""
+    ids = [t for t in type_ids if 0 <= t < TYPE_COUNT]
+    if not ids or len(ids) != len(type_ids) or len(ids) > 2:
+        return UNKNOWN_TYPE
+    return DEFENDER_COMBOS[ids[0]][ids[-1]]
+
+
+def combo_effectiveness(attack_type: int, combo: int) -> float:
+    """表を作るための1件分の倍率（getTypeEffectiveness と同じく、防御タイプごとの倍率の積）"""
+    chart = TYPE_CHART.get(TYPE_NAMES[attack_type], {})
+    multiplier = 1.0
+    for defender_type in COMBOS[combo]:
+        multiplier *= chart.get(TYPE_NAMES[defender_type], 1)
+    return multiplier
+
+
+def effectiveness_rows() -> List[List[float]]:
+    """[攻撃タイプID][組み合わせID] → 倍率（19 × 171）"""
+    return [[combo_effectiveness(attack, combo) for combo in range(COMBO_COUNT)]
+            for attack in range(ATTACK_TYPE_COUNT)]
+
+
+if NUMPY_AVAILABLE:
+    EFFECTIVENESS = np.array(effectiveness_rows(), dtype=np.float64)
+    # 末尾に1倍の行・列を足した表（UNKNOWN_TYPE = -1 で引くと1倍になる。条件分岐なしで配列ごと引ける）
+    EFFECTIVENESS_LOOKUP = np.ones((ATTACK_TYPE_COUNT + 1, COMBO_COUNT + 1))
+    EFFECTIVENESS_LOOKUP[:ATTACK_TYPE_COUNT, :COMBO_COUNT] = EFFECTIVENESS
+
+
+# =============================================================================
+# 出力
+# =============================================================================
+
+def format_numbers(values: List, per_line: int) -> str:
+    lines = []
+    for start in range(0, len(values), per_line):
+        lines.append('    ' + ', '.join(f'{v:g}' if isinstance(v, float) else str(v)
+                                       for v in values[start:start + per_line]) + ',')
+    return '\n'.join(lines)
+
+
+def render_js() -> str:
+    """frontend/js/data/type_table.js の内容"""
+    flat_effectiveness = [value for row in effectiveness_rows() for value in row]
+    flat_combos = [combo for row in DEFENDER_COMBOS for combo in row]
+    type_ids = {name: TYPE_IDS[name] for name in TYPE_NAMES + TYPE_NAMES_JP}
+    return f"""// backend/script/type_table.py で生成したファイル（手で編集しない）
+// タイプID（0〜{ATTACK_TYPE_COUNT - 1}）と、攻撃タイプ × 防御側のタイプの組み合わせ の相性表
+
+export const TYPE_NAMES = {json.dumps(list(TYPE_NAMES))};
+export const TYPE_NAMES_JP = {json.dumps(list(TYPE_NAMES_JP), ensure_ascii=False)};
+export const TYPE_IDS = {json.dumps(type_ids, ensure_ascii=False)};
+export const STELLAR = {STELLAR};
+export const TYPE_COUNT = {TYPE_COUNT};
+export const COMBO_COUNT = {COMBO_COUNT};
+
+// [タイプA * TYPE_COUNT + タイプB] → 組み合わせID（単タイプは A == B）
+export const DEFENDER_COMBOS = new Uint8Array([
+{format_numbers(flat_combos, TYPE_COUNT)}
+]);
+
+// [攻撃タイプID * COMBO_COUNT + 組み合わせID] → 倍率
+export const EFFECTIVENESS = new Float32Array([
+{format_numbers(flat_effectiveness, 19)}
+]);
+
+// 防御側のタイプID（1〜2個）→ 組み合わせID（タイプが無ければ -1）
+export function defenderCombo(typeIds) {{
+    if (!typeIds || typeIds.length === 0 || typeIds.some(id => id == null || id < 0 || id >= TYPE_COUNT)) return -1;
+    return DEFENDER_COMBOS[typeIds[0] * TYPE_COUNT + typeIds[typeIds.length - 1]];
+}}
+"""
+
+
+def annotate_moves(moves: Dict[str, Dict]) -> int:
+    """各技の type の後ろに type_id を入れる（変更した技の数を返す）"""
+    changed = 0
+    for name, move in moves.items():
+        tid = type_id(move.get('type'))
+        value = None if tid == UNKNOWN_TYPE else tid
+        if 'type_id' in move and move['type_id'] == value:
+            continue
+        # キー順を保ったまま type の直後に入れる
+        items = [(k, v) for k, v in move.items() if k != 'type_id']
+        position = next((i + 1 for i, (k, _) in enumerate(items) if k == 'type'), len(items))
+        items.insert(position, ('type_id', value))
+        moves[name] = dict(items)
+        changed += 1
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='タイプIDと相性表を作り、技データにタイプIDを付けます')
+    parser.add_argument('--moves', type=str, default=MOVES_DATA_FILE, help='技データのファイル')
+    parser.add_argument('--js', type=str, default=TYPE_TABLE_JS, help='フロントエンド用の表の出力先')
+    parser.add_argument('--check', action='store_true', help='書き込まずに更新が必要かだけ確認する')
+    args = parser.parse_args()
+
+    js = render_js()
+    current_js = None
+    if os.path.exists(args.js):
+        with open(args.js, 'r', encoding='utf-8') as f:
+            current_js = f.read()
+    with open(args.moves, 'r', encoding='utf-8') as f:
+        moves = json.load(f)
+    changed_moves = annotate_moves(moves)
+    unknown = sorted({move.get('type') for move in moves.values() if move['type_id'] is None}, key=str)
+
+    print(f"タイプ: {ATTACK_TYPE_COUNT} 種類, 防御側の組み合わせ: {COMBO_COUNT} 通り")
+    print(f"type_id を更新する技: {changed_moves} / {len(moves)} 件"
+          + (f"（表に無いタイプ: {', '.join(map(str, unknown))}）" if unknown else ''))
+    print(f"{os.path.basename(args.js)}: {'変更なし' if js == current_js else '更新が必要'}")
+    if args.check:
+        return 1 if changed_moves or js != current_js else 0
+
+    if js != current_js:
+        tmp_file = args.js + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(js)
+        os.replace(tmp_file, args.js)
+        print(f"{args.js} を保存しました")
+    if changed_moves:
+        save_json_atomic(args.moves, moves, indent=2)
+        print(f"{args.moves} を保存しました")
+    print("ポケモンデータのタイプIDは python data_pipeline.py --stages typeids で付けます")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
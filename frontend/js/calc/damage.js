@@ -1,5 +1,5 @@
-import { getTypeEffectiveness } from '../data/types.js';
-import { ITEMS_DEX } from '../data/loader.js?v=3';
+import { getTypeEffectivenessById } from '../data/types.js';
+import { ITEMS_DEX } from '../data/loader.js?v=4';
 
 /**
  * ランク補正倍率を取得
@@ -87,21 +87,22 @@ export function calculateDamage(attacker, defender, move, field = {}) {
     // 乱数 (0.85 ~ 1.00) を適用する前の値を保持して、最後にリスト生成する
     
     // タイプ一致 (STAB): 1.5倍
-    // テラスタルは考慮せず、元のタイプで判定 (speciesData)
-    const attackerTypes = attacker.speciesData ? attacker.speciesData.types : [];
-    const isSTAB = attackerTypes.includes(move.type); // テラスタル時はteraTypeで判定すべきだが一旦省略
+    // テラスタルは考慮せず、元のタイプで判定 (speciesData)。タイプはID（type_table.js）で比べる
+    const attackerTypeIds = attacker.speciesData ? attacker.speciesData.typeIds : [];
+    const isSTAB = move.type_id != null && attackerTypeIds.includes(move.type_id); // テラスタル時はteraTypeで判定すべきだが一旦省略
     let stabMod = isSTAB ? 1.5 : 1.0;
     
-    // タイプ相性
-    const defenderTypes = defender.speciesData ? defender.speciesData.types : [];
-    const typeMod = getTypeEffectiveness(move.type, defenderTypes);
+    // タイプ相性（相性表を1回引くだけ）
+    const defenderCombo = defender.speciesData ? defender.speciesData.typeCombo : -1;
+    const typeMod = getTypeEffectivenessById(move.type_id, defenderCombo);
     
     console.log('[damage.js] Type Debug:', {
         moveType: move.type,
-        defenderTypes: defenderTypes,
+        moveTypeId: move.type_id,
+        defenderCombo: defenderCombo,
         typeMod: typeMod,
         isSTAB: isSTAB,
-        attackerTypes: attackerTypes
+        attackerTypeIds: attackerTypeIds
     });
     
     // 状態異常(やけど): 物理なら0.5 (未実装)
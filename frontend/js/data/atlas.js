@@ -0,0 +1,61 @@
+// スプライトアトラス（backend/script/build_sprite_atlas.py の出力）の読み込みと表示
+// 索引: { url_prefix, sheets: [{file, width, height}], pokemon: {pokedex_name: [sheet, x, y, w, h]}, images: {...} }
+
+export let SPRITE_ATLAS = null;
+
+// 背景画像だけを見せるための透明な1px GIF
+const TRANSPARENT_PIXEL = 'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7';
+
+export async function loadSpriteAtlas() {
+    try {
+        const res = await fetch('./data/sprite_atlas.json');
+        if (!res.ok) return;
+        SPRITE_ATLAS = await res.json();
+        console.log(`Loaded sprite atlas: ${Object.keys(SPRITE_ATLAS.pokemon).length} pokemon, ${SPRITE_ATLAS.sheets.length} sheets.`);
+    } catch (e) {
+        // アトラスがなければ従来どおり1枚ずつ画像を読み込む
+        SPRITE_ATLAS = null;
+    }
+}
+
+function findRect(name) {
+    if (!SPRITE_ATLAS || !name) return null;
+    if (SPRITE_ATLAS.pokemon[name]) return SPRITE_ATLAS.pokemon[name];
+    // フォルム名付きで見つからなければ基本の名前で探す
+    if (name.includes('（') || name.includes('(')) {
+        const baseName = name.split(/[（(]/)[0];
+        return SPRITE_ATLAS.pokemon[baseName] || null;
+    }
+    return null;
+}
+
+// 要素の背景にアトラスの該当領域を表示する（位置・大きさは % 指定なので要素の表示サイズに依存しない）
+// アトラスに無ければ false を返す（呼び出し側で従来の src 指定にフォールバックする）
+export function applyAtlasSprite(img, name) {
+    const rect = findRect(name);
+    if (!rect) {
+        clearAtlasSprite(img);
+        return false;
+    }
+    const [sheetIndex, x, y, w, h] = rect;
+    const sheet = SPRITE_ATLAS.sheets[sheetIndex];
+    const posX = sheet.width > w ? (x / (sheet.width - w)) * 100 : 0;
+    const posY = sheet.height > h ? (y / (sheet.height - h)) * 100 : 0;
+
+    img.style.backgroundImage = `url("${SPRITE_ATLAS.url_prefix}${sheet.file}")`;
+    img.style.backgroundSize = `${(sheet.width / w) * 100}% ${(sheet.height / h) * 100}%`;
+    img.style.backgroundPosition = `${posX}% ${posY}%`;
+    img.style.backgroundRepeat = 'no-repeat';
+    img.style.backgroundOrigin = 'content-box';
+    img.style.backgroundClip = 'content-box';
+    img.src = TRANSPARENT_PIXEL;
+    return true;
+}
+
+export function clearAtlasSprite(img) {
+    if (img.style.backgroundImage) {
+        img.style.backgroundImage = '';
+        img.style.backgroundSize = '';
+        img.style.backgroundPosition = '';
+    }
+}
@@ -1,24 +1,161 @@
+import { TYPE_IDS, defenderCombo } from './type_table.js';
+
 export const SPECIES_DEX = {};
 export const MOVES_DEX = {};
 export let ITEMS_DEX = {};
 export let COMMONLY_USED_POKEMON = [];
 export let USAGE_RATE_DATA = [];
 
+// 索引と詳細シャード（backend/script/build_data_shards.py の出力）
+// マニフェストがあれば索引だけを先に読み込み、特性・覚える技・使用率はポケモンを選んだ時にシャード単位で読み込む
+let SHARD_MANIFEST = null;
+const shardPromises = {};
+const usageEntries = []; // 使用率データ（元の並び順。シャードの内容で後から埋める）
+
+function registerSpecies(p) {
+    // Transform types array to array of strings
+    const sortedTypes = p.types.sort((a, b) => a.slot - b.slot);
+    const typeList = sortedTypes.map(t => t.name);
+    // タイプID（typeids ステージで付けたもの。無ければ名前から）と防御側の組み合わせID
+    const typeIds = sortedTypes.map(t => t.id ?? TYPE_IDS[t.name]);
+    
+    // Map keys "special-attack" -> "spAtk", "special-defense" -> "spDef"
+    const bs = p.base_stats;
+    const stats = {
+        hp: bs.hp,
+        attack: bs.attack,
+        defense: bs.defense,
+        spAtk: bs['special-attack'],
+        spDef: bs['special-defense'],
+        speed: bs.speed
+    };
+
+    SPECIES_DEX[p.pokedex_name] = {
+        baseStats: stats,
+        types: typeList,
+        typeIds: typeIds,
+        typeCombo: defenderCombo(typeIds),
+        abilities: p.abilities,
+        moves: p.moves,
+        commonly_use: p.commonly_use || [],
+        sprite_url: p.sprite_url,
+        weight_kg: p.weight_kg,
+        height_m: p.height_m
+    };
+
+    // Map forms if needed, but current usage seems to rely on exact pokedex_name matching inputs
+}
+
+// 索引の行を pokemon_data_all.json と同じ形に戻して登録する（詳細はシャード読み込みまで null）
+function registerIndex(index) {
+    const nameCounts = {};
+    index.rows.forEach(row => {
+        const values = {};
+        index.fields.forEach((field, i) => { values[field] = row[i]; });
+        const baseStats = {};
+        index.stat_keys.forEach((key, i) => { baseStats[key] = values.base_stats[i]; });
+
+        registerSpecies({
+            pokedex_name: values.pokedex_name,
+            sprite_url: values.sprite_url === null ? null : index.sprite_prefix + values.sprite_url,
+            weight_kg: values.weight_kg,
+            height_m: values.height_m,
+            types: values.types.map(([name, slot, id]) => ({ name, slot, id })),
+            base_stats: baseStats,
+            abilities: null,
+            moves: null,
+            commonly_use: []
+        });
+
+        // 同名フォルムは2件目以降のキーに "#2" などが付く（後の行が SPECIES_DEX に残る点は従来と同じ）
+        nameCounts[values.pokedex_name] = (nameCounts[values.pokedex_name] || 0) + 1;
+        const count = nameCounts[values.pokedex_name];
+        const species = SPECIES_DEX[values.pokedex_name];
+        species.detailKey = count === 1 ? values.pokedex_name : `${values.pokedex_name}#${count}`;
+        species.shard = values.shard;
+        species.detailLoaded = false;
+    });
+
+    index.usage_ranking.forEach(([rank, name]) => {
+        usageEntries.push({ rank, name });
+    });
+    USAGE_RATE_DATA = usageEntries.slice();
+}
+
+function applyShard(shard) {
+    for (const [key, [abilities, moves, commonlyUse]] of Object.entries(shard.forms)) {
+        const species = SPECIES_DEX[key.replace(/#\d+$/, '')];
+        if (!species || species.detailKey !== key) continue;
+        species.abilities = abilities.map(([name, isHidden]) => ({ name, is_hidden: isHidden }));
+        species.moves = moves;
+        species.commonly_use = commonlyUse;
+        species.detailLoaded = true;
+    }
+    shard.usage.forEach(([position, entry]) => {
+        if (usageEntries[position]) Object.assign(usageEntries[position], entry);
+    });
+}
+
+function loadShard(id) {
+    if (!shardPromises[id]) {
+        const entry = SHARD_MANIFEST.shards.find(s => s.id === id);
+        if (!entry) return Promise.resolve();
+        shardPromises[id] = fetch(`./data/${entry.file}`)
+            .then(res => {
+                if (!res.ok) throw new Error(`Failed to load shard ${entry.file}: ${res.status}`);
+                return res.json();
+            })
+            .then(applyShard)
+            .catch(error => {
+                // 次に選んだ時に再試行できるようにする
+                delete shardPromises[id];
+                console.error("Error loading species details:", error);
+            });
+    }
+    return shardPromises[id];
+}
+
+// 特性・覚える技・使用率が読み込み済みか（シャードを使わない場合は常に true）
+export function isSpeciesDetailLoaded(name) {
+    const species = SPECIES_DEX[name];
+    return !species || species.shard === undefined || species.detailLoaded;
+}
+
+// ポケモンの詳細（特性・覚える技・使用率）を含むシャードを読み込む
+export function ensureSpeciesDetails(name) {
+    const species = SPECIES_DEX[name];
+    if (!species || isSpeciesDetailLoaded(name) || !SHARD_MANIFEST) {
+        return Promise.resolve(species || null);
+    }
+    return loadShard(species.shard).then(() => species);
+}
+
 export async function loadAllData() {
     try {
-        const [pokemonRes, movesRes, itemsRes, commonlyUsedRes, usageRateRes] = await Promise.all([
-            fetch('./data/pokemon_data_all.json'),
+        // 索引・シャードのマニフェストと並行して、技・持ち物などを読み込み始める
+        const otherRequests = Promise.all([
             fetch('./data/moves_data.json'),
             fetch('./data/items_data.json'),
-            fetch('./data/commonly_used_pokemon.json'),
-            fetch('./data/pokemon_sv_season_trend.json')
+            fetch('./data/commonly_used_pokemon.json')
         ]);
+        try {
+            const manifestRes = await fetch('./data/pokemon_manifest.json', { cache: 'no-cache' });
+            if (manifestRes.ok) SHARD_MANIFEST = await manifestRes.json();
+        } catch (e) {
+            SHARD_MANIFEST = null;
+        }
+
+        // マニフェストが無ければ従来どおり全ポケモンデータと使用率データを読み込む
+        const [pokemonRes, usageRateRes] = await Promise.all(SHARD_MANIFEST
+            ? [fetch(`./data/${SHARD_MANIFEST.index.file}`), Promise.resolve(null)]
+            : [fetch('./data/pokemon_data_all.json'), fetch('./data/pokemon_sv_season_trend.json')]);
+        const [movesRes, itemsRes, commonlyUsedRes] = await otherRequests;
 
         if (!pokemonRes.ok) throw new Error(`Failed to load pokemon data: ${pokemonRes.status}`);
         if (!movesRes.ok) throw new Error(`Failed to load moves data: ${movesRes.status}`);
         if (!itemsRes.ok) throw new Error(`Failed to load items data: ${itemsRes.status}`);
         if (!commonlyUsedRes.ok) throw new Error(`Failed to load commonly used pokemon: ${commonlyUsedRes.status}`);
-        if (!usageRateRes.ok) {
+        if (usageRateRes && !usageRateRes.ok) {
             console.warn(`Failed to load usage rate data: ${usageRateRes.status}. Using fallback.`);
         }
 
@@ -28,69 +165,24 @@ export async function loadAllData() {
         COMMONLY_USED_POKEMON = await commonlyUsedRes.json();
         
         // Load usage rate data (optional, fallback to empty array if not available)
-        if (usageRateRes.ok) {
+        if (usageRateRes && usageRateRes.ok) {
             USAGE_RATE_DATA = await usageRateRes.json();
             console.log(`Loaded ${USAGE_RATE_DATA.length} usage rate entries.`);
-        } else {
+        } else if (!SHARD_MANIFEST) {
             USAGE_RATE_DATA = [];
         }
 
         // Parse Pokemon Data
-        pokemonList.forEach(p => {
-            // Transform types array to array of strings
-            const typeList = p.types.sort((a, b) => a.slot - b.slot).map(t => t.name);
-            
-            // Map keys "special-attack" -> "spAtk", "special-defense" -> "spDef"
-            const bs = p.base_stats;
-            const stats = {
-                hp: bs.hp,
-                attack: bs.attack,
-                defense: bs.defense,
-                spAtk: bs['special-attack'],
-                spDef: bs['special-defense'],
-                speed: bs.speed
-            };
-
-            SPECIES_DEX[p.pokedex_name] = {
-                baseStats: stats,
-                types: typeList,
-                abilities: p.abilities,
-                moves: p.moves,
-                commonly_use: p.commonly_use || [],
-                sprite_url: p.sprite_url,
-                weight_kg: p.weight_kg,
-                height_m: p.height_m
-            };
-
-            // Map forms if needed, but current usage seems to rely on exact pokedex_name matching inputs
-        });
+        if (SHARD_MANIFEST) {
+            registerIndex(pokemonList);
+            console.log(`Loaded species index (${SHARD_MANIFEST.shards.length} detail shards).`);
+        } else {
+            pokemonList.forEach(registerSpecies);
+        }
 
-const TYPE_TRANSLATION = {
-    "Normal": "ノーマル",
-    "Fire": "ほのお",
-    "Water": "みず",
-    "Grass": "くさ",
-    "Electric": "でんき",
-    "Ice": "こおり",
-    "Fighting": "かくとう",
-    "Poison": "どく",
-    "Ground": "じめん",
-    "Flying": "ひこう",
-    "Psychic": "エスパー",
-    "Bug": "むし",
-    "Rock": "いわ",
-    "Ghost": "ゴースト",
-    "Dragon": "ドラゴン",
-    "Dark": "あく",
-    "Steel": "はがね",
-    "Fairy": "フェアリー"
-};
-
-        // Parse Moves Data
+        // Parse Moves Data（タイプは type_id で比べるので、名前は表示用にそのまま持つ）
         for (const [key, move] of Object.entries(movesData)) {
-            if (move.type && TYPE_TRANSLATION[move.type]) {
-                move.type = TYPE_TRANSLATION[move.type];
-            }
+            if (move.type_id === undefined) move.type_id = move.type in TYPE_IDS ? TYPE_IDS[move.type] : null;
             MOVES_DEX[key] = move;
         }
 
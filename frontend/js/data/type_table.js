@@ -0,0 +1,212 @@
+// backend/script/type_table.py で生成したファイル（手で編集しない）
+// タイプID（0〜18）と、攻撃タイプ × 防御側のタイプの組み合わせ の相性表
+
+export const TYPE_NAMES = ["Normal", "Fighting", "Flying", "Poison", "Ground", "Rock", "Bug", "Ghost", "Steel", "Fire", "Water", "Grass", "Electric", "Psychic", "Ice", "Dragon", "Dark", "Fairy", "Stellar"];
+export const TYPE_NAMES_JP = ["ノーマル", "かくとう", "ひこう", "どく", "じめん", "いわ", "むし", "ゴースト", "はがね", "ほのお", "みず", "くさ", "でんき", "エスパー", "こおり", "ドラゴン", "あく", "フェアリー", "ステラ"];
+export const TYPE_IDS = {"Normal": 0, "Fighting": 1, "Flying": 2, "Poison": 3, "Ground": 4, "Rock": 5, "Bug": 6, "Ghost": 7, "Steel": 8, "Fire": 9, "Water": 10, "Grass": 11, "Electric": 12, "Psychic": 13, "Ice": 14, "Dragon": 15, "Dark": 16, "Fairy": 17, "Stellar": 18, "ノーマル": 0, "かくとう": 1, "ひこう": 2, "どく": 3, "じめん": 4, "いわ": 5, "むし": 6, "ゴースト": 7, "はがね": 8, "ほのお": 9, "みず": 10, "くさ": 11, "でんき": 12, "エスパー": 13, "こおり": 14, "ドラゴン": 15, "あく": 16, "フェアリー": 17, "ステラ": 18};
+export const STELLAR = 18;
+export const TYPE_COUNT = 18;
+export const COMBO_COUNT = 171;
+
+// [タイプA * TYPE_COUNT + タイプB] → 組み合わせID（単タイプは A == B）
+export const DEFENDER_COMBOS = new Uint8Array([
+    0, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34,
+    18, 1, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50,
+    19, 35, 2, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65,
+    20, 36, 51, 3, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79,
+    21, 37, 52, 66, 4, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92,
+    22, 38, 53, 67, 80, 5, 93, 94, 95, 96, 97, 98, 99, 100, 101, 102, 103, 104,
+    23, 39, 54, 68, 81, 93, 6, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+    24, 40, 55, 69, 82, 94, 105, 7, 116, 117, 118, 119, 120, 121, 122, 123, 124, 125,
+    25, 41, 56, 70, 83, 95, 106, 116, 8, 126, 127, 128, 129, 130, 131, 132, 133, 134,
+    26, 42, 57, 71, 84, 96, 107, 117, 126, 9, 135, 136, 137, 138, 139, 140, 141, 142,
+    27, 43, 58, 72, 85, 97, 108, 118, 127, 135, 10, 143, 144, 145, 146, 147, 148, 149,
+    28, 44, 59, 73, 86, 98, 109, 119, 128, 136, 143, 11, 150, 151, 152, 153, 154, 155,
+    29, 45, 60, 74, 87, 99, 110, 120, 129, 137, 144, 150, 12, 156, 157, 158, 159, 160,
+    30, 46, 61, 75, 88, 100, 111, 121, 130, 138, 145, 151, 156, 13, 161, 162, 163, 164,
+    31, 47, 62, 76, 89, 101, 112, 122, 131, 139, 146, 152, 157, 161, 14, 165, 166, 167,
+    32, 48, 63, 77, 90, 102, 113, 123, 132, 140, 147, 153, 158, 162, 165, 15, 168, 169,
+    33, 49, 64, 78, 91, 103, 114, 124, 133, 141, 148, 154, 159, 163, 166, 168, 16, 170,
+    34, 50, 65, 79, 92, 104, 115, 125, 134, 142, 149, 155, 160, 164, 167, 169, 170, 17,
+]);
+
+// [攻撃タイプID * COMBO_COUNT + 組み合わせID] → 倍率
+export const EFFECTIVENESS = new Float32Array([
+    1, 1, 1, 1, 1, 0.5, 1, 0, 0.5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 0.5, 1, 0, 0.5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    0.5, 1, 0, 0.5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0.5, 1, 0, 0.5,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0.5, 1, 0, 0.5, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 0.5, 1, 0, 0.5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0.5, 0,
+    0.25, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0, 0.5, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5,
+    0.5, 0.5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    2, 1, 0.5, 0.5, 1, 2, 0.5, 0, 2, 1, 1, 1, 1, 0.5, 2, 1, 2, 0.5, 2,
+    1, 1, 2, 4, 1, 0, 4, 2, 2, 2, 2, 1, 4, 2, 4, 1, 0.5, 0.5, 1,
+    2, 0.5, 0, 2, 1, 1, 1, 1, 0.5, 2, 1, 2, 0.5, 0.25, 0.5, 1, 0.25, 0, 1,
+    0.5, 0.5, 0.5, 0.5, 0.25, 1, 0.5, 1, 0.25, 0.5, 1, 0.25, 0, 1, 0.5, 0.5, 0.5, 0.5, 0.25,
+    1, 0.5, 1, 0.25, 2, 0.5, 0, 2, 1, 1, 1, 1, 0.5, 2, 1, 2, 0.5, 1, 0,
+    4, 2, 2, 2, 2, 1, 4, 2, 4, 1, 0, 1, 0.5, 0.5, 0.5, 0.5, 0.25, 1, 0.5,
+    1, 0.25, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 2, 2, 1, 4, 2,
+    4, 1, 1, 1, 1, 0.5, 2, 1, 2, 0.5, 1, 1, 0.5, 2, 1, 2, 0.5, 1, 0.5,
+    2, 1, 2, 0.5, 0.5, 2, 1, 2, 0.5, 1, 0.5, 1, 0.25, 2, 4, 1, 2, 0.5, 1,
+    1, 2, 1, 1, 1, 0.5, 2, 1, 0.5, 1, 1, 2, 0.5, 1, 1, 1, 1, 1, 2,
+    1, 1, 1, 0.5, 2, 1, 0.5, 1, 1, 2, 0.5, 1, 1, 1, 1, 1, 2, 2, 2,
+    1, 4, 2, 1, 2, 2, 4, 1, 2, 2, 2, 2, 2, 1, 1, 0.5, 2, 1, 0.5,
+    1, 1, 2, 0.5, 1, 1, 1, 1, 1, 1, 0.5, 2, 1, 0.5, 1, 1, 2, 0.5, 1,
+    1, 1, 1, 1, 0.5, 2, 1, 0.5, 1, 1, 2, 0.5, 1, 1, 1, 1, 1, 1, 0.5,
+    0.25, 0.5, 0.5, 1, 0.25, 0.5, 0.5, 0.5, 0.5, 0.5, 2, 1, 2, 2, 4, 1, 2, 2, 2,
+    2, 2, 0.5, 1, 1, 2, 0.5, 1, 1, 1, 1, 1, 0.5, 0.5, 1, 0.25, 0.5, 0.5, 0.5,
+    0.5, 0.5, 1, 2, 0.5, 1, 1, 1, 1, 1, 2, 0.5, 1, 1, 1, 1, 1, 1, 2,
+    2, 2, 2, 2, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 0.5, 0.5, 0.5, 1, 0.5, 0, 1, 1, 2, 1, 1, 1, 1, 1, 2, 1,
+    1, 0.5, 0.5, 0.5, 1, 0.5, 0, 1, 1, 2, 1, 1, 1, 1, 1, 2, 1, 0.5, 0.5,
+    0.5, 1, 0.5, 0, 1, 1, 2, 1, 1, 1, 1, 1, 2, 0.5, 0.5, 0.5, 1, 0.5, 0,
+    1, 1, 2, 1, 1, 1, 1, 1, 2, 0.25, 0.25, 0.5, 0.25, 0, 0.5, 0.5, 1, 0.5, 0.5,
+    0.5, 0.5, 0.5, 1, 0.25, 0.5, 0.25, 0, 0.5, 0.5, 1, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 0.5, 0.25,
+    0, 0.5, 0.5, 1, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 0.5, 0, 1, 1, 2, 1, 1, 1, 1,
+    1, 2, 0, 0.5, 0.5, 1, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 1, 2, 1, 1, 1, 1, 1, 2, 2, 1, 1, 1, 1, 1, 2, 2, 2,
+    2, 2, 2, 4, 1, 1, 1, 1, 2, 1, 1, 1, 2, 1, 1, 2, 1, 2, 2,
+    1, 1, 0, 2, 1, 2, 0.5, 1, 2, 2, 1, 0.5, 2, 1, 1, 1, 1, 1, 1,
+    0, 2, 1, 2, 0.5, 1, 2, 2, 1, 0.5, 2, 1, 1, 1, 1, 1, 0, 2, 1,
+    2, 0.5, 1, 2, 2, 1, 0.5, 2, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 4, 1, 2, 4, 4, 2, 1, 4, 2,
+    2, 2, 2, 2, 2, 0.5, 1, 2, 2, 1, 0.5, 2, 1, 1, 1, 1, 1, 1, 2,
+    4, 4, 2, 1, 4, 2, 2, 2, 2, 2, 0.5, 1, 1, 0.5, 0.25, 1, 0.5, 0.5, 0.5,
+    0.5, 0.5, 2, 2, 1, 0.5, 2, 1, 1, 1, 1, 1, 4, 2, 1, 4, 2, 2, 2,
+    2, 2, 2, 1, 4, 2, 2, 2, 2, 2, 0.5, 2, 1, 1, 1, 1, 1, 1, 0.5,
+    0.5, 0.5, 0.5, 0.5, 2, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 0.5, 2, 1, 0.5, 1, 2, 1, 0.5, 2, 1, 1, 1, 1, 2, 1, 1, 1, 0.5,
+    2, 1, 0.5, 1, 2, 1, 0.5, 2, 1, 1, 1, 1, 2, 1, 1, 1, 1, 0.5, 0.25,
+    0.5, 1, 0.5, 0.25, 1, 0.5, 0.5, 0.5, 0.5, 1, 0.5, 0.5, 0.5, 2, 1, 2, 4, 2, 1,
+    4, 2, 2, 2, 2, 4, 2, 2, 2, 0.5, 1, 2, 1, 0.5, 2, 1, 1, 1, 1,
+    2, 1, 1, 1, 0.5, 1, 0.5, 0.25, 1, 0.5, 0.5, 0.5, 0.5, 1, 0.5, 0.5, 0.5, 2, 1,
+    0.5, 2, 1, 1, 1, 1, 2, 1, 1, 1, 2, 1, 4, 2, 2, 2, 2, 4, 2,
+    2, 2, 0.5, 2, 1, 1, 1, 1, 2, 1, 1, 1, 1, 0.5, 0.5, 0.5, 0.5, 1, 0.5,
+    0.5, 0.5, 2, 2, 2, 2, 4, 2, 2, 2, 1, 1, 1, 2, 1, 1, 1, 1, 1,
+    2, 1, 1, 1, 1, 2, 1, 1, 1, 2, 1, 1, 1, 2, 2, 2, 1, 1, 1,
+    1, 0.5, 0.5, 0.5, 1, 1, 1, 0.5, 0.5, 0.5, 1, 2, 1, 2, 1, 1, 2, 0.5, 0.5,
+    0.5, 0.5, 1, 1, 1, 0.5, 0.5, 0.5, 1, 2, 1, 2, 1, 1, 2, 0.5, 0.25, 0.25, 0.5,
+    0.5, 0.5, 0.25, 0.25, 0.25, 0.5, 1, 0.5, 1, 0.5, 0.5, 1, 0.25, 0.25, 0.5, 0.5, 0.5, 0.25, 0.25,
+    0.25, 0.5, 1, 0.5, 1, 0.5, 0.5, 1, 0.25, 0.5, 0.5, 0.5, 0.25, 0.25, 0.25, 0.5, 1, 0.5, 1,
+    0.5, 0.5, 1, 0.25, 1, 1, 0.5, 0.5, 0.5, 1, 2, 1, 2, 1, 1, 2, 0.5, 1, 0.5,
+    0.5, 0.5, 1, 2, 1, 2, 1, 1, 2, 0.5, 0.5, 0.5, 0.5, 1, 2, 1, 2, 1, 1,
+    2, 0.5, 0.25, 0.25, 0.5, 1, 0.5, 1, 0.5, 0.5, 1, 0.25, 0.25, 0.5, 1, 0.5, 1, 0.5, 0.5,
+    1, 0.25, 0.5, 1, 0.5, 1, 0.5, 0.5, 1, 0.25, 2, 1, 2, 1, 1, 2, 0.5, 2, 4,
+    2, 2, 4, 1, 2, 1, 1, 2, 0.5, 2, 2, 4, 1, 1, 2, 0.5, 2, 0.5, 1,
+    0, 1, 1, 1, 1, 1, 1, 2, 1, 1, 1, 1, 1, 2, 1, 1, 0.5, 1, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1,
+    1, 1, 2, 1, 1, 1, 1, 1, 2, 1, 1, 0.5, 1, 1, 1, 1, 1, 2, 1,
+    1, 1, 1, 1, 2, 1, 1, 0.5, 1, 1, 1, 1, 2, 1, 1, 1, 1, 1, 2,
+    1, 1, 0.5, 1, 1, 1, 2, 1, 1, 1, 1, 1, 2, 1, 1, 0.5, 1, 1, 2,
+    1, 1, 1, 1, 1, 2, 1, 1, 0.5, 1, 2, 1, 1, 1, 1, 1, 2, 1, 1,
+    0.5, 1, 2, 2, 2, 2, 2, 4, 2, 2, 1, 2, 1, 1, 1, 1, 2, 1, 1,
+    0.5, 1, 1, 1, 1, 2, 1, 1, 0.5, 1, 1, 1, 2, 1, 1, 0.5, 1, 1, 2,
+    1, 1, 0.5, 1, 2, 1, 1, 0.5, 1, 2, 2, 1, 2, 1, 0.5, 1, 0.5, 1, 0.5,
+    1, 1, 1, 1, 1, 2, 1, 1, 0.5, 0.5, 0.5, 1, 0.5, 1, 2, 1, 1, 2, 1,
+    1, 1, 1, 2, 1, 1, 0.5, 0.5, 0.5, 1, 0.5, 1, 2, 1, 1, 2, 1, 1, 1,
+    2, 1, 1, 0.5, 0.5, 0.5, 1, 0.5, 1, 2, 1, 1, 2, 1, 1, 2, 1, 1, 0.5,
+    0.5, 0.5, 1, 0.5, 1, 2, 1, 1, 2, 1, 2, 1, 1, 0.5, 0.5, 0.5, 1, 0.5, 1,
+    2, 1, 1, 2, 2, 1, 1, 0.5, 0.5, 0.5, 1, 0.5, 1, 2, 1, 1, 2, 2, 2,
+    1, 1, 1, 2, 1, 2, 4, 2, 2, 4, 1, 0.5, 0.5, 0.5, 1, 0.5, 1, 2, 1,
+    1, 2, 0.5, 0.5, 0.5, 1, 0.5, 1, 2, 1, 1, 2, 0.25, 0.25, 0.5, 0.25, 0.5, 1, 0.5,
+    0.5, 1, 0.25, 0.5, 0.25, 0.5, 1, 0.5, 0.5, 1, 0.5, 0.25, 0.5, 1, 0.5, 0.5, 1, 0.5, 1,
+    2, 1, 1, 2, 0.5, 1, 0.5, 0.5, 1, 2, 1, 1, 2, 2, 2, 4, 1, 2, 2,
+    1, 1, 1, 1, 1, 0.5, 2, 1, 2, 0.5, 0.5, 2, 1, 1, 2, 0.5, 1, 1, 1,
+    1, 1, 1, 0.5, 2, 1, 2, 0.5, 0.5, 2, 1, 1, 2, 0.5, 1, 1, 1, 1, 1,
+    0.5, 2, 1, 2, 0.5, 0.5, 2, 1, 1, 2, 0.5, 1, 1, 1, 1, 0.5, 2, 1, 2,
+    0.5, 0.5, 2, 1, 1, 2, 0.5, 1, 1, 1, 0.5, 2, 1, 2, 0.5, 0.5, 2, 1, 1,
+    2, 0.5, 1, 1, 0.5, 2, 1, 2, 0.5, 0.5, 2, 1, 1, 2, 0.5, 1, 1, 1, 0.5,
+    1, 0.25, 0.25, 1, 0.5, 0.5, 1, 0.25, 0.5, 0.5, 2, 4, 1, 1, 4, 2, 2, 4, 1,
+    2, 2, 2, 0.5, 0.5, 2, 1, 1, 2, 0.5, 1, 1, 1, 1, 4, 2, 2, 4, 1,
+    2, 2, 0.25, 1, 0.5, 0.5, 1, 0.25, 0.5, 0.5, 1, 0.5, 0.5, 1, 0.25, 0.5, 0.5, 2, 2,
+    4, 1, 2, 2, 1, 2, 0.5, 1, 1, 2, 0.5, 1, 1, 1, 2, 2, 0.5, 0.5, 1,
+    1, 1, 1, 1, 2, 2, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 1, 0.5, 1, 1, 1,
+    1, 1, 2, 2, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 1, 0.5, 1, 1, 1, 1, 2,
+    2, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 1, 0.5, 1, 1, 1, 2, 2, 1, 1, 1,
+    2, 0.5, 0.5, 1, 1, 1, 0.5, 1, 1, 2, 2, 1, 1, 1, 2, 0.5, 0.5, 1, 1,
+    1, 0.5, 1, 1, 4, 2, 2, 2, 4, 1, 1, 2, 2, 2, 1, 2, 2, 2, 2,
+    2, 4, 1, 1, 2, 2, 2, 1, 2, 2, 1, 1, 2, 0.5, 0.5, 1, 1, 1, 0.5,
+    1, 1, 1, 2, 0.5, 0.5, 1, 1, 1, 0.5, 1, 1, 2, 0.5, 0.5, 1, 1, 1, 0.5,
+    1, 1, 1, 1, 2, 2, 2, 1, 2, 2, 0.25, 0.5, 0.5, 0.5, 0.25, 0.5, 0.5, 0.5, 0.5,
+    0.5, 0.25, 0.5, 0.5, 1, 1, 0.5, 1, 1, 1, 0.5, 1, 1, 0.5, 1, 1, 0.5, 0.5, 1,
+    1, 1, 0.5, 0.5, 2, 2, 0.5, 1, 0.5, 0.5, 2, 0.5, 1, 1, 1, 0.5, 1, 1, 1,
+    0.5, 0.5, 2, 2, 0.5, 1, 0.5, 0.5, 2, 0.5, 1, 1, 1, 0.5, 1, 1, 0.5, 0.5, 2,
+    2, 0.5, 1, 0.5, 0.5, 2, 0.5, 1, 1, 1, 0.5, 1, 1, 0.25, 1, 1, 0.25, 0.5, 0.25,
+    0.25, 1, 0.25, 0.5, 0.5, 0.5, 0.25, 0.5, 0.5, 1, 1, 0.25, 0.5, 0.25, 0.25, 1, 0.25, 0.5, 0.5,
+    0.5, 0.25, 0.5, 0.5, 4, 1, 2, 1, 1, 4, 1, 2, 2, 2, 1, 2, 2, 1, 2,
+    1, 1, 4, 1, 2, 2, 2, 1, 2, 2, 0.5, 0.25, 0.25, 1, 0.25, 0.5, 0.5, 0.5, 0.25,
+    0.5, 0.5, 0.5, 0.5, 2, 0.5, 1, 1, 1, 0.5, 1, 1, 0.25, 1, 0.25, 0.5, 0.5, 0.5, 0.25,
+    0.5, 0.5, 1, 0.25, 0.5, 0.5, 0.5, 0.25, 0.5, 0.5, 1, 2, 2, 2, 1, 2, 2, 0.5, 0.5,
+    0.5, 0.25, 0.5, 0.5, 1, 1, 0.5, 1, 1, 1, 0.5, 1, 1, 0.5, 1, 1, 0.5, 0.5, 1,
+    1, 1, 2, 1, 0, 1, 1, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 0.5, 1, 1, 1,
+    2, 1, 0, 1, 1, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 0.5, 1, 1, 2, 1, 0,
+    1, 1, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 0.5, 1, 1, 2, 0, 2, 2, 2, 2,
+    2, 4, 1, 1, 2, 2, 1, 2, 2, 0, 1, 1, 1, 1, 1, 2, 0.5, 0.5, 1,
+    1, 0.5, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1,
+    1, 1, 2, 0.5, 0.5, 1, 1, 0.5, 1, 1, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 0.5,
+    1, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 0.5, 1, 1, 1, 2, 0.5, 0.5, 1, 1, 0.5,
+    1, 1, 2, 0.5, 0.5, 1, 1, 0.5, 1, 1, 1, 1, 2, 2, 1, 2, 2, 0.25, 0.5,
+    0.5, 0.25, 0.5, 0.5, 0.5, 0.5, 0.25, 0.5, 0.5, 1, 0.5, 1, 1, 0.5, 1, 1, 0.5, 0.5, 1,
+    1, 2, 1, 2, 1, 1, 1, 1, 0.5, 1, 1, 1, 1, 0.5, 1, 1, 0, 1, 2,
+    1, 2, 1, 1, 1, 1, 0.5, 1, 1, 1, 1, 0.5, 1, 1, 0, 1, 2, 4, 2,
+    2, 2, 2, 1, 2, 2, 2, 2, 1, 2, 2, 0, 2, 2, 1, 1, 1, 1, 0.5,
+    1, 1, 1, 1, 0.5, 1, 1, 0, 1, 2, 2, 2, 2, 1, 2, 2, 2, 2, 1,
+    2, 2, 0, 2, 1, 1, 1, 0.5, 1, 1, 1, 1, 0.5, 1, 1, 0, 1, 1, 1,
+    0.5, 1, 1, 1, 1, 0.5, 1, 1, 0, 1, 1, 0.5, 1, 1, 1, 1, 0.5, 1, 1,
+    0, 1, 0.5, 1, 1, 1, 1, 0.5, 1, 1, 0, 1, 0.5, 0.5, 0.5, 0.5, 0.25, 0.5, 0.5,
+    0, 0.5, 1, 1, 1, 0.5, 1, 1, 0, 1, 1, 1, 0.5, 1, 1, 0, 1, 1, 0.5,
+    1, 1, 0, 1, 0.5, 1, 1, 0, 1, 0.5, 0.5, 0, 0.5, 1, 0, 1, 0, 1, 0,
+    1, 1, 2, 1, 2, 1, 1, 1, 0.5, 0.5, 0.5, 2, 1, 1, 0.5, 2, 1, 1, 1,
+    2, 1, 2, 1, 1, 1, 0.5, 0.5, 0.5, 2, 1, 1, 0.5, 2, 1, 1, 2, 1, 2,
+    1, 1, 1, 0.5, 0.5, 0.5, 2, 1, 1, 0.5, 2, 1, 1, 2, 4, 2, 2, 2, 1,
+    1, 1, 4, 2, 2, 1, 4, 2, 2, 2, 1, 1, 1, 0.5, 0.5, 0.5, 2, 1, 1,
+    0.5, 2, 1, 1, 2, 2, 2, 1, 1, 1, 4, 2, 2, 1, 4, 2, 2, 1, 1,
+    0.5, 0.5, 0.5, 2, 1, 1, 0.5, 2, 1, 1, 1, 0.5, 0.5, 0.5, 2, 1, 1, 0.5, 2,
+    1, 1, 0.5, 0.5, 0.5, 2, 1, 1, 0.5, 2, 1, 1, 0.25, 0.25, 1, 0.5, 0.5, 0.25, 1,
+    0.5, 0.5, 0.25, 1, 0.5, 0.5, 0.25, 1, 0.5, 0.5, 1, 0.5, 0.5, 0.25, 1, 0.5, 0.5, 2, 2,
+    1, 4, 2, 2, 1, 0.5, 2, 1, 1, 0.5, 2, 1, 1, 1, 0.5, 0.5, 2, 2, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 0.5, 1, 1, 1, 1, 1, 1, 2, 1, 0, 1,
+    1, 1, 1, 1, 1, 1, 0.5, 1, 1, 1, 1, 1, 1, 2, 1, 0, 1, 1, 1,
+    1, 1, 1, 0.5, 1, 1, 1, 1, 1, 1, 2, 1, 0, 1, 1, 1, 1, 1, 0.5,
+    1, 1, 1, 1, 1, 1, 2, 1, 0, 1, 1, 1, 1, 0.5, 1, 1, 1, 1, 1,
+    1, 2, 1, 0, 1, 1, 1, 0.5, 1, 1, 1, 1, 1, 1, 2, 1, 0, 1, 1,
+    0.5, 1, 1, 1, 1, 1, 1, 2, 1, 0, 1, 0.5, 1, 1, 1, 1, 1, 1, 2,
+    1, 0, 0.5, 1, 1, 1, 1, 1, 1, 2, 1, 0, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 1,
+    0.5, 0, 1, 1, 1, 1, 1, 2, 1, 0, 1, 1, 1, 1, 2, 1, 0, 1, 1,
+    1, 2, 1, 0, 1, 1, 2, 1, 0, 1, 2, 1, 0, 2, 1, 0, 2, 0, 0,
+    1, 0.5, 1, 1, 1, 1, 1, 2, 1, 1, 1, 1, 1, 2, 1, 1, 0.5, 0.5, 0.5,
+    1, 1, 1, 1, 1, 2, 1, 1, 1, 1, 1, 2, 1, 1, 0.5, 0.5, 0.5, 0.5, 0.5,
+    0.5, 0.5, 1, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 0.5, 0.5, 0.25, 0.25, 1, 1, 1, 1, 2, 1,
+    1, 1, 1, 1, 2, 1, 1, 0.5, 0.5, 1, 1, 1, 2, 1, 1, 1, 1, 1, 2,
+    1, 1, 0.5, 0.5, 1, 1, 2, 1, 1, 1, 1, 1, 2, 1, 1, 0.5, 0.5, 1, 2,
+    1, 1, 1, 1, 1, 2, 1, 1, 0.5, 0.5, 2, 1, 1, 1, 1, 1, 2, 1, 1,
+    0.5, 0.5, 2, 2, 2, 2, 2, 4, 2, 2, 1, 1, 1, 1, 1, 1, 2, 1, 1,
+    0.5, 0.5, 1, 1, 1, 2, 1, 1, 0.5, 0.5, 1, 1, 2, 1, 1, 0.5, 0.5, 1, 2,
+    1, 1, 0.5, 0.5, 2, 1, 1, 0.5, 0.5, 2, 2, 1, 1, 1, 0.5, 0.5, 0.5, 0.5, 0.25,
+    1, 2, 1, 0.5, 1, 1, 1, 1, 0.5, 0.5, 1, 1, 1, 1, 1, 2, 2, 1, 2,
+    1, 0.5, 1, 1, 1, 1, 0.5, 0.5, 1, 1, 1, 1, 1, 2, 2, 1, 2, 1, 2,
+    2, 2, 2, 1, 1, 2, 2, 2, 2, 2, 4, 4, 2, 0.5, 1, 1, 1, 1, 0.5,
+    0.5, 1, 1, 1, 1, 1, 2, 2, 1, 0.5, 0.5, 0.5, 0.5, 0.25, 0.25, 0.5, 0.5, 0.5, 0.5,
+    0.5, 1, 1, 0.5, 1, 1, 1, 0.5, 0.5, 1, 1, 1, 1, 1, 2, 2, 1, 1, 1,
+    0.5, 0.5, 1, 1, 1, 1, 1, 2, 2, 1, 1, 0.5, 0.5, 1, 1, 1, 1, 1, 2,
+    2, 1, 0.5, 0.5, 1, 1, 1, 1, 1, 2, 2, 1, 0.25, 0.5, 0.5, 0.5, 0.5, 0.5, 1,
+    1, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 1, 0.5, 1, 1, 1, 1, 2, 2, 1, 1, 1,
+    1, 2, 2, 1, 1, 1, 2, 2, 1, 1, 2, 2, 1, 2, 2, 1, 4, 2, 2,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+]);
+
+// 防御側のタイプID（1〜2個）→ 組み合わせID（タイプが無ければ -1）
+export function defenderCombo(typeIds) {
+    if (!typeIds || typeIds.length === 0 || typeIds.some(id => id == null || id < 0 || id >= TYPE_COUNT)) return -1;
+    return DEFENDER_COMBOS[typeIds[0] * TYPE_COUNT + typeIds[typeIds.length - 1]];
+}
@@ -1,61 +1,19 @@
-export const TYPE_CHART = {
-    "Normal": { "Rock": 0.5, "Ghost": 0, "Steel": 0.5 },
-    "Fire": { "Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 2, "Bug": 2, "Rock": 0.5, "Dragon": 0.5, "Steel": 2 },
-    "Water": { "Fire": 2, "Water": 0.5, "Grass": 0.5, "Ground": 2, "Rock": 2, "Dragon": 0.5 },
-    "Electric": { "Water": 2, "Electric": 0.5, "Grass": 0.5, "Ground": 0, "Flying": 2, "Dragon": 0.5 },
-    "Grass": { "Fire": 0.5, "Water": 2, "Grass": 0.5, "Poison": 0.5, "Ground": 2, "Flying": 0.5, "Bug": 0.5, "Rock": 2, "Dragon": 0.5, "Steel": 0.5 },
-    "Ice": { "Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 0.5, "Ground": 2, "Flying": 2, "Dragon": 2, "Steel": 0.5 },
-    "Fighting": { "Normal": 2, "Ice": 2, "Poison": 0.5, "Flying": 0.5, "Psychic": 0.5, "Bug": 0.5, "Rock": 2, "Ghost": 0, "Dark": 2, "Steel": 2, "Fairy": 0.5 },
-    "Poison": { "Grass": 2, "Poison": 0.5, "Ground": 0.5, "Rock": 0.5, "Ghost": 0.5, "Steel": 0, "Fairy": 2 },
-    "Ground": { "Fire": 2, "Electric": 2, "Grass": 0.5, "Poison": 2, "Flying": 0, "Bug": 0.5, "Rock": 2, "Steel": 2 },
-    "Flying": { "Electric": 0.5, "Grass": 2, "Fighting": 2, "Bug": 2, "Rock": 0.5, "Steel": 0.5 },
-    "Psychic": { "Fighting": 2, "Poison": 2, "Psychic": 0.5, "Dark": 0, "Steel": 0.5 },
-    "Bug": { "Fire": 0.5, "Grass": 2, "Fighting": 0.5, "Poison": 0.5, "Flying": 0.5, "Psychic": 2, "Ghost": 0.5, "Dark": 2, "Steel": 0.5, "Fairy": 0.5 },
-    "Rock": { "Fire": 2, "Ice": 2, "Fighting": 0.5, "Ground": 0.5, "Flying": 2, "Bug": 2, "Steel": 0.5 },
-    "Ghost": { "Normal": 0, "Psychic": 2, "Ghost": 2, "Dark": 0.5 },
-    "Dragon": { "Dragon": 2, "Steel": 0.5, "Fairy": 0 },
-    "Dark": { "Fighting": 0.5, "Psychic": 2, "Ghost": 2, "Dark": 0.5, "Fairy": 0.5 },
-    "Steel": { "Fire": 0.5, "Water": 0.5, "Electric": 0.5, "Ice": 2, "Rock": 2, "Steel": 0.5, "Fairy": 2 },
-    "Fairy": { "Fire": 0.5, "Fighting": 2, "Poison": 0.5, "Dragon": 2, "Dark": 2, "Steel": 0.5 }
-};
+import { COMBO_COUNT, EFFECTIVENESS, TYPE_IDS, defenderCombo } from './type_table.js';
 
-// 日本語タイプ名 → 英語タイプ名の変換マップ
-const TYPE_TRANSLATION_JP_TO_EN = {
-    "ノーマル": "Normal",
-    "ほのお": "Fire",
-    "みず": "Water",
-    "でんき": "Electric",
-    "くさ": "Grass",
-    "こおり": "Ice",
-    "かくとう": "Fighting",
-    "どく": "Poison",
-    "じめん": "Ground",
-    "ひこう": "Flying",
-    "エスパー": "Psychic",
-    "むし": "Bug",
-    "いわ": "Rock",
-    "ゴースト": "Ghost",
-    "ドラゴン": "Dragon",
-    "あく": "Dark",
-    "はがね": "Steel",
-    "フェアリー": "Fairy"
-};
+// 相性表は backend/script/type_table.py で生成した type_table.js（タイプID × 防御側のタイプの組み合わせID）
 
-export function getTypeEffectiveness(moveType, defTypes) {
-    let multiplier = 1.0;
-    if (!moveType || !defTypes) return multiplier;
-
-    // 技タイプを英語に変換（日本語の場合）
-    const moveTypeEn = TYPE_TRANSLATION_JP_TO_EN[moveType] || moveType;
+/**
+ * タイプ相性（タイプIDで引く）
+ * moveTypeId: 技の type_id（表に無いタイプは null）
+ * combo: 防御側の組み合わせID（SPECIES_DEX の typeCombo。タイプが無ければ -1）
+ */
+export function getTypeEffectivenessById(moveTypeId, combo) {
+    if (moveTypeId == null || combo < 0) return 1.0;
+    return EFFECTIVENESS[moveTypeId * COMBO_COUNT + combo];
+}
 
-    defTypes.forEach(defType => {
-        // 防御タイプを英語に変換（日本語の場合）
-        const defTypeEn = TYPE_TRANSLATION_JP_TO_EN[defType] || defType;
-        
-        const attackChart = TYPE_CHART[moveTypeEn];
-        if (attackChart && typeof attackChart[defTypeEn] !== 'undefined') {
-            multiplier *= attackChart[defTypeEn];
-        }
-    });
-    return multiplier;
+// タイプ名（日本語・英語）しか無い場合用。計算の途中では getTypeEffectivenessById を使う
+export function getTypeEffectiveness(moveType, defTypes) {
+    if (!moveType || !defTypes) return 1.0;
+    return getTypeEffectivenessById(TYPE_IDS[moveType], defenderCombo(defTypes.map(t => TYPE_IDS[t])));
 }
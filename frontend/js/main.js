@@ -1,7 +1,8 @@
 import { AppState } from './AppState.js?v=117';
-import { SPECIES_DEX, MOVES_DEX, ITEMS_DEX, COMMONLY_USED_POKEMON, USAGE_RATE_DATA, loadAllData } from './data/loader.js?v=3';
-import { calculateDamage } from './calc/damage.js?v=202';
+import { SPECIES_DEX, MOVES_DEX, ITEMS_DEX, COMMONLY_USED_POKEMON, USAGE_RATE_DATA, loadAllData, ensureSpeciesDetails, isSpeciesDetailLoaded } from './data/loader.js?v=4';
+import { calculateDamage } from './calc/damage.js?v=203';
 import { calculateHp, calculateStat } from './calc/stats.js?v=3';
+import { loadSpriteAtlas, applyAtlasSprite, clearAtlasSprite } from './data/atlas.js?v=1';
 
 const appState = new AppState();
 // Debug: Expose to window
@@ -12,7 +13,7 @@ window.SPECIES_DEX = SPECIES_DEX;
 let globalTurnCounter = 0;
 
 document.addEventListener('DOMContentLoaded', async () => {
-    await loadAllData();
+    await Promise.all([loadAllData(), loadSpriteAtlas()]);
 
     // Ally (自分) Inputs
     // Ally (自分) Inputs
@@ -854,32 +855,38 @@ document.addEventListener('DOMContentLoaded', async () => {
                     if (allyIcon && allyPoke) {
                         const name = allyPoke.name.trim();
                         allyIcon.dataset.retried = ''; // Reset retry flag
+
+                        // アトラスに含まれていればシート画像の該当領域を表示（個別の画像リクエストなし）
+                        if (applyAtlasSprite(allyIcon, name)) {
+                            allyIcon.alt = name;
+                            allyIcon.onerror = null;
+                        } else {
+                            let src = `../backend/image/${name}.gif`;
+                            if (allyPoke.speciesData && allyPoke.speciesData.sprite_url) {
+                                src = allyPoke.speciesData.sprite_url;
+                            }
                         
-                        let src = `../backend/image/${name}.gif`;
-                        if (allyPoke.speciesData && allyPoke.speciesData.sprite_url) {
-                            src = allyPoke.speciesData.sprite_url;
-                        }
-                        
-                        allyIcon.src = src;
-                        allyIcon.alt = name;
-                        allyIcon.onerror = () => { 
-                            if (!allyIcon.dataset.retried) {
-                                allyIcon.dataset.retried = 'true';
-                                // JSON URL failed, try local
-                                if (src !== `../backend/image/${name}.gif`) {
-                                    allyIcon.src = `../backend/image/${name}.gif`;
-                                    return;
-                                }
+                            allyIcon.src = src;
+                            allyIcon.alt = name;
+                            allyIcon.onerror = () => { 
+                                if (!allyIcon.dataset.retried) {
+                                    allyIcon.dataset.retried = 'true';
+                                    // JSON URL failed, try local
+                                    if (src !== `../backend/image/${name}.gif`) {
+                                        allyIcon.src = `../backend/image/${name}.gif`;
+                                        return;
+                                    }
                                 
-                                if (name.includes('（') || name.includes('(')) {
-                                    const baseName = name.split(/[（(]/)[0];
-                                    allyIcon.src = `../backend/image/${baseName}.gif`;
-                                    return;
+                                    if (name.includes('（') || name.includes('(')) {
+                                        const baseName = name.split(/[（(]/)[0];
+                                        allyIcon.src = `../backend/image/${baseName}.gif`;
+                                        return;
+                                    }
                                 }
-                            }
-                            allyIcon.src = ''; 
-                            allyIcon.alt = name; 
-                        };
+                                allyIcon.src = ''; 
+                                allyIcon.alt = name; 
+                            };
+                        }
                     }
 
                     // Enemy Icon
@@ -887,32 +894,38 @@ document.addEventListener('DOMContentLoaded', async () => {
                     if (enemyIcon && enemyPoke) {
                         const name = enemyPoke.name.trim();
                         enemyIcon.dataset.retried = ''; // Reset retry flag
-                        
-                        let src = `../backend/image/${name}.gif`;
-                        if (enemyPoke.speciesData && enemyPoke.speciesData.sprite_url) {
-                            src = enemyPoke.speciesData.sprite_url;
-                        }
 
-                        enemyIcon.src = src;
-                        enemyIcon.alt = name;
-                        enemyIcon.onerror = () => { 
-                            if (!enemyIcon.dataset.retried) {
-                                enemyIcon.dataset.retried = 'true';
-                                // JSON URL failed, try local
-                                if (src !== `../backend/image/${name}.gif`) {
-                                    enemyIcon.src = `../backend/image/${name}.gif`;
-                                    return;
-                                }
+                        // アトラスに含まれていればシート画像の該当領域を表示（個別の画像リクエストなし）
+                        if (applyAtlasSprite(enemyIcon, name)) {
+                            enemyIcon.alt = name;
+                            enemyIcon.onerror = null;
+                        } else {
+                            let src = `../backend/image/${name}.gif`;
+                            if (enemyPoke.speciesData && enemyPoke.speciesData.sprite_url) {
+                                src = enemyPoke.speciesData.sprite_url;
+                            }
+
+                            enemyIcon.src = src;
+                            enemyIcon.alt = name;
+                            enemyIcon.onerror = () => { 
+                                if (!enemyIcon.dataset.retried) {
+                                    enemyIcon.dataset.retried = 'true';
+                                    // JSON URL failed, try local
+                                    if (src !== `../backend/image/${name}.gif`) {
+                                        enemyIcon.src = `../backend/image/${name}.gif`;
+                                        return;
+                                    }
                                 
-                                if (name.includes('（') || name.includes('(')) {
-                                    const baseName = name.split(/[（(]/)[0];
-                                    enemyIcon.src = `../backend/image/${baseName}.gif`;
-                                    return;
+                                    if (name.includes('（') || name.includes('(')) {
+                                        const baseName = name.split(/[（(]/)[0];
+                                        enemyIcon.src = `../backend/image/${baseName}.gif`;
+                                        return;
+                                    }
                                 }
-                            }
-                            enemyIcon.src = ''; 
-                            enemyIcon.alt = name; 
-                        };
+                                enemyIcon.src = ''; 
+                                enemyIcon.alt = name; 
+                            };
+                        }
                     }
                     
                     // Arrow Direction
@@ -1489,6 +1502,17 @@ document.addEventListener('DOMContentLoaded', async () => {
 
         const container = document.querySelector(containerSelector);
         if (!container || !pokemon) return;
+
+        // 特性・覚える技・使用率が未読み込みならシャードを読み込み、選択が変わっていなければ再表示
+        if (pokemon.name && !isSpeciesDetailLoaded(pokemon.name)) {
+            const requestedName = pokemon.name;
+            ensureSpeciesDetails(requestedName).then(() => {
+                const current = (teamType === 'ally') ? appState.getAllyPokemon() : appState.getEnemyPokemon();
+                if (current && current.name === requestedName && isSpeciesDetailLoaded(requestedName)) {
+                    updateFormFromState(teamType);
+                }
+            });
+        }
         
         // 初回計算
         if (pokemon.realStats.hp === 0) {
@@ -1693,7 +1717,10 @@ document.addEventListener('DOMContentLoaded', async () => {
                 img.dataset.retried = ''; // Reset retry flag
                 
                 if (expectedSrc) {
-                    img.src = expectedSrc;
+                    // アトラスに含まれていればシート画像の該当領域を表示（個別の画像リクエストなし）
+                    if (!applyAtlasSprite(img, name)) {
+                        img.src = expectedSrc;
+                    }
                     img.alt = name;
                     img.style.display = '';
                     nameSpan.style.display = 'none';
@@ -1701,6 +1728,7 @@ document.addEventListener('DOMContentLoaded', async () => {
                     // No valid data yet (partial match or invalid), hide image
                     img.style.display = 'none';
                     img.src = ''; // Clear to be safe
+                    clearAtlasSprite(img);
                     nameSpan.textContent = name;
                     nameSpan.style.display = 'inline';
                     slotBtn.classList.remove('has-image');
@@ -1929,7 +1957,8 @@ function updateUsageRateDisplay(side, pokemonName) {
     // 配列からポケモン名で検索
     const usageData = USAGE_RATE_DATA.find(entry => entry.name === pokemonName);
     
-    if (!usageData) {
+    // 詳細シャードの読み込み前は順位と名前だけなので表示しない
+    if (!usageData || !usageData.moves) {
         // データがない場合は非表示
         if (section) {
             section.style.display = 'none';